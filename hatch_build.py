@@ -0,0 +1,62 @@
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+
+class PrecomputeTemplatesHook(BuildHookInterface):
+    """Render every template of `pygic/templates` into the wheel (see `pygic.precompute`),
+    so that the installed `pygic` does not render them at every run,
+    and list their names for the shell completion (see `pygic.complete`).
+    """
+
+    PLUGIN_NAME = "custom"
+
+    def initialize(self, version: str, build_data: dict[str, Any]) -> None:
+        # An editable install uses the sources, which may change after the build
+        if self.target_name != "wheel" or version == "editable":
+            return
+
+        # Import `pygic` from the sources being built
+        sys.path.insert(0, self.root)
+        try:
+            import pygic.gitignore
+            from pygic.complete import COMPLETION_NAMES_FILE_NAME
+            from pygic.index import write_completion_names
+            from pygic.precompute import (
+                PRECOMPUTED_TEMPLATES_FILE_NAME,
+                write_precomputed_templates,
+            )
+        finally:
+            sys.path.remove(self.root)
+
+        self._temp_dir = tempfile.mkdtemp()
+        templates_directory = Path(self.root) / "pygic" / "templates"
+        output = Path(self._temp_dir) / PRECOMPUTED_TEMPLATES_FILE_NAME
+        # Keep the indexes of the template directory in memory: the build must not write
+        # in the cache directory of the user, outside of the build tree
+        index_cache_dir = pygic.gitignore.INDEX_CACHE_DIR
+        pygic.gitignore.INDEX_CACHE_DIR = None
+        try:
+            write_precomputed_templates(templates_directory, output)
+        finally:
+            pygic.gitignore.INDEX_CACHE_DIR = index_cache_dir
+        build_data["force_include"][str(output)] = (
+            f"pygic/{PRECOMPUTED_TEMPLATES_FILE_NAME}"
+        )
+        # The names of the templates for the shell completion, see `pygic.complete`
+        names_output = Path(self._temp_dir) / COMPLETION_NAMES_FILE_NAME
+        write_completion_names(templates_directory, names_output)
+        build_data["force_include"][str(names_output)] = (
+            f"pygic/{COMPLETION_NAMES_FILE_NAME}"
+        )
+
+    def finalize(
+        self, version: str, build_data: dict[str, Any], artifact_path: str
+    ) -> None:
+        temp_dir = getattr(self, "_temp_dir", None)
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
@@ -1,3 +1,16 @@
-from .gitignore import Gitignore
+# `typing` is not imported, to keep `import pygic` cheap
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .gitignore import Gitignore
 
 __all__ = ["Gitignore"]
+
+
+def __getattr__(name: str):
+    # `Gitignore` is imported on first use, so that the lightweight modules of `pygic`
+    # (e.g. `pygic.complete`) can be imported without loading the templates machinery
+    if name == "Gitignore":
+        from .gitignore import Gitignore
+
+        return Gitignore
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
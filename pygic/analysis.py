@@ -0,0 +1,346 @@
+from pygic.patterns import (
+    Nfa,
+    Rule,
+    Token,
+    is_glob_intersecting,
+    parse_rule,
+    tokenize_glob,
+)
+
+# Rough relative costs of evaluating a rule against one path, following git's `dir.c`:
+# patterns without wildcards are compared with `strcmp`, `*literal` basename patterns with a suffix
+# comparison, and the other patterns go through `wildmatch`, whose cost grows with the wildcards.
+LITERAL_COST = 1
+WILDMATCH_COST = 2
+STAR_COST = 1
+CHARACTER_CLASS_COST = 2
+DOUBLE_STAR_COST = 4
+
+# The length from which a chain of nested exceptions is reported
+MIN_NEGATION_CHAIN_LENGTH = 3
+# The number of character classes from which a pattern is reported
+MIN_CHARACTER_CLASSES = 3
+
+
+class RuleAnalysis:
+    """The estimated cost of a rule of a gitignore, and how to make it cheaper.
+
+    Attributes:
+        line_number (int): The line number of the rule in the gitignore, starting at 1.
+        rule (Rule): The rule.
+        cost (int): The estimated cost of evaluating the rule against one path, see `estimate_cost`.
+        issues (list[str]): The reasons why the rule is expensive.
+        rewrite (str | None): An equivalent but cheaper line, if any.
+        rewrite_cost (int | None): The estimated cost of the rewritten line, if any.
+    """
+
+    def __init__(self, line_number: int, rule: Rule, cost: int) -> None:
+        self.line_number = line_number
+        self.rule = rule
+        self.cost = cost
+        self.issues: list[str] = []
+        self.rewrite: str | None = None
+        self.rewrite_cost: int | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "line_number": self.line_number,
+            "rule": self.rule.line,
+            "cost": self.cost,
+            "issues": self.issues,
+            "rewrite": self.rewrite,
+            "rewrite_cost": self.rewrite_cost,
+        }
+
+
+class GitignoreAnalysis:
+    """The estimated cost of the rules of a gitignore, see `analyze`.
+
+    Attributes:
+        content (str): The analyzed gitignore.
+        rules (list[RuleAnalysis]): The analysis of each rule, in the order of the gitignore.
+    """
+
+    def __init__(self, content: str, rules: list[RuleAnalysis]) -> None:
+        self.content = content
+        self.rules = rules
+
+    @property
+    def cost(self) -> int:
+        """The estimated cost of evaluating all the rules against a path that none of them matches."""
+        return sum(rule.cost for rule in self.rules)
+
+    @property
+    def rewritten_cost(self) -> int:
+        """The estimated cost once the suggested rewrites are applied."""
+        return sum(
+            rule.cost if rule.rewrite is None else rule.rewrite_cost
+            for rule in self.rules
+        )
+
+    @property
+    def rewritten_content(self) -> str:
+        """The gitignore with the suggested rewrites applied."""
+        lines = self.content.split("\n")
+        for rule in self.rules:
+            if rule.rewrite is not None:
+                lines[rule.line_number - 1] = rule.rewrite
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "cost": self.cost,
+            "rewritten_cost": self.rewritten_cost,
+            "rules": [rule.to_dict() for rule in self.rules],
+        }
+
+
+def _matched_tokens(rule: Rule) -> list[Token]:
+    """Get the tokens of the pattern of a rule as git matches it: against the basename of the paths
+    if the rule is not anchored, otherwise against the path relative to the gitignore.
+
+    Raises:
+        ValueError: If the pattern uses an unsupported construct.
+    """
+    tokens = rule.tokens
+    # The `**/` added to the glob of the rules that are not anchored
+    return tokens if rule.anchored else tokens[1:]
+
+
+def _is_character_class(token: Token) -> bool:
+    return token.kind == "char" and token.text.startswith("[")
+
+
+def estimate_cost(rule: Rule) -> int:
+    """Estimate the cost of evaluating a rule against one path, in rough relative units.
+
+    Like git, patterns without wildcards and basename patterns like `*.log` are compared directly,
+    the other patterns are matched with `wildmatch` at a cost growing with their wildcards,
+    and anchored patterns starting with literal characters reject most paths on these characters.
+    """
+    try:
+        tokens = _matched_tokens(rule)
+    except ValueError:
+        # POSIX character classes like `[[:space:]]`, and empty patterns
+        pattern = rule.pattern
+        return (
+            WILDMATCH_COST
+            + STAR_COST * pattern.count("*")
+            + CHARACTER_CLASS_COST * pattern.count("[")
+            if pattern.strip("/")
+            else 0
+        )
+
+    if all(token.is_literal for token in tokens):
+        return LITERAL_COST
+    if (
+        not rule.anchored
+        and tokens[0].kind == "star"
+        and all(token.is_literal for token in tokens[1:])
+    ):
+        return LITERAL_COST
+
+    cost = WILDMATCH_COST
+    for token in tokens:
+        if token.kind == "star":
+            cost += STAR_COST
+        elif token.kind in ("dirs", "rest"):
+            cost += DOUBLE_STAR_COST
+        elif _is_character_class(token):
+            cost += CHARACTER_CLASS_COST
+        elif not token.is_literal:  # ?
+            cost += STAR_COST
+    if rule.anchored and tokens[0].is_literal:
+        # Most paths are rejected by comparing the literal prefix
+        cost = LITERAL_COST + cost // 2
+    return cost
+
+
+def _escape_pattern_start(pattern: str) -> str:
+    """Escape the first character of a pattern if it would otherwise start a comment or a negation."""
+    return f"\\{pattern}" if pattern[:1] in ("#", "!") else pattern
+
+
+def _format_line(rule: Rule, pattern: str) -> str:
+    """Get the line of a rule with the same negation and directory flag, but another pattern."""
+    return (
+        ("!" if rule.negated else "")
+        + _escape_pattern_start(pattern)
+        + ("/" if rule.directory_only else "")
+    )
+
+
+def _analyze_leading_double_star(analysis: RuleAnalysis) -> None:
+    """Report a leading `**/`, which is evaluated against the whole path at every depth."""
+    rule = analysis.rule
+    tokens = rule.tokens
+    if not rule.pattern.startswith("**/") or tokens[0].kind != "dirs":
+        return
+    rest = rule.pattern[3:]
+    if rest and "/" not in rest:
+        # `**/foo` is the same as `foo`, which git only compares with the basename of the paths
+        analysis.issues.append(
+            f"Leading `**/` matches against the whole path, `{rest}` only matches against the basename."
+        )
+        analysis.rewrite = _format_line(rule, rest)
+    else:
+        analysis.issues.append(
+            "Leading `**/` matches against the whole path at every depth, "
+            "without a literal prefix to reject paths early."
+        )
+
+
+def _literal_prefix(tokens: list[Token]) -> str:
+    """Get the literal characters at the start of a tokenized glob, that every matched path starts with."""
+    prefix = []
+    for token in tokens:
+        if not token.is_literal:
+            break
+        prefix.append(chr(token.chars.intervals[0][0]))
+    return "".join(prefix)
+
+
+def _analyze_directory_contents(
+    analysis: RuleAnalysis, later_negated_rules: list[Rule]
+) -> None:
+    """Report `dir/**`, `dir/*` and `dir/**/*`, which make git check every path of the directory
+    instead of skipping the directory."""
+    rule = analysis.rule
+    if rule.negated or rule.directory_only:
+        return
+    for suffix in ("/**/*", "/**", "/*"):
+        if rule.pattern.endswith(suffix):
+            directory = rule.pattern[: -len(suffix)]
+            break
+    else:
+        return
+    if not directory.strip("/") or directory.endswith("/"):
+        return
+    glob = directory.lstrip("/")
+    try:
+        directory_tokens = tokenize_glob(glob)
+    except ValueError:
+        return
+    directory_prefix = _literal_prefix(directory_tokens)
+    directory_nfas = [
+        Nfa(directory_tokens),
+        Nfa(directory_tokens + tokenize_glob("/**")),
+    ]
+    analysis.issues.append(
+        f"Git checks every path inside `{directory}` instead of skipping the directory."
+    )
+    # A later negation could re-include the directory or some of its paths,
+    # which is not possible once the directory itself is ignored
+    for negated_rule in later_negated_rules:
+        if not negated_rule.is_supported:
+            return
+        # Quick rejection: the paths of both globs start with their literal prefixes
+        prefix = _literal_prefix(negated_rule.tokens)
+        if not (
+            prefix.startswith(directory_prefix) or directory_prefix.startswith(prefix)
+        ):
+            continue
+        if any(is_glob_intersecting(negated_rule.nfa, nfa) for nfa in directory_nfas):
+            return
+    # The pattern must stay anchored
+    analysis.rewrite = f"{'' if '/' in directory else '/'}{directory}/"
+
+
+def _analyze_character_classes(analysis: RuleAnalysis) -> None:
+    """Report patterns with many or complex character classes, like `[Dd][Ee][Bb][Uu][Gg]`."""
+    classes = [
+        token.chars
+        for token in _matched_tokens(analysis.rule)
+        if _is_character_class(token)
+    ]
+    complex_classes = [
+        chars for chars in classes if chars.negated or len(chars.intervals) > 2
+    ]
+    if len(classes) >= MIN_CHARACTER_CLASSES or complex_classes:
+        analysis.issues.append(
+            f"{len(classes)} character classes are matched with wildmatch for every path."
+        )
+
+
+def _analyze_negation_chains(analyses: list[RuleAnalysis]) -> None:
+    """Report chains of nested exceptions, like `.vscode/*`, `!.vscode/settings.json`, then a rule
+    ignoring a part of `.vscode/settings.json` again: each rule of the chain matches every path
+    of the next one, of the other kind (negated or not).
+
+    Such chains are hard to maintain, and a negation re-including a path inside an ignored directory
+    has no effect, since git does not list the content of ignored directories.
+    """
+    # The longest chain ending with each rule, as the indexes of its rules
+    chains: list[list[int]] = []
+    # The indexes of the supported rules, by kind (negated or not)
+    indexes_by_kind: dict[bool, list[int]] = {False: [], True: []}
+    for index, analysis in enumerate(analyses):
+        rule = analysis.rule
+        chain = [index]
+        if rule.is_supported:
+            for previous_index in indexes_by_kind[not rule.negated]:
+                if len(chains[previous_index]) + 1 > len(chain) and analyses[
+                    previous_index
+                ].rule.subsumes(rule):
+                    chain = chains[previous_index] + [index]
+            indexes_by_kind[rule.negated].append(index)
+        chains.append(chain)
+
+    reported: set[int] = set()
+    for chain in sorted(chains, key=len, reverse=True):
+        if len(chain) < MIN_NEGATION_CHAIN_LENGTH or chain[-1] in reported:
+            continue
+        line_numbers = ", ".join(str(analyses[index].line_number) for index in chain)
+        analyses[chain[-1]].issues.append(
+            f"Chain of {len(chain)} nested exceptions alternately ignoring and re-including "
+            f"the same paths (lines {line_numbers})."
+        )
+        reported.update(chain)
+
+
+def analyze(content: str) -> GitignoreAnalysis:
+    """Estimate the cost of the rules of a gitignore, report the expensive ones,
+    and suggest equivalent cheaper rewrites.
+
+    The reported issues are:
+    - A leading `**/`, rewritten without it when it is followed by a basename pattern.
+    - `dir/**`, `dir/*` and `dir/**/*`, rewritten as `/dir/` when no later negation re-includes a path of `dir`.
+    - Many or complex character classes.
+    - Chains of nested exceptions alternately ignoring and re-including the same paths.
+
+    Args:
+        content (str): The content of the gitignore.
+
+    Returns:
+        GitignoreAnalysis: The analysis of each rule.
+    """
+    analyses: list[RuleAnalysis] = []
+    for line_number, line in enumerate(content.split("\n"), start=1):
+        rule = parse_rule(line)
+        if rule is not None:
+            analyses.append(RuleAnalysis(line_number, rule, estimate_cost(rule)))
+
+    negated_rules = [
+        (index, analysis.rule)
+        for index, analysis in enumerate(analyses)
+        if analysis.rule.negated
+    ]
+    for index, analysis in enumerate(analyses):
+        if not analysis.rule.is_supported:
+            if analysis.cost == 0:
+                analysis.issues.append("Empty pattern, which matches nothing.")
+            else:
+                analysis.issues.append(
+                    "POSIX character classes are matched with wildmatch for every path."
+                )
+            continue
+        _analyze_leading_double_star(analysis)
+        later_negated_rules = [
+            rule for negated_index, rule in negated_rules if negated_index > index
+        ]
+        _analyze_directory_contents(analysis, later_negated_rules)
+        _analyze_character_classes(analysis)
+        if analysis.rewrite is not None:
+            analysis.rewrite_cost = estimate_cost(Rule(analysis.rewrite))
+    _analyze_negation_chains(analyses)
+    return GitignoreAnalysis(content, analyses)
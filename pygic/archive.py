@@ -0,0 +1,432 @@
+import contextlib
+import functools
+import hashlib
+import http.client
+import json
+import logging
+import os
+import posixpath
+import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import IO, Callable, Iterator
+from urllib.parse import urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+"""The size of the chunks in which archives are downloaded."""
+
+MAX_REDIRECTS = 5
+"""The maximum number of redirections followed when downloading an archive."""
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+MAX_SYMLINK_DEPTH = 8
+"""The maximum number of symbolic links followed to find the file of a template in an archive."""
+
+TEMPLATES_DIRECTORY_NAME = "templates"
+"""The name of the directory of the templates in the archives of the toptal/gitignore repository."""
+
+
+class ConnectionPool:
+    """Persistent HTTP connections, reused by the successive requests to the same host.
+
+    A connection is only reused once the response to its previous request was fully read,
+    and is used by a single request at a time, so the pool can be shared between threads.
+
+    Attributes:
+        timeout (float): The timeout in seconds of the connections.
+        max_connections_per_host (int): The maximum number of idle connections kept for each host.
+    """
+
+    def __init__(self, timeout: float = 30, max_connections_per_host: int = 4) -> None:
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.__idle_connections: dict[
+            tuple[str, str, int | None], list[http.client.HTTPConnection]
+        ] = {}
+        self.__lock = threading.Lock()
+
+    def __new_connection(
+        self, key: tuple[str, str, int | None]
+    ) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        if scheme == "http":
+            return http.client.HTTPConnection(host, port, timeout=self.timeout)
+        raise ValueError(f"Unsupported URL scheme: '{scheme}'.")
+
+    @contextlib.contextmanager
+    def request(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> Iterator[http.client.HTTPResponse]:
+        """Send a GET request, reusing an idle connection to the host if any.
+
+        The connection is given back to the pool when the context exits if the response was fully read,
+        and closed otherwise.
+
+        Raises:
+            ValueError: If the URL does not use the http or https scheme.
+            OSError: If the request fails.
+            http.client.HTTPException: If the response is invalid.
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname or "", parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+
+        with self.__lock:
+            idle_connections = self.__idle_connections.get(key, [])
+            connection = idle_connections.pop() if idle_connections else None
+        reused = connection is not None
+        if connection is None:
+            connection = self.__new_connection(key)
+
+        try:
+            try:
+                connection.request("GET", path, headers=headers or {})
+                response = connection.getresponse()
+            except ConnectionError:
+                if not reused:
+                    raise
+                # The server closed the idle connection in the meantime
+                connection.close()
+                connection = self.__new_connection(key)
+                connection.request("GET", path, headers=headers or {})
+                response = connection.getresponse()
+            yield response
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.isclosed() and not response.will_close:
+            with self.__lock:
+                idle_connections = self.__idle_connections.setdefault(key, [])
+                if len(idle_connections) < self.max_connections_per_host:
+                    idle_connections.append(connection)
+                    return
+        connection.close()
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        with self.__lock:
+            idle_connections, self.__idle_connections = self.__idle_connections, {}
+        for connections in idle_connections.values():
+            for connection in connections:
+                connection.close()
+
+
+DEFAULT_CONNECTION_POOL = ConnectionPool()
+"""The connection pool used by default, shared by all the downloads of the process."""
+
+
+class ArchiveCache:
+    """The downloaded archive of a URL and its extracted templates.
+
+    The cache directory is organized as follows:
+    - `archive`: The last downloaded archive.
+    - `archive.json`: The URL and the validators (`ETag` and `Last-Modified` headers) of the archive.
+    - `archive.part` and `archive.part.json`: An interrupted download, resumed by the next download
+        if the archive did not change on the server in the meantime.
+    - `templates/`: The templates extracted from the archive.
+
+    Attributes:
+        url (str): The URL of the archive.
+        directory (Path): The cache directory of the URL.
+    """
+
+    def __init__(self, url: str, cache_directory: str | Path) -> None:
+        self.url = url
+        url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+        self.directory = Path(cache_directory) / url_hash
+
+    @property
+    def archive_path(self) -> Path:
+        return self.directory / "archive"
+
+    @property
+    def part_path(self) -> Path:
+        return self.directory / "archive.part"
+
+    @property
+    def templates_directory(self) -> Path:
+        return self.directory / TEMPLATES_DIRECTORY_NAME
+
+    def __read_metadata(self, path: Path) -> dict[str, str]:
+        """Read the validators of a (partial) archive, or an empty dict if they are missing or for another URL."""
+        try:
+            metadata = json.loads(path.with_name(f"{path.name}.json").read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(metadata, dict) or metadata.get("url") != self.url:
+            return {}
+        return metadata
+
+    def __write_metadata(self, path: Path, response: http.client.HTTPResponse) -> None:
+        metadata = {"url": self.url}
+        for header, key in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+            value = response.getheader(header)
+            if value is not None:
+                metadata[key] = value
+        path.with_name(f"{path.name}.json").write_text(json.dumps(metadata))
+
+    def __get_headers(self) -> dict[str, str]:
+        """Get the headers of a conditional request of the archive, resuming the interrupted download if any."""
+        headers = {}
+        metadata = self.__read_metadata(self.archive_path)
+        if metadata and self.archive_path.is_file():
+            if "etag" in metadata:
+                headers["If-None-Match"] = metadata["etag"]
+            if "last_modified" in metadata:
+                headers["If-Modified-Since"] = metadata["last_modified"]
+
+        part_metadata = self.__read_metadata(self.part_path)
+        # A strong ETag, or the last modification date, identifies the version of the partial archive
+        validator = part_metadata.get("etag", "")
+        if validator.startswith("W/"):
+            validator = ""
+        validator = validator or part_metadata.get("last_modified", "")
+        if validator and self.part_path.is_file():
+            headers["Range"] = f"bytes={self.part_path.stat().st_size}-"
+            headers["If-Range"] = validator
+        return headers
+
+    def download(self, pool: ConnectionPool = DEFAULT_CONNECTION_POOL) -> bool:
+        """Download the archive if it changed since the last download.
+
+        Returns:
+            bool: Whether a new archive was downloaded.
+
+        Raises:
+            ConnectionError: If the download fails. A partially downloaded archive is kept,
+                and the next download resumes it if the server supports range requests.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        headers = self.__get_headers()
+        url = self.url
+        error = "too many redirections"
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                with pool.request(url, headers) as response:
+                    status = response.status
+                    if status in (200, 206):
+                        self.__save(response)
+                        return True
+                    response.read()
+                    location = response.getheader("Location")
+                if status in REDIRECT_STATUSES and location is not None:
+                    url = urljoin(url, location)
+                    continue
+                if status == 304:
+                    logger.info(f"The archive '{self.url}' did not change.")
+                    self.part_path.unlink(missing_ok=True)
+                    return False
+                if status == 416 and "Range" in headers:
+                    # The partial archive is longer than the archive, restart the download
+                    self.part_path.unlink()
+                    return self.download(pool)
+                error = f"HTTP {status} {response.reason}"
+                break
+        except (OSError, http.client.HTTPException) as e:
+            raise ConnectionError(f"Could not download '{self.url}': {e}") from e
+        raise ConnectionError(f"Could not download '{self.url}': {error}.")
+
+    def __save(self, response: http.client.HTTPResponse) -> None:
+        """Write the body of a response to the partial archive, then replace the archive with it."""
+        if response.status == 206:
+            # e.g. `bytes 1000-1999/2000`
+            content_range = response.getheader("Content-Range", "")
+            start = content_range.removeprefix("bytes ").split("-")[0]
+            if start != str(self.part_path.stat().st_size):
+                raise ConnectionError(
+                    f"the download was resumed at an unexpected position ({content_range})"
+                )
+            logger.info(f"Resuming the download of '{self.url}' from byte {start}.")
+            mode = "ab"
+        else:
+            self.__write_metadata(self.part_path, response)
+            mode = "wb"
+
+        with open(self.part_path, mode) as f:
+            while chunk := response.read(CHUNK_SIZE):
+                f.write(chunk)
+        # `read` returns an empty chunk instead of raising when the connection is closed too early,
+        # in which case the remaining length of the body is not zero
+        if response.length:
+            raise http.client.IncompleteRead(b"", response.length)
+
+        os.replace(
+            self.part_path.with_name(f"{self.part_path.name}.json"),
+            self.archive_path.with_name(f"{self.archive_path.name}.json"),
+        )
+        os.replace(self.part_path, self.archive_path)
+
+    def extract_templates(self) -> Path:
+        """Extract the templates of the archive, and replace the previously extracted ones with them.
+
+        Returns:
+            Path: The directory of the extracted templates.
+
+        Raises:
+            ValueError: If the archive is not a zip or tar archive, or does not contain a `templates` directory.
+        """
+        tmp_directory = Path(tempfile.mkdtemp(prefix=".templates-", dir=self.directory))
+        try:
+            with open(self.archive_path, "rb") as f:
+                extract_templates(f, tmp_directory)
+            # Swap the templates, the window where they do not exist is limited to two renames
+            old_directory = self.directory / f".templates.old-{os.getpid()}"
+            if self.templates_directory.exists():
+                self.templates_directory.rename(old_directory)
+            tmp_directory.rename(self.templates_directory)
+            shutil.rmtree(old_directory, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            raise
+        return self.templates_directory
+
+    def update(self, pool: ConnectionPool = DEFAULT_CONNECTION_POOL) -> Path:
+        """Download the archive if it changed, and extract its templates if they are not extracted yet.
+        The names of the extracted templates are saved for the shell completion (see `pygic.complete`).
+
+        If the download fails but templates were already extracted, they are used.
+
+        Returns:
+            Path: The directory of the extracted templates.
+
+        Raises:
+            ConnectionError: If the download fails and no templates were extracted before.
+            ValueError: If the archive does not contain templates.
+        """
+        try:
+            changed = self.download(pool)
+        except ConnectionError as e:
+            if not self.templates_directory.is_dir():
+                raise
+            logger.warning(f"{e} Using the previously downloaded templates.")
+            return self.templates_directory
+
+        if changed or not self.templates_directory.is_dir():
+            from pygic.index import save_completion_names
+
+            logger.info(f"Extracting the templates of '{self.url}'.")
+            self.extract_templates()
+            save_completion_names(self.templates_directory)
+        return self.templates_directory
+
+
+def find_templates_prefix(names: list[str]) -> str:
+    """Find the path of the `templates` directory in the member names of an archive,
+    e.g. `gitignore-master/templates/` in an archive of the toptal/gitignore repository.
+
+    Raises:
+        ValueError: If the archive does not contain a `templates` directory.
+    """
+    prefixes = set()
+    for name in names:
+        directory, _, file_name = name.rpartition("/")
+        if file_name and directory.rpartition("/")[2] == TEMPLATES_DIRECTORY_NAME:
+            prefixes.add(f"{directory}/")
+    if not prefixes:
+        raise ValueError("The archive does not contain a `templates` directory.")
+    return min(prefixes, key=lambda prefix: (prefix.count("/"), prefix))
+
+
+class _ArchiveMember:
+    """A file or a symbolic link of an archive.
+
+    Attributes:
+        read (Callable[[], bytes]): Read the content of the file, or the target of the link.
+        is_link (bool): Whether the member is a symbolic link.
+    """
+
+    def __init__(self, read: Callable[[], bytes], is_link: bool) -> None:
+        self.read = read
+        self.is_link = is_link
+
+
+def _list_zip_members(zf: zipfile.ZipFile) -> dict[str, _ArchiveMember]:
+    return {
+        info.filename: _ArchiveMember(
+            functools.partial(zf.read, info),
+            stat.S_ISLNK(info.external_attr >> 16),
+        )
+        for info in zf.infolist()
+        if not info.is_dir()
+    }
+
+
+def _list_tar_members(tf: tarfile.TarFile) -> dict[str, _ArchiveMember]:
+    members = {}
+    for member in tf.getmembers():
+        if member.isfile():
+            members[member.name] = _ArchiveMember(
+                functools.partial(_read_tar_member, tf, member), False
+            )
+        elif member.issym():
+            members[member.name] = _ArchiveMember(
+                functools.partial(str.encode, member.linkname), True
+            )
+    return members
+
+
+def _read_tar_member(tf: tarfile.TarFile, member: tarfile.TarInfo) -> bytes:
+    extracted = tf.extractfile(member)
+    return b"" if extracted is None else extracted.read()
+
+
+def _extract_members(members: dict[str, _ArchiveMember], destination: Path) -> None:
+    prefix = find_templates_prefix(list(members))
+    for name, member in members.items():
+        file_name = name[len(prefix) :]
+        if not name.startswith(prefix) or "/" in file_name:
+            continue
+        # Follow the symbolic links (e.g. `WebStorm.gitignore` to `JetBrains.gitignore`) inside the archive
+        target_name = name
+        for _ in range(MAX_SYMLINK_DEPTH):
+            if not member.is_link:
+                break
+            target_name = posixpath.normpath(
+                posixpath.join(posixpath.dirname(target_name), member.read().decode())
+            )
+            member = members.get(target_name)
+            if member is None:
+                break
+        if member is None or member.is_link:
+            logger.warning(
+                f"Ignoring the broken symbolic link '{name}' of the archive."
+            )
+            continue
+        (destination / file_name).write_bytes(member.read())
+
+
+def extract_templates(archive: IO[bytes], destination: Path) -> None:
+    """Extract the files of the `templates` directory of a zip or tar (possibly compressed) archive,
+    without extracting the other files.
+
+    Only the files directly inside the directory are extracted, under their base name, so the members
+    of the archive cannot be written outside of `destination`. Symbolic links are replaced by a copy
+    of their target if it is a file of the archive.
+
+    Raises:
+        ValueError: If the archive is not a zip or tar archive, or does not contain a `templates` directory.
+    """
+    if zipfile.is_zipfile(archive):
+        archive.seek(0)
+        with zipfile.ZipFile(archive) as zf:
+            _extract_members(_list_zip_members(zf), destination)
+        return
+
+    archive.seek(0)
+    try:
+        with tarfile.open(fileobj=archive, mode="r:*") as tf:
+            _extract_members(_list_tar_members(tf), destination)
+    except tarfile.TarError as e:
+        raise ValueError(f"Invalid archive: {e}") from e
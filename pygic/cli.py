@@ -1,7 +1,10 @@
-from typing import Callable, Tuple
+from typing import TYPE_CHECKING, Callable, Tuple
 
 import rich_click as click
 
+if TYPE_CHECKING:
+    from pygic import Gitignore
+
 
 def verbose_option(func: Callable) -> Callable:
     return click.option(
@@ -12,11 +15,26 @@ def verbose_option(func: Callable) -> Callable:
     )(func)
 
 
+def log_format_option(func: Callable) -> Callable:
+    return click.option(
+        "--log-format",
+        type=click.Choice(["text", "json"]),
+        default="text",
+        envvar="PYGIC_LOG_FORMAT",
+        show_default=True,
+        help=(
+            "The format of the logs: colored text, or a JSON object per line "
+            "with extra fields like the time taken to create each gitignore."
+        ),
+    )(func)
+
+
 @click.group()
 @click.version_option()  # Allow the `--version` option to print the version
 @click.pass_context  # Pass the click context to the function
 @verbose_option
-def pygic(ctx: click.Context, verbose: int):
+@log_format_option
+def pygic(ctx: click.Context, verbose: int, log_format: str):
     """pygic CLI - A tool for generating gitignores."""
 
     import logging
@@ -26,11 +44,11 @@ def pygic(ctx: click.Context, verbose: int):
     # Set up logging based on the provided verbosity level
     # Default to WARNING level
     if verbose == 1:
-        setup_logging(logging.INFO)
+        setup_logging(logging.INFO, log_format=log_format)
     elif verbose >= 2:
-        setup_logging(logging.DEBUG)
+        setup_logging(logging.DEBUG, log_format=log_format)
     else:
-        setup_logging(logging.WARNING)
+        setup_logging(logging.WARNING, log_format=log_format)
 
 
 def clone_option(func: Callable) -> Callable:
@@ -55,7 +73,7 @@ def directory_option(func: Callable) -> Callable:
     return click.option(
         "--directory",
         default=None,
-        help="Directory containing local .gitignore files.",
+        help="Directory containing local .gitignore files, or a zip archive (e.g. a wheel) containing them.",
     )(func)
 
 
@@ -67,58 +85,382 @@ def ignore_num_files_check_option(func: Callable) -> Callable:
     )(func)
 
 
+def clone_ttl_option(func: Callable) -> Callable:
+    return click.option(
+        "--clone-ttl",
+        type=click.FloatRange(min=0),
+        default=None,
+        envvar="PYGIC_CLONE_TTL",
+        help=(
+            "Age in seconds after which the cloned repository is refreshed in the background, "
+            "while the current clone is used. Can also be set with PYGIC_CLONE_TTL."
+        ),
+    )(func)
+
+
+def snapshot_option(func: Callable) -> Callable:
+    return click.option(
+        "--snapshot",
+        default=None,
+        help="Use the templates of a snapshot of the template store (name, commit prefix, or 'latest').",
+    )(func)
+
+
+def archive_option(func: Callable) -> Callable:
+    return click.option(
+        "--archive",
+        is_flag=False,
+        flag_value="default",
+        default=None,
+        help=(
+            "If provided, use the templates of a downloaded archive of the repository instead of cloning it, "
+            "only downloaded again when it changed. If no URL is provided, use the default archive."
+        ),
+    )(func)
+
+
+def ref_option(func: Callable) -> Callable:
+    return click.option(
+        "--ref",
+        default=None,
+        help=(
+            "Use the templates of a branch, tag or commit of the repository, read from its git objects "
+            "without checking them out. The repository is fetched if the ref is not found, "
+            "or with --force-clone."
+        ),
+    )(func)
+
+
+def overlay_option(func: Callable) -> Callable:
+    return click.option(
+        "--overlay",
+        "overlays",
+        multiple=True,
+        type=click.Path(exists=True),
+        envvar="PYGIC_OVERLAY",
+        help=(
+            "A directory of templates stacked on top of the other templates, without copying them: "
+            "its files replace the ones with the same name and its new templates are added. "
+            "Can be repeated, the last overlay being the uppermost one."
+        ),
+    )(func)
+
+
+def load_templates(
+    directory: str | None,
+    clone: str | None,
+    force_clone: bool,
+    ignore_num_files_check: bool,
+    snapshot: str | None = None,
+    clone_ttl: float | None = None,
+    archive: str | None = None,
+    ref: str | None = None,
+    overlays: Tuple[str, ...] = (),
+) -> "Gitignore":
+    """Load the templates according to the template options of a command."""
+
+    from pygic import Gitignore
+
+    if snapshot is not None:
+        templates = Gitignore.from_snapshot(snapshot)
+    elif archive is not None:
+        from pygic.config import TOPTAL_ARCHIVE_URL
+
+        try:
+            templates = Gitignore.from_archive(
+                TOPTAL_ARCHIVE_URL if archive == "default" else archive,
+                ignore_num_files_check=ignore_num_files_check,
+            )
+        except (ConnectionError, ValueError) as e:
+            raise click.ClickException(str(e)) from e
+    elif ref is not None:
+        try:
+            templates = Gitignore.from_git_ref(
+                ref,
+                fetch=force_clone,
+                clone_ttl=clone_ttl,
+                ignore_num_files_check=ignore_num_files_check,
+            )
+        except (ConnectionError, FileNotFoundError, ValueError) as e:
+            raise click.ClickException(str(e)) from e
+    else:
+        templates = Gitignore(
+            directory=directory,
+            clone_directory=clone,
+            force_clone=force_clone,
+            ignore_num_files_check=ignore_num_files_check,
+            clone_ttl=clone_ttl,
+        )
+    try:
+        return templates.with_overlays(*overlays)
+    except (NotADirectoryError, ValueError) as e:
+        raise click.ClickException(str(e)) from e
+
+
 @pygic.command()
 @click.argument("names", nargs=-1, required=True)
 @clone_option
 @force_clone_option
+@clone_ttl_option
 @directory_option
 @ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
+@click.option(
+    "--minimize",
+    is_flag=True,
+    help=(
+        "Remove the rules that are provably subsumed by other rules (e.g. `*.pyc` with `*.py[cod]`), "
+        "and report how many were removed on stderr."
+    ),
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Only output the rules, without the comments, the section headers and the blank lines.",
+)
+@click.option(
+    "--strip",
+    type=click.Choice(["blank", "comments", "headers"]),
+    multiple=True,
+    help="Remove the blank lines, the comments or the section headers. Can be repeated.",
+)
+@click.option(
+    "--sort",
+    "sort_rules",
+    is_flag=True,
+    help="Sort the rules alphabetically, between the negated rules, comments and blank lines.",
+)
+@click.option(
+    "--source-map",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write to this file a JSON map from each output rule to its template file and line.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help=(
+        "The output format. `json` outputs the sections with their template file and rules, "
+        "the duplicated lines removed when merging the templates, the content and its SHA-256."
+    ),
+)
 def gen(
     names: Tuple[str, ...],
     clone: str,
     force_clone: bool,
+    clone_ttl: float | None,
     directory: str,
     ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
+    minimize: bool,
+    compact: bool,
+    strip: Tuple[str, ...],
+    sort_rules: bool,
+    source_map: str | None,
+    output_format: str,
 ):
     """Generate a gitignore file using the template of the given NAMES."""
 
-    from pygic import Gitignore
+    if output_format == "json" and (
+        minimize or compact or strip or sort_rules or source_map
+    ):
+        raise click.UsageError(
+            "--format json cannot be used with --minimize, --compact, --strip, --sort or --source-map."
+        )
 
-    templates = Gitignore(
+    templates = load_templates(
         directory=directory,
-        clone_directory=clone,
+        clone=clone,
         force_clone=force_clone,
         ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
     )
 
+    if output_format == "json":
+        import json
+
+        structured = templates.create_structured(*names)
+        click.echo(json.dumps(structured.to_dict(), indent=2))
+        return
+
     gitignore = templates.create(*names)
 
-    click.echo(gitignore, nl=False)
+    if minimize:
+        from pygic.patterns import minimize as minimize_gitignore
+
+        result = minimize_gitignore(gitignore)
+        gitignore = result.content
+        click.echo(
+            f"Removed {len(result.removed)} of {result.num_rules} rules subsumed by other rules.",
+            err=True,
+        )
+
+    if not (compact or strip or sort_rules or source_map):
+        click.echo(gitignore, nl=False)
+        return
+
+    from pygic.pipeline import (
+        COMPACT_STAGES,
+        SourceMap,
+        iter_source_lines,
+        render_lines,
+        run_pipeline,
+    )
+
+    stages = [f"strip-{part}" for part in strip]
+    if compact:
+        stages.extend(COMPACT_STAGES)
+    if sort_rules:
+        stages.append("sort")
+    rules_map = SourceMap() if source_map else None
+    for text in render_lines(
+        run_pipeline(iter_source_lines(gitignore, templates.directory), stages),
+        rules_map,
+    ):
+        click.echo(text, nl=False)
+    if rules_map is not None:
+        with open(source_map, "w") as f:
+            f.write(rules_map.to_json())
+
+
+@pygic.command()
+@click.argument("names", nargs=-1, required=True)
+@clone_option
+@force_clone_option
+@clone_ttl_option
+@directory_option
+@ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
+@click.option(
+    "--all",
+    "show_all",
+    is_flag=True,
+    help="Show every rule, not only the reported ones.",
+)
+@click.option(
+    "--rewrite",
+    is_flag=True,
+    help="Print the gitignore with the suggested rewrites applied instead of the report.",
+)
+@click.option("--json", "as_json", is_flag=True, help="Output the report as JSON.")
+def analyze(
+    names: Tuple[str, ...],
+    clone: str,
+    force_clone: bool,
+    clone_ttl: float | None,
+    directory: str,
+    ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
+    show_all: bool,
+    rewrite: bool,
+    as_json: bool,
+):
+    """
+    Estimate how expensive the rules of the gitignore of the given NAMES are for git to evaluate,
+    report the expensive patterns and chains of negations, and suggest cheaper equivalent rules.
+    """
+
+    from pygic.analysis import analyze as analyze_gitignore
+
+    templates = load_templates(
+        directory=directory,
+        clone=clone,
+        force_clone=force_clone,
+        ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
+    )
+
+    analysis = analyze_gitignore(templates.create(*names))
+
+    if rewrite:
+        click.echo(
+            f"Estimated cost per path: {analysis.cost} -> {analysis.rewritten_cost}.",
+            err=True,
+        )
+        click.echo(analysis.rewritten_content, nl=False)
+        return
+
+    if as_json:
+        import json
+
+        click.echo(json.dumps(analysis.to_dict(), indent=2))
+        return
+
+    click.echo(
+        f"{len(analysis.rules)} rules, estimated cost per path: {analysis.cost} "
+        f"({analysis.rewritten_cost} with the suggested rewrites)."
+    )
+    rules = sorted(
+        (rule for rule in analysis.rules if show_all or rule.issues or rule.rewrite),
+        key=lambda rule: (-rule.cost, rule.line_number),
+    )
+    for rule in rules:
+        click.echo(f"\nline {rule.line_number}, cost {rule.cost}: {rule.rule.line}")
+        for issue in rule.issues:
+            click.echo(f"  - {issue}")
+        if rule.rewrite is not None:
+            click.echo(f"  Rewrite as: {rule.rewrite} (cost {rule.rewrite_cost})")
 
 
 @pygic.command(help="Search for templates and generate a .gitignore.")
 @clone_option
 @force_clone_option
+@clone_ttl_option
 @directory_option
 @ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
 def search(
     clone: str,
     force_clone: bool,
+    clone_ttl: float | None,
     directory: str,
     ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
 ):
     """
     Search for names among the available gitignore templates
     and generate a gitignore file using the selected templates.
     """
 
-    from pygic import Gitignore
-
-    templates = Gitignore(
+    templates = load_templates(
         directory=directory,
-        clone_directory=clone,
+        clone=clone,
         force_clone=force_clone,
         ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
     )
 
     gitignore = templates.search_and_create()
@@ -126,5 +468,536 @@ def search(
     click.echo(gitignore, nl=False)
 
 
+@pygic.command("list")
+@clone_option
+@force_clone_option
+@clone_ttl_option
+@directory_option
+@ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
+@click.option("--prefix", help="Only list the templates whose name starts with PREFIX.")
+@click.option(
+    "--contains", help="Only list the templates whose name contains this substring."
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Output the templates as JSON, with whether they have a patch and their stacks.",
+)
+def list_templates(
+    clone: str,
+    force_clone: bool,
+    clone_ttl: float | None,
+    directory: str,
+    ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
+    prefix: str | None,
+    contains: str | None,
+    as_json: bool,
+):
+    """
+    List the names of the available templates, regardless of case for the filters.
+    The names are read from an index persisted until the template directory changes.
+    """
+
+    from pygic.index import get_template_index
+
+    templates = load_templates(
+        directory=directory,
+        clone=clone,
+        force_clone=force_clone,
+        ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
+    )
+
+    infos = get_template_index(templates.directory).filter(prefix, contains)
+
+    if as_json:
+        import json
+
+        click.echo(json.dumps([info.to_dict() for info in infos], indent=2))
+        return
+
+    for info in infos:
+        click.echo(info.name)
+
+
+@pygic.command()
+@click.argument("shell", type=click.Choice(["bash", "zsh", "fish"]))
+def completion(shell: str):
+    """
+    Print the script completing the template names of `pygic gen` and `pygic analyze` in SHELL,
+    e.g. `eval "$(pygic completion bash)"` in your `~/.bashrc`.
+    """
+
+    from pygic.complete import get_script
+
+    click.echo(get_script(shell), nl=False)
+
+
+@pygic.command()
+@click.argument("path", type=click.Path(exists=True))
+@click.option(
+    "--check",
+    is_flag=True,
+    help="Do not write the file, exit with code 1 if it is not up to date.",
+)
+@clone_option
+@force_clone_option
+@clone_ttl_option
+@directory_option
+@ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
+def update(
+    path: str,
+    check: bool,
+    clone: str,
+    force_clone: bool,
+    clone_ttl: float | None,
+    directory: str,
+    ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
+):
+    """
+    Update the pygic sections of the gitignore at PATH (a file or a directory containing a .gitignore),
+    preserving the user lines outside of them. The file is only written if a section changed.
+    """
+
+    from pygic.update import update_gitignore_file
+
+    templates = load_templates(
+        directory=directory,
+        clone=clone,
+        force_clone=force_clone,
+        ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
+    )
+
+    try:
+        changed_titles = update_gitignore_file(path, templates, check=check)
+    except (FileNotFoundError, ValueError) as e:
+        raise click.ClickException(str(e)) from e
+
+    if not changed_titles:
+        click.echo(f"{path} is up to date.")
+    elif check:
+        click.echo(f"{path} is outdated, changed sections: {', '.join(changed_titles)}")
+        raise SystemExit(1)
+    else:
+        click.echo(f"Updated {path}, changed sections: {', '.join(changed_titles)}")
+
+
+@pygic.command()
+@click.argument("path", type=click.Path())
+@click.argument("names", nargs=-1)
+@click.option(
+    "--names-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        "A file of the project listing more template names, separated by whitespace. "
+        "The gitignore is regenerated when it changes."
+    ),
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=1.0,
+    show_default=True,
+    help="The number of seconds between two checks for changes.",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=0.5,
+    show_default=True,
+    help="The number of seconds without change to wait for before regenerating the gitignore.",
+)
+@clone_option
+@force_clone_option
+@clone_ttl_option
+@directory_option
+@ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
+def watch(
+    path: str,
+    names: Tuple[str, ...],
+    names_file: str | None,
+    interval: float,
+    debounce: float,
+    clone: str,
+    force_clone: bool,
+    clone_ttl: float | None,
+    directory: str,
+    ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
+):
+    """
+    Generate the gitignore at PATH (a file or a directory) from the templates of the given NAMES,
+    and generate it again each time these templates or the names file change, until interrupted.
+    The file is only written when its content changes.
+    """
+
+    import functools
+
+    from pygic.watch import GitignoreWatcher
+
+    if not names and names_file is None:
+        raise click.UsageError("Provide template NAMES or a --names-file.")
+
+    reload_templates = functools.partial(
+        load_templates,
+        directory=directory,
+        clone=clone,
+        force_clone=False,
+        ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
+    )
+    watcher = GitignoreWatcher(
+        path,
+        reload_templates,
+        names,
+        names_file=names_file,
+        templates=reload_templates(force_clone=force_clone),
+    )
+
+    click.echo(
+        f"Watching the templates of {watcher.path}, press Ctrl+C to stop.", err=True
+    )
+    try:
+        watcher.run(
+            interval,
+            debounce,
+            on_write=lambda written: click.echo(f"Updated {written}", err=True),
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+@pygic.command()
+@click.argument("names", nargs=-1, required=True)
+@click.option(
+    "--repository",
+    type=click.Path(exists=True, file_okay=False),
+    default=".",
+    show_default=True,
+    help="The git repository whose staged files are checked.",
+)
+@clone_option
+@force_clone_option
+@clone_ttl_option
+@directory_option
+@ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
+def precommit(
+    names: Tuple[str, ...],
+    repository: str,
+    clone: str,
+    force_clone: bool,
+    clone_ttl: float | None,
+    directory: str,
+    ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
+):
+    """
+    Check that no staged file of the repository is ignored by the gitignore of the given NAMES.
+
+    Each ignored file is reported with the rule and the template ignoring it, and the command exits
+    with code 1, so that it can be used as a pre-commit hook.
+    """
+
+    from pygic.precommit import find_ignored_files, get_staged_files
+
+    templates = load_templates(
+        directory=directory,
+        clone=clone,
+        force_clone=force_clone,
+        ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
+    )
+    try:
+        staged_files = get_staged_files(repository)
+    except FileNotFoundError as e:
+        raise click.ClickException("git is not installed.") from e
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+    ignored_files = find_ignored_files(templates.create(*names), staged_files)
+    for ignored_file in ignored_files:
+        click.echo(
+            f"{ignored_file.path}: ignored by '{ignored_file.rule.line}'"
+            f" ({ignored_file.section or 'no template'})"
+        )
+    if ignored_files:
+        click.echo(
+            f"{len(ignored_files)} of {len(staged_files)} staged files are ignored by the templates.",
+            err=True,
+        )
+        raise SystemExit(1)
+
+
+@pygic.command("sync-repos")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--check",
+    is_flag=True,
+    help="Do not write any file, exit with code 1 if a gitignore is not up to date.",
+)
+@clone_option
+@force_clone_option
+@clone_ttl_option
+@directory_option
+@ignore_num_files_check_option
+@snapshot_option
+@archive_option
+@ref_option
+@overlay_option
+def sync_repos(
+    manifest: str,
+    jobs: int | None,
+    check: bool,
+    clone: str,
+    force_clone: bool,
+    clone_ttl: float | None,
+    directory: str,
+    ignore_num_files_check: bool,
+    snapshot: str | None,
+    archive: str | None,
+    ref: str | None,
+    overlays: Tuple[str, ...],
+):
+    """
+    Synchronize in parallel the gitignores of the repositories listed in MANIFEST.
+
+    Each line of MANIFEST contains a repository path followed by its template names.
+    Without names, the existing pygic sections of the repository's .gitignore are updated.
+    """
+
+    from pygic.sync import SyncResult, SyncStatus, read_manifest, sync_repositories
+
+    templates = load_templates(
+        directory=directory,
+        clone=clone,
+        force_clone=force_clone,
+        ignore_num_files_check=ignore_num_files_check,
+        snapshot=snapshot,
+        archive=archive,
+        ref=ref,
+        overlays=overlays,
+        clone_ttl=clone_ttl,
+    )
+
+    def progress(num_done: int, total: int, result: SyncResult) -> None:
+        message = f" ({result.message})" if result.message else ""
+        click.echo(
+            f"[{num_done}/{total}] {result.status.value}: {result.path}{message}",
+            err=True,
+        )
+
+    results = sync_repositories(
+        read_manifest(manifest), templates, jobs=jobs, check=check, progress=progress
+    )
+
+    changed = [result for result in results if result.status == SyncStatus.CHANGED]
+    errors = [result for result in results if result.status == SyncStatus.ERROR]
+    click.echo(
+        f"{len(results)} repositories: {len(changed)} changed, "
+        f"{len(results) - len(changed) - len(errors)} unchanged, {len(errors)} failed."
+    )
+    for result in changed:
+        click.echo(f"{'Outdated' if check else 'Changed'}: {result.path}")
+    for result in errors:
+        click.echo(f"Failed: {result.path} ({result.message})")
+
+    if errors or (check and changed):
+        raise SystemExit(1)
+
+
+@pygic.group()
+def store():
+    """Manage the snapshots of the content-addressed template store."""
+
+
+def store_option(func: Callable) -> Callable:
+    return click.option(
+        "--store",
+        "store_directory",
+        default=None,
+        help="Root directory of the template store. Defaults to the one used after cloning.",
+    )(func)
+
+
+def load_store(store_directory: str | None):
+    """Load the template store from its root directory, or the default one."""
+
+    from pygic.gitignore import TEMPLATE_STORE_DIR
+    from pygic.store import TemplateStore
+
+    if store_directory is None:
+        if TEMPLATE_STORE_DIR is None:
+            raise click.ClickException(
+                "`pygic` was not installed with the [git] extra nor the [dulwich] extra, "
+                "so there is no default template store. Please provide --store."
+            )
+        store_directory = TEMPLATE_STORE_DIR
+    return TemplateStore(store_directory)
+
+
+@store.command("import")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.argument("name")
+@click.option("--overwrite", is_flag=True, help="Replace an existing snapshot.")
+@store_option
+def store_import(
+    directory: str, name: str, overwrite: bool, store_directory: str | None
+):
+    """Create the snapshot NAME from the templates in DIRECTORY."""
+
+    try:
+        files = load_store(store_directory).import_directory(
+            directory, name, overwrite=overwrite
+        )
+    except (FileExistsError, ValueError) as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(f"Snapshot '{name}' created with {len(files)} files.")
+
+
+@store.command("list")
+@store_option
+def store_list(store_directory: str | None):
+    """List the snapshots, from the oldest to the most recent."""
+
+    for name in load_store(store_directory).list_snapshots():
+        click.echo(name)
+
+
+@store.command("remove")
+@click.argument("name")
+@store_option
+def store_remove(name: str, store_directory: str | None):
+    """Remove the snapshot NAME. Its files are only deleted by `pygic store gc`."""
+
+    try:
+        load_store(store_directory).remove_snapshot(name)
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e)) from e
+
+
+@store.command("gc")
+@store_option
+def store_gc(store_directory: str | None):
+    """Delete the files that are not used by any snapshot."""
+
+    num_removed = load_store(store_directory).garbage_collect()
+    click.echo(f"{num_removed} unused files removed.")
+
+
+@pygic.command("diff-templates")
+@click.argument("old")
+@click.argument("new")
+@click.option(
+    "--name-sets",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="File with a set of template names per line, to report the ones whose gitignore would change.",
+)
+@click.option("--json", "as_json", is_flag=True, help="Output the result as JSON.")
+@store_option
+def diff_templates(
+    old: str,
+    new: str,
+    name_sets: str | None,
+    as_json: bool,
+    store_directory: str | None,
+):
+    """
+    Compare the templates of OLD and NEW, which are template directories, clones of the
+    toptal/gitignore repository, or snapshots of the template store.
+    """
+
+    from pathlib import Path
+
+    from pygic.diff import TemplateSet, TemplateSetDiff, read_name_sets
+
+    def load_template_set(source: str) -> TemplateSet:
+        if Path(source).exists():
+            return TemplateSet.from_directory(source)
+        try:
+            return TemplateSet.from_snapshot(load_store(store_directory), source)
+        except (FileNotFoundError, ValueError) as e:
+            raise click.ClickException(
+                f"'{source}' is neither a directory nor a snapshot: {e}"
+            ) from e
+
+    diff = TemplateSetDiff(load_template_set(old), load_template_set(new))
+    affected_name_sets = [
+        names
+        for names in (read_name_sets(name_sets) if name_sets is not None else [])
+        if diff.is_affected(names)
+    ]
+
+    if as_json:
+        import json
+
+        result = {**diff.to_dict(), "affected_name_sets": affected_name_sets}
+        click.echo(json.dumps(result, indent=2))
+        return
+
+    for status, file_names in diff.to_dict().items():
+        for file_name in file_names:
+            click.echo(f"{status}: {file_name}")
+    if name_sets is not None:
+        for names in affected_name_sets:
+            click.echo(f"affected: {' '.join(names)}")
+
+
 if __name__ == "__main__":
     pygic()
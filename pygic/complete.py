@@ -0,0 +1,152 @@
+import os
+import sys
+
+COMPLETION_NAMES_FILE_NAME = "_template_names.txt"
+"""The name of the file listing the lowercase template names, one per line. It is generated in the `pygic`
+package when building the wheel (see `hatch_build.py`), and in the user cache directory after each clone
+of the toptal/gitignore repository or download of its archive."""
+
+COMPLETED_COMMANDS = ("gen", "analyze")
+"""The commands whose arguments are template names."""
+
+CACHED_NAMES_OPTIONS = ("--clone", "--archive", "--ref")
+"""The options of the commands using the templates of the toptal/gitignore repository, whose names are the ones
+saved after its last clone or download, instead of the ones of the templates shipped with `pygic`."""
+
+BASH_SCRIPT = """\
+_pygic_complete() {
+    local i command=""
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        if [[ "${COMP_WORDS[i]}" != -* ]]; then
+            command="${COMP_WORDS[i]}"
+            break
+        fi
+    done
+    local cur="${COMP_WORDS[COMP_CWORD]}"
+    if [[ " %(commands)s " == *" $command "* && "$cur" != -* ]]; then
+        COMPREPLY=($(pygic-complete "$cur" "${COMP_WORDS[@]:1:COMP_CWORD-1}"))
+    fi
+}
+complete -o default -F _pygic_complete pygic
+"""
+
+ZSH_SCRIPT = """\
+#compdef pygic
+_pygic() {
+    local -a names
+    local command=${${words[2,CURRENT-1]:#-*}[1]}
+    if [[ " %(commands)s " == *" $command "* && ${words[CURRENT]} != -* ]]; then
+        names=(${(f)"$(pygic-complete "${words[CURRENT]}" "${(@)words[2,CURRENT-1]}")"})
+        compadd -a names
+    else
+        _files
+    fi
+}
+compdef _pygic pygic
+"""
+
+FISH_SCRIPT = """\
+complete -c pygic -n "__fish_seen_subcommand_from %(commands)s" -f -a "(pygic-complete (commandline -ct) (commandline -opc)[2..-1])"
+"""
+
+SHELL_SCRIPTS = {"bash": BASH_SCRIPT, "zsh": ZSH_SCRIPT, "fish": FISH_SCRIPT}
+"""The completion scripts, by shell, printed by `pygic completion SHELL`."""
+
+
+def get_script(shell: str) -> str:
+    """Get the completion script of a shell.
+
+    Raises:
+        KeyError: If the shell is not supported.
+    """
+    return SHELL_SCRIPTS[shell] % {"commands": " ".join(COMPLETED_COMMANDS)}
+
+
+def get_cached_names_file() -> str | None:
+    """Get the path of the names file written after each clone of the toptal/gitignore repository
+    or download of its archive.
+    None if `pygic` was not installed with the [git] extra nor the [dulwich] extra.
+    """
+    try:
+        import appdirs  # type: ignore
+    except ModuleNotFoundError:
+        return None
+    from pygic.config import AUTHOR
+
+    return os.path.join(
+        appdirs.user_cache_dir("pygic", AUTHOR), COMPLETION_NAMES_FILE_NAME
+    )
+
+
+def uses_cached_names(args: list[str]) -> bool:
+    """Check if the arguments of a command make it use the templates of the toptal/gitignore repository
+    (see `CACHED_NAMES_OPTIONS`), e.g. `--clone` or `--archive=URL`."""
+    return any(arg.split("=")[0] in CACHED_NAMES_OPTIONS for arg in args)
+
+
+def read_names(cached: bool = False) -> list[str]:
+    """Read the template names of the templates used by a command, like `pygic gen`.
+
+    Args:
+        cached (bool): If True, read the names of the last cloned or downloaded templates if any
+            (see `uses_cached_names`). Otherwise, or if there are none, read the names of the templates
+            shipped with `pygic`. When running from the sources, there is no precomputed names file
+            for them, and the template directory is listed. Defaults to False.
+    """
+    package_directory = os.path.dirname(os.path.abspath(__file__))
+    for names_file in (
+        get_cached_names_file() if cached else None,
+        os.path.join(package_directory, COMPLETION_NAMES_FILE_NAME),
+    ):
+        if names_file is None:
+            continue
+        try:
+            with open(names_file, encoding="utf-8") as f:
+                return f.read().split()
+        except OSError:
+            pass
+
+    try:
+        file_names = os.listdir(os.path.join(package_directory, "templates"))
+    except OSError:
+        return []
+    # Like `pygic.gitignore.list_renderable_template_names`
+    return sorted(
+        {
+            file_name.split(".")[0].lower()
+            for file_name in file_names
+            if "." in file_name
+        }
+    )
+
+
+def complete(word: str, args: list[str] | None = None) -> list[str]:
+    """Get the template names starting with `word`, regardless of case.
+
+    Args:
+        word (str): The word being completed.
+        args (list[str] | None): The words of the command line before `word`, without `pygic`,
+            which decide which templates are used (see `read_names`). Defaults to None.
+    """
+    word = word.lower()
+    names = read_names(cached=uses_cached_names(args or []))
+    return [name for name in names if name.startswith(word)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the completion: `pygic-complete WORD [ARGS...]` prints the matching names, one per line,
+    `ARGS` being the words of the command line before `WORD`.
+
+    It is run by the shell at every <TAB>, so this module does not import `rich_click` nor the rest of `pygic`
+    (only `pygic.config`), and the names are read from a precomputed file (see `pygic.index.write_completion_names`)
+    instead of listing the templates.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    names = complete(argv[0] if argv else "", argv[1:])
+    if names:
+        sys.stdout.write("\n".join(names) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
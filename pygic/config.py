@@ -1,4 +1,5 @@
 import importlib.resources
+import os
 from pathlib import Path
 
 try:
@@ -6,7 +7,11 @@ try:
     import pygic
 
     if hasattr(importlib.resources, "files"):  # Python 3.9+
-        PACKAGE_DIR = Path(importlib.resources.files(pygic))
+        PACKAGE_DIR = importlib.resources.files(pygic)
+        if isinstance(PACKAGE_DIR, os.PathLike):
+            PACKAGE_DIR = Path(PACKAGE_DIR)
+        # Otherwise, `pygic` is imported from a zip archive (e.g. a zipapp) and the
+        # `Traversable` is kept, see `pygic.resources.open_template_directory`
     else:  # Python 3.8 or earlier
         PACKAGE_DIR = Path(pygic.__file__).parent
 
@@ -25,3 +30,8 @@ VERSION = "0.1.0"
 
 TOPTAL_REPO_URL = "https://github.com/toptal/gitignore.git"
 """The URL of the Toptal gitignore repository containing the templates."""
+
+TOPTAL_ARCHIVE_URL = (
+    "https://codeload.github.com/toptal/gitignore/tar.gz/refs/heads/master"
+)
+"""The URL of a tarball of the Toptal gitignore repository, used instead of cloning it (see `pygic.archive`)."""
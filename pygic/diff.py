@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import Iterable
+
+from pygic.file import FileType
+from pygic.gitignore import read_order_file, sort_template_names
+from pygic.store import TemplateStore, hash_content
+
+
+class TemplateSet:
+    """The hashes of the files of a template directory, used to compare template directories
+    without comparing their content.
+
+    Attributes:
+        directory (Path): The template directory.
+        hashes (dict[str, str]): The hashes of the files of the directory, by file name.
+    """
+
+    def __init__(self, directory: Path, hashes: dict[str, str]) -> None:
+        self.directory = directory
+        self.hashes = hashes
+
+    @classmethod
+    def from_directory(cls, directory: str | Path) -> "TemplateSet":
+        """Hash the files of a template directory.
+
+        If the directory is a clone of the toptal/gitignore repository,
+        the files of its `templates` directory are hashed.
+
+        Raises:
+            NotADirectoryError: If `directory` is not a directory.
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise NotADirectoryError(f"'{directory}' is not a directory.")
+        if (directory / "templates").is_dir():
+            directory = directory / "templates"
+        hashes = {
+            file_path.name: hash_content(file_path.read_bytes())
+            for file_path in directory.iterdir()
+            if file_path.is_file()
+        }
+        return cls(directory, hashes)
+
+    @classmethod
+    def from_snapshot(cls, store: TemplateStore, name: str) -> "TemplateSet":
+        """Get the hashes of a snapshot of a `TemplateStore`, without reading any template.
+
+        Raises:
+            FileNotFoundError: If no snapshot matches the name.
+            ValueError: If several snapshots match the name.
+        """
+        return cls(store.snapshot_directory(name), store.get_snapshot(name))
+
+    def get_order_dict(self) -> dict[str, int]:
+        """Get the order of the templates, or an empty order if there is no `order` file."""
+        if "order" not in self.hashes:
+            return {}
+        return read_order_file(self.directory / "order")
+
+
+def get_template_name(file_name: str) -> str | None:
+    """Get the lowercase name of the template a file belongs to, as matched by `Gitignore.create_one_gitignore`.
+
+    Example:
+        `ReactNative.Buck.stack` belongs to the `reactnative` template.
+
+    Returns:
+        str | None: The name of the template, or None if the file is not a template file (e.g. `order`).
+    """
+    stem, _, suffix = file_name.rpartition(".")
+    if not stem or suffix not in FileType.values():
+        return None
+    return stem.split(".")[0].lower()
+
+
+class TemplateSetDiff:
+    """The differences between two template sets.
+
+    Attributes:
+        added (list[str]): The names of the files only in the new template set.
+        removed (list[str]): The names of the files only in the old template set.
+        changed (list[str]): The names of the files whose content changed.
+        old_order (dict[str, int]): The order of the templates in the old template set.
+        new_order (dict[str, int]): The order of the templates in the new template set.
+            The orders are only read if the `order` file changed, otherwise they are empty.
+        changed_template_names (set[str]): The lowercase names of the templates with at least one added,
+            removed, or changed file.
+    """
+
+    def __init__(self, old: TemplateSet, new: TemplateSet) -> None:
+        self.added = sorted(new.hashes.keys() - old.hashes.keys())
+        self.removed = sorted(old.hashes.keys() - new.hashes.keys())
+        self.changed = sorted(
+            name
+            for name in old.hashes.keys() & new.hashes.keys()
+            if old.hashes[name] != new.hashes[name]
+        )
+
+        if "order" in self.added or "order" in self.removed or "order" in self.changed:
+            self.old_order = old.get_order_dict()
+            self.new_order = new.get_order_dict()
+        else:
+            self.old_order = self.new_order = {}
+
+        self.changed_template_names: set[str] = {
+            template_name
+            for file_name in [*self.added, *self.removed, *self.changed]
+            if (template_name := get_template_name(file_name)) is not None
+        }
+
+    def is_affected(self, names: Iterable[str]) -> bool:
+        """Check if the output of `Gitignore.create(*names)` differs between the two template sets.
+
+        The output differs if a file of one of the templates differs,
+        or if the order of the templates in the output differs.
+
+        Args:
+            names (Iterable[str]): The names of the templates, regardless of case.
+
+        Returns:
+            bool: True if the output differs.
+        """
+        lower_names = {name.lower() for name in names}
+        if not lower_names.isdisjoint(self.changed_template_names):
+            return True
+        return sort_template_names(lower_names, self.old_order) != sort_template_names(
+            lower_names, self.new_order
+        )
+
+    def to_dict(self) -> dict[str, list[str]]:
+        """Get the differences as a JSON serializable dictionary."""
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+
+def read_name_sets(path: str | Path) -> list[list[str]]:
+    """Read a file with a set of template names per line, separated by whitespace.
+
+    Empty lines and comments are ignored.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"File '{path}' does not exist.")
+    with open(path, "r") as f:
+        return [
+            line.split()
+            for line in map(str.strip, f)
+            if line and not line.startswith("#")
+        ]
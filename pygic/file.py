@@ -1,6 +1,9 @@
+import os
 from enum import Enum
 from pathlib import Path
 
+from pygic.resources import TemplateDirectory, is_existing_entry, split_file_name
+
 
 class FileType(str, Enum):
     """Enum to represent the type of a template file."""
@@ -37,26 +40,28 @@ class File:
     Can be of type: `gitignore`, `patch`, or `stack`. (see `FileType` for more information)
 
     Attributes:
-        path (Path): The path to the file. If the file is a symlink, the path is resolved.
+        path (Path | Traversable): The path to the file. If the file is a symlink, the path is resolved.
+            A `Traversable` for a file inside a zip archive (see `pygic.resources`).
         type (FileType): The type of the file.
         name (str): The name of the file without the extension.
             Example: `Python` for `Python.gitignore`.
     """
 
-    def __init__(self, path: Path) -> None:
-        # Ensure that the path is a Path object and check if the file exists
-        self.path = Path(path)
-        if not self.path.exists():
+    def __init__(self, path: str | TemplateDirectory) -> None:
+        # Ensure that the path is a Path object (unless it is inside an archive) and check if the file exists
+        self.path = Path(path) if isinstance(path, (str, os.PathLike)) else path
+        if not is_existing_entry(self.path):
             raise FileNotFoundError(f"File '{self.path}' does not exist.")
 
         # Get the type of the file and check if it is supported
-        self.type = FileType(self.path.suffix[1:])
+        stem, suffix = split_file_name(self.path.name)
+        self.type = FileType(suffix)
 
         # Extract the name of the file
-        self.name = self.path.stem
+        self.name = stem
 
         # Finally, resolve the path if it is a symlink
-        if self.path.is_symlink():
+        if isinstance(self.path, Path) and self.path.is_symlink():
             self.path = self.path.resolve()
 
     def get_content(self) -> str:
@@ -66,6 +71,6 @@ class File:
             This is the desired behavior since `pygic` is a CLI tool and the templates are not expected to be
             read multiple times in a single run.
         """
-        with open(self.path, "r") as f:
+        with self.path.open("r") as f:
             content = f.read()
         return content
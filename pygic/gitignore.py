@@ -1,25 +1,55 @@
 import difflib
 import logging
 import shutil
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Literal
-
-from pygic.config import AUTHOR, PACKAGE_DIR, ROOT_DIR, TOPTAL_REPO_URL, VERSION
+from typing import TYPE_CHECKING, Iterable, Literal, Mapping, Sequence
+
+from pygic.config import (
+    AUTHOR,
+    PACKAGE_DIR,
+    ROOT_DIR,
+    TOPTAL_ARCHIVE_URL,
+    TOPTAL_REPO_URL,
+    VERSION,
+)
 from pygic.file import File, FileType
+from pygic.lines import LineTable
+from pygic.resources import (
+    TemplateDirectory,
+    is_existing_entry,
+    iter_template_files,
+    open_template_directory,
+    split_file_name,
+)
+
+if TYPE_CHECKING:
+    from pygic.precompute import PrecomputedTemplates
+    from pygic.structured import StructuredGitignore
 
 logger = logging.getLogger(__name__)
 
+SECTION_HEADER_FORMATS = {
+    FileType.GITIGNORE: "### {} ###",
+    FileType.PATCH: "### {} Patch ###",
+    FileType.STACK: "### {} Stack ###",
+}
+"""The format of the header of the section of each type of template file, with the name of the file."""
+
 # Check if we're using a development or installed directory structure
 if PACKAGE_DIR is None:
     # Development structure
     _TEMPLATES_LOCAL_DIR = ROOT_DIR / "pygic/templates"
 else:
-    # Installed package structure
-    _TEMPLATES_LOCAL_DIR = PACKAGE_DIR / "templates"
+    # Installed package structure, possibly inside a zip archive (e.g. a zipapp)
+    _TEMPLATES_LOCAL_DIR = open_template_directory(PACKAGE_DIR / "templates")
 
-TEMPLATES_LOCAL_DIR = _TEMPLATES_LOCAL_DIR
-"""The directory (absolute path) of the pre-downloaded gitignore templates from the toptal/gitignore repository."""
+TEMPLATES_LOCAL_DIR: TemplateDirectory = _TEMPLATES_LOCAL_DIR
+"""The directory (absolute path) of the pre-downloaded gitignore templates from the toptal/gitignore repository.
+A `Traversable` if `pygic` is imported from a zip archive, in which case the templates are read from the archive."""
 
 try:
     import appdirs  # type: ignore
@@ -28,6 +58,18 @@ try:
     __CLONED_TOPTAL_DIR: Path | None = Path(
         appdirs.user_data_dir("pygic", AUTHOR, VERSION)
     )
+    __TEMPLATE_STORE_DIR: Path | None = (
+        Path(appdirs.user_data_dir("pygic", AUTHOR)) / "store"
+    )
+    __INDEX_CACHE_DIR: Path | None = (
+        Path(appdirs.user_cache_dir("pygic", AUTHOR)) / "index"
+    )
+    __ARCHIVE_CACHE_DIR: Path | None = (
+        Path(appdirs.user_cache_dir("pygic", AUTHOR)) / "archives"
+    )
+    __GIT_REPOSITORY_DIR: Path | None = (
+        Path(appdirs.user_data_dir("pygic", AUTHOR)) / "toptal.git"
+    )
 
 except ModuleNotFoundError:
     logger.info(
@@ -35,11 +77,79 @@ except ModuleNotFoundError:
         "If you want this feature, install `pygic` with the [git] extra or the [dulwich] extra."
     )
     __CLONED_TOPTAL_DIR: Path | None = None
+    __TEMPLATE_STORE_DIR: Path | None = None
+    __INDEX_CACHE_DIR: Path | None = None
+    __ARCHIVE_CACHE_DIR: Path | None = None
+    __GIT_REPOSITORY_DIR: Path | None = None
 
 CLONED_TOPTAL_DIR: Path | None = __CLONED_TOPTAL_DIR
 """The directory (absolute path) of the cloned toptal/gitignore repository.
 None if `pygic` was not installed with the [git] extra."""
 
+CLONE_STAMP_FILE = ".pygic-cloned"
+"""The file touched in the cloned toptal/gitignore repository after each clone, to know its age."""
+
+TEMPLATE_STORE_DIR: Path | None = __TEMPLATE_STORE_DIR
+"""The directory (absolute path) of the default `TemplateStore`, where a snapshot of the templates
+is saved after each clone of the toptal/gitignore repository.
+None if `pygic` was not installed with the [git] extra."""
+
+INDEX_CACHE_DIR: Path | None = __INDEX_CACHE_DIR
+"""The directory (absolute path) where the template name indexes used by `pygic list` are persisted.
+None if `pygic` was not installed with the [git] extra."""
+
+ARCHIVE_CACHE_DIR: Path | None = __ARCHIVE_CACHE_DIR
+"""The directory (absolute path) where the archives of the templates downloaded by `Gitignore.from_archive`
+and their extracted templates are cached.
+None if `pygic` was not installed with the [archive] extra, the [git] extra, or the [dulwich] extra."""
+
+GIT_REPOSITORY_DIR: Path | None = __GIT_REPOSITORY_DIR
+"""The directory (absolute path) of the bare toptal/gitignore repository fetched by `Gitignore.from_git_ref`.
+None if `pygic` was not installed with the [git] extra nor the [dulwich] extra."""
+
+
+class _LoadedTemplates:
+    """The templates loaded by a `Gitignore` instance, never modified once created.
+
+    Cloning, `Gitignore.ingest` and `Gitignore.reload` create new loaded templates which replace
+    the previous ones atomically, so that concurrent calls keep using the templates they started with.
+
+    Attributes:
+        directory (Path | Traversable): The directory containing the gitignore templates.
+        use_precomputed (bool): Whether the renderings precomputed at build time can be used.
+        line_table (LineTable): The table of the lines of the ingested templates. It is append-only,
+            so it can be shared with the next loaded templates of the instance.
+        ingested (Mapping[str, Sequence[int]]): The IDs of the lines of the ingested templates, by lowercase name.
+            Never modified, `Gitignore.ingest` replaces it.
+        order (Mapping[str, int] | None): The order of the templates, read once by `Gitignore.reload`,
+            or None to read the `order` file on each call.
+    """
+
+    def __init__(
+        self,
+        directory: TemplateDirectory,
+        use_precomputed: bool,
+        line_table: LineTable,
+        ingested: Mapping[str, Sequence[int]],
+        order: Mapping[str, int] | None = None,
+    ) -> None:
+        self.directory = directory
+        self.use_precomputed = use_precomputed
+        self.line_table = line_table
+        self.ingested = ingested
+        self.order = order
+
+    def replace(self, **changes) -> "_LoadedTemplates":
+        """Get a copy of the loaded templates with some attributes changed."""
+        attributes = {
+            "directory": self.directory,
+            "use_precomputed": self.use_precomputed,
+            "line_table": self.line_table,
+            "ingested": self.ingested,
+            "order": self.order,
+        }
+        return _LoadedTemplates(**{**attributes, **changes})
+
 
 class Gitignore:
     """Class to manage the gitignore templates.
@@ -64,8 +174,12 @@ class Gitignore:
     - `create(*names)`: Create a gitignore file from multiple templates.
     - `search_and_create()`: Search for templates and create a gitignore file from the selected ones.
 
+    An instance can be shared by several threads: the loaded templates are never modified, and
+    `reload()` loads new templates in the background before atomically swapping them in.
+
     Attributes:
-        directory (Path): The directory containing the gitignore templates.
+        directory (Path | Traversable): The directory containing the gitignore templates.
+            A `Traversable` for a directory inside a zip archive (see `pygic.resources`).
             Defaults to `TEMPLATES_LOCAL_DIR` which is the directory of the locally downloaded templates
             from the toptal/gitignore repository, without needing to clone the repository.
     """
@@ -77,6 +191,7 @@ class Gitignore:
         clone_directory: str | Path | Literal["default"] | None = None,
         force_clone: bool = False,
         ignore_num_files_check: bool = False,
+        clone_ttl: float | None = None,
     ) -> None:
         """Initialize the `Gitignore` class.
 
@@ -88,6 +203,8 @@ class Gitignore:
             directory (str | Path | None): The directory containing the gitignore templates.
                 Defaults to None.
                 If provided, the directory should contain the gitignore templates.
+                It can also be a zip archive (e.g. a wheel), or a directory inside a zip archive,
+                whose templates are read without extracting the archive (see `open_template_directory`).
             clone_directory (str | Path | Literal["default"] | None): The directory to clone the
                 toptal/gitignore repository to.
                 If "default", the default directory is determined via the `appdirs` library that provides
@@ -100,6 +217,11 @@ class Gitignore:
                 when checking the validity of the directory. Otherwise, the directory should contain at least
                 500 files when it is not empty.
                 Defaults to False.
+            clone_ttl (float | None): The age in seconds after which an already cloned toptal/gitignore
+                repository is stale. A stale repository is still used, but it is refreshed in a background
+                process for the next runs (see `pygic.refresh`). If None, the repository is never refreshed
+                unless `force_clone` is True.
+                Defaults to None.
 
         Raises:
             ValueError: If `directory` is provided and is not a valid directory.
@@ -113,6 +235,8 @@ class Gitignore:
                 and the directory is not empty. (The directory can be empty or not exist in the case where we want
                 to clone the toptal/gitignore repository.)
         """
+        # The precomputed renderings only match the default local templates
+        use_precomputed = False
         if directory is not None:
             # If both `directory` and `clone_directory` are provided, use `directory`
             if clone_directory is not None:
@@ -121,7 +245,7 @@ class Gitignore:
                     f"Using `directory`='{directory}' and ignoring `clone_directory`='{clone_directory}'."
                 )
 
-            chosen_directory = Path(directory)
+            chosen_directory = open_template_directory(directory)
             check_directory_existence_and_validity(
                 chosen_directory, ignore_num_files=ignore_num_files_check
             )
@@ -141,7 +265,12 @@ class Gitignore:
                 if clone_directory == "default":
                     clone_directory = CLONED_TOPTAL_DIR
 
-                chosen_directory = Path(clone_directory)
+                clone_root = Path(clone_directory)
+                # The templates of a cloned repository are in its `templates` directory
+                if (clone_root / "templates").is_dir():
+                    chosen_directory = clone_root / "templates"
+                else:
+                    chosen_directory = clone_root
                 # We will try to clone the toptal/gitignore repository
                 # if it is not cloned yet or if `force_clone` is True
                 dir_validity = check_directory_existence_and_validity(
@@ -152,28 +281,54 @@ class Gitignore:
                 if dir_validity:
                     if not force_clone:
                         logger.info(
-                            f"Using the already cloned toptal/gitignore repository: {chosen_directory}"
+                            f"Using the already cloned toptal/gitignore repository: {clone_root}"
                         )
+                        if clone_ttl is not None:
+                            self.__refresh_if_stale(clone_root, clone_ttl)
                     else:
                         logger.info(
-                            f"Re-cloning the toptal/gitignore repository to: {chosen_directory}"
+                            f"Re-cloning the toptal/gitignore repository to: {clone_root}"
                         )
                 else:
                     logger.info(
-                        f"Cloning the toptal/gitignore repository to: {chosen_directory}"
+                        f"Cloning the toptal/gitignore repository to: {clone_root}"
                     )
                 cloning = (not dir_validity) or force_clone
+                if cloning:
+                    chosen_directory = clone_root
             else:
                 # If both `directory` and `clone_directory` are None, use the local templates.
                 # No need to check the existence or validity of the default directory here
                 # since it is done in the tests.
                 chosen_directory = TEMPLATES_LOCAL_DIR
                 cloning = False
+                use_precomputed = True
 
-        self.directory = chosen_directory
+        self.__loaded = _LoadedTemplates(
+            chosen_directory, use_precomputed, LineTable(), {}
+        )
+        # Serializes the changes of the loaded templates, never held while generating a gitignore
+        self.__lock = threading.Lock()
+        # The number of the last started reload, and of the last one swapped in
+        self.__reload_count = 0
+        self.__swapped_reload_count = 0
         if cloning:
             self.__clone_toptal_gitignore()
 
+    @property
+    def directory(self) -> TemplateDirectory:
+        return self.__loaded.directory
+
+    def __getstate__(self) -> dict:
+        # The lock cannot be pickled (e.g. to send the templates to worker processes)
+        state = self.__dict__.copy()
+        del state["_Gitignore__lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
     def __clone_toptal_gitignore(self) -> None:
         """Clone the toptal/gitignore repository to the `self.directory` directory
         and update the directory to where the templates are: i.e. `self.directory / "templates"`.
@@ -199,144 +354,400 @@ class Gitignore:
                 "so it is not possible to clone the toptal/gitignore repository."
             ) from e
 
+        clone_root = self.directory
         # If the directory already exists, we erase it
-        if self.directory.exists():
-            shutil.rmtree(self.directory)
-        self.directory.mkdir(parents=True, exist_ok=True)
+        if clone_root.exists():
+            shutil.rmtree(clone_root)
+        clone_root.mkdir(parents=True, exist_ok=True)
 
         # Clone the toptal/gitignore repository while showing a spinner
-        cloning_success = False
         with yaspin(
             text="Cloning repository...", color="yellow", side="right"
         ) as spinner:
-            # Check if git is installed
-            is_git_installed = True
-            is_gitpython_installed = True
-            try:
-                from git import Repo  # type: ignore
+            clone_toptal_repository(clone_root)
 
-                Repo.clone_from(TOPTAL_REPO_URL, self.directory)
-                cloning_success = True
+            spinner.text = "Repository cloned"
+            spinner.ok("✅")
 
-            except ModuleNotFoundError:
-                # If the gitpython module is not installed, we pass and try to import dulwich
-                is_gitpython_installed = False
+        # Record when the repository was cloned, to know when it needs to be refreshed
+        (clone_root / CLONE_STAMP_FILE).touch()
 
-            except ImportError as e:
-                if "Bad git executable." not in e.msg:
-                    # Here we only expect the error to be about git not being installed
-                    # Otherwise, we raise it
-                    raise e
-                else:
-                    is_git_installed = False
-
-            if not cloning_success:
-                try:
-                    from dulwich import porcelain  # type: ignore
-
-                    porcelain.clone(TOPTAL_REPO_URL, self.directory)
-
-                except ModuleNotFoundError as e:
-                    if is_gitpython_installed:
-                        if not is_git_installed:
-                            raise ModuleNotFoundError(
-                                "`pygic` was installed with the [git] extra but not the [dulwich] extra, "
-                                "but `git` is not installed. The GitPython library requires git to be installed. "
-                                "If you don't want to install `git`, you can install `pygic` with the [dulwich] extra "
-                                "instead of the [git] extra. Otherwise, please install `git` to allow `pygic` "
-                                "to clone the toptal/gitignore repository, or please use the local templates."
-                            ) from e
-                        else:
-                            raise RuntimeError(
-                                "GitPython and Git are installed but the cloning was unsuccessful and no errors were raised before. "
-                                "This should not happen."
-                            ) from e
-                    raise ModuleNotFoundError(
-                        "`pygic` was not installed with the [git] extra nor the [dulwich] extra, "
-                        "so it is not possible to clone the toptal/gitignore repository."
-                    ) from e
+        # Check the validity of the directory where the templates are
+        templates_directory = clone_root / "templates"
+        check_directory_existence_and_validity(templates_directory)
 
-            spinner.text = "Repository cloned"
-            spinner.ok("✅")
+        # And use it
+        with self.__lock:
+            self.__loaded = self.__loaded.replace(directory=templates_directory)
 
-        # Update the directory to where the templates are
-        self.directory = self.directory / "templates"
+        self.__save_snapshot()
 
-        # And check the validity of the directory
-        check_directory_existence_and_validity(self.directory)
+        from pygic.index import save_completion_names
 
-    def __get_order_dict(self) -> defaultdict[str, int]:
-        """Get the order of the gitignore templates.
+        save_completion_names(templates_directory)
 
-        The order is used when creating a gitignore file with multiple templates.
-        The order is determined by the line number in the file, starting from 0.
-        Empty lines and comments are ignored.
-        If a template is not found in the `order` file, its priority is unchanged (i.e. 0).
+    @staticmethod
+    def __refresh_if_stale(clone_root: Path, clone_ttl: float) -> None:
+        """Start refreshing the cloned toptal/gitignore repository in the background
+        if it is older than `clone_ttl` seconds. The current clone is used in the meantime.
+        The failure of the previous background refresh, if any, is reported first.
+        """
+        from pygic.refresh import (
+            is_clone_stale,
+            pop_refresh_log,
+            start_background_refresh,
+        )
 
-        Example:
-            For this `order` file:
+        refresh_log = pop_refresh_log(clone_root)
+        if refresh_log is not None:
+            logger.warning(
+                "The last background refresh of the cloned toptal/gitignore repository failed:\n"
+                f"{refresh_log}"
+            )
+        if is_clone_stale(clone_root, clone_ttl):
+            logger.info(
+                f"The cloned toptal/gitignore repository is older than {clone_ttl} seconds, "
+                "refreshing it in the background."
+            )
+            start_background_refresh(clone_root)
 
-            ```
-            java
-            # gradle needs gradle-wrapper.jar
-            gradle
+    def __save_snapshot(self) -> None:
+        """Save a snapshot of the cloned templates in the default `TemplateStore`,
+        named after the commit hash of the cloned toptal/gitignore repository.
+        """
+        from pygic.store import save_clone_snapshot
 
-            # Android Studio needs gradle-wrapper.jar
-            androidstudio
+        if TEMPLATE_STORE_DIR is not None:
+            save_clone_snapshot(self.directory, TEMPLATE_STORE_DIR)
 
-            visualstudio
-            umbraco
-            ```
+    @classmethod
+    def from_snapshot(
+        cls, name: str, *, store_directory: str | Path | None = None
+    ) -> "Gitignore":
+        """Create a `Gitignore` instance from a snapshot of a `TemplateStore`.
 
-            The order dictionary will be:
-            ```python
-            {
-                "java": 0,
-                "gradle": 1,
-                "androidstudio": 2,
-                "visualstudio": 3,
-                "umbraco": 4
-            }
-            ```
+        Args:
+            name (str): The name of the snapshot, a unique prefix of it (e.g. an abbreviated commit hash),
+                or `latest` for the most recent snapshot.
+            store_directory (str | Path | None): The root directory of the store.
+                Defaults to None, in which case `TEMPLATE_STORE_DIR` is used.
 
-            And since the order of any other file is 0, Java is sorted in the same way as any other file
-            (i.e., alphabetically), and then, we potentially add at the end of the file Gradle, Android Studio,
-            Visual Studio, and Umbraco (in that order).
+        Returns:
+            Gitignore: The `Gitignore` instance using the templates of the snapshot.
 
+        Raises:
+            ModuleNotFoundError: If `store_directory` is None and `pygic` was not installed
+                with the [git] extra nor the [dulwich] extra.
+            FileNotFoundError: If no snapshot matches the name.
+            ValueError: If several snapshots match the name.
+        """
+        from pygic.store import TemplateStore
+
+        if store_directory is None:
+            if TEMPLATE_STORE_DIR is None:
+                raise ModuleNotFoundError(
+                    "`pygic` was not installed with the [git] extra nor the [dulwich] extra, "
+                    "so there is no default template store."
+                )
+            store_directory = TEMPLATE_STORE_DIR
+
+        store = TemplateStore(store_directory)
+        return cls(
+            directory=store.snapshot_directory(name), ignore_num_files_check=True
+        )
+
+    @classmethod
+    def from_archive(
+        cls,
+        url: str = TOPTAL_ARCHIVE_URL,
+        *,
+        cache_directory: str | Path | None = None,
+        ignore_num_files_check: bool = False,
+    ) -> "Gitignore":
+        """Create a `Gitignore` instance from the templates of an archive of the toptal/gitignore repository,
+        without needing `git` (see `pygic.archive.ArchiveCache`).
+
+        The archive is only downloaded if it changed since the last download (using the `ETag` and `Last-Modified`
+        headers), an interrupted download is resumed, and only the `templates` directory is extracted.
+
+        Args:
+            url (str): The URL of a zip or tar archive containing a `templates` directory.
+                Defaults to `TOPTAL_ARCHIVE_URL`.
+            cache_directory (str | Path | None): The directory where the archive and its templates are cached.
+                Defaults to None, in which case `ARCHIVE_CACHE_DIR` is used.
+            ignore_num_files_check (bool): If True, the number of files in the extracted templates is not checked.
+                Defaults to False.
+
+        Returns:
+            Gitignore: The `Gitignore` instance using the templates of the archive.
+
+        Raises:
+            ModuleNotFoundError: If `cache_directory` is None and `pygic` was not installed
+                with the [archive] extra, the [git] extra, or the [dulwich] extra.
+            ConnectionError: If the download fails and the templates were never downloaded before.
+            ValueError: If the archive does not contain valid templates.
+        """
+        from pygic.archive import ArchiveCache
+
+        if cache_directory is None:
+            if ARCHIVE_CACHE_DIR is None:
+                raise ModuleNotFoundError(
+                    "`pygic` was not installed with the [archive] extra, the [git] extra, "
+                    "nor the [dulwich] extra, so there is no default archive cache directory."
+                )
+            cache_directory = ARCHIVE_CACHE_DIR
+
+        return cls(
+            directory=ArchiveCache(url, cache_directory).update(),
+            ignore_num_files_check=ignore_num_files_check,
+        )
+
+    @classmethod
+    def from_git_ref(
+        cls,
+        ref: str = "HEAD",
+        *,
+        repository: str | Path | None = None,
+        fetch: bool = False,
+        clone_ttl: float | None = None,
+        ignore_num_files_check: bool = False,
+    ) -> "Gitignore":
+        """Create a `Gitignore` instance from the templates of a ref of the toptal/gitignore repository,
+        read from the objects of a bare repository without checking them out (see `pygic.gitobjects`).
+
+        The repository is fetched if it does not exist yet, if the ref is not found in it, if `fetch` is True,
+        or if it was fetched more than `clone_ttl` seconds ago. Fetching only downloads the new objects.
+
+        Args:
+            ref (str): A branch, a tag or a commit hash (possibly abbreviated). Defaults to `HEAD`,
+                the default branch of the repository.
+            repository (str | Path | None): The bare repository. Defaults to None,
+                in which case `GIT_REPOSITORY_DIR` is used.
+            fetch (bool): If True, the repository is fetched before reading the ref. Defaults to False.
+            clone_ttl (float | None): The age in seconds after which the repository is fetched again.
+                Defaults to None, in which case it is only fetched when needed.
+            ignore_num_files_check (bool): If True, the number of files in the templates is not checked.
+                Defaults to False.
 
         Returns:
-            defaultdict[str, int]: A dictionary with the template names as keys (lowercase)
-                and their order index as values.
+            Gitignore: The `Gitignore` instance using the templates of the ref.
+
+        Raises:
+            ModuleNotFoundError: If `pygic` was not installed with the [git] extra nor the [dulwich] extra.
+            ConnectionError: If the repository needs to be fetched and the fetch fails.
+            FileNotFoundError: If the ref, or its `templates` directory, does not exist even after fetching.
+            ValueError: If the templates of the ref are not valid.
+        """
+        from pygic.gitobjects import fetch_repository, open_git_directory
+        from pygic.refresh import is_clone_stale
+
+        if repository is None:
+            if GIT_REPOSITORY_DIR is None:
+                raise ModuleNotFoundError(
+                    "`pygic` was not installed with the [git] extra nor the [dulwich] extra, "
+                    "so it is not possible to fetch the toptal/gitignore repository."
+                )
+            repository = GIT_REPOSITORY_DIR
+        repository = Path(repository)
+
+        def fetch_and_open() -> TemplateDirectory:
+            logger.info(f"Fetching the toptal/gitignore repository in '{repository}'.")
+            fetch_repository(repository)
+            from pygic.index import save_completion_names
+
+            save_completion_names(open_git_directory(repository))
+            return open_git_directory(repository, ref)
+
+        if (
+            fetch
+            or not repository.is_dir()
+            or (clone_ttl is not None and is_clone_stale(repository, clone_ttl))
+        ):
+            directory = fetch_and_open()
+        else:
+            try:
+                directory = open_git_directory(repository, ref)
+            except FileNotFoundError:
+                # E.g. a commit more recent than the last fetch
+                directory = fetch_and_open()
+
+        return cls(directory=directory, ignore_num_files_check=ignore_num_files_check)
+
+    def with_overlays(self, *directories: str | Path) -> "Gitignore":
+        """Create a `Gitignore` instance using these templates with template directories stacked on top of them,
+        without copying any file (see `pygic.layers`).
+
+        A file of an overlay directory replaces the file with the same name, regardless of case, of the
+        directories below it (e.g. a custom `Python.patch`), and its new templates are added. The names of
+        its `order` file are ranked after the ones of the directories below it.
+
+        Args:
+            *directories (str | Path): The overlay directories, from the lowest to the uppermost one.
+                Each one can also be a zip archive, or a directory inside a zip archive.
+
+        Returns:
+            Gitignore: The `Gitignore` instance using the merged templates,
+                or this instance if no overlay directory is provided.
+
+        Raises:
+            NotADirectoryError: If an overlay directory is not a directory.
+            ValueError: If a file of an overlay directory is not a valid template file.
+        """
+        if not directories:
+            return self
+        from pygic.layers import open_layered_directory
+
+        return type(self)(
+            directory=open_layered_directory(self.directory, *directories),
+            ignore_num_files_check=True,
+        )
+
+    @staticmethod
+    def __get_precomputed(loaded: _LoadedTemplates) -> "PrecomputedTemplates | None":
+        """Get the renderings of the templates precomputed when building the wheel (see `pygic.precompute`),
+        or None if the templates are not the default local ones or if there are no precomputed renderings.
+        """
+        if not loaded.use_precomputed:
+            return None
+        from pygic.precompute import get_precomputed_templates
+
+        return get_precomputed_templates()
+
+    def __get_order_dict(
+        self, loaded: _LoadedTemplates | None = None
+    ) -> defaultdict[str, int]:
+        """Get the order of the gitignore templates from the `order` file of the directory.
+
+        See `read_order_file` for more information.
+
+        Args:
+            loaded (_LoadedTemplates | None): The loaded templates to use. Defaults to the current ones.
 
         Raises:
             FileNotFoundError: If the `order` file does not exist.
             ValueError: If there is a duplicate template name in the `order` file.
         """
-        # Open the `order` file
-        order_file = self.directory / "order"
-        if not order_file.exists():
-            raise FileNotFoundError(f"File '{order_file}' does not exist.")
-
-        order_dict: defaultdict[str, int] = defaultdict(int)
-        with open(order_file, "r") as f:
-            order_idx = 0
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                name = line.lower()
-                if name in order_dict:
-                    raise ValueError(
-                        f"Duplicate template name '{name}' found in the 'order' file."
-                    )
-                order_dict[name] = order_idx
-                order_idx += 1
-
-        return order_dict
+        if loaded is None:
+            loaded = self.__loaded
+        if loaded.order is not None:
+            return defaultdict(int, loaded.order)
+        precomputed = self.__get_precomputed(loaded)
+        if precomputed is not None:
+            return defaultdict(int, precomputed.order)
+        return read_order_file(loaded.directory / "order")
 
     def list_template_names(self) -> list[str]:
         """List the names of the available templates, sorted alphabetically."""
-        return sorted([file.stem for file in self.directory.glob("*.gitignore")])
+        return _list_template_names(self.directory)
+
+    def ingest(self, *names: str) -> None:
+        """Normalize templates once into the line table of the instance, for long-lived processes.
+
+        The ingested templates are stored as arrays of line IDs over a table where each distinct line
+        is stored once (see `LineTable`). Afterwards, `create_one_gitignore` and `create` do not read
+        their files anymore, so changes to these files are ignored.
+
+        Args:
+            *names (str): The names of the templates to ingest. Defaults to all the templates,
+                including the patches without a `.gitignore` file.
+
+        Raises:
+            FileNotFoundError: If no template is found for a provided name.
+        """
+        with self.__lock:
+            loaded = self.__loaded
+            ingested = dict(loaded.ingested)
+            for name in names or list_renderable_template_names(loaded.directory):
+                lower_name = name.lower()
+                if lower_name not in ingested:
+                    ingested[lower_name] = loaded.line_table.intern_content(
+                        self.__create_one_gitignore(loaded, name)
+                    )
+            self.__loaded = loaded.replace(ingested=ingested)
+
+    def reload(
+        self,
+        directory: str | Path | None = None,
+        *,
+        ignore_num_files_check: bool = False,
+    ) -> "Future[None]":
+        """Load templates in a background thread, then atomically swap them in.
+
+        The calls started before the swap complete with the previous templates, and the calls started
+        after it use the new ones, without waiting for the loading. All the new templates are ingested
+        (see `ingest`) and their order is read once, so they do not depend on later changes to their files.
+        If several reloads overlap, the templates of the last started one are kept.
+
+        Args:
+            directory (str | Path | None): The directory containing the new templates, as for `Gitignore`.
+                Defaults to None, in which case the current directory is loaded again
+                (e.g. after pulling the cloned toptal/gitignore repository).
+            ignore_num_files_check (bool): If True, the number of files in the directory is not checked.
+                Defaults to False.
+
+        Returns:
+            Future[None]: Done when the new templates are swapped in. If loading them fails,
+                it holds the exception and the current templates are kept.
+        """
+        with self.__lock:
+            self.__reload_count += 1
+            reload_count = self.__reload_count
+            current = self.__loaded
+
+        future: Future[None] = Future()
+        future.set_running_or_notify_cancel()
+
+        def load() -> None:
+            try:
+                loaded = self.__load_templates(
+                    current, directory, ignore_num_files_check
+                )
+            except Exception as e:  # noqa: BLE001
+                # Any error must be set on the future: otherwise it would never be done,
+                # and the callers waiting for its result would block forever
+                future.set_exception(e)
+                return
+            with self.__lock:
+                if reload_count > self.__swapped_reload_count:
+                    self.__loaded = loaded
+                    self.__swapped_reload_count = reload_count
+            future.set_result(None)
+
+        threading.Thread(target=load, name="pygic-reload", daemon=True).start()
+        return future
+
+    def __load_templates(
+        self,
+        current: _LoadedTemplates,
+        directory: str | Path | None,
+        ignore_num_files_check: bool,
+    ) -> _LoadedTemplates:
+        """Load and ingest all the templates of a directory, see `reload`."""
+        if directory is None:
+            loaded = current.replace(line_table=LineTable(), ingested={}, order=None)
+        else:
+            loaded = _LoadedTemplates(
+                open_template_directory(directory), False, LineTable(), {}
+            )
+        check_directory_existence_and_validity(
+            loaded.directory, ignore_num_files=ignore_num_files_check
+        )
+        ingested = {
+            name: loaded.line_table.intern_content(
+                self.__create_one_gitignore(loaded, name)
+            )
+            for name in list_renderable_template_names(loaded.directory)
+        }
+        return loaded.replace(ingested=ingested, order=self.__get_order_dict(loaded))
+
+    def __get_line_ids(self, loaded: _LoadedTemplates, name: str) -> Sequence[int]:
+        """Get the IDs of the lines of `create_one_gitignore(name)` in the line table of the loaded templates."""
+        line_ids = loaded.ingested.get(name.lower())
+        if line_ids is None:
+            line_ids = loaded.line_table.intern_content(
+                self.__create_one_gitignore(loaded, name)
+            )
+        return line_ids
 
     def create_one_gitignore(self, name: str) -> str:
         """Create a gitignore file from a single template.
@@ -368,25 +779,39 @@ class Gitignore:
         Raises:
             FileNotFoundError: If no template is found for the provided name.
         """
+        return self.__create_one_gitignore(self.__loaded, name)
+
+    def __create_one_gitignore(self, loaded: _LoadedTemplates, name: str) -> str:
+        """Create a gitignore file from a single template of the loaded templates, see `create_one_gitignore`."""
         lower_name = name.lower()
-        # Glob the files that start with the name
+        if lower_name in loaded.ingested:
+            return loaded.line_table.render(loaded.ingested[lower_name])
+        precomputed = self.__get_precomputed(loaded)
+        if precomputed is not None and lower_name in precomputed.gitignores:
+            return precomputed.gitignores[lower_name]
+
+        from pygic.index import get_file_name_index
+
+        # Look up the files that start with the name in the index of the directory,
+        # which only reads the shard of the name instead of listing the directory
         # Example:
         # - name = reactnative
-        # - Globbed:
+        # - Found:
         #   - ReactNative.gitignore
         #   - ReactNative.patch  (does not actually exist)
         #   - ReactNative.Linux.stack
         # - Ignored:
         #   - ReactNative+all.patch  (does not actually exist)
         file_paths = [
-            file
-            for file in self.directory.glob("*.*")
-            if file.stem.lower().split(".")[0] == lower_name
+            loaded.directory / file_name
+            for file_name in get_file_name_index(loaded.directory).get_file_names(
+                lower_name
+            )
         ]
         if not file_paths:
             # Get all possible template names
             all_files = [
-                file.stem.lower() for file in self.directory.glob("*.gitignore")
+                name.lower() for name in _list_template_names(loaded.directory)
             ]
             # Find the closest match
             closest_matches = difflib.get_close_matches(name, all_files)
@@ -416,17 +841,9 @@ class Gitignore:
             )
 
         gitignore = []  # Stores the lines for the final string
-        if "gitignore" in files:
-            for file in files["gitignore"]:
-                gitignore.append(f"### {file.name} ###")
-                gitignore.append(file.get_content())
-        if "patch" in files:
-            for file in files["patch"]:
-                gitignore.append(f"### {file.name} Patch ###")
-                gitignore.append(file.get_content())
-        if "stack" in files:
-            for file in files["stack"]:
-                gitignore.append(f"### {file.name} Stack ###")
+        for file_type, header_format in SECTION_HEADER_FORMATS.items():
+            for file in files.get(file_type, []):
+                gitignore.append(header_format.format(file.name))
                 gitignore.append(file.get_content())
 
         gitignore = "\n".join(gitignore)
@@ -443,6 +860,9 @@ class Gitignore:
         - Compile the gitignores in the sorted order.
         - Remove duplicated lines from the final gitignore file.
 
+        The gitignores are merged as arrays of line IDs (see `LineTable.merge`),
+        so removing duplicated lines only compares integers.
+
         Args:
             *names (str): The names of the gitignore templates to use.
 
@@ -458,32 +878,102 @@ class Gitignore:
                 "You need to provide at least one template for a gitignore to be generated."
             )
 
+        start = time.perf_counter()
+        # Use the same loaded templates for the whole gitignore, even if they are reloaded meanwhile
+        loaded = self.__loaded
+        sorted_names, sub_gitignores_dict = self.__get_sorted_line_ids(loaded, names)
+
+        # Compile the gitignores in the sorted order and remove duplicated lines
+        content = loaded.line_table.merge(
+            sub_gitignores_dict[name] for name in sorted_names
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            duration_ms = (time.perf_counter() - start) * 1000
+            logger.debug(
+                f"Created a gitignore from {len(sorted_names)} templates in {duration_ms:.3f} ms.",
+                extra={"templates": sorted_names, "duration_ms": duration_ms},
+            )
+        return content
+
+    def __get_sorted_line_ids(
+        self, loaded: _LoadedTemplates, names: Iterable[str]
+    ) -> tuple[list[str], dict[str, Sequence[int]]]:
+        """Get the lowercase names of the templates in the order of their gitignores (see `create`),
+        and the IDs of the lines of the gitignore of each name."""
         # Get the order of the gitignore templates
-        order_dict: defaultdict[str, int | float] = self.__get_order_dict()
-        sub_gitignores_dict: dict[str, str] = {
-            name.lower(): self.create_one_gitignore(name) for name in names
+        order_dict: defaultdict[str, int | float] = self.__get_order_dict(loaded)
+        sub_gitignores_dict: dict[str, Sequence[int]] = {
+            name.lower(): self.__get_line_ids(loaded, name) for name in names
         }
 
         # Sort the gitignore names alphabetically and then based on their order index
-        alphabetically_sorted_names = sorted(
-            name.lower() for name in sub_gitignores_dict.keys()
-        )
-        sorted_names = sorted(
-            alphabetically_sorted_names, key=lambda name: order_dict[name]
-        )
+        sorted_names = sort_template_names(sub_gitignores_dict.keys(), order_dict)
+        return sorted_names, sub_gitignores_dict
+
+    @staticmethod
+    def __get_header_file_names(
+        loaded: _LoadedTemplates, lower_name: str
+    ) -> dict[str, str]:
+        """Get the name of the template file of each section header of the gitignore of a template."""
+        from pygic.index import get_file_name_index
+
+        header_file_names = {}
+        for file_name in get_file_name_index(loaded.directory).get_file_names(
+            lower_name
+        ):
+            stem, suffix = split_file_name(file_name)
+            header_format = SECTION_HEADER_FORMATS.get(suffix)
+            if header_format is not None:
+                header_file_names[header_format.format(stem)] = file_name
+        return header_file_names
+
+    def create_structured(self, *names: str) -> "StructuredGitignore":
+        """Create a gitignore file from multiple templates, like `create`, with its sections.
+
+        The sections, their rules, and the duplicated lines removed when merging the templates are collected
+        while merging the lines of the templates, instead of parsing the content of the gitignore.
+        The duplicated lines of a template are already removed from its own gitignore (see `create_one_gitignore`),
+        so only the lines that are duplicated across templates are reported.
 
-        # Compile the gitignores in the sorted order
-        gitignore = "\n".join(sub_gitignores_dict[name] for name in sorted_names)
+        Args:
+            *names (str): The names of the gitignore templates to use.
 
-        gitignore = remove_duplicated_lines(gitignore)
-        return gitignore
+        Returns:
+            StructuredGitignore: The gitignore, whose `content` is the same as the output of `create`.
+
+        Raises:
+            ValueError: If no template is provided.
+            FileNotFoundError: If no template is found for a provided name.
+        """
+        from pygic.structured import merge_sections
+
+        if not names:
+            raise ValueError(
+                "You need to provide at least one template for a gitignore to be generated."
+            )
+
+        loaded = self.__loaded
+        sorted_names, sub_gitignores_dict = self.__get_sorted_line_ids(loaded, names)
+        return merge_sections(
+            loaded.line_table,
+            (
+                (
+                    name,
+                    sub_gitignores_dict[name],
+                    self.__get_header_file_names(loaded, name),
+                )
+                for name in sorted_names
+            ),
+        )
 
     def __search_names(self) -> list[str]:
         """Search for templates and return the selected names.
 
-        `pzp` is used to search for the templates.
-        The user can select multiple templates by pressing Enter on the selected item.
-        The search stops when the user presses ESC, CTRL-C, CTRL-G, or CTRL-Q.
+        `pzp` is used to search for the templates, in a single prompt (see `pygic.search.SearchSession`).
+        The user selects or unselects the highlighted template with TAB, while a preview shows its gitignore,
+        or the merged gitignore of the selected templates after pressing CTRL-T.
+        The search stops when the user presses ENTER (selecting the highlighted template if none is selected),
+        ESC, CTRL-C, CTRL-G, or CTRL-Q.
 
         Returns:
             list[str]: The selected names.
@@ -492,38 +982,19 @@ class Gitignore:
             ModuleNotFoundError: If `pygic` was not installed with the [search] extra,
         """
         try:
-            from pzp import pzp  # type: ignore
+            from pygic.search import search_template_names
         except ModuleNotFoundError as e:
             raise ModuleNotFoundError(
                 "`pygic` was not installed with the [search] extra, "
                 "so it is not possible to search for templates."
             ) from e
 
-        candidates = self.list_template_names()
-        selected_names: list[str] = []
-
-        while True:
-            name = pzp(
-                candidates=candidates,
-                fullscreen=False,
-                height=20,
-                header_str=(
-                    f"To stop searching, press ESC, CTRL-C, CTRL-G, or CTRL-Q\n"
-                    f"Already selected items: {selected_names}"
-                ),
-            )
-            if name is None:
-                break
-            selected_names.append(name)
-
-        return selected_names
+        return search_template_names(self)
 
     def search_and_create(self) -> str | None:
         """Search for templates and create a gitignore file from the selected ones.
 
-        `pzp` is used to search for the templates.
-        The user can select multiple templates by pressing Enter on the selected item.
-        The search stops when the user presses ESC, CTRL-C, CTRL-G, or CTRL-Q.
+        `pzp` is used to search for the templates, see `__search_names`.
 
         Returns:
             Optional[str]: The content of the gitignore file., or None if no template is selected.
@@ -541,8 +1012,180 @@ class Gitignore:
         return self.create(*selected_names)
 
 
+def clone_toptal_repository(directory: Path) -> None:
+    """Clone the toptal/gitignore repository to `directory` with GitPython,
+    or with Dulwich if GitPython or `git` is not installed.
+
+    Args:
+        directory (Path): The directory to clone the repository to. It should not exist or be empty.
+
+    Raises:
+        ModuleNotFoundError: If `pygic` was not installed with the [git] extra nor the [dulwich] extra,
+            so it is not possible to clone the toptal/gitignore repository.
+        ModuleNotFoundError: If `git` is not installed while `pygic` was installed with the [git] extra
+            and not the [dulwich] extra.
+    """
+    cloning_success = False
+    # Check if git is installed
+    is_git_installed = True
+    is_gitpython_installed = True
+    try:
+        from git import Repo  # type: ignore
+
+        Repo.clone_from(TOPTAL_REPO_URL, directory)
+        cloning_success = True
+
+    except ModuleNotFoundError:
+        # If the gitpython module is not installed, we pass and try to import dulwich
+        is_gitpython_installed = False
+
+    except ImportError as e:
+        if "Bad git executable." not in e.msg:
+            # Here we only expect the error to be about git not being installed
+            # Otherwise, we raise it
+            raise e
+        else:
+            is_git_installed = False
+
+    if not cloning_success:
+        try:
+            from dulwich import porcelain  # type: ignore
+
+            porcelain.clone(TOPTAL_REPO_URL, directory)
+
+        except ModuleNotFoundError as e:
+            if is_gitpython_installed:
+                if not is_git_installed:
+                    raise ModuleNotFoundError(
+                        "`pygic` was installed with the [git] extra but not the [dulwich] extra, "
+                        "but `git` is not installed. The GitPython library requires git to be installed. "
+                        "If you don't want to install `git`, you can install `pygic` with the [dulwich] extra "
+                        "instead of the [git] extra. Otherwise, please install `git` to allow `pygic` "
+                        "to clone the toptal/gitignore repository, or please use the local templates."
+                    ) from e
+                else:
+                    raise RuntimeError(
+                        "GitPython and Git are installed but the cloning was unsuccessful and no errors were raised before. "
+                        "This should not happen."
+                    ) from e
+            raise ModuleNotFoundError(
+                "`pygic` was not installed with the [git] extra nor the [dulwich] extra, "
+                "so it is not possible to clone the toptal/gitignore repository."
+            ) from e
+
+
+def _list_template_names(directory: TemplateDirectory) -> list[str]:
+    """List the names of the templates with a `.gitignore` file, see `Gitignore.list_template_names`."""
+    return sorted(
+        stem
+        for stem, suffix in map(
+            split_file_name, (file.name for file in directory.iterdir())
+        )
+        if suffix == FileType.GITIGNORE.value
+    )
+
+
+def list_renderable_template_names(directory: TemplateDirectory) -> list[str]:
+    """List the lowercase names accepted by `Gitignore.create_one_gitignore` for a template directory,
+    i.e. the name of each template file before its first dot, sorted alphabetically.
+
+    Unlike `Gitignore.list_template_names`, this includes the names of patches without a `.gitignore` file.
+    """
+    return sorted(
+        {file.name.split(".")[0].lower() for file in iter_template_files(directory)}
+    )
+
+
+def read_order_file(order_file: TemplateDirectory) -> defaultdict[str, int]:
+    """Get the order of the gitignore templates.
+
+    The order is used when creating a gitignore file with multiple templates.
+    The order is determined by the line number in the file, starting from 0.
+    Empty lines and comments are ignored.
+    If a template is not found in the `order` file, its priority is unchanged (i.e. 0).
+
+    Example:
+        For this `order` file:
+
+        ```
+        java
+        # gradle needs gradle-wrapper.jar
+        gradle
+
+        # Android Studio needs gradle-wrapper.jar
+        androidstudio
+
+        visualstudio
+        umbraco
+        ```
+
+        The order dictionary will be:
+        ```python
+        {
+            "java": 0,
+            "gradle": 1,
+            "androidstudio": 2,
+            "visualstudio": 3,
+            "umbraco": 4
+        }
+        ```
+
+        And since the order of any other file is 0, Java is sorted in the same way as any other file
+        (i.e., alphabetically), and then, we potentially add at the end of the file Gradle, Android Studio,
+        Visual Studio, and Umbraco (in that order).
+
+    Args:
+        order_file (Path | Traversable): The path to the `order` file.
+
+    Returns:
+        defaultdict[str, int]: A dictionary with the template names as keys (lowercase)
+            and their order index as values.
+
+    Raises:
+        FileNotFoundError: If the `order` file does not exist.
+        ValueError: If there is a duplicate template name in the `order` file.
+    """
+    if not is_existing_entry(order_file):
+        raise FileNotFoundError(f"File '{order_file}' does not exist.")
+
+    order_dict: defaultdict[str, int] = defaultdict(int)
+    with order_file.open("r") as f:
+        order_idx = 0
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name = line.lower()
+            if name in order_dict:
+                raise ValueError(
+                    f"Duplicate template name '{name}' found in the 'order' file."
+                )
+            order_dict[name] = order_idx
+            order_idx += 1
+
+    return order_dict
+
+
+def sort_template_names(
+    names: Iterable[str], order_dict: Mapping[str, int]
+) -> list[str]:
+    """Sort lowercase template names alphabetically and then based on their order index.
+
+    This is the order of the templates in the gitignore file created by `Gitignore.create`.
+
+    Args:
+        names (Iterable[str]): The template names, in lowercase.
+        order_dict (Mapping[str, int]): The order of the templates, see `read_order_file`.
+
+    Returns:
+        list[str]: The sorted template names.
+    """
+    alphabetically_sorted_names = sorted(names)
+    return sorted(alphabetically_sorted_names, key=lambda name: order_dict.get(name, 0))
+
+
 def check_directory_existence_and_validity(
-    directory: Path,
+    directory: TemplateDirectory,
     *,
     ignore_num_files: bool = False,
     raise_if_not_exist_or_empty: bool = True,
@@ -559,8 +1202,11 @@ def check_directory_existence_and_validity(
     so this function also checks that the provided directory contains at least 500 files
     if `ignore_num_files` is False.
 
+    Only the names of the files are checked, using the file name index of the directory
+    (see `pygic.index.FileNameIndex`).
+
     Args:
-        directory (Path): The directory to check.
+        directory (Path | Traversable): The directory to check.
         ignore_num_files (bool): If True, the function will not check the number of files in the directory.
             Defaults to False.
         raise_if_not_exist_or_empty (bool): If True, the function raises an error if the directory does not exist
@@ -579,38 +1225,41 @@ def check_directory_existence_and_validity(
     """
 
     def __check_directory_existence_and_validity(
-        directory: Path,
+        directory: TemplateDirectory,
         *,
         ignore_num_files: bool = False,
     ) -> bool:
-        if not directory.exists():
+        if not is_existing_entry(directory):
             return False
 
         if not directory.is_dir():
             raise NotADirectoryError(f"'{directory}' is not a directory.")
 
+        from pygic.index import get_file_name_index
+
+        # The summary of the directory is persisted with its index until a file is added, removed or renamed,
+        # so a large directory is only listed and validated again when it changed
+        index = get_file_name_index(directory)
+
         # Check if the directory is empty
-        if not any(directory.iterdir()):
+        if not index.num_entries:
             return False
 
         # Otherwise, we consider that the directory should be valid and check everything else
         # Check if the `order` file exists
-        order_file = directory / "order"
-        if not order_file.exists():
-            raise FileNotFoundError(f"File '{order_file}' does not exist.")
+        if not index.has_order:
+            raise FileNotFoundError(f"File '{directory / 'order'}' does not exist.")
 
         # Check if the files in the directory are valid template files
-        file_paths = list(directory.glob("*.*"))
-        for file_path in file_paths:
-            if file_path.suffix[1:] not in FileType.values():
-                raise ValueError(
-                    f"File '{file_path}' is not a valid template file. "
-                    f"Only the following extensions are allowed: {', '.join(FileType.values())}"
-                )
+        if index.invalid_file is not None:
+            raise ValueError(
+                f"File '{directory / index.invalid_file}' is not a valid template file. "
+                f"Only the following extensions are allowed: {', '.join(FileType.values())}"
+            )
 
         if not ignore_num_files:
             # Check if the directory contains at least 500 files
-            num_files = len(file_paths)
+            num_files = index.num_files
             if num_files < 500:
                 raise ValueError(
                     f"The directory '{directory}' should contain at least 500 files, "
@@ -0,0 +1,335 @@
+import logging
+import posixpath
+import stat
+import weakref
+from pathlib import Path
+from typing import Iterator
+
+from pygic.config import TOPTAL_REPO_URL
+from pygic.gitignore import CLONE_STAMP_FILE
+from pygic.resources import ZipTraversable
+
+logger = logging.getLogger(__name__)
+
+MAX_SYMLINK_DEPTH = 8
+"""The maximum number of symbolic links followed to find the blob of a template in a tree."""
+
+
+class _GitPythonObjects:
+    """The objects of a git repository, read with GitPython (i.e. with `git cat-file`)."""
+
+    def __init__(self, repository: Path) -> None:
+        from git import Repo  # type: ignore
+
+        self.repo = Repo(repository)
+
+    def resolve(self, ref: str) -> str:
+        from git import BadName  # type: ignore
+
+        try:
+            return self.repo.commit(ref).hexsha
+        except (BadName, ValueError) as e:
+            raise FileNotFoundError(
+                f"Ref '{ref}' does not exist in '{self.repo.git_dir}'."
+            ) from e
+
+    def walk(self, commit: str, root: str) -> Iterator[tuple[str, int, str]]:
+        tree = self.repo.commit(commit).tree
+        if root:
+            try:
+                tree = tree / root
+            except KeyError:
+                tree = None
+            if tree is None or tree.type != "tree":
+                raise FileNotFoundError(f"'{root}' does not exist in commit {commit}.")
+        for item in tree.traverse():
+            if item.type != "tree":
+                yield item.path[len(tree.path) :].lstrip("/"), item.mode, item.hexsha
+
+    def read(self, blob_id: str) -> bytes:
+        return self.repo.odb.stream(bytes.fromhex(blob_id)).read()
+
+    def close(self) -> None:
+        self.repo.close()
+
+
+class _DulwichObjects:
+    """The objects of a git repository, read with Dulwich (without `git`)."""
+
+    def __init__(self, repository: Path) -> None:
+        from dulwich.repo import Repo  # type: ignore
+
+        self.repo = Repo(str(repository))
+
+    def resolve(self, ref: str) -> str:
+        from dulwich.objectspec import parse_commit  # type: ignore
+
+        try:
+            return parse_commit(self.repo, ref).id.decode()
+        except (KeyError, ValueError) as e:
+            raise FileNotFoundError(
+                f"Ref '{ref}' does not exist in '{self.repo.path}'."
+            ) from e
+
+    def walk(self, commit: str, root: str) -> Iterator[tuple[str, int, str]]:
+        tree = self.repo[self.repo[commit.encode()].tree]
+        for part in filter(None, root.split("/")):
+            try:
+                mode, tree_id = tree[part.encode()]
+            except KeyError:
+                mode = None
+            if mode is None or not stat.S_ISDIR(mode):
+                raise FileNotFoundError(f"'{root}' does not exist in commit {commit}.")
+            tree = self.repo[tree_id]
+        trees = [("", tree)]
+        while trees:
+            directory, tree = trees.pop()
+            for entry in tree.iteritems():
+                path = posixpath.join(directory, entry.path.decode())
+                if stat.S_ISDIR(entry.mode):
+                    trees.append((path, self.repo[entry.sha]))
+                else:
+                    yield path, entry.mode, entry.sha.decode()
+
+    def read(self, blob_id: str) -> bytes:
+        return self.repo[blob_id.encode()].data
+
+    def close(self) -> None:
+        self.repo.close()
+
+
+def _import_gitpython() -> bool:
+    """Check if GitPython can be used, i.e. if it is installed along with `git`."""
+    try:
+        import git  # type: ignore # noqa: F401
+    except ImportError:
+        # `ModuleNotFoundError`, or "Bad git executable." if `git` is not installed
+        return False
+    return True
+
+
+def _open_objects(repository: Path) -> "_GitPythonObjects | _DulwichObjects":
+    """Open the objects of a git repository with GitPython, or with Dulwich if GitPython or `git` is not installed.
+
+    Raises:
+        ModuleNotFoundError: If `pygic` was not installed with the [git] extra nor the [dulwich] extra.
+        FileNotFoundError: If the repository does not exist.
+    """
+    if not repository.is_dir():
+        raise FileNotFoundError(f"Git repository '{repository}' does not exist.")
+    if _import_gitpython():
+        return _GitPythonObjects(repository)
+    try:
+        return _DulwichObjects(repository)
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError(
+            "`pygic` was not installed with the [git] extra nor the [dulwich] extra, "
+            "so it is not possible to read a git repository."
+        ) from e
+
+
+class GitTreeIndex:
+    """The files of a tree of a commit, listed from the object store of a git repository when it is opened.
+
+    Nothing is checked out: the blobs of the files are read from the object store when they are read,
+    and symbolic links (e.g. `WebStorm.gitignore` to `JetBrains.gitignore` in the toptal/gitignore repository)
+    are replaced by the blobs of their targets if they are in the tree.
+
+    Attributes:
+        repository (Path): The path to the git repository, bare or not.
+        commit (str): The hash of the commit.
+        root (str): The path of the tree in the commit, `""` for the root tree of the commit.
+        files (dict[str, str]): The blob hash of each file, by path inside the tree.
+        children (dict[str, dict[str, None]]): The paths of the entries of each directory, by path inside the tree.
+            The tree itself is `""`.
+    """
+
+    def __init__(self, repository: Path, ref: str, root: str = "") -> None:
+        self.repository = repository
+        self.root = root.strip("/")
+        self.files: dict[str, str] = {}
+        self.children: dict[str, dict[str, None]] = {"": {}}
+
+        self.__objects = _open_objects(repository)
+        # The repository is closed once the index is not used anymore, or when the interpreter exits
+        weakref.finalize(self, self.__objects.close)
+        self.commit = self.__objects.resolve(ref)
+
+        links = {}
+        for path, mode, blob_id in self.__objects.walk(self.commit, self.root):
+            if stat.S_ISLNK(mode):
+                links[path] = blob_id
+            elif stat.S_ISREG(mode):
+                self.files[path] = blob_id
+            # Other entries are submodules, which have no content in this repository
+        for path, blob_id in links.items():
+            target_id = self.__resolve_link(path, blob_id, links)
+            if target_id is None:
+                logger.warning(
+                    f"Ignoring the broken symbolic link '{path}' of commit {self.commit}."
+                )
+                continue
+            self.files[path] = target_id
+
+        for path in self.files:
+            while path:
+                parent = path.rpartition("/")[0]
+                siblings = self.children.setdefault(parent, {})
+                if path in siblings:
+                    break
+                siblings[path] = None
+                path = parent
+
+    def __resolve_link(
+        self, path: str, blob_id: str, links: dict[str, str]
+    ) -> str | None:
+        """Get the blob hash of the target of a symbolic link, or None if it is not a file of the tree."""
+        for _ in range(MAX_SYMLINK_DEPTH):
+            target = self.__objects.read(blob_id).decode()
+            path = posixpath.normpath(posixpath.join(posixpath.dirname(path), target))
+            if path in self.files:
+                return self.files[path]
+            if path not in links:
+                return None
+            blob_id = links[path]
+        return None
+
+    def read(self, path: str) -> bytes:
+        """Read the content of a file of the tree.
+
+        Raises:
+            FileNotFoundError: If the path is not a file of the tree.
+        """
+        try:
+            blob_id = self.files[path]
+        except KeyError:
+            raise FileNotFoundError(
+                f"File '{path}' does not exist in commit {self.commit} of '{self.repository}'."
+            ) from None
+        return self.__objects.read(blob_id)
+
+
+class GitTraversable(ZipTraversable):
+    """An entry of a tree of a commit, readable without checking out the commit.
+
+    All the entries of a tree share the same `GitTreeIndex`.
+
+    Attributes:
+        index (GitTreeIndex): The index of the tree.
+        at (str): The path of the entry inside the tree, `""` for the tree itself.
+    """
+
+    index: GitTreeIndex  # type: ignore[assignment]
+
+    @property
+    def path(self) -> str:
+        """The path of the entry in the commit."""
+        return "/".join(part for part in (self.index.root, self.at) if part)
+
+    @property
+    def name(self) -> str:
+        return self.path.rpartition("/")[2] or self.index.repository.name
+
+    def __str__(self) -> str:
+        return f"{self.index.repository}@{self.index.commit[:12]}:{self.path}"
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}({str(self.index.repository)!r}, "
+            f"{self.index.commit!r}, {self.path!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GitTraversable):
+            return NotImplemented
+        return (self.index.repository, self.index.commit, self.path) == (
+            other.index.repository,
+            other.index.commit,
+            other.path,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.index.repository, self.index.commit, self.path))
+
+    def __reduce__(self):
+        # The opened repository cannot be pickled, so the tree is indexed again when unpickled
+        return open_git_directory, (self.index.repository, self.index.commit, self.path)
+
+
+def open_git_directory(
+    repository: str | Path, ref: str = "HEAD", at: str = "templates"
+) -> GitTraversable:
+    """Open a directory of a commit of a git repository, without checking out the commit.
+
+    Args:
+        repository (str | Path): The path to the git repository, bare or not.
+        ref (str): A branch, a tag or a commit hash (possibly abbreviated). Defaults to `HEAD`.
+        at (str): The path of the directory in the commit. Defaults to `templates`.
+
+    Raises:
+        ModuleNotFoundError: If `pygic` was not installed with the [git] extra nor the [dulwich] extra.
+        FileNotFoundError: If the repository, the ref, or the directory does not exist.
+    """
+    return GitTraversable(GitTreeIndex(Path(repository), ref, at))
+
+
+def fetch_repository(repository: str | Path, url: str = TOPTAL_REPO_URL) -> None:
+    """Fetch the branches and the tags of a remote repository into a bare repository, created if needed,
+    with GitPython, or with Dulwich if GitPython or `git` is not installed.
+
+    Nothing is checked out: refreshing the repository only downloads the new objects.
+    The `HEAD` of the repository follows the default branch of the remote repository,
+    and `CLONE_STAMP_FILE` is touched in the repository to know when it was last fetched.
+
+    Raises:
+        ModuleNotFoundError: If `pygic` was not installed with the [git] extra nor the [dulwich] extra.
+        ConnectionError: If the fetch fails.
+    """
+    repository = Path(repository)
+    refspecs = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+    if _import_gitpython():
+        from git import GitCommandError, Repo  # type: ignore
+
+        repo = Repo.init(repository, bare=True, mkdir=True)
+        try:
+            repo.git.fetch(url, *refspecs)
+            # e.g. `ref: refs/heads/master\tHEAD`
+            head = repo.git.ls_remote("--symref", url, "HEAD").splitlines()[0]
+            if head.startswith("ref: "):
+                repo.git.symbolic_ref("HEAD", head[len("ref: ") :].split("\t")[0])
+        except GitCommandError as e:
+            raise ConnectionError(f"Could not fetch '{url}': {e}") from e
+        finally:
+            repo.close()
+    else:
+        try:
+            from dulwich.client import get_transport_and_path  # type: ignore
+            from dulwich.errors import GitProtocolError, NotGitRepository  # type: ignore
+            from dulwich.repo import Repo  # type: ignore
+        except ModuleNotFoundError as e:
+            raise ModuleNotFoundError(
+                "`pygic` was not installed with the [git] extra nor the [dulwich] extra, "
+                "so it is not possible to fetch the toptal/gitignore repository."
+            ) from e
+
+        if (repository / "objects").is_dir():
+            repo = Repo(str(repository))
+        else:
+            repo = Repo.init_bare(str(repository), mkdir=not repository.exists())
+        try:
+            client, path = get_transport_and_path(url)
+            result = client.fetch(path, repo)
+            for ref, sha in result.refs.items():
+                if ref.startswith((b"refs/heads/", b"refs/tags/")) and not ref.endswith(
+                    b"^{}"
+                ):
+                    repo.refs[ref] = sha
+            head = result.symrefs.get(b"HEAD")
+            if head is not None:
+                repo.refs.set_symbolic_ref(b"HEAD", head)
+        except (GitProtocolError, NotGitRepository, OSError) as e:
+            raise ConnectionError(f"Could not fetch '{url}': {e}") from e
+        finally:
+            repo.close()
+
+    (repository / CLONE_STAMP_FILE).touch()
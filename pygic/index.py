@@ -0,0 +1,500 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import weakref
+import zlib
+from pathlib import Path
+from typing import Iterable
+
+from pygic.file import FileType
+from pygic.resources import (
+    TemplateDirectory,
+    ZipTraversable,
+    iter_template_files,
+    split_file_name,
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+"""The version of the format of the persisted indexes, increased when the format changes."""
+
+NUM_SHARDS = 64
+"""The number of shards of the file name indexes, see `FileNameIndex`."""
+
+RACY_INTERVAL_NS = 2 * 10**9
+"""The age in nanoseconds under which the modification time of a directory does not identify its content,
+the coarsest timestamp resolution of common filesystems (FAT): another change in the same tick
+would not change it, so the indexes of such a directory are neither cached nor persisted."""
+
+
+def is_racy(directory_mtime_ns: int) -> bool:
+    """Check if a directory was modified too recently for its modification time to identify its content."""
+    return time.time_ns() - directory_mtime_ns < RACY_INTERVAL_NS
+
+
+class TemplateInfo:
+    """The files of a template, as listed by `pygic list`.
+
+    Attributes:
+        name (str): The name of the template, as written in its file names (e.g. `ReactNative`).
+        has_gitignore (bool): Whether the template has a `.gitignore` file.
+            Templates without one only have a patch (e.g. `Rider+all`), but can still be generated.
+        has_patch (bool): Whether the template has a `.patch` file.
+        stacks (list[str]): The names of the stacks of the template, sorted case-insensitively
+            (e.g. `Linux` for `ReactNative.Linux.stack`).
+    """
+
+    def __init__(
+        self, name: str, has_gitignore: bool, has_patch: bool, stacks: list[str]
+    ) -> None:
+        self.name = name
+        self.has_gitignore = has_gitignore
+        self.has_patch = has_patch
+        self.stacks = stacks
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "has_gitignore": self.has_gitignore,
+            "has_patch": self.has_patch,
+            "stacks": self.stacks,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TemplateInfo":
+        return cls(
+            data["name"], data["has_gitignore"], data["has_patch"], data["stacks"]
+        )
+
+
+class TemplateIndex:
+    """The templates of a template directory, built from the names of its files only.
+
+    Attributes:
+        templates (list[TemplateInfo]): The templates, sorted case-insensitively by name.
+    """
+
+    def __init__(self, templates: list[TemplateInfo]) -> None:
+        self.templates = templates
+
+    @classmethod
+    def from_directory(cls, directory: TemplateDirectory) -> "TemplateIndex":
+        """List the templates of a template directory, without reading their files.
+
+        Files with the same name before their first dot are part of the same template, regardless of case,
+        as for `Gitignore.create_one_gitignore`.
+        """
+        names: dict[str, str] = {}
+        file_types: dict[str, set[str]] = {}
+        stacks: dict[str, list[str]] = {}
+        for file in iter_template_files(directory):
+            stem, suffix = split_file_name(file.name)
+            if suffix not in FileType.values():
+                continue
+            name, _, stack = stem.partition(".")
+            lower_name = name.lower()
+            # The name of the `.gitignore` file is preferred, e.g. over the name of a stack
+            if lower_name not in names or suffix == FileType.GITIGNORE.value:
+                names[lower_name] = name
+            file_types.setdefault(lower_name, set()).add(suffix)
+            if suffix == FileType.STACK.value:
+                stacks.setdefault(lower_name, []).append(stack)
+
+        return cls(
+            [
+                TemplateInfo(
+                    names[lower_name],
+                    FileType.GITIGNORE.value in file_types[lower_name],
+                    FileType.PATCH.value in file_types[lower_name],
+                    sorted(stacks.get(lower_name, []), key=str.lower),
+                )
+                for lower_name in sorted(names)
+            ]
+        )
+
+    def filter(
+        self, prefix: str | None = None, substring: str | None = None
+    ) -> list[TemplateInfo]:
+        """Get the templates whose name starts with `prefix` and contains `substring`, regardless of case."""
+        prefix = (prefix or "").lower()
+        substring = (substring or "").lower()
+        return [
+            template
+            for template in self.templates
+            if template.name.lower().startswith(prefix)
+            and substring in template.name.lower()
+        ]
+
+    def to_json(self, directory_mtime_ns: int) -> str:
+        return json.dumps(
+            {
+                "format": INDEX_FORMAT,
+                "directory_mtime_ns": directory_mtime_ns,
+                "templates": [template.to_dict() for template in self.templates],
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, content: str, directory_mtime_ns: int) -> "TemplateIndex":
+        """Load a persisted index.
+
+        Raises:
+            ValueError: If the index is invalid, has another format,
+                or was built when the directory had another modification time.
+        """
+        try:
+            data = json.loads(content)
+            if (
+                data["format"] != INDEX_FORMAT
+                or data["directory_mtime_ns"] != directory_mtime_ns
+            ):
+                raise ValueError("The index is outdated.")
+            return cls([TemplateInfo.from_dict(item) for item in data["templates"]])
+        except (KeyError, TypeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid template index: {e}") from e
+
+
+def get_index_path(directory: Path, cache_directory: Path) -> Path:
+    """Get the path of the persisted index of a template directory."""
+    key = hashlib.sha256(str(directory.resolve()).encode()).hexdigest()[:32]
+    return cache_directory / f"{key}.json"
+
+
+def get_template_index(
+    directory: TemplateDirectory, cache_directory: str | Path | None = None
+) -> TemplateIndex:
+    """Get the index of a template directory, from its persisted index if it is up to date.
+
+    Adding, removing or renaming a file changes the modification time of the directory,
+    which invalidates the persisted index. So listing the templates only costs a `stat` of the directory
+    and the read of a small JSON file, instead of listing the directory.
+    A directory modified too recently (see `is_racy`) is always listed.
+
+    Args:
+        directory (Path | Traversable): The template directory. The indexes of directories inside zip archives
+            are not persisted, since their listing is already kept in memory (see `pygic.resources`).
+        cache_directory (str | Path | None): The directory of the persisted indexes.
+            Defaults to None, in which case `INDEX_CACHE_DIR` is used, or the index is not persisted
+            if `pygic` was not installed with the [git] extra nor the [dulwich] extra.
+
+    Returns:
+        TemplateIndex: The index of the directory.
+    """
+    if cache_directory is None:
+        from pygic.gitignore import INDEX_CACHE_DIR
+
+        cache_directory = INDEX_CACHE_DIR
+    if cache_directory is None or not isinstance(directory, Path):
+        return TemplateIndex.from_directory(directory)
+
+    directory_mtime_ns = directory.stat().st_mtime_ns
+    if is_racy(directory_mtime_ns):
+        return TemplateIndex.from_directory(directory)
+    index_path = get_index_path(directory, Path(cache_directory))
+    try:
+        return TemplateIndex.from_json(index_path.read_text(), directory_mtime_ns)
+    except (OSError, ValueError):
+        pass
+
+    index = TemplateIndex.from_directory(directory)
+    try:
+        _write_atomically(index_path, index.to_json(directory_mtime_ns))
+    except OSError as e:
+        logger.info(f"Could not persist the index of '{directory}': {e}")
+    return index
+
+
+def get_shard(lower_name: str) -> int:
+    """Get the shard of a lowercase template name, the same in every process (unlike `hash`)."""
+    return zlib.crc32(lower_name.encode()) % NUM_SHARDS
+
+
+class FileNameIndex:
+    """The file names of a template directory by lowercase template name (the part of the file name before
+    its first dot, as for `Gitignore.create_one_gitignore`), and the summary used to validate the directory
+    (see `pygic.gitignore.check_directory_existence_and_validity`).
+
+    The file names are split into `NUM_SHARDS` shards by `get_shard`. When the index is persisted
+    (see `get_file_name_index`), a shard is only read when one of its names is looked up, so looking up
+    a template does not depend on the number of templates of the directory. If the persisted index was
+    removed in the meantime (e.g. by another process, since the directory changed), the directory is listed.
+
+    Attributes:
+        num_entries (int): The number of entries of the directory.
+        num_files (int): The number of entries with an extension, i.e. the template files.
+        has_order (bool): Whether the directory has an `order` file.
+        invalid_file (str | None): The first file name, alphabetically, whose extension is not a `FileType`,
+            or None if all the template files are valid.
+    """
+
+    def __init__(
+        self,
+        num_entries: int,
+        num_files: int,
+        has_order: bool,
+        invalid_file: str | None,
+        shards: dict[int, dict[str, list[str]]],
+        shards_directory: Path | None = None,
+        directory: Path | None = None,
+    ) -> None:
+        self.num_entries = num_entries
+        self.num_files = num_files
+        self.has_order = has_order
+        self.invalid_file = invalid_file
+        # The shards read so far, a persisted index reads the other ones from `shards_directory`,
+        # or lists `directory` again if they cannot be read anymore
+        self.__shards = shards
+        self.__shards_directory = shards_directory
+        self.__directory = directory
+
+    @classmethod
+    def from_file_names(cls, file_names: Iterable[str]) -> "FileNameIndex":
+        """Index the names of the entries of a template directory."""
+        shards: dict[int, dict[str, list[str]]] = {
+            shard: {} for shard in range(NUM_SHARDS)
+        }
+        num_entries = num_files = 0
+        has_order = False
+        invalid_files = []
+        for file_name in file_names:
+            num_entries += 1
+            if file_name == "order":
+                has_order = True
+            if "." not in file_name:
+                continue
+            num_files += 1
+            if split_file_name(file_name)[1] not in FileType.values():
+                invalid_files.append(file_name)
+            lower_name = file_name.split(".")[0].lower()
+            shards[get_shard(lower_name)].setdefault(lower_name, []).append(file_name)
+        return cls(
+            num_entries,
+            num_files,
+            has_order,
+            min(invalid_files) if invalid_files else None,
+            shards,
+        )
+
+    def __get_shard(self, shard: int) -> dict[str, list[str]]:
+        """Get the file names of the templates of a shard, reading it from the persisted index if needed."""
+        if shard not in self.__shards:
+            assert self.__shards_directory is not None
+            try:
+                content = (self.__shards_directory / f"{shard:02x}.json").read_text()
+            except OSError:
+                if self.__directory is None:
+                    raise
+                logger.info(
+                    f"The file name index of '{self.__directory}' was removed, listing the directory again."
+                )
+                self.__shards = FileNameIndex.from_file_names(
+                    os.listdir(self.__directory)
+                ).__shards
+                self.__shards_directory = None
+                return self.__shards[shard]
+            try:
+                self.__shards[shard] = json.loads(content)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid file name index: {e}") from e
+        return self.__shards[shard]
+
+    def get_file_names(self, lower_name: str) -> list[str]:
+        """Get the names of the files of a template, e.g. `ReactNative.gitignore` and `ReactNative.Linux.stack`
+        for `reactnative`. Empty if there is no such template.
+
+        Raises:
+            OSError: If the shard of the name cannot be read from the persisted index,
+                nor from the listing of the directory.
+            ValueError: If the shard of the name is invalid.
+        """
+        return self.__get_shard(get_shard(lower_name)).get(lower_name, [])
+
+    def save(self, shards_directory: Path) -> None:
+        """Persist the index, with one file per shard and a `manifest.json` file for the summary.
+
+        The files are written in a temporary directory renamed to `shards_directory`, so that a concurrent
+        `load` never sees a partial index. If another process already persisted it, the directory is kept.
+        """
+        shards_directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp_directory = Path(
+            tempfile.mkdtemp(prefix=".files-", dir=shards_directory.parent)
+        )
+        try:
+            for shard in range(NUM_SHARDS):
+                (tmp_directory / f"{shard:02x}.json").write_text(
+                    json.dumps(self.__get_shard(shard), separators=(",", ":"))
+                )
+            (tmp_directory / "manifest.json").write_text(
+                json.dumps(
+                    {
+                        "format": INDEX_FORMAT,
+                        "num_entries": self.num_entries,
+                        "num_files": self.num_files,
+                        "has_order": self.has_order,
+                        "invalid_file": self.invalid_file,
+                    }
+                )
+            )
+            tmp_directory.rename(shards_directory)
+        except OSError:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            if not (shards_directory / "manifest.json").is_file():
+                raise
+
+    @classmethod
+    def load(
+        cls, shards_directory: Path, directory: Path | None = None
+    ) -> "FileNameIndex":
+        """Load a persisted index, without reading its shards.
+
+        If `directory` is given, it is listed again when a shard cannot be read anymore.
+
+        Raises:
+            OSError: If the index does not exist.
+            ValueError: If the index is invalid or has another format.
+        """
+        try:
+            data = json.loads((shards_directory / "manifest.json").read_text())
+            if data["format"] != INDEX_FORMAT:
+                raise ValueError("The index is outdated.")
+            return cls(
+                data["num_entries"],
+                data["num_files"],
+                data["has_order"],
+                data["invalid_file"],
+                {},
+                shards_directory,
+                directory,
+            )
+        except (KeyError, TypeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid file name index: {e}") from e
+
+
+@functools.lru_cache(maxsize=16)
+def _get_file_name_index(
+    directory: Path,
+    directory_mtime_ns: int,
+    directory_size: int,
+    cache_directory: Path | None,
+) -> FileNameIndex:
+    # The modification time and the size of the directory are only part of the cache key,
+    # so that adding, removing or renaming a file indexes the directory again. The size depends on
+    # the entries on most filesystems, and is available without listing the directory, unlike their number
+    if cache_directory is None:
+        return FileNameIndex.from_file_names(os.listdir(directory))
+
+    key = get_index_path(directory, cache_directory).stem
+    shards_directory = (
+        cache_directory / f"{key}-{directory_mtime_ns}-{directory_size}.files"
+    )
+    try:
+        return FileNameIndex.load(shards_directory, directory)
+    except (OSError, ValueError):
+        pass
+
+    index = FileNameIndex.from_file_names(os.listdir(directory))
+    try:
+        index.save(shards_directory)
+        # Remove the indexes of the previous versions of the directory
+        for old_directory in cache_directory.glob(f"{key}-*.files"):
+            if old_directory != shards_directory:
+                shutil.rmtree(old_directory, ignore_errors=True)
+    except OSError as e:
+        logger.info(f"Could not persist the file name index of '{directory}': {e}")
+    return index
+
+
+_indexes_by_listing: "weakref.WeakKeyDictionary[object, dict[str, FileNameIndex]]" = (
+    weakref.WeakKeyDictionary()
+)
+"""The file name indexes of the directories of each in-memory listing, by path inside the listing."""
+
+
+def get_file_name_index(
+    directory: TemplateDirectory, cache_directory: str | Path | None = None
+) -> FileNameIndex:
+    """Get the file name index of a template directory, see `FileNameIndex`.
+
+    The index of a regular directory is kept in memory and persisted until the directory changes,
+    like `get_template_index`, so it is only built by listing the directory once for all the processes.
+    Then, getting it only costs a `stat` of the directory, and the read of a small manifest in a new process.
+    A directory modified too recently (see `is_racy`) is always listed.
+
+    Args:
+        directory (Path | Traversable): The template directory. The indexes of directories inside zip archives,
+            git trees or stacks of layers (see `pygic.layers`) are built once from their listing,
+            which is already kept in memory, and kept as long as their listing.
+        cache_directory (str | Path | None): The directory of the persisted indexes.
+            Defaults to None, in which case `INDEX_CACHE_DIR` is used, or the index is only kept in memory
+            if `pygic` was not installed with the [git] extra nor the [dulwich] extra.
+
+    Raises:
+        OSError: If the directory cannot be listed.
+    """
+    if isinstance(directory, ZipTraversable):
+        # The listing of the archive, the tree or the layers never changes, so the index is built once for it
+        indexes = _indexes_by_listing.setdefault(directory.index, {})
+        if directory.at not in indexes:
+            indexes[directory.at] = FileNameIndex.from_file_names(
+                entry.name for entry in directory.iterdir()
+            )
+        return indexes[directory.at]
+    if not isinstance(directory, Path):
+        return FileNameIndex.from_file_names(
+            entry.name for entry in directory.iterdir()
+        )
+    stat = directory.stat()
+    if is_racy(stat.st_mtime_ns):
+        return FileNameIndex.from_file_names(os.listdir(directory))
+    if cache_directory is None:
+        from pygic.gitignore import INDEX_CACHE_DIR
+
+        cache_directory = INDEX_CACHE_DIR
+    return _get_file_name_index(
+        directory.resolve(),
+        stat.st_mtime_ns,
+        stat.st_size,
+        None if cache_directory is None else Path(cache_directory),
+    )
+
+
+def _write_atomically(path: Path, content: str) -> None:
+    """Write a file through a temporary file, so that a concurrent read never sees a partial content."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+        f.write(content)
+    os.replace(f.name, path)
+
+
+def write_completion_names(directory: TemplateDirectory, output: Path) -> None:
+    """Write the lowercase names of the templates of a template directory, one per line,
+    for the shell completion (see `pygic.complete`).
+    """
+    index = TemplateIndex.from_directory(directory)
+    _write_atomically(
+        output, "".join(f"{template.name.lower()}\n" for template in index.templates)
+    )
+
+
+def save_completion_names(directory: TemplateDirectory) -> None:
+    """Write the names of the templates newly cloned or downloaded from the toptal/gitignore repository
+    where the shell completion reads them, if `pygic` was installed with the [git] extra or the [dulwich] extra.
+    """
+    from pygic.complete import get_cached_names_file
+
+    names_file = get_cached_names_file()
+    if names_file is None:
+        return
+    try:
+        write_completion_names(directory, Path(names_file))
+    except OSError as e:
+        logger.warning(
+            f"Could not save the template names for the shell completion: {e}"
+        )
@@ -0,0 +1,139 @@
+import os
+from typing import Sequence
+
+from pygic.gitignore import read_order_file
+from pygic.resources import (
+    TemplateDirectory,
+    Traversable,
+    ZipTraversable,
+    is_existing_entry,
+    open_template_directory,
+)
+
+
+class LayeredIndex:
+    """The merged files of an ordered stack of template directories, listed once when the stack is opened.
+
+    A file of an upper layer overrides the file of a lower layer with the same name, regardless of case
+    (e.g. a custom `python.patch` overrides the `Python.patch` of toptal/gitignore, under the name of the latter),
+    and the other files of the lower layers are kept (e.g. `Python.gitignore`).
+    Nothing is copied: the files are read from their layer.
+
+    The merged `order` file contains the names of the `order` file of the lowest layer, followed by the names
+    of the `order` files of the upper layers that are not already in it.
+
+    Attributes:
+        layers (list[Path | Traversable]): The template directories, from the lowest to the uppermost layer.
+        files (dict[str, Path | Traversable]): The file of each merged file name, `order` excepted.
+        children (dict[str, dict[str, None]]): The file names of the merged directory `""`, like `ZipIndex.children`.
+        order (bytes | None): The content of the merged `order` file, or None if no layer has one.
+    """
+
+    def __init__(self, layers: Sequence[TemplateDirectory]) -> None:
+        self.layers = list(layers)
+        files_by_lower_name: dict[str, tuple[str, TemplateDirectory]] = {}
+        order_names: dict[str, None] = {}
+        has_order = False
+        for layer in self.layers:
+            for entry in layer.iterdir():
+                if entry.name == "order":
+                    has_order = True
+                    order_names.update(dict.fromkeys(read_order_file(entry)))
+                else:
+                    # The name of the lowest file is kept, so the headers of the gitignores do not change
+                    lower_name = entry.name.lower()
+                    name = files_by_lower_name.get(lower_name, (entry.name,))[0]
+                    files_by_lower_name[lower_name] = (name, entry)
+
+        self.files: dict[str, TemplateDirectory] = dict(
+            sorted(files_by_lower_name.values(), key=lambda item: item[0])
+        )
+        self.order = (
+            "".join(f"{name}\n" for name in order_names).encode() if has_order else None
+        )
+        names = dict.fromkeys(self.files)
+        if self.order is not None:
+            names["order"] = None
+        self.children: dict[str, dict[str, None]] = {"": names}
+
+    def read(self, path: str) -> bytes:
+        """Read the content of a merged file.
+
+        Raises:
+            FileNotFoundError: If the path is not a file of the merged directory.
+        """
+        if path == "order" and self.order is not None:
+            return self.order
+        try:
+            entry = self.files[path]
+        except KeyError:
+            raise FileNotFoundError(
+                f"File '{path}' does not exist in '{self}'."
+            ) from None
+        return entry.read_bytes()
+
+    def __str__(self) -> str:
+        return " + ".join(str(layer) for layer in self.layers)
+
+
+class LayeredTraversable(ZipTraversable):
+    """An entry of the merged directory of a stack of template directories, see `LayeredIndex`.
+
+    Attributes:
+        index (LayeredIndex): The merged files of the layers.
+        at (str): The name of the entry, `""` for the merged directory itself.
+    """
+
+    index: LayeredIndex  # type: ignore[assignment]
+
+    def is_file(self) -> bool:
+        return self.at in self.index.children[""] and bool(self.at)
+
+    @property
+    def name(self) -> str:
+        return self.at or "templates"
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.at}" if self.at else str(self.index)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.index.layers!r}, {self.at!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LayeredTraversable):
+            return NotImplemented
+        return (self.index.layers, self.at) == (other.index.layers, other.at)
+
+    def __hash__(self) -> int:
+        return hash((tuple(map(str, self.index.layers)), self.at))
+
+    def __reduce__(self):
+        # The layers are listed again when unpickled
+        return _open_layered_entry, (self.index.layers, self.at)
+
+
+def _open_layered_entry(layers: list[TemplateDirectory], at: str) -> LayeredTraversable:
+    return LayeredTraversable(LayeredIndex(layers), at)
+
+
+def open_layered_directory(
+    *layers: str | os.PathLike | Traversable,
+) -> LayeredTraversable:
+    """Open the merged directory of an ordered stack of template directories, see `LayeredIndex`.
+
+    Args:
+        *layers (str | os.PathLike | Traversable): The template directories, from the lowest layer
+            (e.g. the bundled or the cloned templates) to the uppermost one (e.g. a local overlay directory).
+            Each one can be a zip archive or a directory inside one, see `open_template_directory`.
+
+    Raises:
+        ValueError: If no layer is provided.
+        NotADirectoryError: If a layer is not a directory.
+    """
+    if not layers:
+        raise ValueError("At least one template directory is needed.")
+    directories = [open_template_directory(layer) for layer in layers]
+    for directory in directories:
+        if not is_existing_entry(directory) or not directory.is_dir():
+            raise NotADirectoryError(f"'{directory}' is not a directory.")
+    return LayeredTraversable(LayeredIndex(directories))
@@ -0,0 +1,102 @@
+import threading
+from array import array
+from typing import Iterable, Sequence
+
+
+class LineTable:
+    """An interned table of the lines of the templates, shared by all the templates of a `Gitignore`.
+
+    Each distinct line is stored once and identified by an integer, so that a template is only an array
+    of small integers, and lines that appear in many templates (e.g. `.DS_Store` or `*.log`) are stored once.
+
+    Each line also has a deduplication key: the ID of its stripped content, or -1 for the empty lines
+    and comments which are never removed (see `remove_duplicated_lines`). Lines that only differ by
+    their surrounding whitespace share the same key, so removing duplicated lines only compares integers.
+
+    The table is append-only: interning is thread-safe, and rendering and merging do not need to lock
+    since the lines of the IDs they receive never change.
+
+    Attributes:
+        lines (list[str]): The interned lines, indexed by their ID.
+        keys (array[int]): The deduplication keys of the lines, indexed by their ID.
+    """
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.keys = array("i")
+        self.__line_ids: dict[str, int] = {}
+        self.__key_ids: dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # The lock cannot be pickled (e.g. to send the templates to worker processes)
+        state = self.__dict__.copy()
+        del state["_LineTable__lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def intern(self, line: str) -> int:
+        """Get the ID of a line, adding it to the table if needed."""
+        with self.__lock:
+            return self.__intern(line)
+
+    def __intern(self, line: str) -> int:
+        line_id = self.__line_ids.get(line)
+        if line_id is None:
+            line_id = len(self.lines)
+            self.lines.append(line)
+            self.__line_ids[line] = line_id
+
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                self.keys.append(-1)
+            else:
+                self.keys.append(
+                    self.__key_ids.setdefault(stripped, len(self.__key_ids))
+                )
+        return line_id
+
+    def intern_content(self, content: str) -> array:
+        """Split a content on `\\n` and get the IDs of its lines.
+
+        The content should only use `\\n` as line separator, like the output of `Gitignore.create_one_gitignore`,
+        so that it is exactly `"\\n".join` of its lines (a trailing newline gives a trailing empty line).
+        """
+        with self.__lock:
+            return array("I", map(self.__intern, content.split("\n")))
+
+    def render(self, line_ids: Sequence[int]) -> str:
+        """Get the content of the lines with the given IDs, the inverse of `intern_content`."""
+        lines = self.lines
+        return "\n".join([lines[line_id] for line_id in line_ids])
+
+    def merge(self, pieces: Iterable[Sequence[int]]) -> str:
+        """Join pieces of content with newlines and remove the duplicated lines.
+
+        This is equivalent to `remove_duplicated_lines("\\n".join(pieces))` for the contents of the pieces,
+        but the lines are only compared through their deduplication keys.
+
+        Args:
+            pieces (Iterable[Sequence[int]]): The IDs of the lines of each piece, see `intern_content`.
+
+        Returns:
+            str: The merged content.
+        """
+        lines, keys = self.lines, self.keys
+        seen: set[int] = set()
+        result: list[str] = []
+        for piece in pieces:
+            for line_id in piece:
+                key = keys[line_id]
+                if key >= 0:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                result.append(lines[line_id])
+        return "\n".join(result)
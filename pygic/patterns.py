@@ -0,0 +1,760 @@
+import re
+import sys
+from collections import defaultdict
+from typing import Iterable
+
+MAX_CODE_POINT = sys.maxunicode
+
+
+class CharSet:
+    """A set of characters, as a union of code point intervals, possibly negated.
+
+    Attributes:
+        intervals (tuple[tuple[int, int], ...]): The inclusive intervals of code points of the set.
+        negated (bool): If True, the set contains the characters that are not in the intervals.
+    """
+
+    def __init__(
+        self, intervals: Iterable[tuple[int, int]], negated: bool = False
+    ) -> None:
+        self.intervals = tuple(intervals)
+        self.negated = negated
+
+    @classmethod
+    def literal(cls, char: str) -> "CharSet":
+        return cls(((ord(char), ord(char)),))
+
+    def __contains__(self, char: str) -> bool:
+        code = ord(char)
+        return self.negated != any(lo <= code <= hi for lo, hi in self.intervals)
+
+    def example(self) -> str | None:
+        """Get a character of the set, preferably a letter, or None if the set is empty (e.g. `[/]`)."""
+        for char in "xa0_":
+            if char in self:
+                return char
+        if not self.negated:
+            return chr(self.intervals[0][0]) if self.intervals else None
+        code = 0
+        while chr(code) not in self:
+            code += 1
+        return chr(code)
+
+    def to_regex(self) -> str:
+        """Get a regular expression matching one character of the set."""
+        if not self.intervals:
+            return "(?s:.)" if self.negated else "(?!)"
+        body = "".join(
+            re.escape(chr(lo))
+            if lo == hi
+            else f"{re.escape(chr(lo))}-{re.escape(chr(hi))}"
+            for lo, hi in self.intervals
+        )
+        return f"[^{body}]" if self.negated else f"[{body}]"
+
+
+SLASH = CharSet.literal("/")
+NOT_SLASH = CharSet(SLASH.intervals, negated=True)
+ANY_CHAR = CharSet((), negated=True)
+
+
+class Token:
+    """A token of a glob, see `tokenize_glob`.
+
+    Attributes:
+        kind (str): One of:
+            - `char`: One character of `chars`. Literal characters, `?` and bracket expressions.
+            - `star`: `*`, any sequence of characters without slashes.
+            - `dirs`: `**/` at the start or `/**/` in the middle of a glob, any sequence of directories
+                (each followed by a slash), including none. The slash before `/**/` is a separate `char` token.
+            - `rest`: `/**` at the end of a glob, any non-empty sequence of characters.
+                The slash before it is a separate `char` token.
+        chars (CharSet | None): The characters matched by a `char` token.
+        text (str): The text of the token in the glob.
+    """
+
+    def __init__(self, kind: str, text: str, chars: CharSet | None = None) -> None:
+        self.kind = kind
+        self.text = text
+        self.chars = chars
+
+    @property
+    def is_literal(self) -> bool:
+        """Whether the token matches a single literal character."""
+        return (
+            self.kind == "char"
+            and not self.chars.negated
+            and len(self.chars.intervals) == 1
+            and self.chars.intervals[0][0] == self.chars.intervals[0][1]
+        )
+
+
+def _parse_bracket(glob: str, start: int) -> tuple[CharSet, int] | None:
+    """Parse the bracket expression starting at `glob[start] == "["`.
+
+    Returns:
+        tuple[CharSet, int] | None: The characters of the expression and the index after it,
+            or None if the bracket is not closed (it is then a literal `[`).
+
+    Raises:
+        ValueError: If the expression uses a character class like `[:alpha:]`, which is not supported.
+    """
+    i = start + 1
+    negated = i < len(glob) and glob[i] in "!^"
+    if negated:
+        i += 1
+    intervals = []
+    first = True
+    while i < len(glob):
+        char = glob[i]
+        if char == "]" and not first:
+            return _bracket_charset(intervals, negated), i + 1
+        first = False
+        if char == "[" and glob.startswith("[:", i):
+            raise ValueError(f"Character classes are not supported: '{glob}'.")
+        if char == "\\" and i + 1 < len(glob):
+            i += 1
+            char = glob[i]
+        lo = char
+        i += 1
+        if i + 1 < len(glob) and glob[i] == "-" and glob[i + 1] != "]":
+            hi = glob[i + 1]
+            if hi == "\\" and i + 2 < len(glob):
+                hi = glob[i + 2]
+                i += 1
+            i += 2
+            if ord(lo) <= ord(hi):
+                intervals.append((ord(lo), ord(hi)))
+        else:
+            intervals.append((ord(lo), ord(lo)))
+    return None
+
+
+def _bracket_charset(intervals: list[tuple[int, int]], negated: bool) -> CharSet:
+    """Get the characters of a bracket expression, which never matches a slash."""
+    slash = ord("/")
+    without_slash = []
+    for lo, hi in intervals:
+        if lo <= slash <= hi:
+            without_slash.extend(
+                interval
+                for interval in ((lo, slash - 1), (slash + 1, hi))
+                if interval[0] <= interval[1]
+            )
+        else:
+            without_slash.append((lo, hi))
+    if negated:
+        without_slash.append((slash, slash))
+    return CharSet(without_slash, negated)
+
+
+def tokenize_glob(glob: str) -> list[Token]:
+    """Split a glob matched against a whole path into tokens, with the semantics of git's `wildmatch`.
+
+    Raises:
+        ValueError: If the glob uses an unsupported construct (character classes like `[:alpha:]`).
+    """
+    tokens: list[Token] = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if char == "*":
+            j = i
+            while j < len(glob) and glob[j] == "*":
+                j += 1
+            at_segment_start = i == 0 or glob[i - 1] == "/"
+            at_segment_end = j == len(glob) or glob[j] == "/"
+            if j - i >= 2 and at_segment_start and at_segment_end:
+                if j == len(glob):
+                    tokens.append(Token("rest", glob[i:j]))
+                    i = j
+                else:
+                    # `**/`: the following slash is part of the token
+                    tokens.append(Token("dirs", glob[i : j + 1]))
+                    i = j + 1
+            else:
+                tokens.append(Token("star", glob[i:j]))
+                i = j
+        elif char == "?":
+            tokens.append(Token("char", char, NOT_SLASH))
+            i += 1
+        elif char == "[" and (bracket := _parse_bracket(glob, i)) is not None:
+            chars, j = bracket
+            tokens.append(Token("char", glob[i:j], chars))
+            i = j
+        else:
+            if char == "\\" and i + 1 < len(glob):
+                i += 1
+                char = glob[i]
+                tokens.append(Token("char", glob[i - 1 : i + 1], CharSet.literal(char)))
+            else:
+                tokens.append(Token("char", char, CharSet.literal(char)))
+            i += 1
+    return tokens
+
+
+def glob_tokens_to_regex(tokens: list[Token]) -> str:
+    """Get a regular expression (for `re.DOTALL`) matching the same paths as a tokenized glob."""
+    parts = []
+    for token in tokens:
+        if token.kind == "char":
+            parts.append(token.chars.to_regex())
+        elif token.kind == "star":
+            parts.append("[^/]*")
+        elif token.kind == "dirs":
+            parts.append("(?:[^/]+/)*")
+        else:  # rest
+            parts.append(".+")
+    return "".join(parts)
+
+
+class Nfa:
+    """A nondeterministic finite automaton recognizing the paths matched by a glob.
+
+    Attributes:
+        edges (list[list[tuple[CharSet, int]]]): The transitions of each state on a character.
+        epsilons (list[list[int]]): The transitions of each state without consuming a character.
+        accept (int): The accepting state. The starting state is 0.
+    """
+
+    def __init__(self, tokens: list[Token]) -> None:
+        self.edges: list[list[tuple[CharSet, int]]] = []
+        self.epsilons: list[list[int]] = []
+        current = self.__new_state()
+        for token in tokens:
+            state = self.__new_state()
+            self.epsilons[current].append(state)
+            if token.kind == "char":
+                current = self.__new_state()
+                self.edges[state].append((token.chars, current))
+            elif token.kind == "star":
+                self.edges[state].append((NOT_SLASH, state))
+                current = state
+            elif token.kind == "dirs":
+                # (segment "/")*, where a segment is a non-empty sequence of characters without slashes
+                segment = self.__new_state()
+                self.edges[state].append((NOT_SLASH, segment))
+                self.edges[segment].append((NOT_SLASH, segment))
+                self.edges[segment].append((SLASH, state))
+                current = state
+            else:  # rest
+                current = self.__new_state()
+                self.edges[state].append((ANY_CHAR, current))
+                self.edges[current].append((ANY_CHAR, current))
+        self.accept = current
+
+    def __new_state(self) -> int:
+        self.edges.append([])
+        self.epsilons.append([])
+        return len(self.edges) - 1
+
+    def closure(self, states: Iterable[int]) -> frozenset[int]:
+        """Get the states reachable from `states` without consuming a character."""
+        stack = list(states)
+        reached = set(stack)
+        while stack:
+            for state in self.epsilons[stack.pop()]:
+                if state not in reached:
+                    reached.add(state)
+                    stack.append(state)
+        return frozenset(reached)
+
+    def step(self, states: frozenset[int], char: str) -> frozenset[int]:
+        """Get the states reached from `states` by consuming `char`."""
+        return self.closure(
+            target
+            for state in states
+            for chars, target in self.edges[state]
+            if char in chars
+        )
+
+    def charsets(self) -> Iterable[CharSet]:
+        return (chars for edges in self.edges for chars, _ in edges)
+
+    def matches(self, path: str) -> bool:
+        states = self.closure([0])
+        for char in path:
+            states = self.step(states, char)
+            if not states:
+                return False
+        return self.accept in states
+
+
+def _representative_chars(*nfas: Nfa) -> list[str]:
+    """Get one character of each class of characters that no transition of the automata can distinguish.
+
+    The boundaries of the intervals of all the transitions split the code points into ranges
+    that are either fully inside or fully outside of each transition's characters.
+    """
+    boundaries = {0, ord("/"), ord("/") + 1}
+    for nfa in nfas:
+        for chars in nfa.charsets():
+            for lo, hi in chars.intervals:
+                boundaries.add(lo)
+                boundaries.add(hi + 1)
+    return [chr(code) for code in sorted(boundaries) if code <= MAX_CODE_POINT]
+
+
+def is_glob_included(included: Nfa, including: Nfa) -> bool:
+    """Check if every path matched by `included` is matched by `including`.
+
+    The automata are determinized on the fly, looking for a path accepted by `included`
+    but not by `including`.
+    """
+    chars = _representative_chars(included, including)
+    start = (included.closure([0]), including.closure([0]))
+    visited = {start}
+    stack = [start]
+    while stack:
+        included_states, including_states = stack.pop()
+        if (
+            included.accept in included_states
+            and including.accept not in including_states
+        ):
+            return False
+        for char in chars:
+            next_included_states = included.step(included_states, char)
+            if not next_included_states:
+                continue
+            pair = (next_included_states, including.step(including_states, char))
+            if pair not in visited:
+                visited.add(pair)
+                stack.append(pair)
+    return True
+
+
+def is_glob_intersecting(first: Nfa, second: Nfa) -> bool:
+    """Check if some path is matched by both `first` and `second`."""
+    chars = _representative_chars(first, second)
+    start = (first.closure([0]), second.closure([0]))
+    visited = {start}
+    stack = [start]
+    while stack:
+        first_states, second_states = stack.pop()
+        if first.accept in first_states and second.accept in second_states:
+            return True
+        for char in chars:
+            pair = (first.step(first_states, char), second.step(second_states, char))
+            if pair[0] and pair[1] and pair not in visited:
+                visited.add(pair)
+                stack.append(pair)
+    return False
+
+
+class Rule:
+    """A rule of a gitignore file.
+
+    Attributes:
+        line (str): The line of the rule, as written in the file.
+        pattern (str): The pattern of the rule, without the `!`, the trailing slash, and the trailing spaces.
+        negated (bool): If True, the rule re-includes the paths it matches (`!pattern`).
+        directory_only (bool): If True, the rule only matches directories (`pattern/`).
+        anchored (bool): If True, the rule matches paths relative to the directory of the gitignore file,
+            otherwise it matches at any level (the pattern has no slash except a trailing one).
+        glob (str): The glob matched against whole paths: the pattern without its leading slash
+            if it is anchored, otherwise the pattern preceded by `**/`.
+    """
+
+    def __init__(self, line: str) -> None:
+        self.line = line
+        pattern = _strip_trailing_spaces(line)
+        self.negated = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+        self.directory_only = pattern.endswith("/") and not pattern.endswith("\\/")
+        if self.directory_only:
+            pattern = pattern.rstrip("/")
+        self.pattern = pattern
+        self.anchored = "/" in pattern
+        self.glob = pattern.lstrip("/") if self.anchored else f"**/{pattern}"
+        self.__tokens: list[Token] | None = None
+        self.__nfa: Nfa | None = None
+        self.__regex: re.Pattern | None = None
+        self.__examples: tuple[str, ...] | None = None
+        self.__literal_suffix: str | None = None
+
+    @property
+    def tokens(self) -> list[Token]:
+        """The tokens of the glob of the rule.
+
+        Raises:
+            ValueError: If the glob uses an unsupported construct.
+        """
+        if self.__tokens is None:
+            if not self.pattern.strip("/"):
+                raise ValueError(f"Empty pattern: '{self.line}'.")
+            self.__tokens = tokenize_glob(self.glob)
+        return self.__tokens
+
+    @property
+    def is_supported(self) -> bool:
+        """Whether the glob of the rule only uses supported constructs."""
+        try:
+            return bool(self.tokens)
+        except ValueError:
+            return False
+
+    @property
+    def nfa(self) -> Nfa:
+        """The automaton of the glob of the rule.
+
+        Raises:
+            ValueError: If the glob uses an unsupported construct.
+        """
+        if self.__nfa is None:
+            self.__nfa = Nfa(self.tokens)
+        return self.__nfa
+
+    @property
+    def regex(self) -> re.Pattern:
+        """The regular expression matching the same paths as the glob of the rule.
+
+        Raises:
+            ValueError: If the glob uses an unsupported construct.
+        """
+        if self.__regex is None:
+            self.__regex = re.compile(glob_tokens_to_regex(self.tokens), re.DOTALL)
+        return self.__regex
+
+    @property
+    def examples(self) -> tuple[str, ...]:
+        """A short and a longer path matched by the glob of the rule, used to quickly reject subsumptions,
+        or none if the glob matches no path (e.g. `a[/]b`, since a bracket expression never matches a slash).
+
+        Raises:
+            ValueError: If the glob uses an unsupported construct.
+        """
+        if self.__examples is None:
+            short, long = [], []
+            for token in self.tokens:
+                if token.kind == "char":
+                    char = token.chars.example()
+                    if char is None:
+                        self.__examples = ()
+                        return self.__examples
+                    short.append(char)
+                    long.append(char)
+                elif token.kind == "star":
+                    long.append("x")
+                elif token.kind == "dirs":
+                    long.append("d/")
+                else:  # rest
+                    short.append("x")
+                    long.append("d/x")
+            self.__examples = ("".join(short), "".join(long))
+        return self.__examples
+
+    @property
+    def literal_suffix(self) -> str:
+        """The literal characters at the end of the glob, that every matched path ends with."""
+        if self.__literal_suffix is None:
+            suffix = []
+            for token in reversed(self.tokens):
+                if not token.is_literal:
+                    break
+                suffix.append(chr(token.chars.intervals[0][0]))
+            self.__literal_suffix = "".join(reversed(suffix))
+        return self.__literal_suffix
+
+    def matches(self, path: str, is_directory: bool = False) -> bool:
+        """Check if the rule matches a path relative to the directory of the gitignore file,
+        regardless of whether the rule is negated.
+
+        Raises:
+            ValueError: If the glob uses an unsupported construct.
+        """
+        if self.directory_only and not is_directory:
+            return False
+        return self.regex.fullmatch(path.strip("/")) is not None
+
+    def subsumes(self, other: "Rule") -> bool:
+        """Check if the rule matches every path matched by `other`, regardless of whether they are negated.
+
+        Raises:
+            ValueError: If a glob uses an unsupported construct.
+        """
+        if self.directory_only and not other.directory_only:
+            return False
+        # Quick rejections: a path matched by `other` is not matched by this rule
+        if not other.literal_suffix.endswith(self.literal_suffix):
+            return False
+        if not all(self.regex.fullmatch(example) for example in other.examples):
+            return False
+        return is_glob_included(other.nfa, self.nfa)
+
+    def __repr__(self) -> str:
+        return f"Rule({self.line!r})"
+
+
+def _strip_trailing_spaces(line: str) -> str:
+    """Remove the trailing spaces of a line, unless they are escaped with a backslash."""
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        # Keep the escaped space
+        stripped += " "
+    return stripped
+
+
+def parse_rule(line: str) -> Rule | None:
+    """Parse a line of a gitignore file.
+
+    Returns:
+        Rule | None: The rule of the line, or None if the line is empty or a comment.
+    """
+    if line.startswith("#") or not _strip_trailing_spaces(line):
+        return None
+    return Rule(line)
+
+
+def is_ignored(rules: Iterable[Rule], path: str, is_directory: bool = False) -> bool:
+    """Check if a path is ignored by a list of rules: the last rule matching the path decides.
+
+    NOTE: Unlike git, the parent directories of the path are not checked,
+        i.e. a path inside an ignored directory is only ignored if it is matched itself.
+    """
+    ignored = False
+    for rule in rules:
+        if rule.matches(path, is_directory):
+            ignored = not rule.negated
+    return ignored
+
+
+def _get_literal(tokens: list[Token]) -> str:
+    """Get the characters matched by literal tokens."""
+    return "".join(chr(token.chars.intervals[0][0]) for token in tokens)
+
+
+class _CompiledRules:
+    """The rules of a `RuleMatcher` that can match a kind of path (files or directories).
+
+    The literal names, name suffixes and paths are looked up in dictionaries, and the other globs are combined
+    into regular expressions, one per last character of the matched names or paths.
+    """
+
+    def __init__(self, rules: list[Rule], is_directory: bool) -> None:
+        # The index of the last rule of each literal name (e.g. `.DS_Store`), each literal suffix
+        # of a name starting with a dot (e.g. `*.pyc`, the most common rules) or not (e.g. `*~`),
+        # and each literal anchored path
+        self.names: dict[str, int] = {}
+        self.extensions: dict[str, int] = {}
+        self.name_suffixes: dict[str, int] = {}
+        self.paths: dict[str, int] = {}
+        name_globs: list[tuple[int, list[Token]]] = []
+        path_globs: list[tuple[int, list[Token]]] = []
+        for idx, rule in enumerate(rules):
+            if (rule.directory_only and not is_directory) or not rule.is_supported:
+                continue
+            if rule.anchored:
+                tokens, literals, globs = rule.tokens, self.paths, path_globs
+            else:
+                # A pattern without slash only matches the name of a path, at any level
+                tokens = tokenize_glob(rule.pattern)
+                literals, globs = self.names, name_globs
+            if all(token.is_literal for token in tokens):
+                literals[_get_literal(tokens)] = idx
+            elif (
+                not rule.anchored
+                and tokens[0].kind == "star"
+                and all(token.is_literal for token in tokens[1:])
+            ):
+                suffix = _get_literal(tokens[1:])
+                if suffix.startswith("."):
+                    self.extensions[suffix] = idx
+                else:
+                    self.name_suffixes[suffix] = idx
+            else:
+                globs.append((idx, tokens))
+        self.suffix_lengths = sorted({len(suffix) for suffix in self.name_suffixes})
+        self.name_regexes = self.__combine(name_globs)
+        self.path_regexes = self.__combine(path_globs)
+
+    @staticmethod
+    def __combine(globs: list[tuple[int, list[Token]]]) -> dict[str, re.Pattern]:
+        """Combine globs in regular expressions whose first matching alternative is the last matching glob.
+
+        The globs are grouped by the last character of the strings they match, `""` if it is not a literal,
+        so that a string is only matched against the globs that can match it.
+        """
+        groups: defaultdict[str, list[tuple[int, str]]] = defaultdict(list)
+        for idx, tokens in globs:
+            last_char = _get_literal(tokens[-1:]) if tokens[-1].is_literal else ""
+            groups[last_char].append((idx, glob_tokens_to_regex(tokens)))
+        return {
+            last_char: re.compile(
+                "|".join(f"(?P<r{idx}>{regex})" for idx, regex in reversed(group)),
+                re.DOTALL,
+            )
+            for last_char, group in groups.items()
+        }
+
+    def last_match(self, path: str) -> int:
+        """Get the index of the last rule matching a path, or -1 if no rule matches it."""
+        name = path.rpartition("/")[2]
+        last = max(self.names.get(name, -1), self.paths.get(path, -1))
+        dot = name.find(".")
+        while dot != -1:
+            last = max(last, self.extensions.get(name[dot:], -1))
+            dot = name.find(".", dot + 1)
+        for length in self.suffix_lengths:
+            if length > len(name):
+                break
+            last = max(last, self.name_suffixes.get(name[len(name) - length :], -1))
+        for regexes, string in ((self.name_regexes, name), (self.path_regexes, path)):
+            for last_char in (string[-1:], ""):
+                regex = regexes.get(last_char)
+                if regex is not None and (match := regex.fullmatch(string)) is not None:
+                    last = max(last, int(match.lastgroup[1:]))
+        return last
+
+
+class RuleMatcher:
+    """Find the rules ignoring many paths, like git, by matching each path against all the rules at once.
+
+    The rules are split into the literal names and paths (e.g. `.DS_Store`, `/build`), looked up in dictionaries,
+    and the other globs, combined into one regular expression for the names and one for the paths, so matching
+    a path does not depend much on the number of rules. The decisions of the directories are cached, since
+    the paths of a repository share most of their directories.
+
+    Unlike `is_ignored`, a path inside an ignored directory is ignored, as with git. Unsupported rules never match.
+
+    Attributes:
+        rules (list[Rule]): The rules, in the order of the gitignore file.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules = list(rules)
+        self.__files = _CompiledRules(self.rules, is_directory=False)
+        self.__directories = _CompiledRules(self.rules, is_directory=True)
+        # The index of the rule ignoring each directory, or None if it is not ignored by itself
+        self.__directory_rules: dict[str, int | None] = {}
+
+    def __get_directory_rule(self, directory: str) -> int | None:
+        try:
+            return self.__directory_rules[directory]
+        except KeyError:
+            pass
+        idx = self.__directories.last_match(directory)
+        rule = idx if idx >= 0 and not self.rules[idx].negated else None
+        self.__directory_rules[directory] = rule
+        return rule
+
+    def get_ignoring_rule(self, path: str, is_directory: bool = False) -> Rule | None:
+        """Get the rule ignoring a path relative to the directory of the gitignore file.
+
+        Returns:
+            Rule | None: The last rule matching the path, or the rule ignoring one of its parent directories,
+                or None if the path is not ignored.
+        """
+        path = path.strip("/")
+        end = path.find("/")
+        while end != -1:
+            idx = self.__get_directory_rule(path[:end])
+            if idx is not None:
+                return self.rules[idx]
+            end = path.find("/", end + 1)
+        if is_directory:
+            idx = self.__get_directory_rule(path)
+            return None if idx is None else self.rules[idx]
+        idx = self.__files.last_match(path)
+        if idx < 0 or self.rules[idx].negated:
+            return None
+        return self.rules[idx]
+
+
+class MinimizationResult:
+    """The result of `minimize`.
+
+    Attributes:
+        content (str): The gitignore without the redundant rules.
+        num_rules (int): The number of rules of the gitignore before the minimization.
+        removed (list[tuple[Rule, Rule]]): The removed rules, each with the rule that subsumes it.
+    """
+
+    def __init__(
+        self, content: str, num_rules: int, removed: list[tuple[Rule, Rule]]
+    ) -> None:
+        self.content = content
+        self.num_rules = num_rules
+        self.removed = removed
+
+
+def minimize(content: str) -> MinimizationResult:
+    """Remove the rules of a gitignore that are provably subsumed by other rules.
+
+    Git decides whether a path is ignored with the last rule matching it. So a rule can be removed:
+    - If a later rule (negated or not) matches every path it matches: it never decides anything.
+    - If an earlier rule of the same kind (negated or not) matches every path it matches,
+      and there is no kept rule of the other kind between them: the decision of the earlier rule
+      is the same as its own for the paths it matches.
+
+    Directory-only rules (`pattern/`) never subsume rules that also match files, and rules using
+    unsupported constructs are kept. Comments and empty lines are kept.
+
+    Args:
+        content (str): The content of the gitignore.
+
+    Returns:
+        MinimizationResult: The minimized gitignore and the removed rules.
+    """
+    lines = content.split("\n")
+    rules: list[tuple[int, Rule]] = []
+    for line_number, line in enumerate(lines):
+        rule = parse_rule(line)
+        if rule is None:
+            continue
+        if not rule.is_supported:
+            # Unsupported rules are kept, but still separate rules of the other kind
+            rule = _OpaqueRule(line)
+        rules.append((line_number, rule))
+
+    # A rule can only subsume rules whose literal suffix ends with its own literal suffix,
+    # so the candidates are looked up by the last character of their literal suffix
+    rule_indexes_by_last_char: defaultdict[str, list[int]] = defaultdict(list)
+    for index, (_, rule) in enumerate(rules):
+        if not isinstance(rule, _OpaqueRule):
+            rule_indexes_by_last_char[rule.literal_suffix[-1:]].append(index)
+
+    # The rules are removed one at a time, each removal keeping the decisions of the remaining rules
+    removed_indexes: set[int] = set()
+    removed: list[tuple[Rule, Rule]] = []
+    # The index of the last kept rule of each kind (negated or not) before the current rule, or -1
+    last_kept_index_by_kind = {False: -1, True: -1}
+    for index, (line_number, rule) in enumerate(rules):
+        if isinstance(rule, _OpaqueRule):
+            last_kept_index_by_kind[rule.negated] = index
+            continue
+        barrier = last_kept_index_by_kind[not rule.negated]
+        last_chars = {"", rule.literal_suffix[-1:]}
+        candidates = [
+            candidate
+            for last_char in last_chars
+            for candidate in rule_indexes_by_last_char[last_char]
+            if candidate != index
+        ]
+        for candidate in sorted(candidates, key=lambda candidate: candidate < index):
+            # Later rules first, then earlier rules of the same kind that were not removed
+            if candidate < index and (
+                candidate <= barrier or candidate in removed_indexes
+            ):
+                continue
+            if rules[candidate][1].subsumes(rule):
+                removed_indexes.add(index)
+                removed.append((rule, rules[candidate][1]))
+                break
+        else:
+            last_kept_index_by_kind[rule.negated] = index
+
+    removed_lines = {rules[index][0] for index in removed_indexes}
+    minimized = "\n".join(
+        line
+        for line_number, line in enumerate(lines)
+        if line_number not in removed_lines
+    )
+    return MinimizationResult(minimized, len(rules), removed)
+
+
+class _OpaqueRule(Rule):
+    """A rule using an unsupported construct, which never subsumes another rule."""
+
+    def subsumes(self, other: Rule) -> bool:
+        return False
@@ -0,0 +1,205 @@
+import json
+from typing import Callable, Iterable, Iterator, Sequence
+
+from pygic.file import File, FileType
+from pygic.patterns import parse_rule
+from pygic.resources import TemplateDirectory, is_existing_entry
+from pygic.update import HEADER_REGEX
+
+
+class SourceLine:
+    """A line of a generated gitignore, with the template file and line it comes from.
+
+    Attributes:
+        text (str): The line.
+        section (str | None): The title of the section of the line (e.g. `Python Patch`),
+            or None if the line is before the first section.
+        file_name (str | None): The name of the template file of the section (e.g. `Python.patch`),
+            or None if the line is before the first section.
+        line_number (int | None): The number of the line in the template file, starting at 1,
+            or None if it is a section header or if it is unknown.
+        is_header (bool): If True, the line is a section header (e.g. `### Python Patch ###`).
+        is_rule (bool): If True, the line is a rule, i.e. neither a comment nor a blank line.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        section: str | None = None,
+        file_name: str | None = None,
+        line_number: int | None = None,
+        *,
+        is_header: bool = False,
+    ) -> None:
+        self.text = text
+        self.section = section
+        self.file_name = file_name
+        self.line_number = line_number
+        self.is_header = is_header
+        self.is_rule = not is_header and parse_rule(text) is not None
+
+    def __repr__(self) -> str:
+        return f"SourceLine({self.text!r}, {self.file_name!r}, {self.line_number!r})"
+
+
+Stage = Callable[[Iterable[SourceLine]], Iterator[SourceLine]]
+"""A step of the post-processing pipeline, transforming a stream of lines."""
+
+
+def get_section_file_name(title: str) -> str:
+    """Get the name of the template file of a section title (e.g. `Python.patch` for `Python Patch`)."""
+    for file_type in (FileType.PATCH, FileType.STACK):
+        suffix = f" {file_type.value.capitalize()}"
+        if title.endswith(suffix):
+            return f"{title[: -len(suffix)]}.{file_type.value}"
+    return f"{title}.{FileType.GITIGNORE.value}"
+
+
+def iter_source_lines(
+    content: str, directory: TemplateDirectory | None = None
+) -> Iterator[SourceLine]:
+    """Stream the lines of a gitignore created by `Gitignore.create`, with the template file of each line.
+
+    Args:
+        content (str): The content of the gitignore.
+        directory (TemplateDirectory | None): The template directory the gitignore was created from,
+            to find the number of each line in its template file. A header whose template file does not exist
+            in the directory is then a comment of the current section. Defaults to None, in which case
+            the line numbers are unknown.
+
+    Yields:
+        SourceLine: The lines of the gitignore.
+    """
+    section = file_name = None
+    # The lines of the template file of the current section, and the index of the next line to match
+    file_lines: list[str] = []
+    position = 0
+    for text in content.splitlines():
+        header = HEADER_REGEX.match(text)
+        if header is not None:
+            title = header["title"]
+            header_file_name = get_section_file_name(title)
+            if directory is None:
+                section, file_name = title, header_file_name
+                yield SourceLine(text, section, file_name, is_header=True)
+                continue
+            header_file = directory / header_file_name
+            if is_existing_entry(header_file):
+                section, file_name = title, header_file_name
+                file_lines = File(header_file).get_content().splitlines()
+                position = 0
+                yield SourceLine(text, section, file_name, is_header=True)
+                continue
+
+        # The duplicated lines are removed from the templates, so the line is the next one with the same text
+        line_number = None
+        for i in range(position, len(file_lines)):
+            if file_lines[i] == text:
+                line_number = i + 1
+                position = i + 1
+                break
+        yield SourceLine(text, section, file_name, line_number)
+
+
+def strip_blank_lines(lines: Iterable[SourceLine]) -> Iterator[SourceLine]:
+    """Remove the blank lines."""
+    return (line for line in lines if line.text.strip())
+
+
+def strip_comments(lines: Iterable[SourceLine]) -> Iterator[SourceLine]:
+    """Remove the comments, except the section headers."""
+    return (
+        line
+        for line in lines
+        if line.is_header or line.is_rule or not line.text.strip()
+    )
+
+
+def strip_headers(lines: Iterable[SourceLine]) -> Iterator[SourceLine]:
+    """Remove the section headers."""
+    return (line for line in lines if not line.is_header)
+
+
+def sort_rules(lines: Iterable[SourceLine]) -> Iterator[SourceLine]:
+    """Sort the rules alphabetically, without changing which paths are ignored.
+
+    Only the consecutive rules that are not negated are sorted together: the negated rules, comments and
+    blank lines stay in place, since a negated rule only re-includes the paths matched by the rules before it.
+    """
+    run: list[SourceLine] = []
+    for line in lines:
+        if line.is_rule and not line.text.startswith("!"):
+            run.append(line)
+            continue
+        yield from sorted(run, key=lambda line: line.text)
+        run.clear()
+        yield line
+    yield from sorted(run, key=lambda line: line.text)
+
+
+STAGES: dict[str, Stage] = {
+    "strip-blank": strip_blank_lines,
+    "strip-comments": strip_comments,
+    "strip-headers": strip_headers,
+    "sort": sort_rules,
+}
+"""The built-in stages of the post-processing pipeline, by name."""
+
+COMPACT_STAGES = ("strip-comments", "strip-headers", "strip-blank")
+"""The stages of the compact output, which only keeps the rules."""
+
+
+def run_pipeline(
+    lines: Iterable[SourceLine], stages: Sequence[str | Stage]
+) -> Iterator[SourceLine]:
+    """Apply stages, by name (see `STAGES`) or as functions, to a stream of lines, in order.
+
+    Raises:
+        KeyError: If a stage name is unknown.
+    """
+    iterator: Iterable[SourceLine] = lines
+    for stage in stages:
+        iterator = (STAGES[stage] if isinstance(stage, str) else stage)(iterator)
+    yield from iterator
+
+
+class SourceMap:
+    """A map from the rules of a post-processed gitignore to the template files and lines they come from.
+
+    Attributes:
+        entries (list[dict]): For each rule, its line number in the output (`line`), the rule (`rule`),
+            its section (`section`), its template file (`file`) and its line in the template file (`file_line`).
+    """
+
+    VERSION = 1
+    """The version of the format of the source map files."""
+
+    def __init__(self) -> None:
+        self.entries: list[dict] = []
+
+    def add(self, output_line_number: int, line: SourceLine) -> None:
+        """Add a line of the output, which is ignored if it is not a rule."""
+        if line.is_rule:
+            self.entries.append(
+                {
+                    "line": output_line_number,
+                    "rule": line.text,
+                    "section": line.section,
+                    "file": line.file_name,
+                    "file_line": line.line_number,
+                }
+            )
+
+    def to_json(self) -> str:
+        """Get the JSON of the source map, to write it next to the gitignore."""
+        return json.dumps({"version": self.VERSION, "rules": self.entries}, indent=2)
+
+
+def render_lines(
+    lines: Iterable[SourceLine], source_map: SourceMap | None = None
+) -> Iterator[str]:
+    """Stream the text of each line of the output with its line ending, adding its rules to a source map."""
+    for output_line_number, line in enumerate(lines, start=1):
+        if source_map is not None:
+            source_map.add(output_line_number, line)
+        yield f"{line.text}\n"
@@ -0,0 +1,90 @@
+import subprocess
+from pathlib import Path
+from typing import Iterable
+
+from pygic.patterns import Rule, RuleMatcher, parse_rule
+from pygic.update import HEADER_REGEX
+
+
+class IgnoredFile:
+    """A staged file that the gitignore would ignore.
+
+    Attributes:
+        path (str): The path of the file, relative to the root of the repository.
+        rule (Rule): The rule ignoring the file, or one of its parent directories.
+        section (str | None): The title of the section of the rule in the gitignore (e.g. `Python` or
+            `Python Patch`), i.e. the template responsible for ignoring the file, or None if the rule is not
+            in a section.
+    """
+
+    def __init__(self, path: str, rule: Rule, section: str | None) -> None:
+        self.path = path
+        self.rule = rule
+        self.section = section
+
+    def __repr__(self) -> str:
+        return f"IgnoredFile(path={self.path!r}, rule={self.rule.line!r}, section={self.section!r})"
+
+
+def get_section_rules(content: str) -> tuple[list[Rule], list[str | None]]:
+    """Get the rules of a gitignore, with the title of the section of each rule (see `pygic.update`).
+
+    Returns:
+        tuple[list[Rule], list[str | None]]: The rules, and the section title of each of them.
+    """
+    rules: list[Rule] = []
+    sections: list[str | None] = []
+    section = None
+    for line in content.splitlines():
+        header = HEADER_REGEX.match(line)
+        if header is not None:
+            section = header.group("title")
+            continue
+        rule = parse_rule(line)
+        if rule is not None:
+            rules.append(rule)
+            sections.append(section)
+    return rules, sections
+
+
+def find_ignored_files(content: str, paths: Iterable[str]) -> list[IgnoredFile]:
+    """Find the files ignored by a gitignore, in one batch (see `RuleMatcher`).
+
+    Args:
+        content (str): The content of the gitignore, at the root of the repository.
+        paths (Iterable[str]): The paths of the files, relative to the root of the repository.
+
+    Returns:
+        list[IgnoredFile]: The ignored files, in the order of `paths`.
+    """
+    rules, sections = get_section_rules(content)
+    matcher = RuleMatcher(rules)
+    section_by_rule = {id(rule): section for rule, section in zip(rules, sections)}
+    ignored_files = []
+    for path in paths:
+        rule = matcher.get_ignoring_rule(path)
+        if rule is not None:
+            ignored_files.append(IgnoredFile(path, rule, section_by_rule[id(rule)]))
+    return ignored_files
+
+
+def get_staged_files(repository: str | Path = ".") -> list[str]:
+    """Get the paths of the files added, copied, modified or renamed in the index of a git repository,
+    relative to the root of the repository.
+
+    Raises:
+        FileNotFoundError: If `git` is not installed.
+        ValueError: If the directory is not in a git repository.
+    """
+    result = subprocess.run(
+        ["git", "diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR"],
+        cwd=repository,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise ValueError(
+            f"Could not list the staged files of '{repository}': "
+            f"{result.stderr.decode(errors='replace').strip()}"
+        )
+    return [path for path in result.stdout.decode().split("\0") if path]
@@ -0,0 +1,106 @@
+import functools
+import gzip
+import json
+import logging
+from pathlib import Path
+
+from pygic.config import PACKAGE_DIR
+from pygic.resources import TemplateDirectory
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTED_TEMPLATES_FILE_NAME = "_precomputed.json.gz"
+"""The name of the precomputed templates file, generated in the `pygic` package when building the wheel
+(see `hatch_build.py`)."""
+
+PRECOMPUTED_TEMPLATES_FORMAT = 1
+"""The version of the format of the precomputed templates file, increased when the format changes."""
+
+
+class PrecomputedTemplates:
+    """The single-template gitignores and the order of a template directory, rendered ahead of time.
+
+    The renderings are fully determined by the template directory, so they are computed once when building
+    the wheel, and `Gitignore.create` only has to merge them.
+
+    Attributes:
+        gitignores (dict[str, str]): The output of `Gitignore.create_one_gitignore` for each lowercase template name.
+        order (dict[str, int]): The order of the templates, see `read_order_file`.
+    """
+
+    def __init__(self, gitignores: dict[str, str], order: dict[str, int]) -> None:
+        self.gitignores = gitignores
+        self.order = order
+
+    @classmethod
+    def from_directory(cls, directory: TemplateDirectory) -> "PrecomputedTemplates":
+        """Render every template of a template directory.
+
+        Every name accepted by `Gitignore.create_one_gitignore` is rendered, i.e. the lowercase name of
+        each template file before its first dot, including the names of patches without a `.gitignore` file.
+        """
+        from pygic.gitignore import (
+            Gitignore,
+            list_renderable_template_names,
+            read_order_file,
+        )
+
+        templates = Gitignore(directory=directory, ignore_num_files_check=True)
+        names = list_renderable_template_names(directory)
+        gitignores = {name: templates.create_one_gitignore(name) for name in names}
+        order = dict(read_order_file(directory / "order"))
+        return cls(gitignores, order)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the precomputed templates to compressed JSON.
+
+        The output is reproducible: it only depends on the precomputed templates.
+        """
+        data = {
+            "format": PRECOMPUTED_TEMPLATES_FORMAT,
+            "order": self.order,
+            "gitignores": self.gitignores,
+        }
+        content = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+        return gzip.compress(content, mtime=0)
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> "PrecomputedTemplates":
+        """Deserialize precomputed templates serialized with `to_bytes`.
+
+        Raises:
+            ValueError: If the content is not valid, or uses another format.
+        """
+        try:
+            data = json.loads(gzip.decompress(content))
+        except (OSError, EOFError, ValueError) as e:
+            raise ValueError(f"Invalid precomputed templates: {e}") from e
+        if data.get("format") != PRECOMPUTED_TEMPLATES_FORMAT:
+            raise ValueError(
+                f"Unsupported precomputed templates format: {data.get('format')}."
+            )
+        return cls(data["gitignores"], data["order"])
+
+
+def write_precomputed_templates(directory: TemplateDirectory, output: Path) -> None:
+    """Render every template of a template directory and write them to `output`."""
+    output.write_bytes(PrecomputedTemplates.from_directory(directory).to_bytes())
+
+
+@functools.lru_cache(maxsize=1)
+def get_precomputed_templates() -> PrecomputedTemplates | None:
+    """Get the precomputed renderings of the templates shipped with `pygic`.
+
+    They only exist in a built wheel, so None is returned when running from the sources,
+    or if they cannot be read.
+    """
+    if PACKAGE_DIR is None:
+        return None
+    path = PACKAGE_DIR / PRECOMPUTED_TEMPLATES_FILE_NAME
+    try:
+        return PrecomputedTemplates.from_bytes(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring the precomputed templates '{path}': {e}")
+        return None
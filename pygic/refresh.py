@@ -0,0 +1,239 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pygic.gitignore import (
+    CLONE_STAMP_FILE,
+    check_directory_existence_and_validity,
+    clone_toptal_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = 30 * 60
+"""The age in seconds after which a refresh lock is considered abandoned (e.g. the refresh process was killed)."""
+
+
+def get_clone_age(clone_root: Path) -> float | None:
+    """Get the age in seconds of a cloned toptal/gitignore repository.
+
+    The age is determined by the `CLONE_STAMP_FILE` touched after each clone, or by the `.git` directory
+    for repositories cloned before this file existed.
+
+    Args:
+        clone_root (Path): The directory of the cloned repository.
+
+    Returns:
+        float | None: The age of the clone, or None if it cannot be determined.
+    """
+    for path in (clone_root / CLONE_STAMP_FILE, clone_root / ".git"):
+        try:
+            return time.time() - path.stat().st_mtime
+        except OSError:
+            continue
+    return None
+
+
+def is_clone_stale(clone_root: Path, ttl: float) -> bool:
+    """Check if a cloned toptal/gitignore repository is older than `ttl` seconds,
+    or if its age cannot be determined."""
+    age = get_clone_age(clone_root)
+    return age is None or age > ttl
+
+
+def get_lock_path(clone_root: Path) -> Path:
+    """Get the path of the lock preventing concurrent refreshes of a cloned repository.
+
+    The lock is next to the clone rather than inside it, since the clone is replaced during a refresh.
+    """
+    return clone_root.parent / f".{clone_root.name}.refresh.lock"
+
+
+def get_log_path(clone_root: Path) -> Path:
+    """Get the path of the file the background refresh of a cloned repository writes its output to,
+    next to its lock."""
+    return clone_root.parent / f".{clone_root.name}.refresh.log"
+
+
+def pop_refresh_log(clone_root: Path) -> str | None:
+    """Get and remove the output of the last background refresh of a cloned repository.
+
+    The detached refresh process cannot report its failures, so they are written to a log file
+    (see `get_log_path`) and reported by the next run instead.
+
+    Returns:
+        str | None: The output of the last refresh, or None if it has no output (it succeeded)
+            or if a refresh is still in progress.
+    """
+    if get_lock_path(clone_root).exists():
+        return None
+    log_path = get_log_path(clone_root)
+    try:
+        output = log_path.read_text(errors="replace").strip()
+        log_path.unlink()
+    except OSError:
+        return None
+    return output or None
+
+
+def acquire_refresh_lock(clone_root: Path) -> bool:
+    """Try to acquire the refresh lock of a cloned repository, without blocking.
+
+    A lock older than `LOCK_TIMEOUT` is considered abandoned and is acquired again.
+
+    Returns:
+        bool: True if the lock was acquired, False if another refresh is in progress.
+    """
+    lock_path = get_lock_path(clone_root)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime <= LOCK_TIMEOUT:
+                    return False
+                logger.info(f"Removing the abandoned refresh lock: {lock_path}")
+                lock_path.unlink()
+            except FileNotFoundError:
+                # The lock was released in the meantime
+                pass
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def release_refresh_lock(clone_root: Path) -> None:
+    """Release the refresh lock of a cloned repository."""
+    get_lock_path(clone_root).unlink(missing_ok=True)
+
+
+def start_background_refresh(clone_root: Path) -> bool:
+    """Refresh a cloned toptal/gitignore repository in a detached process (see `refresh_clone`).
+
+    This function returns immediately, the current clone can be used while it is refreshed.
+    Nothing is done if another refresh of the same clone is in progress.
+    The warnings and errors of the refresh are written to a log file, see `pop_refresh_log`.
+
+    Args:
+        clone_root (Path): The directory of the cloned repository.
+
+    Returns:
+        bool: True if a refresh was started.
+    """
+    if not acquire_refresh_lock(clone_root):
+        logger.info(
+            "The cloned toptal/gitignore repository is already being refreshed."
+        )
+        return False
+
+    if sys.platform == "win32":
+        detach_kwargs = {
+            "creationflags": subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+        }
+    else:
+        detach_kwargs = {"start_new_session": True}
+
+    try:
+        # The lock is inherited by the refresh process, which releases it when done
+        with open(get_log_path(clone_root), "w") as log_file:
+            subprocess.Popen(
+                [sys.executable, "-m", "pygic.refresh", str(clone_root)],
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                close_fds=True,
+                **detach_kwargs,
+            )
+    except OSError as e:
+        release_refresh_lock(clone_root)
+        logger.warning(
+            f"Could not refresh the cloned repository in the background: {e}"
+        )
+        return False
+
+    return True
+
+
+def refresh_clone(clone_root: Path) -> None:
+    """Clone the toptal/gitignore repository again and replace `clone_root` with the new clone.
+
+    The repository is cloned next to `clone_root` and only replaces it once it is complete and valid,
+    so `clone_root` stays usable during the refresh and is left untouched if it fails.
+    The refresh lock is released at the end, whether the refresh succeeded or not.
+
+    Args:
+        clone_root (Path): The directory of the cloned repository.
+
+    Raises:
+        ModuleNotFoundError: If neither GitPython with `git` nor Dulwich is installed.
+        FileNotFoundError: If the `order` file does not exist in the new clone.
+        ValueError: If the new clone does not contain valid templates.
+    """
+    from pygic.gitignore import TEMPLATE_STORE_DIR
+    from pygic.index import save_completion_names
+    from pygic.store import save_clone_snapshot
+
+    new_clone = Path(
+        tempfile.mkdtemp(prefix=f".{clone_root.name}.new-", dir=clone_root.parent)
+    )
+    old_clone = clone_root.parent / f".{clone_root.name}.old-{os.getpid()}"
+    moved_old_clone = False
+    try:
+        clone_toptal_repository(new_clone)
+        check_directory_existence_and_validity(new_clone / "templates")
+        (new_clone / CLONE_STAMP_FILE).touch()
+
+        # Swap the clones, the window where `clone_root` does not exist is limited to two renames
+        if clone_root.exists():
+            clone_root.rename(old_clone)
+            moved_old_clone = True
+        new_clone.rename(clone_root)
+    except BaseException:
+        if moved_old_clone:
+            # Put the current clone back in place
+            old_clone.rename(clone_root)
+        shutil.rmtree(new_clone, ignore_errors=True)
+        raise
+    finally:
+        release_refresh_lock(clone_root)
+
+    shutil.rmtree(old_clone, ignore_errors=True)
+    logger.info(f"The cloned toptal/gitignore repository was refreshed: {clone_root}")
+
+    if TEMPLATE_STORE_DIR is not None:
+        save_clone_snapshot(clone_root / "templates", TEMPLATE_STORE_DIR)
+    save_completion_names(clone_root / "templates")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the background refresh process: `python -m pygic.refresh CLONE_ROOT`.
+
+    Its output is written to the refresh log by `start_background_refresh`.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python -m pygic.refresh CLONE_ROOT", file=sys.stderr)
+        return 2
+    try:
+        refresh_clone(Path(argv[0]))
+    except Exception:
+        logger.exception("Failed to refresh the cloned toptal/gitignore repository.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # Only the warnings and errors are logged, so the refresh log is empty if the refresh succeeded
+    logging.basicConfig(
+        level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    sys.exit(main())
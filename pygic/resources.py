@@ -0,0 +1,234 @@
+import functools
+import io
+import os
+import zipfile
+from pathlib import Path
+from typing import Iterator
+
+try:
+    from importlib.resources.abc import Traversable
+except ModuleNotFoundError:  # Python 3.10
+    from importlib.abc import Traversable
+
+TemplateDirectory = Path | Traversable
+"""A directory of templates: a regular directory, or a directory inside a zip archive
+(e.g. a zipped wheel or a zipapp, see `open_template_directory`)."""
+
+
+class ZipIndex:
+    """The central directory of a zip archive, read once when the archive is opened.
+
+    The archive is kept open, so reading an entry only seeks into the archive file,
+    and looking up or listing entries does not read anything.
+
+    Attributes:
+        archive (Path): The path to the zip archive.
+        zip_file (zipfile.ZipFile): The opened zip archive.
+        files (dict[str, zipfile.ZipInfo]): The file entries, by path inside the archive.
+        children (dict[str, dict[str, None]]): The paths of the entries of each directory
+            (including the implicit ones), by path inside the archive. The root directory is `""`.
+    """
+
+    def __init__(self, archive: Path) -> None:
+        self.archive = archive
+        self.zip_file = zipfile.ZipFile(archive)
+        self.files: dict[str, zipfile.ZipInfo] = {}
+        self.children: dict[str, dict[str, None]] = {"": {}}
+
+        for info in self.zip_file.infolist():
+            path = info.filename.rstrip("/")
+            if info.is_dir():
+                self.children.setdefault(path, {})
+            else:
+                self.files[path] = info
+            # Register the entry in its parent directories, which may not have their own entries
+            while path:
+                parent = path.rpartition("/")[0]
+                siblings = self.children.setdefault(parent, {})
+                if path in siblings:
+                    break
+                siblings[path] = None
+                path = parent
+
+    def read(self, path: str) -> bytes:
+        """Read the content of a file entry.
+
+        Raises:
+            FileNotFoundError: If the entry is not a file of the archive.
+        """
+        try:
+            info = self.files[path]
+        except KeyError:
+            raise FileNotFoundError(
+                f"File '{path}' does not exist in '{self.archive}'."
+            ) from None
+        return self.zip_file.read(info)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_zip_index(archive: Path, mtime_ns: int, size: int) -> ZipIndex:
+    # The modification time and the size are only part of the cache key,
+    # so that an archive replaced on disk is indexed again
+    return ZipIndex(archive)
+
+
+def get_zip_index(archive: str | Path) -> ZipIndex:
+    """Get the index of a zip archive, cached as long as the archive is not modified.
+
+    Raises:
+        FileNotFoundError: If the archive does not exist.
+        zipfile.BadZipFile: If the file is not a zip archive.
+    """
+    archive = Path(archive).resolve()
+    stat = archive.stat()
+    return _get_zip_index(archive, stat.st_mtime_ns, stat.st_size)
+
+
+class ZipTraversable(Traversable):
+    """An entry of a zip archive, readable without extracting the archive.
+
+    All the entries of an archive share the same `ZipIndex`.
+
+    Attributes:
+        index (ZipIndex): The index of the archive.
+        at (str): The path of the entry inside the archive, `""` for the root of the archive.
+    """
+
+    def __init__(self, index: ZipIndex, at: str = "") -> None:
+        self.index = index
+        self.at = at
+
+    @property
+    def name(self) -> str:
+        return self.at.rpartition("/")[2] or self.index.archive.name
+
+    def exists(self) -> bool:
+        return self.is_dir() or self.is_file()
+
+    def is_dir(self) -> bool:
+        return self.at in self.index.children
+
+    def is_file(self) -> bool:
+        return self.at in self.index.files
+
+    def iterdir(self) -> Iterator["ZipTraversable"]:
+        if not self.is_dir():
+            raise NotADirectoryError(f"'{self}' is not a directory.")
+        for path in self.index.children[self.at]:
+            yield type(self)(self.index, path)
+
+    def joinpath(self, *descendants: str) -> "ZipTraversable":
+        parts = [part for part in self.at.split("/") if part]
+        for descendant in descendants:
+            for part in str(descendant).replace("\\", "/").split("/"):
+                if part == "..":
+                    if parts:
+                        parts.pop()
+                elif part and part != ".":
+                    parts.append(part)
+        return type(self)(self.index, "/".join(parts))
+
+    def open(self, mode: str = "r", *args, **kwargs) -> io.IOBase:
+        if mode not in ("r", "rb"):
+            raise ValueError(f"'{self}' can only be read, not opened in mode '{mode}'.")
+        stream = io.BytesIO(self.index.read(self.at))
+        if mode == "rb":
+            return stream
+        # Same newline translation and default encoding as the built-in `open`
+        return io.TextIOWrapper(stream, *args, **kwargs)
+
+    def __str__(self) -> str:
+        return str(self.index.archive / self.at) if self.at else str(self.index.archive)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.index.archive)!r}, {self.at!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ZipTraversable):
+            return NotImplemented
+        return (self.index.archive, self.at) == (other.index.archive, other.at)
+
+    def __hash__(self) -> int:
+        return hash((self.index.archive, self.at))
+
+    def __reduce__(self):
+        # The opened archive cannot be pickled (e.g. to send templates to worker processes),
+        # so the archive is indexed again when unpickled
+        return open_zip_directory, (self.index.archive, self.at)
+
+
+def open_zip_directory(archive: str | Path, at: str = "") -> ZipTraversable:
+    """Open a directory inside a zip archive.
+
+    Args:
+        archive (str | Path): The path to the zip archive.
+        at (str): The path of the directory inside the archive. Defaults to the root of the archive.
+    """
+    return ZipTraversable(get_zip_index(archive)).joinpath(at)
+
+
+def open_template_directory(
+    directory: str | os.PathLike | Traversable,
+) -> TemplateDirectory:
+    """Open a directory of templates, which can be inside a zip archive.
+
+    A path going through a zip archive (e.g. `pygic.whl/pygic/templates` or `pygic.pyz/pygic/templates`)
+    is opened inside the archive. For a path to the archive itself, the templates are looked for at the root
+    of the archive, then in `templates`, then in `pygic/templates`.
+    Any other path is returned as a `Path`, even if it does not exist.
+
+    Args:
+        directory (str | os.PathLike | Traversable): The path to the directory,
+            or a directory returned by `importlib.resources.files`.
+
+    Returns:
+        TemplateDirectory: A `Path` for a regular directory, a `Traversable` otherwise.
+    """
+    if isinstance(directory, zipfile.Path):
+        # E.g. `importlib.resources.files(pygic)` when `pygic` is imported from a zip archive
+        return open_zip_directory(directory.root.filename, directory.at)
+    if not isinstance(directory, (str, os.PathLike)):
+        return directory
+
+    path = Path(directory)
+    # Find the first existing path among the path and its parents
+    for archive in (path, *path.parents):
+        if archive.exists():
+            break
+    else:
+        return path
+    if not archive.is_file() or not zipfile.is_zipfile(archive):
+        return path
+
+    root = open_zip_directory(archive, path.relative_to(archive).as_posix())
+    if archive == path:
+        for candidate in ("templates", "pygic/templates"):
+            if (root / "order").is_file():
+                break
+            if (root / candidate).is_dir():
+                root = open_zip_directory(archive, candidate)
+    return root
+
+
+def is_existing_entry(entry: TemplateDirectory) -> bool:
+    """Check if a file or a directory exists, `Traversable` not providing `exists`."""
+    if isinstance(entry, (Path, ZipTraversable)):
+        return entry.exists()
+    return entry.is_dir() or entry.is_file()
+
+
+def iter_template_files(directory: TemplateDirectory) -> Iterator[TemplateDirectory]:
+    """Iterate over the entries of a directory with an extension, like `directory.glob("*.*")`."""
+    return (entry for entry in directory.iterdir() if "." in entry.name)
+
+
+def split_file_name(name: str) -> tuple[str, str]:
+    """Split a file name into its stem and its extension without the dot, like `Path.stem` and `Path.suffix`.
+
+    Example:
+        `ReactNative.Linux.stack` is split into `ReactNative.Linux` and `stack`.
+    """
+    stem, dot, suffix = name.rpartition(".")
+    if not dot or not stem:
+        return name, ""
+    return stem, suffix
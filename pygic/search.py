@@ -0,0 +1,216 @@
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Sequence, TextIO
+
+from pzp import CustomAction, Finder  # type: ignore
+from pzp.exceptions import AbortAction, AcceptAction  # type: ignore
+from pzp.matcher import ExtendedMatcher, Matcher  # type: ignore
+from pzp.screen import Screen  # type: ignore
+
+if TYPE_CHECKING:
+    from pygic.gitignore import Gitignore
+
+# The characters after which a longer pattern can match more names than a shorter one:
+# `!` excludes names, `$` anchors the end of a term, `'` and `\` change how the pattern is split
+NON_NARROWING_CHARACTERS = frozenset("!$'\\")
+
+NL = "\n"
+
+TOGGLE_KEY = "tab"
+TOGGLE_PREVIEW_KEY = "ctrl-t"
+HELP_LINE = (
+    "TAB: select/unselect, ENTER: generate, CTRL-T: switch preview, "
+    "ESC/CTRL-C/CTRL-G/CTRL-Q: stop searching"
+)
+
+
+class IncrementalMatcher(Matcher, option="pygic-incremental"):
+    """The extended matcher of `pzp` (see `pzp.matcher.ExtendedMatcher`), which only filters the names
+    that matched the previous pattern when the new pattern narrows it (e.g. `pyt` after `py`),
+    and does not filter anything when the pattern did not change (e.g. when moving the selection).
+    """
+
+    def __init__(self) -> None:
+        self.matcher = ExtendedMatcher()
+        self.pattern: str | None = None
+        self.candidates: Sequence[Any] = []
+        self.matches: Sequence[Any] = []
+
+    def filter(
+        self,
+        pattern: str,
+        candidates: Sequence[Any],
+        format_fn: Callable[[Any], str] = lambda x: str(x),
+    ) -> Sequence[Any]:
+        if candidates is not self.candidates or self.pattern is None:
+            searched = candidates
+        elif pattern == self.pattern:
+            return self.matches
+        elif pattern.startswith(self.pattern) and not (
+            NON_NARROWING_CHARACTERS & set(pattern)
+        ):
+            searched = self.matches
+        else:
+            searched = candidates
+        # The names are displayed with a selection mark (`format_fn`), but matched without it
+        self.matches = self.matcher.filter(pattern, searched)
+        self.pattern = pattern
+        self.candidates = candidates
+        return self.matches
+
+
+class TemplatePreviews:
+    """The renderings of the templates shown while searching, rendered on first display and then cached.
+
+    Attributes:
+        templates (Gitignore): The templates.
+        gitignores (dict[str, str]): The rendering of each displayed template, by name.
+        merged_gitignores (dict[tuple[str, ...], str]): The merged gitignore of each displayed selection.
+    """
+
+    def __init__(self, templates: "Gitignore") -> None:
+        self.templates = templates
+        self.gitignores: dict[str, str] = {}
+        self.merged_gitignores: dict[tuple[str, ...], str] = {}
+
+    def get(self, name: str) -> str:
+        """Get the gitignore of a single template, see `Gitignore.create_one_gitignore`."""
+        if name not in self.gitignores:
+            self.gitignores[name] = self.templates.create_one_gitignore(name)
+        return self.gitignores[name]
+
+    def get_merged(self, names: Sequence[str]) -> str:
+        """Get the gitignore of several templates, see `Gitignore.create`."""
+        key = tuple(names)
+        if key not in self.merged_gitignores:
+            self.merged_gitignores[key] = self.templates.create(*names)
+        return self.merged_gitignores[key]
+
+
+def fit_lines(content: str, height: int, width: int) -> list[str]:
+    """Get exactly `height` lines of a content, truncated to `width` characters."""
+    lines = [
+        line.replace("\t", "    ")[:width] for line in content.split("\n")[:height]
+    ]
+    return lines + [""] * (height - len(lines))
+
+
+class SearchSession:
+    """An interactive search of templates in a single `pzp` prompt, where several templates can be selected,
+    with a preview of the highlighted template or of the merged gitignore of the selected ones.
+
+    Attributes:
+        names (list[str]): The names of the templates that can be selected.
+        previews (TemplatePreviews): The renderings of the previewed templates.
+        selected_names (list[str]): The selected names, in the order of their selection.
+        preview_merged (bool): Whether the preview shows the merged gitignore of the selected templates,
+            instead of the highlighted template.
+        height (int): The height of the list of names.
+        preview_height (int): The height of the preview.
+    """
+
+    def __init__(
+        self,
+        templates: "Gitignore",
+        height: int = 12,
+        preview_height: int = 12,
+    ) -> None:
+        self.names = templates.list_template_names()
+        self.previews = TemplatePreviews(templates)
+        self.selected_names: list[str] = []
+        self.preview_merged = False
+        self.height = height
+        self.preview_height = preview_height
+
+    def toggle(self, name: str | None) -> None:
+        """Select a template, or unselect it if it is already selected."""
+        if name is None:
+            return
+        if name in self.selected_names:
+            self.selected_names.remove(name)
+        else:
+            self.selected_names.append(name)
+
+    def format_name(self, name: str) -> str:
+        return f"* {name}" if name in self.selected_names else f"  {name}"
+
+    def get_header(self, highlighted: str | None, width: int) -> str:
+        """Get the header of the prompt: the keys, the selected names and the preview.
+
+        It always has the same number of lines, since `pzp` computes the layout of the screen from it.
+        """
+        selected = ", ".join(self.selected_names) or "none"
+        if self.preview_merged:
+            title = "Merged gitignore"
+            content = (
+                self.previews.get_merged(self.selected_names)
+                if self.selected_names
+                else ""
+            )
+        elif highlighted is not None:
+            title = highlighted
+            content = self.previews.get(highlighted)
+        else:
+            title = "No matching template"
+            content = ""
+        title = f"{title} ({content.count(NL)} lines)"
+        lines = [
+            HELP_LINE,
+            f"Selected ({len(self.selected_names)}): {selected}",
+            f"--- {title} ---",
+            *fit_lines(content, self.preview_height, width),
+            "---",
+        ]
+        return "\n".join(line[:width] for line in lines)
+
+    def run(self, output_stream: TextIO = sys.stderr) -> list[str]:
+        """Run the search and get the selected names.
+
+        ENTER stops the search and selects the highlighted template if no template was selected yet,
+        and ESC, CTRL-C, CTRL-G or CTRL-Q stops the search.
+        """
+        finder = Finder(
+            candidates=self.names,
+            fullscreen=False,
+            height=self.height + self.preview_height + 6,
+            format_fn=self.format_name,
+            layout="reverse-list",
+            header_str=self.get_header(
+                self.names[0] if self.names else None,
+                Screen.get_terminal_size().columns - 1,
+            ),
+            keys_binding={
+                "toggle": [TOGGLE_KEY],
+                "toggle-preview": [TOGGLE_PREVIEW_KEY],
+            },
+            matcher=IncrementalMatcher(),
+            output_stream=output_stream,
+        )
+        try:
+            try:
+                finder.setup()
+                while True:
+                    try:
+                        finder.process_key()
+                    except CustomAction as action:
+                        if action.action == "toggle":
+                            self.toggle(action.selected_item)
+                        elif action.action == "toggle-preview":
+                            self.preview_merged = not self.preview_merged
+                    finder.apply_filter()
+                    finder.config.header_str = self.get_header(
+                        finder.prepare_result(), finder.layout.screen.width - 1
+                    )
+                    finder.update_screen()
+            finally:
+                finder.layout.cleanup()
+        except AcceptAction as action:
+            if not self.selected_names and action.selected_item is not None:
+                self.selected_names.append(action.selected_item)
+        except AbortAction:
+            pass
+        return self.selected_names
+
+
+def search_template_names(templates: "Gitignore") -> list[str]:
+    """Search for templates interactively and return the selected names, see `SearchSession`."""
+    return SearchSession(templates).run()
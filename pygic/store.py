@@ -0,0 +1,292 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_NAME_REGEX = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+"""The regex that snapshot names must match, so that they can safely be used as file names."""
+
+
+def hash_content(content: bytes) -> str:
+    """Get the SHA-256 hex digest used to address a content in the store."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class TemplateStore:
+    """A content-addressed store of template directories.
+
+    Each template file is stored once as a blob named after the hash of its content,
+    so identical files (e.g. the symlinked templates of the toptal/gitignore repository)
+    and files unchanged between two versions of the templates share the same blob.
+
+    A snapshot maps the file names of a template directory to the hashes of their content.
+    It can be opened as a regular template directory through `snapshot_directory`,
+    which only contains symlinks to the blobs (or hard links if symlinks are not supported).
+
+    The store is organized as follows:
+    - `objects/{hash[:2]}/{hash[2:]}`: The blobs.
+    - `snapshots/{name}.json`: The snapshots, with their creation time and their files.
+    - `views/{name}/`: The template directories of the snapshots, created on demand.
+
+    Attributes:
+        root (Path): The root directory of the store.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    @property
+    def objects_directory(self) -> Path:
+        return self.root / "objects"
+
+    @property
+    def snapshots_directory(self) -> Path:
+        return self.root / "snapshots"
+
+    @property
+    def views_directory(self) -> Path:
+        return self.root / "views"
+
+    def blob_path(self, blob_hash: str) -> Path:
+        """Get the path of the blob with the given hash."""
+        return self.objects_directory / blob_hash[:2] / blob_hash[2:]
+
+    def add_blob(self, content: bytes) -> str:
+        """Add a content to the store if it is not already in it.
+
+        Args:
+            content (bytes): The content to add.
+
+        Returns:
+            str: The hash of the content.
+        """
+        blob_hash = hash_content(content)
+        blob_path = self.blob_path(blob_hash)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that a blob is never partially written
+            with tempfile.NamedTemporaryFile(dir=blob_path.parent, delete=False) as f:
+                f.write(content)
+            os.replace(f.name, blob_path)
+        return blob_hash
+
+    def import_directory(
+        self, directory: str | Path, name: str, *, overwrite: bool = False
+    ) -> dict[str, str]:
+        """Create a snapshot from a template directory.
+
+        Symlinks are followed, so a symlinked template is stored as its target's blob.
+
+        Args:
+            directory (str | Path): The template directory to import.
+            name (str): The name of the snapshot, e.g. the commit hash of the toptal/gitignore repository.
+            overwrite (bool): If True, an existing snapshot with the same name is replaced. Defaults to False.
+
+        Returns:
+            dict[str, str]: The files of the snapshot, mapping the file names to the hashes of their content.
+
+        Raises:
+            ValueError: If the name is not a valid snapshot name.
+            FileExistsError: If a snapshot with the same name already exists and `overwrite` is False.
+            NotADirectoryError: If `directory` is not a directory.
+        """
+        if SNAPSHOT_NAME_REGEX.match(name) is None:
+            raise ValueError(
+                f"Invalid snapshot name '{name}'. "
+                "It should only contain letters, digits, dots, dashes and underscores."
+            )
+        snapshot_path = self.snapshots_directory / f"{name}.json"
+        if snapshot_path.exists() and not overwrite:
+            raise FileExistsError(f"Snapshot '{name}' already exists.")
+
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise NotADirectoryError(f"'{directory}' is not a directory.")
+
+        files: dict[str, str] = {}
+        for file_path in sorted(directory.iterdir()):
+            if file_path.is_file():
+                files[file_path.name] = self.add_blob(file_path.read_bytes())
+
+        self.snapshots_directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.snapshots_directory, delete=False
+        ) as f:
+            json.dump({"created": time.time(), "files": files}, f, indent=2)
+        os.replace(f.name, snapshot_path)
+
+        # Remove an outdated view of the snapshot, if any
+        shutil.rmtree(self.views_directory / name, ignore_errors=True)
+
+        logger.info(
+            f"Snapshot '{name}' created with {len(files)} files from '{directory}'."
+        )
+        return files
+
+    def list_snapshots(self) -> list[str]:
+        """List the names of the snapshots, from the oldest to the most recent."""
+        snapshots = []
+        for snapshot_path in self.snapshots_directory.glob("*.json"):
+            with open(snapshot_path, "r") as f:
+                snapshots.append((json.load(f)["created"], snapshot_path.stem))
+        return [name for _, name in sorted(snapshots)]
+
+    def resolve_snapshot_name(self, name: str) -> str:
+        """Resolve a snapshot name, which can be a unique prefix of an existing snapshot name
+        (e.g. an abbreviated commit hash), or `latest` for the most recent snapshot.
+
+        Raises:
+            FileNotFoundError: If no snapshot matches the name.
+            ValueError: If several snapshots match the name.
+        """
+        if (self.snapshots_directory / f"{name}.json").exists():
+            return name
+        snapshots = self.list_snapshots()
+        if name == "latest" and snapshots:
+            return snapshots[-1]
+        matches = [snapshot for snapshot in snapshots if snapshot.startswith(name)]
+        if not matches:
+            raise FileNotFoundError(f"No snapshot found for '{name}'.")
+        if len(matches) > 1:
+            raise ValueError(
+                f"Several snapshots match '{name}': {', '.join(sorted(matches))}."
+            )
+        return matches[0]
+
+    def get_snapshot(self, name: str) -> dict[str, str]:
+        """Get the files of a snapshot, mapping the file names to the hashes of their content.
+
+        Raises:
+            FileNotFoundError: If no snapshot matches the name.
+            ValueError: If several snapshots match the name.
+        """
+        name = self.resolve_snapshot_name(name)
+        with open(self.snapshots_directory / f"{name}.json", "r") as f:
+            return json.load(f)["files"]
+
+    def snapshot_directory(self, name: str) -> Path:
+        """Get a template directory with the files of a snapshot, usable by the `Gitignore` class.
+
+        The directory only contains links to the blobs and is created the first time it is requested.
+
+        Raises:
+            FileNotFoundError: If no snapshot matches the name.
+            ValueError: If several snapshots match the name.
+        """
+        name = self.resolve_snapshot_name(name)
+        view = self.views_directory / name
+        if view.exists():
+            return view
+
+        files = self.get_snapshot(name)
+        # Build the view in a temporary directory first so that a view is never partially built
+        self.views_directory.mkdir(parents=True, exist_ok=True)
+        tmp_view = Path(tempfile.mkdtemp(dir=self.views_directory))
+        for file_name, blob_hash in files.items():
+            blob_path = self.blob_path(blob_hash)
+            try:
+                (tmp_view / file_name).symlink_to(blob_path)
+            except OSError:
+                # Symlinks may require privileges, e.g. on Windows
+                os.link(blob_path, tmp_view / file_name)
+        try:
+            tmp_view.rename(view)
+        except OSError:
+            # The view was built concurrently by another process
+            shutil.rmtree(tmp_view)
+        return view
+
+    def remove_snapshot(self, name: str) -> None:
+        """Remove a snapshot and its view. Its blobs are only removed by `garbage_collect`.
+
+        Raises:
+            FileNotFoundError: If the snapshot does not exist.
+        """
+        snapshot_path = self.snapshots_directory / f"{name}.json"
+        if not snapshot_path.exists():
+            raise FileNotFoundError(f"Snapshot '{name}' does not exist.")
+        snapshot_path.unlink()
+        shutil.rmtree(self.views_directory / name, ignore_errors=True)
+
+    def garbage_collect(self) -> int:
+        """Remove the blobs that are not used by any snapshot.
+
+        Returns:
+            int: The number of removed blobs.
+        """
+        used_hashes = {
+            blob_hash
+            for name in self.list_snapshots()
+            for blob_hash in self.get_snapshot(name).values()
+        }
+        num_removed = 0
+        for blob_path in self.objects_directory.glob("*/*"):
+            if blob_path.parent.name + blob_path.name not in used_hashes:
+                blob_path.unlink()
+                num_removed += 1
+        return num_removed
+
+
+def get_head_commit(repository: str | Path) -> str | None:
+    """Get the hash of the commit checked out in a git repository, without requiring `git`.
+
+    Args:
+        repository (str | Path): The path to the repository (the parent of the `.git` directory).
+
+    Returns:
+        str | None: The hash of the commit, or None if it cannot be determined.
+    """
+    git_dir = Path(repository) / ".git"
+    head_path = git_dir / "HEAD"
+    if not head_path.exists():
+        return None
+
+    head = head_path.read_text().strip()
+    if not head.startswith("ref: "):
+        # Detached HEAD
+        return head
+
+    ref = head[len("ref: ") :]
+    ref_path = git_dir / ref
+    if ref_path.exists():
+        return ref_path.read_text().strip()
+
+    packed_refs_path = git_dir / "packed-refs"
+    if packed_refs_path.exists():
+        for line in packed_refs_path.read_text().splitlines():
+            commit, _, packed_ref = line.partition(" ")
+            if packed_ref == ref:
+                return commit
+    return None
+
+
+def save_clone_snapshot(templates_directory: Path, store_directory: str | Path) -> None:
+    """Save a snapshot of the templates of a cloned toptal/gitignore repository,
+    named after the commit hash of the clone, if it is not already saved.
+
+    Failing to save the snapshot is not fatal, since the cloned templates can still be used,
+    so errors are only logged.
+
+    Args:
+        templates_directory (Path): The `templates` directory of the cloned repository.
+        store_directory (str | Path): The root directory of the store.
+    """
+    try:
+        commit = get_head_commit(templates_directory.parent)
+        if commit is None:
+            logger.warning(
+                "Could not determine the commit of the cloned repository, no snapshot was saved."
+            )
+            return
+        store = TemplateStore(store_directory)
+        if commit not in store.list_snapshots():
+            store.import_directory(templates_directory, commit)
+    except OSError as e:
+        logger.warning(f"Could not save a snapshot of the cloned templates: {e}")
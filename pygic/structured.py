@@ -0,0 +1,143 @@
+import hashlib
+from typing import Iterable, Sequence
+
+from pygic.lines import LineTable
+
+
+class GitignoreSection:
+    """A section of a created gitignore: the content of one template file, after removing the duplicated lines.
+
+    Attributes:
+        template (str): The lowercase name of the template of the section (e.g. `reactnative`).
+        title (str | None): The title of the section (e.g. `ReactNative.Linux Stack`), or None for the lines
+            of a template before its first section header.
+        file_name (str | None): The name of the template file of the section (e.g. `ReactNative.Linux.stack`),
+            or None for the lines of a template before its first section header.
+        lines (list[str]): The lines of the section kept in the gitignore, without the header.
+        rules (list[str]): The rules of the section kept in the gitignore, i.e. its lines that are neither
+            comments nor blank.
+    """
+
+    def __init__(self, template: str, title: str | None, file_name: str | None) -> None:
+        self.template = template
+        self.title = title
+        self.file_name = file_name
+        self.lines: list[str] = []
+        self.rules: list[str] = []
+
+    def to_dict(self) -> dict:
+        return {
+            "template": self.template,
+            "title": self.title,
+            "file": self.file_name,
+            "rules": self.rules,
+        }
+
+
+class DroppedLine:
+    """A duplicated line removed from a section, since a previous section already contains it.
+
+    Attributes:
+        line (str): The removed line.
+        section (GitignoreSection): The section the line was removed from.
+        kept_in (GitignoreSection): The section keeping the first occurrence of the line.
+    """
+
+    def __init__(
+        self, line: str, section: GitignoreSection, kept_in: GitignoreSection
+    ) -> None:
+        self.line = line
+        self.section = section
+        self.kept_in = kept_in
+
+    def to_dict(self) -> dict:
+        return {
+            "line": self.line,
+            "file": self.section.file_name,
+            "kept_in": self.kept_in.file_name,
+        }
+
+
+class StructuredGitignore:
+    """A gitignore created from templates, with the section and the template file of each of its lines.
+
+    Attributes:
+        templates (list[str]): The lowercase names of the templates, in the order of their sections.
+        sections (list[GitignoreSection]): The sections, in the order of the gitignore.
+        dropped (list[DroppedLine]): The duplicated lines removed when merging the templates.
+        content (str): The content of the gitignore, the same as `Gitignore.create`.
+    """
+
+    def __init__(
+        self,
+        templates: list[str],
+        sections: list[GitignoreSection],
+        dropped: list[DroppedLine],
+        content: str,
+    ) -> None:
+        self.templates = templates
+        self.sections = sections
+        self.dropped = dropped
+        self.content = content
+
+    @property
+    def content_hash(self) -> str:
+        """The SHA-256 of the content, to detect that a gitignore changed without comparing it."""
+        return hashlib.sha256(self.content.encode()).hexdigest()
+
+    def to_dict(self) -> dict:
+        return {
+            "templates": self.templates,
+            "content_hash": self.content_hash,
+            "sections": [section.to_dict() for section in self.sections],
+            "dropped_duplicates": [dropped.to_dict() for dropped in self.dropped],
+            "content": self.content,
+        }
+
+
+def merge_sections(
+    line_table: LineTable,
+    pieces: Iterable[tuple[str, Sequence[int], dict[str, str]]],
+) -> StructuredGitignore:
+    """Merge the gitignores of templates like `LineTable.merge`, keeping track of the section of each line.
+
+    Args:
+        line_table (LineTable): The line table of the IDs of the lines.
+        pieces (Iterable[tuple[str, Sequence[int], dict[str, str]]]): For each template, in order,
+            its lowercase name, the IDs of the lines of its gitignore, and the name of the template file
+            of each of its section headers (e.g. `Python.patch` for `### Python Patch ###`).
+
+    Returns:
+        StructuredGitignore: The merged gitignore.
+    """
+    lines, keys = line_table.lines, line_table.keys
+    kept_in: dict[int, GitignoreSection] = {}
+    templates: list[str] = []
+    sections: list[GitignoreSection] = []
+    dropped: list[DroppedLine] = []
+    result: list[str] = []
+    for template, line_ids, header_file_names in pieces:
+        templates.append(template)
+        section = None
+        for line_id in line_ids:
+            line = lines[line_id]
+            file_name = header_file_names.get(line)
+            if file_name is not None:
+                # The header is a comment, so it is never removed
+                section = GitignoreSection(template, line[4:-4], file_name)
+                sections.append(section)
+                result.append(line)
+                continue
+            if section is None:
+                section = GitignoreSection(template, None, None)
+                sections.append(section)
+            key = keys[line_id]
+            if key >= 0:
+                if key in kept_in:
+                    dropped.append(DroppedLine(line, section, kept_in[key]))
+                    continue
+                kept_in[key] = section
+                section.rules.append(line)
+            section.lines.append(line)
+            result.append(line)
+    return StructuredGitignore(templates, sections, dropped, "\n".join(result))
@@ -0,0 +1,204 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Iterable
+
+from pygic.gitignore import Gitignore
+from pygic.update import update_gitignore_file
+
+logger = logging.getLogger(__name__)
+
+
+class SyncStatus(str, Enum):
+    """Enum to represent the outcome of the synchronization of a repository."""
+
+    UNCHANGED = "unchanged"
+    """The `.gitignore` of the repository was already up to date."""
+
+    CHANGED = "changed"
+    """The `.gitignore` of the repository was written (or would be, in check mode)."""
+
+    ERROR = "error"
+    """The synchronization of the repository failed, the `.gitignore` was not written."""
+
+
+class SyncResult:
+    """The result of the synchronization of a repository.
+
+    Attributes:
+        path (Path): The path to the `.gitignore` file of the repository.
+        status (SyncStatus): The outcome of the synchronization.
+        message (str): The changed sections, or the error message if the synchronization failed.
+    """
+
+    def __init__(self, path: Path, status: SyncStatus, message: str = "") -> None:
+        self.path = path
+        self.status = status
+        self.message = message
+
+    def __repr__(self) -> str:
+        return f"SyncResult(path={str(self.path)!r}, status={self.status.value!r}, message={self.message!r})"
+
+
+def read_manifest(manifest: str | Path) -> list[tuple[Path, list[str]]]:
+    """Read a manifest listing repositories and their template names.
+
+    Each line of the manifest contains the path to a repository, followed by the names of its templates,
+    separated by whitespace. If no name is given, the existing pygic sections of the repository's `.gitignore`
+    are updated instead (see `pygic.update.update_gitignore`).
+    Relative paths are relative to the directory of the manifest. Empty lines and comments are ignored.
+
+    Example:
+        ```
+        # Generated from the given names
+        backend python docker
+        frontend node react
+        # Only update the existing pygic sections
+        /srv/repos/legacy
+        ```
+
+    Args:
+        manifest (str | Path): The path to the manifest.
+
+    Returns:
+        list[tuple[Path, list[str]]]: The repositories paths with their template names.
+
+    Raises:
+        FileNotFoundError: If the manifest does not exist.
+    """
+    manifest = Path(manifest)
+    if not manifest.exists():
+        raise FileNotFoundError(f"File '{manifest}' does not exist.")
+
+    entries: list[tuple[Path, list[str]]] = []
+    with open(manifest, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path, *names = line.split()
+            entries.append((manifest.parent / Path(path).expanduser(), names))
+    return entries
+
+
+def sync_repository(
+    repository: Path, names: list[str], templates: Gitignore, *, check: bool = False
+) -> SyncResult:
+    """Synchronize the `.gitignore` of a repository.
+
+    If `names` are provided, the pygic sections of the `.gitignore` are generated from them,
+    otherwise its existing pygic sections are updated (see `pygic.update.update_gitignore`).
+    In both cases, the lines written by the user are kept, and the file is only written if it changes.
+    Any error is caught and reported in the result so that it does not affect the other repositories.
+
+    Args:
+        repository (Path): The path to the repository.
+        names (list[str]): The names of the templates, can be empty.
+        templates (Gitignore): The templates used to generate the `.gitignore`.
+        check (bool): If True, the file is never written. Defaults to False.
+
+    Returns:
+        SyncResult: The result of the synchronization.
+    """
+    path = repository / ".gitignore"
+    try:
+        if not repository.is_dir():
+            raise NotADirectoryError(f"'{repository}' is not a directory.")
+
+        changed_titles = update_gitignore_file(
+            path, templates, names or None, check=check
+        )
+        if not changed_titles:
+            return SyncResult(path, SyncStatus.UNCHANGED)
+        return SyncResult(path, SyncStatus.CHANGED, ", ".join(changed_titles))
+
+    except Exception as e:
+        logger.debug(f"Failed to synchronize '{repository}'", exc_info=True)
+        return SyncResult(path, SyncStatus.ERROR, f"{type(e).__name__}: {e}")
+
+
+# The templates of a worker process, set once by `_init_worker`
+_worker_templates: Gitignore | None = None
+
+
+def _init_worker(templates: Gitignore) -> None:
+    global _worker_templates
+    _worker_templates = templates
+
+
+def _sync_repository_in_worker(
+    repository: Path, names: list[str], check: bool
+) -> SyncResult:
+    assert _worker_templates is not None, "The worker was not initialized."
+    return sync_repository(repository, names, _worker_templates, check=check)
+
+
+def sync_repositories(
+    entries: Iterable[tuple[Path, list[str]]],
+    templates: Gitignore,
+    *,
+    jobs: int | None = None,
+    check: bool = False,
+    progress: Callable[[int, int, SyncResult], None] | None = None,
+) -> list[SyncResult]:
+    """Synchronize the `.gitignore` of many repositories in parallel (see `sync_repository`).
+
+    The repositories are processed by a pool of processes, each of them receiving the `templates`
+    once when it starts instead of once per repository.
+
+    Args:
+        entries (Iterable[tuple[Path, list[str]]]): The repositories paths with their template names,
+            see `read_manifest`.
+        templates (Gitignore): The templates used to generate the `.gitignore` files.
+        jobs (int | None): The number of processes. If None, the number of CPUs is used.
+            If 1, the repositories are processed in the current process. Defaults to None.
+        check (bool): If True, the files are never written. Defaults to False.
+        progress (Callable[[int, int, SyncResult], None] | None): A function called after each repository
+            is processed, with the number of processed repositories, the total number of repositories,
+            and the result. Defaults to None.
+
+    Returns:
+        list[SyncResult]: The results, in the same order as `entries`. A repository whose worker process
+            failed (e.g. was killed) has an error result.
+    """
+    entries = list(entries)
+    results: dict[int, SyncResult] = {}
+
+    def report(idx: int, result: SyncResult, num_done: int) -> None:
+        results[idx] = result
+        if progress is not None:
+            progress(num_done, len(entries), result)
+
+    if jobs == 1:
+        for idx, (repository, names) in enumerate(entries):
+            report(
+                idx, sync_repository(repository, names, templates, check=check), idx + 1
+            )
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(templates,)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _sync_repository_in_worker, repository, names, check
+                ): idx
+                for idx, (repository, names) in enumerate(entries)
+            }
+            for num_done, future in enumerate(as_completed(futures), start=1):
+                idx = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker failed outside of `sync_repository`, e.g. a `BrokenProcessPool`
+                    # if a process was killed, which fails the repositories it did not process
+                    repository = entries[idx][0]
+                    logger.debug(f"Failed to synchronize '{repository}'", exc_info=True)
+                    result = SyncResult(
+                        repository / ".gitignore",
+                        SyncStatus.ERROR,
+                        f"{type(e).__name__}: {e}",
+                    )
+                report(idx, result, num_done)
+
+    return [results[idx] for idx in range(len(entries))]
@@ -0,0 +1,327 @@
+import difflib
+import hashlib
+import logging
+import re
+from pathlib import Path
+
+from pygic.file import FileType
+from pygic.gitignore import Gitignore
+
+logger = logging.getLogger(__name__)
+
+HEADER_REGEX = re.compile(r"^### (?P<title>.+) ###$")
+"""The regex matching the section headers emitted by `Gitignore.create_one_gitignore`."""
+
+END_MARKER = "# End of pygic sections"
+"""The comment separating the pygic sections from the user lines that follow them.
+It is only written by `update_gitignore` when there are user lines to preserve after the sections."""
+
+
+def get_section_titles(templates: Gitignore) -> dict[str, str]:
+    """Get all the section titles that `create_one_gitignore` can emit, mapped to their template name.
+
+    Example:
+        - `Python.gitignore` gives the title `Python` mapped to `Python`.
+        - `Python.patch` gives the title `Python Patch` mapped to `Python`.
+        - `ReactNative.Buck.stack` gives the title `ReactNative.Buck Stack` mapped to `ReactNative`.
+
+    Args:
+        templates (Gitignore): The templates used to generate the sections.
+
+    Returns:
+        dict[str, str]: A dictionary with the section titles as keys and the template names as values.
+    """
+    titles: dict[str, str] = {}
+    for entry in templates.directory.iterdir():
+        stem, _, suffix = entry.name.rpartition(".")
+        if not stem or suffix not in FileType.values():
+            continue
+        name = stem.split(".")[0]
+        if suffix == FileType.GITIGNORE:
+            titles[stem] = name
+        elif suffix == FileType.PATCH:
+            titles[f"{stem} Patch"] = name
+        else:
+            titles[f"{stem} Stack"] = name
+    return titles
+
+
+def get_title_name(title: str, titles: dict[str, str]) -> str | None:
+    """Get the template name of a section title, or None if it is not a pygic section title.
+
+    Patch and stack titles of known templates are recognized even if the patch or stack file
+    does not exist anymore, so that the sections of removed stacks can be detected.
+
+    Args:
+        title (str): The title of the section, e.g. `ReactNative.Buck Stack`.
+        titles (dict[str, str]): The known section titles (see `get_section_titles`).
+
+    Returns:
+        str | None: The name of the template, e.g. `ReactNative`.
+    """
+    if title in titles:
+        return titles[title]
+    stem, _, kind = title.rpartition(" ")
+    if kind in ("Patch", "Stack"):
+        name = stem.split(".")[0]
+        if titles.get(name) == name:
+            return name
+    return None
+
+
+def split_sections(
+    lines: list[str], titles: dict[str, str]
+) -> tuple[list[str], list[tuple[str, list[str]]]]:
+    """Split lines into the lines before the first section and the sections themselves.
+
+    A section starts with a header whose title is in `titles` and ends right before the next one.
+
+    Args:
+        lines (list[str]): The lines to split.
+        titles (dict[str, str]): The known section titles (see `get_section_titles`).
+
+    Returns:
+        tuple[list[str], list[tuple[str, list[str]]]]: The lines before the first section,
+            and the list of sections as (title, lines) tuples, the header line being included.
+    """
+    preamble: list[str] = []
+    sections: list[tuple[str, list[str]]] = []
+    for line in lines:
+        match = HEADER_REGEX.match(line)
+        if match is not None and get_title_name(match["title"], titles) is not None:
+            sections.append((match["title"], [line]))
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+    return preamble, sections
+
+
+def hash_section(lines: list[str]) -> str:
+    """Get the SHA-256 hex digest of a section."""
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def get_section_names(
+    templates: Gitignore, sections: list[tuple[str, list[str]]], titles: dict[str, str]
+) -> list[str]:
+    """Get the names of the templates that generated the given sections.
+
+    Some templates contain lines that look like the headers of other templates.
+    For example, `LSspice.gitignore` contains `### LTspice ###`. Such a header is not
+    attributed to its own template if all its occurrences are explained by the content
+    of the other templates.
+
+    Args:
+        templates (Gitignore): The templates used to generate the sections.
+        sections (list[tuple[str, list[str]]]): The sections, see `split_sections`.
+        titles (dict[str, str]): The known section titles (see `get_section_titles`).
+
+    Returns:
+        list[str]: The template names, in order of first appearance.
+    """
+    header_counts: dict[str, int] = {}
+    for title, _ in sections:
+        header_counts[title] = header_counts.get(title, 0) + 1
+
+    candidates: dict[str, str] = {}
+    for title in header_counts:
+        name = get_title_name(title, titles)
+        candidates.setdefault(name.lower(), name)
+
+    # Each candidate is rendered once: the occurrences of a header inside the content of the templates
+    # are counted for all of them, then the occurrences inside its own template are subtracted
+    headers = {f"### {name} ###" for name in candidates.values()}
+    own_counts: dict[str, int] = {}
+    total_counts: dict[str, int] = dict.fromkeys(headers, 0)
+    for name in candidates.values():
+        header = f"### {name} ###"
+        for line in templates.create_one_gitignore(name).split("\n")[1:]:
+            if line in headers:
+                total_counts[line] += 1
+                if line == header:
+                    own_counts[name] = own_counts.get(name, 0) + 1
+
+    names: list[str] = []
+    for name in candidates.values():
+        if name not in header_counts:
+            # Only patch or stack headers, they cannot be mistaken for another template
+            names.append(name)
+            continue
+        header = f"### {name} ###"
+        explained = total_counts[header] - own_counts.get(name, 0)
+        if header_counts[name] > explained:
+            names.append(name)
+    return names
+
+
+def split_user_lines(
+    old_section: list[str], new_section: list[str]
+) -> tuple[list[str], list[str]]:
+    """Split the last section of a gitignore without `END_MARKER` into its template lines and the user lines
+    appended after them.
+
+    The user lines are the lines after the last block of lines that the section has in common with its
+    regenerated version: the lines of the old version of the template are either still in the template,
+    or followed by lines of the template, unless they were at its end and removed since then,
+    in which case they are kept as user lines rather than risking to delete user lines.
+
+    Args:
+        old_section (list[str]): The lines of the last section of the gitignore, the header being included.
+        new_section (list[str]): The lines of the regenerated section with the same title.
+
+    Returns:
+        tuple[list[str], list[str]]: The lines of the section, and the user lines that follow them.
+    """
+    matcher = difflib.SequenceMatcher(None, old_section, new_section, autojunk=False)
+    # The header is always in common
+    end = 1
+    for block in matcher.get_matching_blocks():
+        if block.size:
+            end = max(end, block.a + block.size)
+    return old_section[:end], old_section[end:]
+
+
+def update_gitignore(
+    content: str, templates: Gitignore, names: list[str] | None = None
+) -> tuple[str, list[str]]:
+    """Update the pygic sections of a gitignore content with the current templates.
+
+    The pygic sections are found via the headers emitted by `create_one_gitignore`:
+    `### {name} ###`, `### {name} Patch ###` and `### {name} Stack ###`.
+    They span from the first header to the `END_MARKER` line if any, or to the end of the content.
+    When there is no `END_MARKER` (e.g. lines added after `pygic gen > .gitignore`), the lines appended
+    after the last section are kept as user lines (see `split_user_lines`), after an `END_MARKER`.
+    If the template of the last section does not exist anymore, all its lines are kept as user lines.
+
+    The lines before the first section and after the `END_MARKER` are always preserved.
+    The sections are only rewritten if at least one of them changed, based on their hash.
+
+    If `names` are given, the sections are generated from them instead of the templates of the existing
+    sections, and a content without any pygic section is kept before them.
+
+    Args:
+        content (str): The content of the gitignore file.
+        templates (Gitignore): The templates used to regenerate the sections.
+        names (list[str] | None): The names of the templates of the sections.
+            Defaults to None, in which case the templates of the existing sections are used.
+
+    Returns:
+        tuple[str, list[str]]: The updated content, and the titles of the sections that changed.
+            If no section changed, the content is returned unchanged with an empty list.
+
+    Raises:
+        ValueError: If the content does not contain any pygic section and no `names` are given.
+        FileNotFoundError: If a template of the sections does not exist anymore.
+    """
+    lines = content.split("\n")
+    has_end_marker = END_MARKER in lines
+    epilogue: list[str] = []
+    if has_end_marker:
+        marker_idx = lines.index(END_MARKER)
+        epilogue = lines[marker_idx + 1 :]
+        lines = lines[:marker_idx]
+    elif lines[-1] == "":
+        # Remove the empty string resulting from the final newline
+        lines.pop()
+
+    titles = get_section_titles(templates)
+    preamble, old_sections = split_sections(lines, titles)
+    if not old_sections and names is None:
+        raise ValueError("No pygic section found in the gitignore content.")
+    old_region = lines[len(preamble) :]
+
+    if names is None:
+        names = get_section_names(templates, old_sections, titles)
+    new_region = templates.create(*names).split("\n")
+    if new_region[-1] == "":
+        new_region.pop()
+    _, new_sections = split_sections(new_region, titles)
+
+    if old_sections and not has_end_marker:
+        # The user lines appended after the sections are at the end of the last section
+        last_title, last_lines = old_sections[-1]
+        new_last_lines = next(
+            (lines for title, lines in new_sections if title == last_title), None
+        )
+        if new_last_lines is None:
+            # Rather than risking to delete user lines, the whole section is kept as user lines
+            logger.warning(
+                f"The section '{last_title}' does not exist anymore, so the lines appended after it "
+                f"cannot be told apart from its own lines: they are all kept after '{END_MARKER}'."
+            )
+            epilogue = last_lines[1:]
+        else:
+            last_lines, epilogue = split_user_lines(last_lines, new_last_lines)
+            old_sections[-1] = (last_title, last_lines)
+            old_region = old_region[: len(old_region) - len(epilogue)]
+
+    if old_region == new_region:
+        logger.info("The pygic sections are up to date.")
+        return content, []
+
+    old_hashes = {title: hash_section(lines) for title, lines in old_sections}
+    new_hashes = {title: hash_section(lines) for title, lines in new_sections}
+    changed_titles = [
+        title
+        for title in dict.fromkeys([*new_hashes, *old_hashes])
+        if old_hashes.get(title) != new_hashes.get(title)
+    ]
+    logger.info(f"Changed pygic sections: {changed_titles}")
+
+    while epilogue and not epilogue[-1]:
+        epilogue.pop()
+    while epilogue and not epilogue[0] and not has_end_marker:
+        epilogue.pop(0)
+    if preamble and preamble[-1] and not old_sections:
+        # Separate the user lines from the new sections
+        preamble.append("")
+    updated_lines = preamble + new_region
+    if has_end_marker or epilogue:
+        updated_lines += [END_MARKER] + epilogue
+    return "\n".join(updated_lines) + "\n", changed_titles
+
+
+def update_gitignore_file(
+    path: str | Path,
+    templates: Gitignore,
+    names: list[str] | None = None,
+    *,
+    check: bool = False,
+) -> list[str]:
+    """Update the pygic sections of a gitignore file in place (see `update_gitignore`).
+
+    The file is not written if its sections are up to date.
+
+    Args:
+        path (str | Path): The path to the gitignore file, or to a directory containing a `.gitignore` file.
+        templates (Gitignore): The templates used to regenerate the sections.
+        names (list[str] | None): The names of the templates of the sections, in which case the file
+            is created if it does not exist. Defaults to None, in which case the templates of
+            the existing sections are used.
+        check (bool): If True, the file is never written, only the changed sections are reported.
+            Defaults to False.
+
+    Returns:
+        list[str]: The titles of the sections that changed.
+
+    Raises:
+        FileNotFoundError: If the gitignore file does not exist and no `names` are given.
+        ValueError: If the gitignore file does not contain any pygic section and no `names` are given.
+    """
+    path = Path(path)
+    if path.is_dir():
+        path = path / ".gitignore"
+    if path.exists():
+        with open(path, "r") as f:
+            content = f.read()
+    elif names is not None:
+        content = ""
+    else:
+        raise FileNotFoundError(f"File '{path}' does not exist.")
+
+    updated_content, changed_titles = update_gitignore(content, templates, names)
+    if changed_titles and not check:
+        with open(path, "w") as f:
+            f.write(updated_content)
+    return changed_titles
@@ -1,12 +1,28 @@
+import datetime
+import json
 import logging
 import sys
 from enum import Enum
+from typing import TextIO
 
 from termcolor import colored
 
+PYGIC_LOGGER_NAME = "pygic"
+"""The name of the logger configured by `setup_logging`, parent of the loggers of all the `pygic` modules."""
+
+# The attributes of every log record, to tell them apart from the fields passed with `extra`
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
 
 class ColorFormatter(logging.Formatter):
-    """A formatter that colors the log messages based on their level."""
+    """A formatter that colors the log messages based on their level.
+
+    The formatter of each level is created once, not for every formatted record.
+    """
 
     BASE_FORMAT: str = (
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s (%(filename)s:%(lineno)d)"
@@ -20,12 +36,45 @@ class ColorFormatter(logging.Formatter):
         logging.CRITICAL: colored(BASE_FORMAT, "red", attrs=["bold"]),
     }
 
+    def __init__(self) -> None:
+        super().__init__(self.BASE_FORMAT)
+        self.__formatters = {
+            level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()
+        }
+
     def format(self, record: logging.LogRecord) -> str:
-        log_fmt = self.FORMATS.get(record.levelno, self.BASE_FORMAT)
-        formatter = logging.Formatter(log_fmt)
+        formatter = self.__formatters.get(record.levelno)
+        if formatter is None:
+            return super().format(record)
         return formatter.format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """A formatter that writes each log record as a JSON object on a single line.
+
+    The fields passed with the `extra` argument of the logging calls (e.g. the `duration_ms` of the creation
+    of a gitignore) are added to the object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                log[key] = value
+        if record.exc_info:
+            log["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log, default=str)
+
+
 class LoggingLevel(Enum):
     """Logging level possible values."""
 
@@ -36,14 +85,43 @@ class LoggingLevel(Enum):
     CRITICAL: int = logging.CRITICAL
 
 
-def setup_logging(log_level: LoggingLevel | int | None = None) -> None:
+class _PygicHandler(logging.StreamHandler):
+    """The handler added by `setup_logging`, to find it again when it is called several times."""
+
+
+def setup_logging(
+    log_level: LoggingLevel | int | None = None,
+    *,
+    log_format: str = "text",
+    stream: TextIO | None = None,
+) -> None:
     """Setup logging for the application.
 
+    Only the `pygic` logger is configured, so the logging of an application using `pygic` as a library
+    is left untouched. Calling this function again replaces the previous configuration instead of
+    adding another handler.
+
     Args:
         log_level (LoggingLevel | int | None, optional): The log level to set.
             If None, the default logging level is WARNING. Defaults to None.
+        log_format (str, optional): `text` for colored log messages, or `json` for a JSON object per line,
+            see `JsonFormatter`. Defaults to `text`.
+        stream (TextIO | None, optional): The stream the logs are written to.
+            Defaults to None, in which case the current `sys.stdout` is used.
+
+    Raises:
+        ValueError: If the log format is not `text` nor `json`.
     """
 
+    if log_format == "text":
+        formatter: logging.Formatter = ColorFormatter()
+    elif log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        raise ValueError(
+            f"Unknown log format '{log_format}', expected 'text' or 'json'."
+        )
+
     if log_level is not None:
         if isinstance(log_level, int):
             log_level = LoggingLevel(log_level)
@@ -52,14 +130,19 @@ def setup_logging(log_level: LoggingLevel | int | None = None) -> None:
         # Default to WARNING level
         _log_level = logging.WARNING
 
-    # Root logger
-    logger = logging.getLogger()
+    logger = logging.getLogger(PYGIC_LOGGER_NAME)
 
     # Set the log level
     logger.setLevel(_log_level)
 
-    # Console handler with color formatter
-    console_handler = logging.StreamHandler(sys.stdout)
+    # Console handler, reused if logging was already set up
+    console_handler = next(
+        (handler for handler in logger.handlers if isinstance(handler, _PygicHandler)),
+        None,
+    )
+    if console_handler is None:
+        console_handler = _PygicHandler()
+        logger.addHandler(console_handler)
+    console_handler.setStream(sys.stdout if stream is None else stream)
     console_handler.setLevel(_log_level)
-    console_handler.setFormatter(ColorFormatter())
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(formatter)
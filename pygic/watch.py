@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from pygic.gitignore import Gitignore
+from pygic.resources import TemplateDirectory
+
+logger = logging.getLogger(__name__)
+
+StatSignature = tuple[int, int, int] | None
+"""The modification time, size and inode of a file, or None if it does not exist."""
+
+
+def stat_signature(path: Path) -> StatSignature:
+    """Get the `StatSignature` of a file or a directory."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def read_names_file(names_file: str | Path) -> list[str]:
+    """Read the template names listed in a file of a project, separated by whitespace.
+
+    Everything after a `#` on a line is a comment.
+
+    Example:
+        ```
+        # The templates of the project
+        python
+        node react
+        ```
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    with open(names_file, "r") as f:
+        return [name for line in f for name in line.partition("#")[0].split()]
+
+
+def get_watched_directories(directory: TemplateDirectory) -> list[Path]:
+    """Get the directories on disk whose changes can change the templates of a template directory.
+
+    The templates inside a zip archive or a git tree never change, so they are not watched.
+    """
+    from pygic.layers import LayeredTraversable
+
+    if isinstance(directory, Path):
+        return [directory]
+    if isinstance(directory, LayeredTraversable):
+        return [layer for layer in directory.index.layers if isinstance(layer, Path)]
+    return []
+
+
+class GitignoreWatcher:
+    """Regenerate a gitignore file when the templates or the template names it is generated from change.
+
+    Changes are detected by comparing the `stat` of the inputs of the gitignore only: the watched template
+    directories (whose modification time changes when a file is added, removed or renamed), their `order` file,
+    the files of the selected templates, and the names file. Other templates can change without any cost.
+
+    Attributes:
+        path (Path): The gitignore file.
+        names (tuple[str, ...]): The template names.
+        names_file (Path | None): A file listing more template names, see `read_names_file`.
+        load_templates (Callable[[], Gitignore]): Load the templates, called again when a file of a watched
+            template directory is added, removed or renamed.
+        templates (Gitignore): The current templates.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        load_templates: Callable[[], Gitignore],
+        names: Iterable[str] = (),
+        *,
+        names_file: str | Path | None = None,
+        templates: Gitignore | None = None,
+    ) -> None:
+        """Initialize the watcher, without generating the gitignore.
+
+        Args:
+            path (str | Path): The gitignore file, or a directory containing it.
+            load_templates (Callable[[], Gitignore]): Load the templates.
+            names (Iterable[str]): The template names. Defaults to no name.
+            names_file (str | Path | None): A file listing more template names. Defaults to None.
+            templates (Gitignore | None): The already loaded templates. Defaults to None,
+                in which case `load_templates` is called.
+        """
+        path = Path(path)
+        self.path = path / ".gitignore" if path.is_dir() else path
+        self.names = tuple(names)
+        self.names_file = None if names_file is None else Path(names_file)
+        self.load_templates = load_templates
+        self.templates = load_templates() if templates is None else templates
+
+        # The signature of the inputs of the last generation, None before the first one
+        self.__signature: tuple | None = None
+        # The last different signature seen, and when it was first seen, to wait until the inputs are stable
+        self.__pending_signature: tuple | None = None
+        self.__pending_since = 0.0
+        # The signature of the listings of the template directories the current templates were loaded from
+        self.__listing_signature = self.__get_listing_signature()
+
+    def get_names(self) -> list[str]:
+        """Get the template names, from `names` and the names file.
+
+        Raises:
+            FileNotFoundError: If the names file does not exist.
+        """
+        names = list(self.names)
+        if self.names_file is not None:
+            names.extend(read_names_file(self.names_file))
+        return names
+
+    def __get_listing_signature(self) -> tuple:
+        """Get the signature of the listings of the watched template directories."""
+        return tuple(
+            stat_signature(directory)
+            for directory in get_watched_directories(self.templates.directory)
+        )
+
+    def get_signature(self) -> tuple:
+        """Get the `stat` signature of all the inputs of the gitignore."""
+        from pygic.index import get_file_name_index
+
+        signature: list = [stat_signature(self.names_file)] if self.names_file else []
+        try:
+            names = self.get_names()
+        except OSError:
+            names = []
+        for directory in get_watched_directories(self.templates.directory):
+            signature.append(stat_signature(directory))
+            signature.append(stat_signature(directory / "order"))
+            try:
+                index = get_file_name_index(directory)
+            except OSError:
+                continue
+            for name in names:
+                for file_name in index.get_file_names(name.lower()):
+                    signature.append(stat_signature(directory / file_name))
+        return tuple(signature)
+
+    def regenerate(self) -> bool:
+        """Generate the gitignore, and write it if its content changed.
+
+        Returns:
+            bool: True if the gitignore was written.
+
+        Raises:
+            FileNotFoundError: If the names file does not exist, or if no template is found for a name.
+            ValueError: If there is no template name.
+        """
+        names = self.get_names()
+        if not names:
+            raise ValueError(
+                "There is no template name to generate the gitignore from."
+            )
+        content = self.templates.create(*names)
+        try:
+            with open(self.path, "r") as f:
+                if f.read() == content:
+                    return False
+        except FileNotFoundError:
+            pass
+        with open(self.path, "w") as f:
+            f.write(content)
+        logger.info(f"Regenerated '{self.path}' from {', '.join(names)}.")
+        return True
+
+    def poll(self, debounce: float = 0.0) -> bool:
+        """Regenerate the gitignore if its inputs changed since the last generation,
+        and did not change anymore for `debounce` seconds.
+
+        Errors are logged, and the gitignore is generated again once the inputs change again.
+
+        Args:
+            debounce (float): The number of seconds without change to wait before regenerating,
+                e.g. while the templates are being pulled. Defaults to 0.
+
+        Returns:
+            bool: True if the gitignore was written.
+        """
+        now = time.monotonic()
+        signature = self.get_signature()
+        if signature == self.__signature:
+            self.__pending_signature = None
+            return False
+        if signature != self.__pending_signature:
+            self.__pending_signature = signature
+            self.__pending_since = now
+        if now - self.__pending_since < debounce:
+            return False
+
+        listing_signature = self.__get_listing_signature()
+        if listing_signature != self.__listing_signature:
+            # E.g. a new template in an overlay, or a new clone of the templates
+            try:
+                self.templates = self.load_templates()
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not load the templates: {e}")
+                return False
+            self.__listing_signature = listing_signature
+        self.__signature = signature
+        self.__pending_signature = None
+        try:
+            return self.regenerate()
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not regenerate '{self.path}': {e}")
+            return False
+
+    def run(
+        self,
+        interval: float = 1.0,
+        debounce: float = 0.5,
+        *,
+        stop: threading.Event | None = None,
+        on_write: Callable[[Path], None] | None = None,
+    ) -> None:
+        """Generate the gitignore, then poll its inputs every `interval` seconds until `stop` is set.
+
+        Args:
+            interval (float): The number of seconds between two polls. Defaults to 1.
+            debounce (float): See `poll`. Defaults to 0.5.
+            stop (threading.Event | None): Set to stop watching. Defaults to None, in which case
+                the inputs are watched until the process is interrupted.
+            on_write (Callable[[Path], None] | None): Called with `path` each time the gitignore is written.
+                Defaults to None.
+        """
+        if stop is None:
+            stop = threading.Event()
+        if self.poll() and on_write is not None:
+            on_write(self.path)
+        while not stop.wait(interval):
+            if self.poll(debounce) and on_write is not None:
+                on_write(self.path)
@@ -0,0 +1,139 @@
+import logging
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Callable, Iterator
+from unittest.mock import patch
+
+import pytest
+
+from pygic.patterns import parse_rule
+
+
+@pytest.fixture(autouse=True)
+def completion_names_file(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """The names file for the shell completion written after cloning, instead of the one of the user."""
+    names_file = tmp_path_factory.mktemp("cache") / "_template_names.txt"
+    with patch("pygic.complete.get_cached_names_file", return_value=str(names_file)):
+        yield names_file
+
+
+@pytest.fixture(autouse=True)
+def index_cache_directory(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """The directory of the persisted indexes of the template directories, instead of the one of the user."""
+    cache_directory = tmp_path_factory.mktemp("index")
+    with patch("pygic.gitignore.INDEX_CACHE_DIR", cache_directory):
+        yield cache_directory
+
+
+@pytest.fixture(autouse=True)
+def pygic_logger() -> Iterator[logging.Logger]:
+    """The `pygic` logger, whose level and handlers set up by the commands are restored after each test."""
+    logger = logging.getLogger("pygic")
+    level, handlers = logger.level, logger.handlers[:]
+    yield logger
+    logger.setLevel(level)
+    logger.handlers[:] = handlers
+
+
+_generation_timings: dict[str, list[float]] = {}
+
+
+@pytest.fixture
+def generation_timings() -> dict[str, list[float]]:
+    """The durations of the gitignores generated by each path of the differential tests,
+    summarized at the end of the session."""
+    return _generation_timings
+
+
+_memory_usages: dict[str, tuple[int, int]] = {}
+
+
+@pytest.fixture
+def memory_usages() -> dict[str, tuple[int, int]]:
+    """The peak and retained memory of each scenario of the memory benchmarks, in bytes,
+    summarized at the end of the session."""
+    return _memory_usages
+
+
+_lookup_timings: dict[int, float] = {}
+
+
+@pytest.fixture
+def lookup_timings() -> dict[int, float]:
+    """The duration of the lookup benchmark for each number of templates, in seconds,
+    summarized at the end of the session."""
+    return _lookup_timings
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    if _lookup_timings:
+        terminalreporter.section("template lookup timings")
+        for num_templates, duration in sorted(_lookup_timings.items()):
+            terminalreporter.write_line(
+                f"{num_templates:>6} templates  {duration * 1000:7.2f} ms"
+            )
+    if _memory_usages:
+        terminalreporter.section("memory usage")
+        for scenario, (peak, retained) in _memory_usages.items():
+            terminalreporter.write_line(
+                f"{scenario:<12} peak {peak / 1024:9.1f} KiB  retained {retained / 1024:9.1f} KiB"
+            )
+    if not _generation_timings:
+        return
+    terminalreporter.section("gitignore generation timings")
+    for path, durations in _generation_timings.items():
+        if not durations:
+            continue
+        durations = sorted(durations)
+        terminalreporter.write_line(
+            f"{path:<12} {len(durations):>6} gitignores  "
+            f"total {sum(durations) * 1000:9.1f} ms  "
+            f"median {durations[len(durations) // 2] * 1e6:8.1f} us  "
+            f"max {durations[-1] * 1e6:9.1f} us"
+        )
+
+
+def generate_paths(content: str) -> list[str]:
+    """Generate paths matched by the rules, at the root and in a subdirectory, as files and directories."""
+    paths = set()
+    for line in content.split("\n"):
+        rule = parse_rule(line)
+        if rule is None or not rule.is_supported:
+            continue
+        for example in rule.examples:
+            for prefix in ("", "sub/"):
+                paths.add(prefix + example)
+                paths.add(prefix + example + "/")
+                paths.add(prefix + example + "/file")
+    return sorted(path for path in paths if path.strip("/"))
+
+
+@pytest.fixture
+def git_ignored_paths(tmp_path: Path) -> Callable[[str, list[str]], set[str]]:
+    """Get the paths that git ignores with a gitignore content, using `git check-ignore`."""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    repository = tmp_path / "repository"
+    repository.mkdir()
+    subprocess.run(["git", "init", "-q"], cwd=repository, check=True)
+
+    def get_ignored_paths(content: str, paths: list[str]) -> set[str]:
+        (repository / ".gitignore").write_text(content)
+        result = subprocess.run(
+            ["git", "check-ignore", "--no-index", "--stdin", "-v", "-n"],
+            cwd=repository,
+            input="\n".join(paths) + "\n",
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        ignored = set()
+        for line in result.stdout.splitlines():
+            source, _, path = line.partition("\t")
+            pattern = source.split(":", 2)[-1]
+            if pattern and not pattern.startswith("!"):
+                ignored.add(path)
+        return ignored
+
+    return get_ignored_paths
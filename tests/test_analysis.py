@@ -0,0 +1,121 @@
+import pytest
+from conftest import generate_paths
+
+from pygic.analysis import analyze, estimate_cost
+from pygic.gitignore import Gitignore
+from pygic.patterns import Rule
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("build", 1),
+        ("/build/", 1),
+        ("*.log", 1),
+        ("*.py[cod]", 5),
+        ("Backup*/", 3),
+        ("doc/*.txt", 2),
+        ("**/foo", 6),
+        ("[[:space:]]", 6),
+        ("/", 0),
+    ],
+)
+def test_estimate_cost(line: str, expected: int):
+    assert estimate_cost(Rule(line)) == expected
+
+
+def test_analyze():
+    content = "\n".join(
+        [
+            "*.log",
+            "!important*.log",
+            "important-debug.log",
+            "# Rewritten",
+            "**/node_modules/",
+            "!**/#keep",
+            ".cache/**",
+            "/vendor/*",
+            "a/b/**/*",
+            "# Not rewritten",
+            "**/a/b",
+            "logs/*",
+            "[Dd][Ee][Bb]ug",
+            "*.py[!c]",
+            "!logs/keep",
+            "",
+        ]
+    )
+    analysis = analyze(content)
+    rewrites = {rule.rule.line: rule.rewrite for rule in analysis.rules}
+    assert rewrites == {
+        "**/node_modules/": "node_modules/",
+        "!**/#keep": "!\\#keep",
+        ".cache/**": "/.cache/",
+        "/vendor/*": "/vendor/",
+        "a/b/**/*": "a/b/",
+        "**/a/b": None,
+        # `!logs/keep` re-includes a path of `logs`
+        "logs/*": None,
+        "[Dd][Ee][Bb]ug": None,
+        "*.py[!c]": None,
+        "*.log": None,
+        "!important*.log": None,
+        "important-debug.log": None,
+        "!logs/keep": None,
+    }
+    issues = {rule.rule.line: rule.issues for rule in analysis.rules if rule.issues}
+    assert set(issues) == {
+        "**/node_modules/",
+        "!**/#keep",
+        ".cache/**",
+        "/vendor/*",
+        "a/b/**/*",
+        "**/a/b",
+        "logs/*",
+        "[Dd][Ee][Bb]ug",
+        "*.py[!c]",
+        "important-debug.log",
+    }
+    assert issues["important-debug.log"] == [
+        "Chain of 3 nested exceptions alternately ignoring and re-including "
+        "the same paths (lines 1, 2, 3)."
+    ]
+
+    assert analysis.rewritten_cost < analysis.cost
+    assert analysis.rewritten_content.split("\n")[4:9] == [
+        "node_modules/",
+        "!\\#keep",
+        "/.cache/",
+        "/vendor/",
+        "a/b/",
+    ]
+    assert analysis.to_dict()["rules"][3] == {
+        "line_number": 5,
+        "rule": "**/node_modules/",
+        "cost": 6,
+        "issues": [
+            "Leading `**/` matches against the whole path, `node_modules` only matches against the basename."
+        ],
+        "rewrite": "node_modules/",
+        "rewrite_cost": 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        ["java", "gradle", "androidstudio", "visualstudio", "umbraco"],
+        ["cakephp", "mule", "cfwheels", "fuelphp", "unrealengine"],
+        ["vrealizeorchestrator", "joomla"],
+    ],
+)
+def test_analyze_rewrites_match_git(git_ignored_paths, names: list[str]):
+    """Git ignores exactly the same paths with the rewritten gitignore."""
+    content = Gitignore().create(*names)
+    rewritten_content = analyze(content).rewritten_content
+    assert rewritten_content != content
+
+    paths = sorted(set(generate_paths(content) + generate_paths(rewritten_content)))
+    assert git_ignored_paths(content, paths) == git_ignored_paths(
+        rewritten_content, paths
+    )
@@ -0,0 +1,270 @@
+import io
+import logging
+import stat
+import tarfile
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pygic.archive import (
+    ArchiveCache,
+    ConnectionPool,
+    extract_templates,
+    find_templates_prefix,
+)
+from pygic.cli import pygic
+from pygic.gitignore import TEMPLATES_LOCAL_DIR, Gitignore
+
+
+def make_tarball(python: bytes | None = None) -> bytes:
+    """Create a tarball like the ones of the toptal/gitignore repository, with symlinked templates."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tf:
+        tf.add(TEMPLATES_LOCAL_DIR, arcname="gitignore-master/templates")
+        readme = tarfile.TarInfo("gitignore-master/README.md")
+        tf.addfile(readme, io.BytesIO(b""))
+        if python is not None:
+            info = tarfile.TarInfo("gitignore-master/templates/Python.gitignore")
+            info.size = len(python)
+            tf.addfile(info, io.BytesIO(python))
+    return buffer.getvalue()
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    """A local stand-in for the server of the archives, supporting conditional and range requests.
+
+    Attributes:
+        archive (bytes): The served archive.
+        etag (str): The ETag of the archive.
+        requests (list[tuple[str, dict[str, str], int]]): The path, headers and status of each request.
+        client_addresses (set[tuple[str, int]]): The addresses of the connections of the clients.
+        interrupt_after (int | None): If set, the connection is closed after sending this many bytes of the archive.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), ArchiveRequestHandler)
+        self.set_archive(make_tarball(), '"v1"')
+        self.requests: list[tuple[str, dict[str, str], int]] = []
+        self.client_addresses: set[tuple[str, int]] = set()
+        self.interrupt_after: int | None = None
+
+    def set_archive(self, archive: bytes, etag: str) -> None:
+        self.archive = archive
+        self.etag = etag
+
+    def url(self, path: str = "/archive.tar.gz") -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+    @property
+    def statuses(self) -> list[int]:
+        return [status for _, _, status in self.requests]
+
+
+class ArchiveRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ArchiveServer
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def send(self, status: int, body: bytes = b"", headers: dict | None = None) -> None:
+        self.server.requests.append((self.path, dict(self.headers), status))
+        self.server.client_addresses.add(self.client_address)
+        self.send_response(status)
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.interrupt_after is not None and status in (200, 206):
+            self.wfile.write(body[: self.server.interrupt_after])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/redirect":
+            return self.send(302, headers={"Location": "/archive.tar.gz"})
+        if self.path != "/archive.tar.gz":
+            return self.send(404)
+
+        archive, etag = self.server.archive, self.server.etag
+        headers = {"ETag": etag, "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        if self.headers.get("If-None-Match") == etag:
+            return self.send(304, headers=headers)
+        range_header = self.headers.get("Range")
+        if range_header is not None and self.headers.get("If-Range") == etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(archive):
+                return self.send(416)
+            headers["Content-Range"] = (
+                f"bytes {start}-{len(archive) - 1}/{len(archive)}"
+            )
+            return self.send(206, archive[start:], headers)
+        self.send(200, archive, headers)
+
+
+@pytest.fixture
+def server() -> Iterator[ArchiveServer]:
+    server = ArchiveServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_archive_is_only_downloaded_when_changed(server: ArchiveServer, tmp_path: Path):
+    pool = ConnectionPool()
+    cache = ArchiveCache(server.url(), tmp_path)
+    templates_directory = cache.update(pool)
+    templates = Gitignore(directory=templates_directory)
+    # `WebStorm.gitignore` is a symbolic link to `JetBrains.gitignore`
+    assert templates.create("python", "webstorm") == Gitignore().create(
+        "python", "webstorm"
+    )
+
+    with patch.object(ArchiveCache, "extract_templates") as extract:
+        assert cache.update(pool) == templates_directory
+    extract.assert_not_called()
+    assert server.statuses == [200, 304]
+    assert server.requests[1][1]["If-None-Match"] == '"v1"'
+    # Both requests used the same connection
+    assert len(server.client_addresses) == 1
+
+    server.set_archive(make_tarball(python=b"*.pyc\n"), '"v2"')
+    Gitignore.from_archive(server.url(), cache_directory=tmp_path)
+    assert server.statuses == [200, 304, 200]
+    assert (templates_directory / "Python.gitignore").read_text() == "*.pyc\n"
+    assert sorted(path.name for path in cache.directory.iterdir()) == [
+        "archive",
+        "archive.json",
+        "templates",
+    ]
+    pool.close()
+
+
+def test_interrupted_download_is_resumed(server: ArchiveServer, tmp_path: Path):
+    cache = ArchiveCache(server.url(), tmp_path)
+    server.interrupt_after = 1000
+    with pytest.raises(ConnectionError, match="Could not download"):
+        cache.download()
+    assert cache.part_path.stat().st_size == 1000
+    assert not cache.archive_path.exists()
+
+    server.interrupt_after = None
+    assert cache.download()
+    assert server.statuses == [200, 206]
+    assert server.requests[1][1]["Range"] == "bytes=1000-"
+    assert cache.archive_path.read_bytes() == server.archive
+    assert not cache.part_path.exists()
+
+    # The archive changed since the interrupted download, which restarts
+    server.interrupt_after = 1000
+    server.set_archive(make_tarball(python=b"*.pyc\n"), '"v2"')
+    with pytest.raises(ConnectionError):
+        cache.download()
+    server.interrupt_after = None
+    server.set_archive(make_tarball(python=b".venv/\n"), '"v3"')
+    assert cache.download()
+    assert server.statuses[-1] == 200
+    assert cache.archive_path.read_bytes() == server.archive
+
+
+def test_resumed_download_of_a_complete_archive(server: ArchiveServer, tmp_path: Path):
+    """A partial archive which is not shorter than the archive is downloaded again."""
+    cache = ArchiveCache(server.url(), tmp_path)
+    cache.download()
+    cache.archive_path.rename(cache.part_path)
+    cache.archive_path.with_name("archive.json").rename(
+        cache.part_path.with_name("archive.part.json")
+    )
+    assert cache.download()
+    assert server.statuses == [200, 416, 200]
+    assert cache.archive_path.read_bytes() == server.archive
+
+
+def test_download_follows_redirections(server: ArchiveServer, tmp_path: Path):
+    cache = ArchiveCache(server.url("/redirect"), tmp_path)
+    assert cache.download()
+    assert server.statuses == [302, 200]
+    assert not cache.download()
+    assert server.statuses == [302, 200, 302, 304]
+
+
+def test_download_failure(
+    server: ArchiveServer, tmp_path: Path, caplog: pytest.LogCaptureFixture
+):
+    with pytest.raises(ConnectionError, match="HTTP 404"):
+        ArchiveCache(server.url("/missing"), tmp_path).update()
+
+    cache = ArchiveCache(server.url(), tmp_path)
+    templates_directory = cache.update(ConnectionPool())
+    server.shutdown()
+    server.server_close()
+    with caplog.at_level(logging.WARNING):
+        assert cache.update(ConnectionPool()) == templates_directory
+    assert "Using the previously downloaded templates." in caplog.text
+
+
+def test_extract_templates_from_zip(tmp_path: Path):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("repo-main/templates/Python.gitignore", "__pycache__/\n")
+        link = zipfile.ZipInfo("repo-main/templates/Python3.gitignore")
+        link.external_attr = (stat.S_IFLNK | 0o777) << 16
+        zf.writestr(link, "Python.gitignore")
+        broken_link = zipfile.ZipInfo("repo-main/templates/Broken.gitignore")
+        broken_link.external_attr = (stat.S_IFLNK | 0o777) << 16
+        zf.writestr(broken_link, "../../outside")
+        zf.writestr("repo-main/templates/sub/Nested.gitignore", "nested\n")
+        zf.writestr("repo-main/docs/templates.md", "")
+    extract_templates(buffer, tmp_path)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "Python.gitignore",
+        "Python3.gitignore",
+    ]
+    assert (tmp_path / "Python3.gitignore").read_text() == "__pycache__/\n"
+
+
+def test_extract_templates_invalid_archive(tmp_path: Path):
+    with pytest.raises(ValueError, match="Invalid archive"):
+        extract_templates(io.BytesIO(b"not an archive"), tmp_path)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("repo-main/README.md", "")
+    with pytest.raises(ValueError, match="does not contain a `templates` directory"):
+        extract_templates(buffer, tmp_path)
+
+
+def test_find_templates_prefix():
+    assert (
+        find_templates_prefix(
+            [
+                "gitignore-master/README.md",
+                "gitignore-master/templates/order",
+                "gitignore-master/vendor/x/templates/order",
+            ]
+        )
+        == "gitignore-master/templates/"
+    )
+    assert find_templates_prefix(["templates/order"]) == "templates/"
+
+
+def test_cli_pygic_gen_command_archive(server: ArchiveServer, tmp_path: Path):
+    runner = CliRunner()
+    with patch("pygic.gitignore.ARCHIVE_CACHE_DIR", tmp_path):
+        result = runner.invoke(pygic, ["gen", "python", "--archive", server.url()])
+        assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+        assert result.output == Gitignore().create("python")
+
+        result = runner.invoke(
+            pygic, ["gen", "python", "--archive", server.url("/missing")]
+        )
+        assert result.exit_code == 1
+        assert "HTTP 404" in result.output
@@ -1,6 +1,9 @@
+import json
+import shutil
 import sys
 from pathlib import Path
 from time import sleep
+from unittest.mock import patch
 
 import pexpect
 import pytest
@@ -55,9 +58,9 @@ def test_cli_pygic_gen_command_happy_path(file: Path):
     gitignore = result.output
 
     # Compare the generated content with the expected content
-    assert (
-        gitignore == expected_content
-    ), f".gitignore content does not match for {file.name}."
+    assert gitignore == expected_content, (
+        f".gitignore content does not match for {file.name}."
+    )
 
 
 @pytest.mark.skip(reason="This test is not working as expected")
@@ -133,3 +136,235 @@ def test_cli_pygic_search_names_interactively(tmp_path: Path):
     with open(target_path, "r") as f:
         expected_content = f.read()
     assert expected_content in output
+
+
+def test_cli_pygic_update_command(tmp_path: Path):
+    """Test the 'update' CLI command on an up-to-date and an outdated gitignore."""
+    gitignore_path = tmp_path / ".gitignore"
+    expected_content = (
+        ROOT_DIR / "tests" / "targets" / "python.c.gitignore"
+    ).read_text()
+    gitignore_path.write_text(expected_content)
+
+    runner = CliRunner()
+    result = runner.invoke(pygic, ["update", str(tmp_path)])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "is up to date." in result.output
+
+    # Outdate the C section, while keeping user lines before the sections
+    outdated_content = "/secrets\n" + expected_content.replace("*.o\n", "", 1)
+    gitignore_path.write_text(outdated_content)
+
+    result = runner.invoke(pygic, ["update", "--check", str(gitignore_path)])
+    assert result.exit_code == 1
+    assert "changed sections: C" in result.output
+    assert gitignore_path.read_text() == outdated_content
+
+    result = runner.invoke(pygic, ["update", str(gitignore_path)])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "changed sections: C" in result.output
+    assert gitignore_path.read_text() == "/secrets\n" + expected_content
+
+
+def test_cli_pygic_update_command_no_section(tmp_path: Path):
+    gitignore_path = tmp_path / ".gitignore"
+    gitignore_path.write_text("/build\n")
+
+    runner = CliRunner()
+    result = runner.invoke(pygic, ["update", str(gitignore_path)])
+    assert result.exit_code == 1
+    assert "No pygic section found" in result.output
+
+
+def test_cli_pygic_sync_repos_command(tmp_path: Path):
+    """Test the 'sync-repos' CLI command, including the summary and the error isolation."""
+    (tmp_path / "repo").mkdir()
+    manifest = tmp_path / "manifest"
+    manifest.write_text("repo python\nmissing python\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        pygic, ["sync-repos", "--jobs", "1", "--check", str(manifest)]
+    )
+    assert result.exit_code == 1
+    assert "2 repositories: 1 changed, 0 unchanged, 1 failed." in result.output
+    assert f"Outdated: {tmp_path / 'repo' / '.gitignore'}" in result.output
+    assert not (tmp_path / "repo" / ".gitignore").exists()
+
+    manifest.write_text("repo python\n")
+    result = runner.invoke(pygic, ["sync-repos", "--jobs", "1", str(manifest)])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "[1/1] changed:" in result.output
+    assert "1 repositories: 1 changed, 0 unchanged, 0 failed." in result.output
+    assert (tmp_path / "repo" / ".gitignore").read_text() == (
+        ROOT_DIR / "tests" / "targets" / "python.gitignore"
+    ).read_text()
+
+
+def test_cli_pygic_store_commands(tmp_path: Path):
+    """Test the 'store' CLI commands and the '--snapshot' option of 'gen'."""
+    store_directory = str(tmp_path / "store")
+    templates_directory = str(ROOT_DIR / "pygic" / "templates")
+    runner = CliRunner()
+
+    result = runner.invoke(
+        pygic,
+        ["store", "import", templates_directory, "v1", "--store", store_directory],
+    )
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "Snapshot 'v1' created" in result.output
+
+    result = runner.invoke(
+        pygic,
+        ["store", "import", templates_directory, "v1", "--store", store_directory],
+    )
+    assert result.exit_code == 1
+    assert "Snapshot 'v1' already exists." in result.output
+
+    result = runner.invoke(pygic, ["store", "list", "--store", store_directory])
+    assert result.output == "v1\n"
+
+    with patch("pygic.gitignore.TEMPLATE_STORE_DIR", tmp_path / "store"):
+        result = runner.invoke(pygic, ["gen", "python", "--snapshot", "v1"])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert (
+        result.output
+        == (ROOT_DIR / "tests" / "targets" / "python.gitignore").read_text()
+    )
+
+    result = runner.invoke(pygic, ["store", "remove", "v1", "--store", store_directory])
+    assert result.exit_code == 0
+    result = runner.invoke(pygic, ["store", "remove", "v1", "--store", store_directory])
+    assert result.exit_code == 1
+
+    result = runner.invoke(pygic, ["store", "gc", "--store", store_directory])
+    assert result.exit_code == 0
+    assert "unused files removed." in result.output
+
+    with patch("pygic.gitignore.TEMPLATE_STORE_DIR", None):
+        result = runner.invoke(pygic, ["store", "list"])
+    assert result.exit_code == 1
+    assert "there is no default template store" in result.output
+
+
+def test_cli_pygic_diff_templates_command(tmp_path: Path):
+    """Test the 'diff-templates' CLI command between a directory and a snapshot."""
+    templates_directory = ROOT_DIR / "pygic" / "templates"
+    new_directory = tmp_path / "new"
+    shutil.copytree(templates_directory, new_directory)
+    (new_directory / "C.gitignore").write_text("*.o\n")
+    name_sets = tmp_path / "name_sets"
+    name_sets.write_text("python\nc python\n")
+
+    runner = CliRunner()
+    store_directory = str(tmp_path / "store")
+    runner.invoke(
+        pygic,
+        ["store", "import", str(templates_directory), "v1", "--store", store_directory],
+    )
+
+    cmd_args = ["diff-templates", "v1", str(new_directory), "--store", store_directory]
+    result = runner.invoke(pygic, cmd_args + ["--name-sets", str(name_sets)])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert result.output == "changed: C.gitignore\naffected: c python\n"
+
+    result = runner.invoke(pygic, cmd_args + ["--json"])
+    assert json.loads(result.output) == {
+        "added": [],
+        "removed": [],
+        "changed": ["C.gitignore"],
+        "affected_name_sets": [],
+    }
+
+    result = runner.invoke(
+        pygic, ["diff-templates", "v2", str(new_directory), "--store", store_directory]
+    )
+    assert result.exit_code == 1
+    assert "'v2' is neither a directory nor a snapshot" in result.output
+
+
+def test_cli_pygic_gen_command_minimize():
+    """Test the 'gen --minimize' CLI command."""
+    runner = CliRunner()
+    names = ["java", "gradle", "androidstudio", "visualstudio", "umbraco"]
+    result = runner.invoke(pygic, ["gen", *names, "--minimize"])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "rules subsumed by other rules." in result.output
+    expected_path = ROOT_DIR / "tests" / "targets" / f"{'.'.join(names)}.gitignore"
+    assert "Removed" not in result.stdout
+    assert 0 < len(result.stdout) < len(expected_path.read_text())
+
+
+def test_cli_pygic_gen_command_json():
+    """Test the 'gen --format json' CLI command."""
+    runner = CliRunner()
+    result = runner.invoke(pygic, ["gen", "python", "c", "--format", "json"])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    data = json.loads(result.output)
+    assert data["templates"] == ["c", "python"]
+    expected_path = ROOT_DIR / "tests" / "targets" / "c.python.gitignore"
+    assert data["content"] == expected_path.read_text()
+    assert [section["file"] for section in data["sections"]] == [
+        "C.gitignore",
+        "Python.gitignore",
+        "Python.patch",
+    ]
+    assert "__pycache__/" in data["sections"][1]["rules"]
+
+    result = runner.invoke(pygic, ["gen", "python", "--format", "json", "--compact"])
+    assert result.exit_code == 2
+    assert "--format json cannot be used with" in result.output
+
+
+def test_cli_pygic_analyze_command():
+    """Test the 'analyze' CLI command."""
+    runner = CliRunner()
+    names = ["java", "gradle", "androidstudio", "visualstudio", "umbraco"]
+    result = runner.invoke(pygic, ["analyze", *names])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "estimated cost per path" in result.output
+    assert "line 29, cost 6: **/build/" in result.output
+    assert "Rewrite as: build/ (cost 1)" in result.output
+
+    result = runner.invoke(pygic, ["analyze", *names, "--json"])
+    report = json.loads(result.output)
+    assert report["rewritten_cost"] < report["cost"]
+
+    result = runner.invoke(pygic, ["analyze", *names, "--rewrite"])
+    assert "\n**/build/\n" not in result.stdout
+    assert "\nbuild/\n!src/**/build/\n" in result.stdout
+
+
+def test_cli_pygic_list_command(tmp_path: Path):
+    """Test the 'list' CLI command."""
+    runner = CliRunner()
+    with patch("pygic.gitignore.INDEX_CACHE_DIR", tmp_path):
+        result = runner.invoke(pygic, ["list", "--prefix", "py"])
+        assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+        assert result.output.split() == [
+            "PyCharm",
+            "PyCharm+all",
+            "PyCharm+iml",
+            "pydev",
+            "Python",
+            "PythonVanilla",
+        ]
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+        result = runner.invoke(pygic, ["list", "--contains", "rider", "--json"])
+        assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+        assert json.loads(result.output) == [
+            {"name": "Rider", "has_gitignore": True, "has_patch": False, "stacks": []},
+            {
+                "name": "Rider+all",
+                "has_gitignore": False,
+                "has_patch": True,
+                "stacks": [],
+            },
+            {
+                "name": "Rider+iml",
+                "has_gitignore": False,
+                "has_patch": True,
+                "stacks": [],
+            },
+        ]
@@ -0,0 +1,98 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pygic.cli import pygic
+from pygic.complete import complete, get_script, main, read_names
+from pygic.config import ROOT_DIR
+from pygic.gitignore import TEMPLATES_LOCAL_DIR, list_renderable_template_names
+from pygic.index import save_completion_names
+
+
+def test_read_names_from_sources():
+    """Without a names file, the templates shipped with `pygic` are listed."""
+    with patch("pygic.complete.get_cached_names_file", return_value=None):
+        assert read_names() == list_renderable_template_names(TEMPLATES_LOCAL_DIR)
+
+
+def test_read_names_after_clone(tmp_path: Path, completion_names_file: Path):
+    """The names of the cloned templates are used once they are saved, by the commands using them."""
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "order").touch()
+    (templates / "Python.gitignore").touch()
+    (templates / "ReactNative.Linux.stack").touch()
+    (templates / "Rider+all.patch").touch()
+    save_completion_names(templates)
+    assert read_names(cached=True) == ["python", "reactnative", "rider+all"]
+    assert complete("R", ["gen", "--clone"]) == ["reactnative", "rider+all"]
+    assert complete("R", ["gen", "--archive=https://example.com/a.zip"]) == [
+        "reactnative",
+        "rider+all",
+    ]
+    # The other commands use the templates shipped with `pygic`
+    assert read_names() == list_renderable_template_names(TEMPLATES_LOCAL_DIR)
+    assert "rider" in complete("R", ["gen", "--directory", "templates"])
+
+
+def test_main(capsys: pytest.CaptureFixture):
+    assert main(["PyTh"]) == 0
+    assert capsys.readouterr().out == "python\npythonvanilla\n"
+    assert main(["not-a-template"]) == 0
+    assert capsys.readouterr().out == ""
+    assert main(["PyTh", "-v", "gen", "--clone"]) == 0
+    assert capsys.readouterr().out == "python\npythonvanilla\n"
+
+
+def test_complete_does_not_import_the_cli():
+    """Completing a name does not import `rich_click` nor the templates machinery."""
+    code = (
+        "import sys; import pygic.complete; "
+        "print(sorted(m for m in sys.modules if m.startswith(('pygic', 'rich', 'click'))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "['pygic', 'pygic.complete']"
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not installed")
+def test_bash_completion_script():
+    runner = CliRunner()
+    result = runner.invoke(pygic, ["completion", "bash"])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+
+    # `pygic-complete` is not installed when running the tests from the sources
+    script = (
+        result.output
+        + f'pygic-complete() {{ "{sys.executable}" -m pygic.complete "$@"; }}\n'
+        + 'complete_words() { COMP_WORDS=("$@"); COMP_CWORD=$(($# - 1)); COMPREPLY=(); '
+        + '_pygic_complete; echo "${COMPREPLY[*]}"; }\n'
+        + "complete_words pygic -v gen python reactn\n"
+        + "complete_words pygic analyze --json reactn\n"
+        + "complete_words pygic update reactn\n"
+        + "complete_words pygic gen --\n"
+    )
+    result = subprocess.run(
+        ["bash", "-c", script],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split("\n") == ["reactnative", "reactnative", "", "", ""]
+
+
+@pytest.mark.parametrize("shell", ["zsh", "fish"])
+def test_completion_scripts(shell: str):
+    assert "pygic-complete" in get_script(shell)
+    assert "gen analyze" in get_script(shell)
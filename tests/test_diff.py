@@ -0,0 +1,125 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from pygic.diff import (
+    TemplateSet,
+    TemplateSetDiff,
+    get_template_name,
+    read_name_sets,
+)
+from pygic.gitignore import TEMPLATES_LOCAL_DIR, Gitignore
+from pygic.store import TemplateStore
+
+
+@pytest.fixture
+def new_templates(tmp_path: Path) -> Path:
+    """A copy of the local templates with a few modifications."""
+    directory = tmp_path / "new" / "templates"
+    shutil.copytree(TEMPLATES_LOCAL_DIR, directory)
+    (directory / "Python.gitignore").write_text("*.pyc\n")
+    (directory / "ReactNative.Buck.stack").unlink()
+    (directory / "Pygic.gitignore").write_text("*.pygic\n")
+    return directory
+
+
+NAME_SETS = [
+    ["python"],
+    ["c", "PYTHON"],
+    ["reactnative"],
+    ["pygic"],
+    ["c", "java"],
+    ["java", "gradle", "androidstudio"],
+]
+
+
+def test_get_template_name():
+    assert get_template_name("Python.gitignore") == "python"
+    assert get_template_name("ReactNative.Buck.stack") == "reactnative"
+    assert get_template_name("JetBrains+all.patch") == "jetbrains+all"
+    assert get_template_name("order") is None
+    assert get_template_name("README.md") is None
+
+
+def test_template_set_from_directory_clone(new_templates: Path):
+    """A clone of the toptal/gitignore repository is resolved to its templates directory."""
+    template_set = TemplateSet.from_directory(new_templates.parent)
+    assert template_set.directory == new_templates
+    assert "order" in template_set.hashes
+
+    with pytest.raises(NotADirectoryError):
+        TemplateSet.from_directory(new_templates / "order")
+
+
+def test_template_set_diff(new_templates: Path):
+    diff = TemplateSetDiff(
+        TemplateSet.from_directory(TEMPLATES_LOCAL_DIR),
+        TemplateSet.from_directory(new_templates),
+    )
+    assert diff.to_dict() == {
+        "added": ["Pygic.gitignore"],
+        "removed": ["ReactNative.Buck.stack"],
+        "changed": ["Python.gitignore"],
+    }
+    assert diff.changed_template_names == {"pygic", "python", "reactnative"}
+    assert [names for names in NAME_SETS if diff.is_affected(names)] == NAME_SETS[:4]
+
+
+def test_template_set_diff_order(new_templates: Path):
+    """Only the name sets whose templates are sorted differently are affected by a change of order."""
+    (new_templates / "order").write_text(
+        "java\ngradle\nvisualstudio\nandroidstudio\nc\n"
+    )
+    diff = TemplateSetDiff(
+        TemplateSet.from_directory(TEMPLATES_LOCAL_DIR),
+        TemplateSet.from_directory(new_templates),
+    )
+    assert diff.changed == ["Python.gitignore", "order"]
+    assert diff.is_affected(["c", "java"])
+    assert not diff.is_affected(["java", "gradle", "androidstudio"])
+    assert not diff.is_affected(["node", "rust"])
+
+
+def test_template_set_diff_matches_generation(new_templates: Path):
+    """The affected name sets are exactly the ones whose generated gitignore changes."""
+    (new_templates / "order").write_text(
+        "java\ngradle\nvisualstudio\nandroidstudio\nc\n"
+    )
+    diff = TemplateSetDiff(
+        TemplateSet.from_directory(TEMPLATES_LOCAL_DIR),
+        TemplateSet.from_directory(new_templates),
+    )
+    old_templates = Gitignore()
+    new_templates_ = Gitignore(directory=new_templates)
+    for names in NAME_SETS + [["node", "rust"], ["java", "gradle", "androidstudio"]]:
+        if names == ["reactnative"] or names == ["pygic"]:
+            # One of the sets does not have all the templates
+            assert diff.is_affected(names)
+            continue
+        assert diff.is_affected(names) == (
+            old_templates.create(*names) != new_templates_.create(*names)
+        ), names
+
+
+def test_template_set_from_snapshot(new_templates: Path, tmp_path: Path):
+    store = TemplateStore(tmp_path / "store")
+    store.import_directory(TEMPLATES_LOCAL_DIR, "v1")
+    store.import_directory(new_templates, "v2")
+
+    diff = TemplateSetDiff(
+        TemplateSet.from_snapshot(store, "v1"), TemplateSet.from_snapshot(store, "v2")
+    )
+    assert diff.to_dict() == {
+        "added": ["Pygic.gitignore"],
+        "removed": ["ReactNative.Buck.stack"],
+        "changed": ["Python.gitignore"],
+    }
+
+
+def test_read_name_sets(tmp_path: Path):
+    path = tmp_path / "name_sets"
+    path.write_text("# Fleet\npython c\n\njava\n")
+    assert read_name_sets(path) == [["python", "c"], ["java"]]
+    with pytest.raises(FileNotFoundError):
+        read_name_sets(tmp_path / "missing")
@@ -0,0 +1,310 @@
+import difflib
+import functools
+import pickle
+import random
+import shutil
+import subprocess
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from pygic.file import File, FileType
+from pygic.gitignore import (
+    TEMPLATES_LOCAL_DIR,
+    Gitignore,
+    list_renderable_template_names,
+    read_order_file,
+    remove_duplicated_lines,
+)
+
+NUM_COMBINATIONS = 2000
+"""The number of random combinations of template names generated by each path."""
+
+SEED = 20241019
+
+# Templates with stacks, names of the `order` file, and templates sharing many lines
+EDGE_CASE_NAMES = (
+    "reactnative",
+    "java",
+    "gradle",
+    "androidstudio",
+    "visualstudio",
+    "umbraco",
+    "jetbrains+all",
+    "rider+all",
+    "python",
+    "c",
+)
+
+
+@functools.cache
+def render_reference_template(name: str) -> str:
+    """Render a template like the first version of `Gitignore.create_one_gitignore`,
+    by globbing the files of the template directory."""
+    lower_name = name.lower()
+    file_paths = [
+        file
+        for file in TEMPLATES_LOCAL_DIR.glob("*.*")
+        if file.stem.lower().split(".")[0] == lower_name
+    ]
+    if not file_paths:
+        all_files = [
+            file.stem.lower() for file in TEMPLATES_LOCAL_DIR.glob("*.gitignore")
+        ]
+        closest_matches = difflib.get_close_matches(name, all_files)
+        if closest_matches:
+            raise FileNotFoundError(
+                f"No template found for '{name}' regardless of case. Did you mean '{closest_matches[0]}'?"
+            )
+        raise FileNotFoundError(f"No template found for '{name}' regardless of case.")
+
+    files: defaultdict[FileType, list[File]] = defaultdict(list)
+    for file_path in file_paths:
+        file = File(file_path)
+        files[file.type].append(file)
+    gitignore = []
+    for file_type, header in (
+        (FileType.GITIGNORE, "### {} ###"),
+        (FileType.PATCH, "### {} Patch ###"),
+        (FileType.STACK, "### {} Stack ###"),
+    ):
+        for file in sorted(files[file_type], key=lambda file: file.name.lower()):
+            gitignore.append(header.format(file.name))
+            gitignore.append(file.get_content())
+    return remove_duplicated_lines("\n".join(gitignore))
+
+
+def create_reference_gitignore(*names: str) -> str:
+    """Create a gitignore like the first version of `Gitignore.create`."""
+    order_dict = read_order_file(TEMPLATES_LOCAL_DIR / "order")
+    sub_gitignores = {name.lower(): render_reference_template(name) for name in names}
+    sorted_names = sorted(sorted(sub_gitignores), key=lambda name: order_dict[name])
+    return remove_duplicated_lines(
+        "\n".join(sub_gitignores[name] for name in sorted_names)
+    )
+
+
+def generate_name_combinations(
+    num_combinations: int, seed: int
+) -> list[tuple[str, ...]]:
+    """Generate random combinations of template names, with case variants, duplicates and misspelled names."""
+    rng = random.Random(seed)
+    names = list_renderable_template_names(TEMPLATES_LOCAL_DIR)
+
+    def variant(name: str) -> str:
+        case = rng.randrange(4)
+        if case == 0:
+            return name
+        if case == 1:
+            return name.upper()
+        if case == 2:
+            return name.title()
+        return "".join(rng.choice((char.lower(), char.upper())) for char in name)
+
+    combinations = []
+    for _ in range(num_combinations):
+        size = rng.choice((1, 1, 2, 2, 3, 4, 6))
+        combination = [
+            rng.choice(EDGE_CASE_NAMES if rng.random() < 0.4 else names)
+            for _ in range(size)
+        ]
+        if rng.random() < 0.2:
+            combination.append(rng.choice(combination))
+        if rng.random() < 0.02:
+            name = rng.choice(combination)
+            position = rng.randrange(len(name))
+            combination.append(name[:position] + name[position + 1 :])
+        combinations.append(tuple(variant(name) for name in combination))
+    return combinations
+
+
+def create_or_error(create: Callable[..., str], names: tuple[str, ...]) -> str:
+    try:
+        return create(*names)
+    except FileNotFoundError as e:
+        return f"FileNotFoundError: {e}"
+
+
+@functools.cache
+def get_reference_outputs() -> list[tuple[tuple[str, ...], str, float]]:
+    """The output of the reference implementation for each combination, with the time taken to create it."""
+    outputs = []
+    for names in generate_name_combinations(NUM_COMBINATIONS, SEED):
+        start = time.perf_counter()
+        content = create_or_error(create_reference_gitignore, names)
+        outputs.append((names, content, time.perf_counter() - start))
+    return outputs
+
+
+def make_rendered_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Gitignore:
+    return Gitignore(directory=TEMPLATES_LOCAL_DIR)
+
+
+def make_precomputed_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Gitignore:
+    from pygic.precompute import PrecomputedTemplates
+
+    precomputed = PrecomputedTemplates.from_directory(TEMPLATES_LOCAL_DIR)
+    monkeypatch.setattr(
+        "pygic.precompute.get_precomputed_templates", lambda: precomputed
+    )
+    # The precomputed templates are only used by the default instance
+    return Gitignore()
+
+
+def make_ingested_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Gitignore:
+    templates = Gitignore(directory=TEMPLATES_LOCAL_DIR)
+    templates.ingest()
+    return templates
+
+
+def make_reloaded_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Gitignore:
+    templates = Gitignore(directory=TEMPLATES_LOCAL_DIR)
+    templates.reload().result()
+    return templates
+
+
+def make_pickled_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Gitignore:
+    return pickle.loads(pickle.dumps(make_ingested_templates(tmp_path, monkeypatch)))
+
+
+def make_zip_templates(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Gitignore:
+    archive = tmp_path / "templates.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for file in TEMPLATES_LOCAL_DIR.iterdir():
+            zf.writestr(f"templates/{file.name}", file.read_bytes())
+    return Gitignore(directory=archive / "templates")
+
+
+def make_git_templates(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Gitignore:
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    from pygic.gitobjects import open_git_directory
+
+    repository = tmp_path / "repository"
+    shutil.copytree(TEMPLATES_LOCAL_DIR, repository / "templates", symlinks=True)
+    git = ["git", "-c", "user.name=pygic", "-c", "user.email=pygic@example.com"]
+    for args in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", "Templates"]):
+        subprocess.run([*git, *args], cwd=repository, check=True)
+    # Read with Dulwich, since GitPython cannot be imported again by the tests simulating that `git` is not installed
+    pytest.importorskip("dulwich")
+    monkeypatch.setattr("pygic.gitobjects._import_gitpython", lambda: False)
+    return Gitignore(directory=open_git_directory(repository))
+
+
+def make_snapshot_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Gitignore:
+    from pygic.store import TemplateStore
+
+    TemplateStore(tmp_path / "store").import_directory(TEMPLATES_LOCAL_DIR, "reference")
+    return Gitignore.from_snapshot("refer", store_directory=tmp_path / "store")
+
+
+def make_layered_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Gitignore:
+    (tmp_path / "overlay").mkdir()
+    return Gitignore(directory=TEMPLATES_LOCAL_DIR).with_overlays(tmp_path / "overlay")
+
+
+GENERATION_PATHS: dict[str, Callable[[Path, pytest.MonkeyPatch], Gitignore]] = {
+    "rendered": make_rendered_templates,
+    "precomputed": make_precomputed_templates,
+    "ingested": make_ingested_templates,
+    "reloaded": make_reloaded_templates,
+    "pickled": make_pickled_templates,
+    "zip": make_zip_templates,
+    "git": make_git_templates,
+    "snapshot": make_snapshot_templates,
+    "layered": make_layered_templates,
+}
+"""The ways of loading the same templates, which must all generate the same gitignores."""
+
+
+def test_reference_outputs(generation_timings: dict[str, list[float]]):
+    outputs = get_reference_outputs()
+    generation_timings["reference"] = [duration for _, _, duration in outputs]
+    # The combinations cover the edge cases
+    contents = [content for _, content, _ in outputs]
+    assert any("### ReactNative.Linux Stack ###" in content for content in contents)
+    assert any(
+        "### Gradle ###" in content and "### Java ###" in content
+        for content in contents
+    )
+    assert any(content.startswith("FileNotFoundError") for content in contents)
+    assert any(
+        len({name.lower() for name in names}) < len(names) for names, _, _ in outputs
+    )
+
+
+@pytest.mark.parametrize("path", GENERATION_PATHS)
+def test_generation_path_matches_reference(
+    path: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    generation_timings: dict[str, list[float]],
+):
+    templates = GENERATION_PATHS[path](tmp_path, monkeypatch)
+    durations = generation_timings.setdefault(path, [])
+    for names, expected, _ in get_reference_outputs():
+        start = time.perf_counter()
+        content = create_or_error(templates.create, names)
+        durations.append(time.perf_counter() - start)
+        assert content == expected, (
+            f"The {path} templates differ from the reference for {names}"
+        )
+
+
+def test_structured_generation_matches_reference(
+    generation_timings: dict[str, list[float]],
+):
+    templates = Gitignore(directory=TEMPLATES_LOCAL_DIR)
+
+    def create_structured(*names: str) -> str:
+        return templates.create_structured(*names).content
+
+    durations = generation_timings.setdefault("structured", [])
+    for names, expected, _ in get_reference_outputs():
+        start = time.perf_counter()
+        content = create_or_error(create_structured, names)
+        durations.append(time.perf_counter() - start)
+        assert content == expected, (
+            f"The structured gitignore differs from the reference for {names}"
+        )
+
+
+def test_threaded_generation_matches_reference(
+    generation_timings: dict[str, list[float]],
+):
+    templates = Gitignore(directory=TEMPLATES_LOCAL_DIR)
+    outputs = get_reference_outputs()
+
+    def create(names: tuple[str, ...]) -> tuple[str, float]:
+        start = time.perf_counter()
+        content = create_or_error(templates.create, names)
+        return content, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # The templates are ingested while the gitignores are generated
+        executor.submit(templates.ingest)
+        results = list(executor.map(create, (names for names, _, _ in outputs)))
+    generation_timings["threads"] = [duration for _, duration in results]
+    for (names, expected, _), (content, _) in zip(outputs, results):
+        assert content == expected, (
+            f"The threaded generation differs from the reference for {names}"
+        )
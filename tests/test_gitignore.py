@@ -1,13 +1,18 @@
+import hashlib
 import logging
 import os
+import pickle
 import shutil
 import sys
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+from pygic import gitignore
 from pygic.config import ROOT_DIR, TOPTAL_REPO_URL
 from pygic.gitignore import (
     TEMPLATES_LOCAL_DIR,
@@ -481,6 +486,175 @@ python
         ):
             templates.create()
 
+    def test_create_structured(self):
+        templates = Gitignore()
+        names = ("java", "Gradle", "reactnative")
+        structured = templates.create_structured(*names)
+        assert structured.content == templates.create(*names)
+        assert structured.templates == ["java", "reactnative", "gradle"]
+        assert [section.file_name for section in structured.sections][:3] == [
+            "Java.gitignore",
+            "ReactNative.gitignore",
+            "ReactNative.Android.stack",
+        ]
+        assert structured.sections[-1].title == "Gradle Patch"
+        assert "*.class" in structured.sections[0].rules
+        assert all(
+            not rule.startswith("#") and rule.strip()
+            for section in structured.sections
+            for rule in section.rules
+        )
+
+        # Each duplicated rule is reported with the section keeping it
+        dropped = [(line.line, line.kept_in.file_name) for line in structured.dropped]
+        assert ("*.log", "Java.gitignore") in dropped
+        kept_rules = [rule for section in structured.sections for rule in section.rules]
+        assert len(kept_rules) == len(set(kept_rules))
+
+        data = structured.to_dict()
+        assert (
+            data["content_hash"]
+            == hashlib.sha256(structured.content.encode()).hexdigest()
+        )
+        assert data["dropped_duplicates"][0] == {
+            "line": structured.dropped[0].line,
+            "file": structured.dropped[0].section.file_name,
+            "kept_in": structured.dropped[0].kept_in.file_name,
+        }
+
+    def test_create_structured_ingested(self):
+        templates = Gitignore()
+        templates.ingest("python", "c")
+        structured = templates.create_structured("python", "c")
+        assert structured.content == Gitignore().create("python", "c")
+        assert [section.title for section in structured.sections] == [
+            "C",
+            "Python",
+            "Python Patch",
+        ]
+        with pytest.raises(ValueError, match="You need to provide at least one"):
+            templates.create_structured()
+
+
+#######################################################################################
+# Test reloading the templates of a Gitignore shared by several threads
+#######################################################################################
+
+
+def make_small_templates(directory: Path, python: str) -> Path:
+    directory.mkdir()
+    (directory / "order").write_text("python\nnode\n")
+    (directory / "Python.gitignore").write_text(python)
+    (directory / "Node.gitignore").write_text("node_modules/\n")
+    return directory
+
+
+def test_reload(tmp_path: Path):
+    old_directory = make_small_templates(tmp_path / "old", "__pycache__/\n")
+    new_directory = make_small_templates(tmp_path / "new", "*.pyc\n")
+    templates = Gitignore(directory=old_directory, ignore_num_files_check=True)
+    assert templates.create("python") == "### Python ###\n__pycache__/\n"
+
+    templates.reload(new_directory, ignore_num_files_check=True).result(timeout=10)
+    assert templates.directory == new_directory
+    assert templates.create("python") == "### Python ###\n*.pyc\n"
+    # The reloaded templates do not depend on later changes to their files
+    (new_directory / "Python.gitignore").write_text(".venv/\n")
+    (new_directory / "order").write_text("node\npython\n")
+    assert templates.create("node", "python") == (
+        "### Python ###\n*.pyc\n\n### Node ###\nnode_modules/\n"
+    )
+
+    # Reload the current directory
+    templates.reload(ignore_num_files_check=True).result(timeout=10)
+    assert templates.create("node", "python") == (
+        "### Node ###\nnode_modules/\n\n### Python ###\n.venv/\n"
+    )
+    # The reloaded templates can be sent to other processes
+    assert pickle.loads(pickle.dumps(templates)).create("python") == (
+        "### Python ###\n.venv/\n"
+    )
+
+
+def test_reload_failure_keeps_templates(tmp_path: Path):
+    directory = make_small_templates(tmp_path / "templates", "__pycache__/\n")
+    templates = Gitignore(directory=directory, ignore_num_files_check=True)
+
+    future = templates.reload(tmp_path / "missing")
+    with pytest.raises(FileNotFoundError):
+        future.result(timeout=10)
+    assert templates.directory == directory
+    assert templates.create("python") == "### Python ###\n__pycache__/\n"
+
+
+def test_reload_does_not_block_generations(tmp_path: Path):
+    """Generations started before the swap complete against the previous templates,
+    and generations during the loading do not wait for it."""
+    old_directory = make_small_templates(tmp_path / "old", "__pycache__/\n")
+    new_directory = make_small_templates(tmp_path / "new", "*.pyc\n")
+    templates = Gitignore(directory=old_directory, ignore_num_files_check=True)
+    old_gitignore = templates.create("python", "node")
+
+    loading = threading.Event()
+    generating = threading.Event()
+    list_renderable_template_names = gitignore.list_renderable_template_names
+    sort_template_names = gitignore.sort_template_names
+
+    def slow_list_renderable_template_names(directory):
+        loading.wait(timeout=10)
+        return list_renderable_template_names(directory)
+
+    def slow_sort_template_names(names, order_dict):
+        if threading.current_thread().name == "in-flight":
+            generating.wait(timeout=10)
+        return sort_template_names(names, order_dict)
+
+    with (
+        patch(
+            "pygic.gitignore.list_renderable_template_names",
+            slow_list_renderable_template_names,
+        ),
+        patch("pygic.gitignore.sort_template_names", slow_sort_template_names),
+        ThreadPoolExecutor(1, thread_name_prefix="in-flight") as executor,
+    ):
+        in_flight = executor.submit(templates.create, "python", "node")
+        future = templates.reload(new_directory, ignore_num_files_check=True)
+        # The templates are being loaded
+        assert templates.create("python", "node") == old_gitignore
+        loading.set()
+        future.result(timeout=10)
+        assert templates.create("python") == "### Python ###\n*.pyc\n"
+        # The generation started before the swap uses the previous templates
+        generating.set()
+        assert in_flight.result(timeout=10) == old_gitignore
+
+
+def test_concurrent_generations_and_reloads(tmp_path: Path):
+    directories = [
+        make_small_templates(tmp_path / "first", "__pycache__/\n*.pyc\n"),
+        make_small_templates(tmp_path / "second", "*.pyc\n.venv/\n"),
+    ]
+    templates = Gitignore(directory=directories[0], ignore_num_files_check=True)
+    expected = set()
+    for directory in directories:
+        templates.reload(directory, ignore_num_files_check=True).result(timeout=10)
+        expected.add(templates.create("python", "node"))
+
+    def generate() -> set[str]:
+        return {templates.create("python", "node") for _ in range(200)}
+
+    with ThreadPoolExecutor(8) as executor:
+        generations = [executor.submit(generate) for _ in range(8)]
+        reloads = [
+            templates.reload(directories[i % 2], ignore_num_files_check=True)
+            for i in range(10)
+        ]
+        for reload in reloads:
+            reload.result(timeout=10)
+        assert set().union(*(future.result() for future in generations)) <= expected
+    # The last started reload is kept
+    assert templates.directory == directories[1]
+
 
 #######################################################################################
 # Test the remove_duplicated_lines function
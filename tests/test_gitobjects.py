@@ -0,0 +1,145 @@
+import functools
+import pickle
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pygic.cli import pygic
+from pygic.gitignore import CLONE_STAMP_FILE, TEMPLATES_LOCAL_DIR, Gitignore
+from pygic.gitobjects import GitTraversable, fetch_repository, open_git_directory
+
+
+def git(repository: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=pygic", "-c", "user.email=pygic@example.com", *args],
+        cwd=repository,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    """A repository like the toptal/gitignore one, with the local templates tagged `v1`,
+    then a commit changing `Python.gitignore`."""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    source = tmp_path / "source"
+    # `WebStorm.gitignore` is copied as a symbolic link to `JetBrains.gitignore`
+    shutil.copytree(TEMPLATES_LOCAL_DIR, source / "templates", symlinks=True)
+    (source / "README.md").write_text("Templates\n")
+    git(source, "init", "-q", "-b", "main")
+    git(source, "add", ".")
+    git(source, "commit", "-q", "-m", "Add the templates")
+    git(source, "tag", "v1")
+    (source / "templates/Python.gitignore").write_text("*.pyc\n")
+    git(source, "commit", "-q", "-am", "Simplify the Python template")
+    return source
+
+
+@pytest.fixture(params=["gitpython", "dulwich"])
+def backend(request: pytest.FixtureRequest) -> Iterator[str]:
+    """Read and fetch the repositories with GitPython, then with Dulwich."""
+    if request.param == "dulwich":
+        pytest.importorskip("dulwich")
+        with patch("pygic.gitobjects._import_gitpython", return_value=False):
+            yield request.param
+    else:
+        pytest.importorskip("git")
+        yield request.param
+
+
+def test_fetch_and_read_refs(source: Path, tmp_path: Path, backend: str):
+    repository = tmp_path / "toptal.git"
+    fetch_repository(repository, str(source))
+    # Nothing is checked out
+    assert not (repository / "templates").exists()
+    assert (repository / CLONE_STAMP_FILE).is_file()
+
+    head = open_git_directory(repository)
+    assert isinstance(head, GitTraversable)
+    assert head.name == "templates"
+    assert str(head).endswith(f"@{git(source, 'rev-parse', 'HEAD')[:12]}:templates")
+    assert (head / "Python.gitignore").read_text() == "*.pyc\n"
+    assert sorted(entry.name for entry in head.iterdir()) == sorted(
+        entry.name for entry in TEMPLATES_LOCAL_DIR.iterdir()
+    )
+    webstorm = head / "WebStorm.gitignore"
+    assert (
+        webstorm.read_text()
+        == (TEMPLATES_LOCAL_DIR / "JetBrains.gitignore").read_text()
+    )
+
+    old = open_git_directory(repository, "v1")
+    assert (old / "Python.gitignore").read_text() == (
+        TEMPLATES_LOCAL_DIR / "Python.gitignore"
+    ).read_text()
+    commit = git(source, "rev-parse", "v1")
+    assert open_git_directory(repository, commit[:10]) == old
+    assert pickle.loads(pickle.dumps(old)) == old
+
+    with pytest.raises(FileNotFoundError, match="Ref 'v2' does not exist"):
+        open_git_directory(repository, "v2")
+    with pytest.raises(FileNotFoundError, match="'docs' does not exist"):
+        open_git_directory(repository, at="docs")
+    with pytest.raises(FileNotFoundError):
+        (head / "Missing.gitignore").read_bytes()
+
+    # Fetching again gets the new commits
+    git(source, "tag", "v2")
+    fetch_repository(repository, str(source))
+    assert open_git_directory(repository, "v2") == head
+
+    with pytest.raises(ConnectionError, match="Could not fetch"):
+        fetch_repository(repository, str(tmp_path / "missing"))
+
+
+def test_gitignore_from_git_ref(source: Path, tmp_path: Path, backend: str):
+    repository = tmp_path / "toptal.git"
+    fetch_source = functools.partial(fetch_repository, url=str(source))
+    with patch("pygic.gitobjects.fetch_repository", side_effect=fetch_source) as fetch:
+        # The repository is fetched since it does not exist
+        templates = Gitignore.from_git_ref("v1", repository=repository)
+        assert templates.create("python", "webstorm") == Gitignore().create(
+            "python", "webstorm"
+        )
+        python = Gitignore.from_git_ref(repository=repository).create("python")
+        assert "### Python ###\n*.pyc\n" in python
+        assert fetch.call_count == 1
+
+        # A missing ref is fetched
+        (source / "templates/Rust.gitignore").write_text("target/\n")
+        git(source, "commit", "-q", "-am", "Simplify the Rust template")
+        commit = git(source, "rev-parse", "HEAD")
+        templates = Gitignore.from_git_ref(commit, repository=repository)
+        assert "### Rust ###\ntarget/\n" in templates.create("rust")
+        with pytest.raises(FileNotFoundError):
+            Gitignore.from_git_ref("missing", repository=repository)
+        assert fetch.call_count == 3
+
+        Gitignore.from_git_ref(repository=repository, clone_ttl=3600)
+        assert fetch.call_count == 3
+        Gitignore.from_git_ref(repository=repository, clone_ttl=0)
+        Gitignore.from_git_ref(repository=repository, fetch=True)
+        assert fetch.call_count == 5
+
+
+def test_cli_pygic_gen_command_ref(source: Path, tmp_path: Path, backend: str):
+    repository = tmp_path / "toptal.git"
+    fetch_repository(repository, str(source))
+    runner = CliRunner()
+    with patch("pygic.gitignore.GIT_REPOSITORY_DIR", repository):
+        result = runner.invoke(pygic, ["gen", "python", "--ref", "v1"])
+        assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+        assert result.output == Gitignore().create("python")
+
+        with patch("pygic.gitobjects.fetch_repository"):
+            result = runner.invoke(pygic, ["gen", "python", "--ref", "missing"])
+        assert result.exit_code == 1
+        assert "Ref 'missing' does not exist" in result.output
@@ -0,0 +1,302 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pygic.gitignore import TEMPLATES_LOCAL_DIR, Gitignore
+from pygic.index import (
+    RACY_INTERVAL_NS,
+    FileNameIndex,
+    TemplateIndex,
+    _get_file_name_index,
+    get_file_name_index,
+    get_index_path,
+    get_template_index,
+)
+
+
+def set_old_mtime(directory: Path) -> Path:
+    """Set the modification time of a directory further in the past than `RACY_INTERVAL_NS`,
+    so that its indexes are cached."""
+    mtime_ns = time.time_ns() - 2 * RACY_INTERVAL_NS
+    os.utime(directory, ns=(mtime_ns, mtime_ns))
+    return directory
+
+
+@pytest.fixture
+def templates_directory(tmp_path: Path) -> Path:
+    directory = tmp_path / "templates"
+    directory.mkdir()
+    (directory / "order").write_text("python\n")
+    (directory / "Python.gitignore").write_text("__pycache__/\n")
+    (directory / "ReactNative.gitignore").write_text("# React Native\n")
+    (directory / "ReactNative.Node.stack").write_text("node_modules/\n")
+    (directory / "ReactNative.macOS.stack").write_text(".DS_Store\n")
+    (directory / "Rider.patch").write_text(".idea/\n")
+    (directory / "Rider+all.patch").write_text(".idea/\n")
+    (directory / "Rider.gitignore").write_text("*.sln.iml\n")
+    return set_old_mtime(directory)
+
+
+def test_template_index_from_directory(templates_directory: Path):
+    index = TemplateIndex.from_directory(templates_directory)
+    assert [template.to_dict() for template in index.templates] == [
+        {"name": "Python", "has_gitignore": True, "has_patch": False, "stacks": []},
+        {
+            "name": "ReactNative",
+            "has_gitignore": True,
+            "has_patch": False,
+            "stacks": ["macOS", "Node"],
+        },
+        {"name": "Rider", "has_gitignore": True, "has_patch": True, "stacks": []},
+        {"name": "Rider+all", "has_gitignore": False, "has_patch": True, "stacks": []},
+    ]
+
+
+def test_template_index_matches_gitignore():
+    """The templates with a `.gitignore` file are the ones listed by `Gitignore`."""
+    index = TemplateIndex.from_directory(TEMPLATES_LOCAL_DIR)
+    assert [
+        template.name for template in index.templates if template.has_gitignore
+    ] == sorted(Gitignore().list_template_names(), key=str.lower)
+
+
+def test_template_index_filter(templates_directory: Path):
+    index = TemplateIndex.from_directory(templates_directory)
+
+    def names(**kwargs) -> list[str]:
+        return [template.name for template in index.filter(**kwargs)]
+
+    assert names() == ["Python", "ReactNative", "Rider", "Rider+all"]
+    assert names(prefix="r") == ["ReactNative", "Rider", "Rider+all"]
+    assert names(substring="ALL") == ["Rider+all"]
+    assert names(prefix="rid", substring="+") == ["Rider+all"]
+    assert names(prefix="native") == []
+
+
+def test_get_template_index_is_persisted(templates_directory: Path, tmp_path: Path):
+    cache_directory = tmp_path / "cache"
+    index = get_template_index(templates_directory, cache_directory)
+    assert get_index_path(templates_directory, cache_directory).is_file()
+
+    # The persisted index is used while the directory is unchanged
+    with patch.object(TemplateIndex, "from_directory") as from_directory:
+        persisted_index = get_template_index(templates_directory, cache_directory)
+    from_directory.assert_not_called()
+    assert [template.to_dict() for template in persisted_index.templates] == [
+        template.to_dict() for template in index.templates
+    ]
+
+    # Adding a template changes the modification time of the directory
+    (templates_directory / "Node.gitignore").write_text("node_modules/\n")
+    set_old_mtime(templates_directory)
+    index = get_template_index(templates_directory, cache_directory)
+    assert "Node" in [template.name for template in index.templates]
+    with patch.object(TemplateIndex, "from_directory") as from_directory:
+        get_template_index(templates_directory, cache_directory)
+    from_directory.assert_not_called()
+
+
+@pytest.mark.parametrize("content", ["", "{", "[]", '{"format": 1}'])
+def test_get_template_index_invalid_persisted_index(
+    templates_directory: Path, tmp_path: Path, content: str
+):
+    cache_directory = tmp_path / "cache"
+    cache_directory.mkdir()
+    get_index_path(templates_directory, cache_directory).write_text(content)
+    index = get_template_index(templates_directory, cache_directory)
+    assert len(index.templates) == 4
+    # The invalid index is replaced
+    with patch.object(TemplateIndex, "from_directory") as from_directory:
+        get_template_index(templates_directory, cache_directory)
+    from_directory.assert_not_called()
+
+
+def test_get_template_index_unwritable_cache(templates_directory: Path, tmp_path: Path):
+    cache_file = tmp_path / "cache"
+    cache_file.write_text("not a directory")
+    index = get_template_index(templates_directory, cache_file)
+    assert len(index.templates) == 4
+
+
+def make_synthetic_directory(directory: Path, num_templates: int) -> Path:
+    """Create a template directory with `num_templates` templates, every tenth one with a patch and a stack."""
+    directory.mkdir()
+    (directory / "order").write_text("t000001\nt000000\n")
+    for i in range(num_templates):
+        (directory / f"T{i:06d}.gitignore").write_text(f"/t{i}/\n")
+        if i % 10 == 0:
+            (directory / f"T{i:06d}.patch").write_text(f"/t{i}.patch/\n")
+            (directory / f"T{i:06d}.Linux.stack").write_text(f"/t{i}.linux/\n")
+    return set_old_mtime(directory)
+
+
+def test_file_name_index_from_file_names():
+    index = FileNameIndex.from_file_names(
+        [
+            "order",
+            "Rider.gitignore",
+            "rider+all.patch",
+            "Rider.patch",
+            "README.md",
+            "docs",
+        ]
+    )
+    assert (index.num_entries, index.num_files, index.has_order) == (6, 4, True)
+    assert index.invalid_file == "README.md"
+    assert sorted(index.get_file_names("rider")) == ["Rider.gitignore", "Rider.patch"]
+    assert index.get_file_names("rider+all") == ["rider+all.patch"]
+    assert index.get_file_names("python") == []
+
+
+def test_file_name_index_is_persisted(templates_directory: Path, tmp_path: Path):
+    cache_directory = tmp_path / "cache"
+    index = get_file_name_index(templates_directory, cache_directory)
+    _get_file_name_index.cache_clear()
+    with patch("os.listdir") as listdir:
+        persisted_index = get_file_name_index(templates_directory, cache_directory)
+        assert sorted(persisted_index.get_file_names("reactnative")) == sorted(
+            index.get_file_names("reactnative")
+        )
+    listdir.assert_not_called()
+    assert (persisted_index.num_entries, persisted_index.num_files) == (8, 7)
+
+    # Only the index of the current version of the directory is kept
+    (templates_directory / "Node.gitignore").write_text("node_modules/\n")
+    set_old_mtime(templates_directory)
+    index = get_file_name_index(templates_directory, cache_directory)
+    assert index.get_file_names("node") == ["Node.gitignore"]
+    assert len(list(cache_directory.glob("*.files"))) == 1
+
+    # A corrupted shard is reported
+    (shards_directory,) = cache_directory.glob("*.files")
+    for shard in shards_directory.glob("[0-9a-f]*.json"):
+        shard.write_text("{")
+    _get_file_name_index.cache_clear()
+    with pytest.raises(ValueError, match="Invalid file name index"):
+        get_file_name_index(templates_directory, cache_directory).get_file_names("node")
+
+
+def test_file_name_index_of_a_recently_modified_directory(
+    templates_directory: Path, tmp_path: Path
+):
+    cache_directory = tmp_path / "cache"
+    # A change in the same timestamp tick as the index would not change the modification time
+    os.utime(templates_directory)
+    get_file_name_index(templates_directory, cache_directory)
+    assert not cache_directory.exists()
+    (templates_directory / "Node.gitignore").write_text("node_modules/\n")
+    assert get_file_name_index(templates_directory, cache_directory).get_file_names(
+        "node"
+    ) == ["Node.gitignore"]
+    assert not cache_directory.exists()
+
+
+def test_file_name_index_removed_shards(templates_directory: Path, tmp_path: Path):
+    cache_directory = tmp_path / "cache"
+    get_file_name_index(templates_directory, cache_directory)
+    _get_file_name_index.cache_clear()
+    index = get_file_name_index(templates_directory, cache_directory)
+
+    # Another process indexes the new version of the directory and removes the shards of this one
+    (shards_directory,) = cache_directory.glob("*.files")
+    shutil.rmtree(shards_directory)
+    assert sorted(index.get_file_names("rider")) == ["Rider.gitignore", "Rider.patch"]
+    assert index.get_file_names("python") == ["Python.gitignore"]
+
+
+@pytest.mark.parametrize("num_templates", [10, 1_000, 10_000])
+def test_lookup_cost_is_independent_of_the_number_of_templates(
+    tmp_path: Path, num_templates: int
+):
+    """Benchmark the templates of a synthetic directory in a new process, by counting the listings
+    of the directory and the reads of the index, which do not depend on the number of templates."""
+    directory = make_synthetic_directory(tmp_path / "templates", num_templates)
+    Gitignore(directory, ignore_num_files_check=True)
+
+    # Simulate a new process, which finds the persisted index
+    _get_file_name_index.cache_clear()
+    with (
+        patch("os.listdir", wraps=os.listdir) as listdir,
+        patch.object(
+            Path, "iterdir", autospec=True, side_effect=Path.iterdir
+        ) as iterdir,
+        patch.object(
+            Path, "read_text", autospec=True, side_effect=Path.read_text
+        ) as read_text,
+    ):
+        templates = Gitignore(directory, ignore_num_files_check=True)
+        gitignore = templates.create("t000000", "t000001")
+    assert gitignore == (
+        "### T000001 ###\n/t1/\n\n"
+        "### T000000 ###\n/t0/\n\n"
+        "### T000000 Patch ###\n/t0.patch/\n\n"
+        "### T000000.Linux Stack ###\n/t0.linux/\n"
+    )
+    listdir.assert_not_called()
+    iterdir.assert_not_called()
+    # The manifest of the index, and the shards of the 2 names
+    assert read_text.call_count == 3
+    assert all(
+        call.args[0].parent.suffix == ".files" for call in read_text.call_args_list
+    )
+
+
+LOOKUP_BENCHMARK_SIZES = (600, 10_000)
+"""The numbers of templates of the small and the large directories of the lookup benchmark."""
+
+LOOKUP_SLOWDOWN_BUDGET = 3
+"""How many times slower the lookups in the large directory of the benchmark can be than in the small one,
+about twice what is measured, since the shards read are larger."""
+
+
+def time_lookup(directory: Path) -> float:
+    """Get the best duration, in seconds, of the validation of a template directory and the generation
+    of 2 of its templates in a simulated new process, which finds the persisted index."""
+    Gitignore(directory)
+    durations = []
+    for _ in range(7):
+        _get_file_name_index.cache_clear()
+        start = time.perf_counter()
+        Gitignore(directory).create("t000000", "t000001")
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def test_lookup_duration_is_independent_of_the_number_of_templates(
+    tmp_path: Path, lookup_timings: dict[int, float]
+):
+    for num_templates in LOOKUP_BENCHMARK_SIZES:
+        directory = make_synthetic_directory(
+            tmp_path / f"templates-{num_templates}", num_templates
+        )
+        lookup_timings[num_templates] = time_lookup(directory)
+    small_duration, large_duration = (
+        lookup_timings[num_templates] for num_templates in LOOKUP_BENCHMARK_SIZES
+    )
+    # With 1 ms of slack for the noise of the timer on slow runners
+    assert large_duration <= LOOKUP_SLOWDOWN_BUDGET * small_duration + 1e-3, (
+        f"The lookups take {large_duration * 1000:.2f} ms with {LOOKUP_BENCHMARK_SIZES[1]} templates, "
+        f"more than {LOOKUP_SLOWDOWN_BUDGET} times the {small_duration * 1000:.2f} ms "
+        f"with {LOOKUP_BENCHMARK_SIZES[0]} templates"
+    )
+
+
+def test_validation_is_only_done_again_when_the_directory_changes(tmp_path: Path):
+    directory = make_synthetic_directory(tmp_path / "templates", 600)
+    Gitignore(directory)
+    _get_file_name_index.cache_clear()
+    with patch("os.listdir", wraps=os.listdir) as listdir:
+        Gitignore(directory)
+    listdir.assert_not_called()
+
+    (directory / "notes.txt").write_text("")
+    with pytest.raises(ValueError, match="notes.txt' is not a valid template file"):
+        Gitignore(directory)
+    (directory / "notes.txt").unlink()
+    (directory / "order").unlink()
+    with pytest.raises(FileNotFoundError, match="order' does not exist"):
+        Gitignore(directory)
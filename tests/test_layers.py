@@ -0,0 +1,124 @@
+import pickle
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pygic.cli import pygic
+from pygic.gitignore import TEMPLATES_LOCAL_DIR, Gitignore, read_order_file
+from pygic.layers import LayeredTraversable, open_layered_directory
+
+
+@pytest.fixture
+def overlay(tmp_path: Path) -> Path:
+    """An overlay directory replacing the patch of Python (in lowercase) and adding a `Custom` template."""
+    overlay = tmp_path / "overlay"
+    overlay.mkdir()
+    (overlay / "python.patch").write_text("# Custom patch\n*.mine\n")
+    (overlay / "Custom.gitignore").write_text("custom/\n")
+    (overlay / "order").write_text("custom\npython\n")
+    return overlay
+
+
+def test_open_layered_directory(overlay: Path):
+    directory = open_layered_directory(TEMPLATES_LOCAL_DIR, overlay)
+    assert isinstance(directory, LayeredTraversable)
+    assert directory.is_dir() and not directory.is_file()
+    assert directory.name == "templates"
+
+    names = {entry.name for entry in directory.iterdir()}
+    assert names == {entry.name for entry in TEMPLATES_LOCAL_DIR.iterdir()} | {
+        "Custom.gitignore"
+    }
+    # The overlay file replaces the base one under the name of the base one
+    assert "python.patch" not in names
+    assert (directory / "Python.patch").read_text() == "# Custom patch\n*.mine\n"
+    assert (directory / "Python.gitignore").read_text() == (
+        TEMPLATES_LOCAL_DIR / "Python.gitignore"
+    ).read_text()
+    assert (directory / "Custom.gitignore").is_file()
+    assert not (directory / "Missing.gitignore").exists()
+    with pytest.raises(FileNotFoundError):
+        (directory / "Missing.gitignore").read_bytes()
+
+    # The new names of the overlay `order` file are ranked after the base ones
+    base_order = list(read_order_file(TEMPLATES_LOCAL_DIR / "order"))
+    assert list(read_order_file(directory / "order")) == [
+        *base_order,
+        "custom",
+        "python",
+    ]
+
+    assert str(directory) == f"{TEMPLATES_LOCAL_DIR} + {overlay}"
+    assert pickle.loads(pickle.dumps(directory)) == directory
+    assert pickle.loads(pickle.dumps(directory / "Python.patch")) == (
+        directory / "Python.patch"
+    )
+
+    with pytest.raises(ValueError, match="At least one"):
+        open_layered_directory()
+    with pytest.raises(NotADirectoryError):
+        open_layered_directory(TEMPLATES_LOCAL_DIR, overlay / "order")
+
+
+def test_gitignore_with_overlays(overlay: Path, tmp_path: Path):
+    templates = Gitignore().with_overlays(overlay)
+    python = templates.create("python")
+    assert python.startswith(
+        Gitignore().create_one_gitignore("python").split("### Python Patch ###")[0]
+    )
+    assert "### Python Patch ###\n# Custom patch\n*.mine\n" in python
+    assert "Custom" in templates.list_template_names()
+    assert templates.create("python", "custom").startswith("### Custom ###\n")
+
+    # The uppermost overlay wins
+    upper = tmp_path / "upper"
+    upper.mkdir()
+    (upper / "CUSTOM.gitignore").write_text("upper/\n")
+    custom = Gitignore().with_overlays(overlay, upper).create("custom")
+    assert "### Custom ###\nupper/\n" in custom
+
+    assert templates.with_overlays() is templates
+    (upper / "README.md").write_text("Templates\n")
+    with pytest.raises(ValueError, match="not a valid template file"):
+        Gitignore().with_overlays(upper)
+
+
+def test_overlays_are_listed_once(overlay: Path):
+    templates = Gitignore().with_overlays(overlay)
+    with (
+        patch.object(
+            Path, "iterdir", autospec=True, side_effect=Path.iterdir
+        ) as iterdir,
+        patch.object(Path, "stat", autospec=True, side_effect=Path.stat) as stat,
+    ):
+        for _ in range(3):
+            templates.create("python", "custom")
+            templates.create_one_gitignore("rust")
+    assert iterdir.call_count == 0
+    # Only the read files are accessed
+    assert all(call.args[0].name != "templates" for call in stat.call_args_list)
+
+
+def test_cli_pygic_gen_command_overlay(overlay: Path):
+    runner = CliRunner()
+    result = runner.invoke(
+        pygic, ["gen", "python", "custom", "--overlay", str(overlay)]
+    )
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert result.output == Gitignore().with_overlays(overlay).create(
+        "python", "custom"
+    )
+
+    result = runner.invoke(
+        pygic, ["gen", "custom"], env={"PYGIC_OVERLAY": str(overlay)}
+    )
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "### Custom ###\ncustom/\n" in result.output
+
+    result = runner.invoke(
+        pygic, ["gen", "python", "--overlay", str(overlay / "order")]
+    )
+    assert result.exit_code == 1
+    assert "is not a directory" in result.output
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from pygic.config import ROOT_DIR
+from pygic.gitignore import (
+    TEMPLATES_LOCAL_DIR,
+    Gitignore,
+    list_renderable_template_names,
+    remove_duplicated_lines,
+)
+from pygic.lines import LineTable
+
+
+@pytest.mark.parametrize(
+    "pieces",
+    [
+        [""],
+        ["a\nb\n", "b\n# b\n\n# b\n a \n"],
+        ["### A ###\n*.log\n", "### B ###\n*.log\n  *.log\n"],
+        ["a", "a\n", "\nb\n\n"],
+    ],
+)
+def test_merge(pieces: list[str]):
+    table = LineTable()
+    line_ids = [table.intern_content(piece) for piece in pieces]
+    assert table.merge(line_ids) == remove_duplicated_lines("\n".join(pieces))
+    for piece, piece_line_ids in zip(pieces, line_ids):
+        assert table.render(piece_line_ids) == piece
+
+
+def test_intern():
+    table = LineTable()
+    assert table.intern("*.log") == table.intern("*.log")
+    assert len(table) == 1
+    # Lines with the same stripped content share the same deduplication key
+    assert table.keys[table.intern("  *.log")] == table.keys[table.intern("*.log")]
+    assert table.keys[table.intern("")] == table.keys[table.intern("# *.log")] == -1
+
+
+def test_ingest():
+    templates = Gitignore()
+    expected = {
+        name: templates.create_one_gitignore(name)
+        for name in list_renderable_template_names(TEMPLATES_LOCAL_DIR)
+    }
+
+    templates.ingest()
+    table = templates._Gitignore__loaded.line_table
+    # Lines shared by several templates are stored once
+    num_lines = sum(content.count("\n") + 1 for content in expected.values())
+    assert len(table) < num_lines / 2
+    for name, content in expected.items():
+        assert templates.create_one_gitignore(name) == content
+
+    for file in sorted((ROOT_DIR / "tests" / "targets").glob("*.gitignore")):
+        assert templates.create(*file.stem.split(".")) == file.read_text()
+
+
+def test_ingest_ignores_later_changes(tmp_path: Path):
+    directory = tmp_path / "templates"
+    directory.mkdir()
+    (directory / "order").write_text("")
+    (directory / "Python.gitignore").write_text("__pycache__/\n")
+    templates = Gitignore(directory=directory, ignore_num_files_check=True)
+
+    templates.ingest("python")
+    (directory / "Python.gitignore").write_text("*.pyc\n")
+    assert templates.create("python") == "### Python ###\n__pycache__/\n"
+
+    with pytest.raises(FileNotFoundError):
+        templates.ingest("node")
@@ -0,0 +1,169 @@
+import gc
+import multiprocessing
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+from unittest.mock import patch
+
+import pytest
+
+from pygic.gitignore import (
+    TEMPLATES_LOCAL_DIR,
+    Gitignore,
+    list_renderable_template_names,
+    remove_duplicated_lines,
+)
+
+KIB = 1024
+
+MULTI_TEMPLATE_NAMES = (
+    "python",
+    "java",
+    "gradle",
+    "node",
+    "visualstudio",
+    "macos",
+    "jetbrains+all",
+    "c",
+    "rust",
+    "go",
+)
+
+
+def init_templates() -> object:
+    return Gitignore()
+
+
+def create_single_template() -> object:
+    templates = Gitignore()
+    return templates, templates.create("python")
+
+
+def create_multi_templates() -> object:
+    templates = Gitignore()
+    return templates, templates.create(*MULTI_TEMPLATE_NAMES)
+
+
+def create_all_templates() -> object:
+    templates = Gitignore()
+    return templates, templates.create(
+        *list_renderable_template_names(templates.directory)
+    )
+
+
+def create_batch() -> object:
+    templates = Gitignore()
+    names = list_renderable_template_names(templates.directory)
+    for name in names:
+        templates.create(name)
+    for i in range(len(names)):
+        templates.create(*names[i : i + 5])
+    return templates
+
+
+def ingest_templates() -> object:
+    templates = Gitignore()
+    templates.ingest()
+    return templates
+
+
+def read_kitchen_sink_content() -> str:
+    """The content of every template file, concatenated, to remove its duplicated lines."""
+    return "\n".join(
+        path.read_text()
+        for path in sorted(TEMPLATES_LOCAL_DIR.iterdir())
+        if path.suffix in (".gitignore", ".patch", ".stack")
+    )
+
+
+SCENARIOS: dict[str, Callable[..., object]] = {
+    "init": init_templates,
+    "single": create_single_template,
+    "multi": create_multi_templates,
+    "all": create_all_templates,
+    "batch": create_batch,
+    "ingest": ingest_templates,
+    "dedup": remove_duplicated_lines,
+}
+"""What is measured by each memory benchmark, returning what stays in memory afterwards."""
+
+SCENARIO_INPUTS: dict[str, Callable[[], object]] = {
+    "dedup": read_kitchen_sink_content,
+}
+"""The inputs of the scenarios, created before measuring them."""
+
+MEMORY_BUDGETS: dict[str, tuple[int, int]] = {
+    "init": (64 * KIB, 64 * KIB),
+    "single": (576 * KIB, 576 * KIB),
+    "multi": (832 * KIB, 736 * KIB),
+    "all": (6144 * KIB, 4672 * KIB),
+    "batch": (4224 * KIB, 3904 * KIB),
+    "ingest": (4224 * KIB, 4160 * KIB),
+    "dedup": (2816 * KIB, 768 * KIB),
+}
+"""The peak and retained memory allowed for each scenario, in bytes, about 1.5 times what they use
+with an empty index cache, i.e. including the index of the template directory that is built."""
+
+
+def measure_memory(scenario: str, index_cache_directory: Path) -> tuple[int, int]:
+    """Measure the peak and retained memory allocated by a scenario, in bytes, with `tracemalloc`.
+
+    The index of the template directory is persisted in `index_cache_directory` instead of the cache
+    of the user, since the patches of the fixtures do not apply in the processes running the scenarios.
+    """
+    with patch("pygic.gitignore.INDEX_CACHE_DIR", index_cache_directory):
+        get_input = SCENARIO_INPUTS.get(scenario)
+        args = () if get_input is None else (get_input(),)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            retained_object = SCENARIOS[scenario](*args)
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del retained_object
+    return peak - start, current - start
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_memory_budget(
+    scenario: str,
+    index_cache_directory: Path,
+    memory_usages: dict[str, tuple[int, int]],
+):
+    # Run the scenario in a new process, so that the caches filled by the other tests are not shared
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        peak, retained = executor.submit(
+            measure_memory, scenario, index_cache_directory
+        ).result()
+    memory_usages[scenario] = peak, retained
+    peak_budget, retained_budget = MEMORY_BUDGETS[scenario]
+    assert peak <= peak_budget, (
+        f"The {scenario} scenario allocates {peak / KIB:.0f} KiB at its peak, "
+        f"more than its budget of {peak_budget / KIB:.0f} KiB"
+    )
+    assert retained <= retained_budget, (
+        f"The {scenario} scenario retains {retained / KIB:.0f} KiB, "
+        f"more than its budget of {retained_budget / KIB:.0f} KiB"
+    )
+
+
+def test_discarded_templates_are_released():
+    # Fill the caches shared by the instances (e.g. the file name index of the template directory)
+    create_multi_templates()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for _ in range(20):
+            create_multi_templates()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert retained < 64 * KIB
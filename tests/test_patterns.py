@@ -0,0 +1,175 @@
+import pytest
+from conftest import generate_paths
+
+from pygic.gitignore import Gitignore
+from pygic.patterns import Rule, is_ignored, minimize, parse_rule
+
+
+@pytest.mark.parametrize(
+    "line, path, is_directory, expected",
+    [
+        ("*.log", "a.log", False, True),
+        ("*.log", "dir/sub/a.log", False, True),
+        ("*.log", "a.log/b", False, False),
+        ("/build", "build", False, True),
+        ("/build", "dir/build", False, False),
+        ("build/", "build", False, False),
+        ("build/", "dir/build", True, True),
+        ("doc/*.txt", "doc/a.txt", False, True),
+        ("doc/*.txt", "doc/sub/a.txt", False, False),
+        ("**/foo", "a/b/foo", False, True),
+        ("a/**/b", "a/b", False, True),
+        ("a/**/b", "a/x/y/b", False, True),
+        ("a/**", "a/x/y", False, True),
+        ("a/**", "a", True, False),
+        ("*.py[cod]", "a.pyc", False, True),
+        ("*.py[!cod]", "a.pyx", False, True),
+        ("*.py[!cod]", "a.pyc", False, False),
+        ("a[/]b", "a/b", False, False),
+        ("\\#file", "#file", False, True),
+        ("\\!important", "!important", False, True),
+        ("trailing   ", "trailing", False, True),
+        ("space\\ ", "space ", False, True),
+        ("?.txt", "/.txt", False, False),
+    ],
+)
+def test_rule_matches(line: str, path: str, is_directory: bool, expected: bool):
+    assert Rule(line).matches(path, is_directory) == expected
+
+
+def test_parse_rule():
+    assert parse_rule("") is None
+    assert parse_rule("   ") is None
+    assert parse_rule("# comment") is None
+    rule = parse_rule("!/build/")
+    assert rule.negated and rule.directory_only and rule.anchored
+    assert rule.glob == "build"
+    rule = parse_rule("*.log")
+    assert not rule.negated and not rule.directory_only and not rule.anchored
+    assert rule.glob == "**/*.log"
+
+
+def test_is_ignored():
+    rules = [Rule("*.log"), Rule("!important.log"), Rule("logs/")]
+    assert is_ignored(rules, "debug.log")
+    assert not is_ignored(rules, "sub/important.log")
+    assert not is_ignored(rules, "logs")
+    assert is_ignored(rules, "logs", is_directory=True)
+    assert not is_ignored(rules, "a.txt")
+
+
+@pytest.mark.parametrize(
+    "including, included, expected",
+    [
+        ("*.py[cod]", "*.pyc", True),
+        ("*.pyc", "*.py[cod]", False),
+        ("build/", "/build/", True),
+        ("/build/", "build/", False),
+        ("build", "build/", True),
+        ("build/", "build", False),
+        ("*", "a/b", True),
+        ("/*", "a/b", False),
+        ("/*", "/a", True),
+        ("**/logs/**", "logs/*.log", True),
+        ("a/**", "a/*/b", True),
+        ("*.user", "*.DotSettings.user", True),
+        ("*pass*", "*password*", True),
+        ("*password*", "*pass*", False),
+        ("[a-z]*", "abc", True),
+        ("[a-z]*", "Abc", False),
+        ("?", "[ab]", True),
+    ],
+)
+def test_rule_subsumes(including: str, included: str, expected: bool):
+    assert Rule(including).subsumes(Rule(included)) == expected
+
+
+def test_minimize():
+    content = "\n".join(
+        [
+            "### Python ###",
+            "*.py[cod]",
+            "*.pyc",
+            "",
+            "# Build",
+            "/build/",
+            "build/",
+            "!build/keep/",
+            "*.log",
+            "!important.log",
+            "important.log",
+            "debug.log",
+            "[[:space:]]",
+            "",
+        ]
+    )
+    result = minimize(content)
+    assert result.num_rules == 10
+    assert [(rule.line, by.line) for rule, by in result.removed] == [
+        ("*.pyc", "*.py[cod]"),
+        ("/build/", "build/"),
+        # Never decides anything since `important.log` comes after it
+        ("!important.log", "important.log"),
+        ("important.log", "*.log"),
+        ("debug.log", "*.log"),
+    ]
+    assert result.content == "\n".join(
+        [
+            "### Python ###",
+            "*.py[cod]",
+            "",
+            "# Build",
+            "build/",
+            "!build/keep/",
+            "*.log",
+            "[[:space:]]",
+            "",
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "content, expected_content",
+    [
+        # An earlier rule does not subsume a rule separated from it by a negation
+        ("*.log\n!*.tmp.log\na.tmp.log\n", "*.log\n!*.tmp.log\na.tmp.log\n"),
+        ("*.log\n!keep.log\nkeep.log/\n", "*.log\n!keep.log\nkeep.log/\n"),
+        # A rule subsumed by a later rule never decides anything, even a negation
+        ("*.log\n!*.log\nkeep.log\n", "!*.log\nkeep.log\n"),
+        ("!a.log\n*.log\n", "*.log\n"),
+        ("*.log\n!a.log\n*.log\n!b.log\na.log\n", "*.log\n!b.log\na.log\n"),
+    ],
+)
+def test_minimize_negations(content: str, expected_content: str):
+    assert minimize(content).content == expected_content
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        ["python", "c", "java"],
+        ["node", "react", "visualstudio", "jetbrains+all", "macos"],
+        ["cordova", "androidstudio", "gradle", "bitrix"],
+    ],
+)
+def test_minimize_matches_git(git_ignored_paths, names: list[str]):
+    """Git ignores exactly the same paths with the minimized gitignore."""
+    content = Gitignore().create(*names)
+    result = minimize(content)
+    assert result.removed
+
+    paths = generate_paths(content)
+    assert git_ignored_paths(content, paths) == git_ignored_paths(result.content, paths)
+
+
+def test_minimize_rule_matching_nothing():
+    # A bracket expression never matches a slash, so these rules never match anything
+    assert Rule("[/]").examples == ()
+    assert not Rule("[/]").matches("a")
+    result = minimize("*\n[/]\na[/]b/\n")
+    assert [(rule.line, by.line) for rule, by in result.removed] == [
+        ("[/]", "*"),
+        ("a[/]b/", "*"),
+    ]
+    assert result.content == "*\n"
+    assert minimize("[/]\n").content == "[/]\n"
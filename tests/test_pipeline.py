@@ -0,0 +1,126 @@
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pygic.cli import pygic
+from pygic.gitignore import TEMPLATES_LOCAL_DIR, Gitignore
+from pygic.patterns import parse_rule
+from pygic.pipeline import (
+    COMPACT_STAGES,
+    SourceMap,
+    get_section_file_name,
+    iter_source_lines,
+    render_lines,
+    run_pipeline,
+)
+
+
+def test_get_section_file_name():
+    assert get_section_file_name("Python") == "Python.gitignore"
+    assert get_section_file_name("Python Patch") == "Python.patch"
+    assert get_section_file_name("ReactNative.Linux Stack") == "ReactNative.Linux.stack"
+
+
+def test_iter_source_lines():
+    templates = Gitignore()
+    content = templates.create("reactnative", "java", "python", "jetbrains+all")
+    lines = list(iter_source_lines(content, templates.directory))
+    assert "".join(render_lines(lines)) == content
+
+    rules = [line for line in lines if line.is_rule]
+    assert {line.file_name for line in lines if line.is_header} >= {
+        "ReactNative.gitignore",
+        "ReactNative.Linux.stack",
+        "Python.patch",
+    }
+    for line in rules:
+        file_lines = (TEMPLATES_LOCAL_DIR / line.file_name).read_text().splitlines()
+        assert file_lines[line.line_number - 1] == line.text
+
+    # Without the template directory, only the line numbers are unknown
+    assert [
+        (line.text, line.file_name, line.line_number)
+        for line in iter_source_lines("# Top\n### C ###\n*.o\n### Not A Template ###\n")
+    ] == [
+        ("# Top", None, None),
+        ("### C ###", "C.gitignore", None),
+        ("*.o", "C.gitignore", None),
+        ("### Not A Template ###", "Not A Template.gitignore", None),
+    ]
+
+
+def test_compact_pipeline():
+    templates = Gitignore()
+    content = templates.create("python", "node", "macos")
+    compact = "".join(
+        render_lines(
+            run_pipeline(
+                iter_source_lines(content, templates.directory), COMPACT_STAGES
+            )
+        )
+    )
+    expected_rules = [
+        line for line in content.splitlines() if parse_rule(line) is not None
+    ]
+    assert compact.splitlines() == expected_rules
+    assert len(compact) < len(content) / 2
+
+
+def test_sort_rules_keeps_negations_in_place():
+    content = "### C ###\n*.o\nbuild/\n*.a\n!keep.a\nz\ny\n# Comment\nb\na\n"
+    lines = run_pipeline(
+        iter_source_lines(content), ["strip-headers", "strip-comments", "sort"]
+    )
+    assert [line.text for line in lines] == [
+        "*.a",
+        "*.o",
+        "build/",
+        "!keep.a",
+        "a",
+        "b",
+        "y",
+        "z",
+    ]
+    lines = run_pipeline(iter_source_lines(content), ["strip-headers", "sort"])
+    assert [line.text for line in lines][4:] == ["y", "z", "# Comment", "a", "b"]
+
+
+def test_source_map():
+    templates = Gitignore()
+    source_map = SourceMap()
+    output = list(
+        render_lines(
+            run_pipeline(
+                iter_source_lines(templates.create("python"), templates.directory),
+                ["strip-comments", "strip-blank", "sort"],
+            ),
+            source_map,
+        )
+    )
+    entries = json.loads(source_map.to_json())["rules"]
+    assert len(entries) == len(output) - 2  # The headers of the sections
+    for entry in entries:
+        assert output[entry["line"] - 1] == f"{entry['rule']}\n"
+        assert entry["section"] in ("Python", "Python Patch")
+        file_lines = (TEMPLATES_LOCAL_DIR / entry["file"]).read_text().splitlines()
+        assert file_lines[entry["file_line"] - 1] == entry["rule"]
+
+
+def test_cli_pygic_gen_compact(tmp_path: Path):
+    runner = CliRunner()
+    source_map = tmp_path / "gitignore.map.json"
+    result = runner.invoke(
+        pygic, ["gen", "python", "--compact", "--source-map", str(source_map)]
+    )
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert "#" not in result.output
+    assert "__pycache__/\n" in result.output
+    entries = json.loads(source_map.read_text())["rules"]
+    assert len(entries) == len(result.output.splitlines())
+    assert entries[0]["file"] == "Python.gitignore"
+
+    result = runner.invoke(pygic, ["gen", "python", "--strip", "blank", "--sort"])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert result.output.startswith("### Python ###\n# Byte-compiled")
+    assert "\n\n" not in result.output
@@ -0,0 +1,198 @@
+import random
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from pygic.cli import pygic
+from pygic.gitignore import Gitignore
+from pygic.patterns import Rule, RuleMatcher
+from pygic.precommit import find_ignored_files, get_section_rules, get_staged_files
+
+requires_git = pytest.mark.skipif(
+    shutil.which("git") is None, reason="git is not installed"
+)
+
+GIT = ["git", "-c", "user.name=pygic", "-c", "user.email=pygic@example.com"]
+
+
+def git(repository: Path, *args: str) -> str:
+    return subprocess.run(
+        [*GIT, *args], cwd=repository, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def make_tree(root: Path, seed: int) -> list[str]:
+    """Create random files, with names and directories matched by the common templates."""
+    rng = random.Random(seed)
+    directories = [
+        "",
+        "src",
+        "src/pkg",
+        "build",
+        "src/build",
+        "node_modules/react",
+        "__pycache__",
+        "src/pkg/__pycache__",
+        ".idea",
+        ".idea/libraries",
+        "target/debug",
+        "lib",
+        "dist",
+        "docs/_build",
+        "bin",
+        "obj/Debug",
+        ".venv/lib",
+    ]
+    names = [
+        "main.py",
+        "main.pyc",
+        "module.pyo",
+        "lib.so",
+        "app.o",
+        "app.exe",
+        "Main.class",
+        "app.jar",
+        "notes.log",
+        ".DS_Store",
+        "workspace.xml",
+        "Cargo.lock",
+        "index.js",
+        "npm-debug.log.1",
+        ".env",
+        "file~",
+        "README.md",
+        "setup.egg-info",
+        "local.properties",
+        "coverage.xml",
+        "Thumbs.db",
+    ]
+    paths = []
+    for directory in directories:
+        for name in rng.sample(names, 8):
+            path = f"{directory}/{name}" if directory else name
+            (root / path).parent.mkdir(parents=True, exist_ok=True)
+            (root / path).write_text("")
+            paths.append(path)
+    return paths
+
+
+@requires_git
+def test_rule_matcher_matches_git(tmp_path: Path):
+    templates = ("python", "java", "node", "rust", "c", "macos", "jetbrains+all")
+    content = Gitignore().create(*templates)
+    paths = make_tree(tmp_path, seed=0)
+    (tmp_path / ".gitignore").write_text(content)
+    git(tmp_path, "init", "-q")
+    expected = set(
+        git(
+            tmp_path,
+            "ls-files",
+            "--others",
+            "--ignored",
+            "--exclude-standard",
+            "-z",
+        ).split("\0")
+    ) - {""}
+    assert expected
+
+    ignored = {ignored_file.path for ignored_file in find_ignored_files(content, paths)}
+    assert ignored == expected
+
+
+def test_rule_matcher():
+    lines = ["*.log", "!keep.log", "build/", "/dist", "docs/**/*.tmp", "*~", "a*b"]
+    matcher = RuleMatcher([Rule(line) for line in lines])
+
+    def ignoring_line(path: str, is_directory: bool = False) -> str | None:
+        rule = matcher.get_ignoring_rule(path, is_directory)
+        return None if rule is None else rule.line
+
+    assert ignoring_line("src/debug.log") == "*.log"
+    assert ignoring_line("src/keep.log") is None
+    assert ignoring_line("build/keep.log") == "build/"
+    assert ignoring_line("build") is None
+    assert ignoring_line("build", is_directory=True) == "build/"
+    assert ignoring_line("dist/app.js") == "/dist"
+    assert ignoring_line("src/dist/app.js") is None
+    assert ignoring_line("docs/a/b/c.tmp") == "docs/**/*.tmp"
+    assert ignoring_line("main.py~") == "*~"
+    assert ignoring_line("src/axxb") == "a*b"
+    assert ignoring_line("src/main.py") is None
+
+
+def test_find_ignored_files_sections():
+    content = Gitignore().create("python", "macos")
+    rules, sections = get_section_rules(content)
+    assert len(rules) == len(sections)
+    assert {"Python", "macOS"} <= set(sections)
+
+    ignored_files = find_ignored_files(
+        content, ["src/main.py", "src/__pycache__/main.cpython-311.pyc", ".DS_Store"]
+    )
+    assert [(file.path, file.rule.line, file.section) for file in ignored_files] == [
+        ("src/__pycache__/main.cpython-311.pyc", "__pycache__/", "Python"),
+        (".DS_Store", ".DS_Store", "macOS"),
+    ]
+    assert find_ignored_files("*.o\n", ["main.o"])[0].section is None
+
+
+def test_find_ignored_files_performance():
+    content = Gitignore().create(
+        "python", "java", "gradle", "node", "visualstudio", "macos", "jetbrains+all"
+    )
+    rng = random.Random(0)
+    extensions = ["py", "java", "ts", "js", "md", "c", "h", "rs", "go", "json", "cs"]
+    paths = [
+        f"pkg{rng.randrange(200)}/sub{rng.randrange(10)}/file{i}.{rng.choice(extensions)}"
+        for i in range(50_000)
+    ]
+    start = time.perf_counter()
+    find_ignored_files(content, paths)
+    # Well under a second on a developer machine, with room for slow CI runners
+    assert time.perf_counter() - start < 5
+
+
+@requires_git
+def test_get_staged_files(tmp_path: Path):
+    repository = tmp_path / "repository"
+    repository.mkdir()
+    git(repository, "init", "-q")
+    (repository / "committed.py").write_text("")
+    git(repository, "add", ".")
+    git(repository, "commit", "-q", "-m", "Initial commit")
+    (repository / "committed.py").unlink()
+    (repository / "src").mkdir()
+    (repository / "src" / "main.pyc").write_text("")
+    (repository / "unstaged.py").write_text("")
+    git(repository, "add", "committed.py", "src")
+    assert get_staged_files(repository) == ["src/main.pyc"]
+
+    (tmp_path / "not-a-repository").mkdir()
+    with pytest.raises(ValueError, match="Could not list the staged files"):
+        get_staged_files(tmp_path / "not-a-repository")
+
+
+@requires_git
+def test_cli_pygic_precommit_command(tmp_path: Path):
+    git(tmp_path, "init", "-q")
+    (tmp_path / "main.py").write_text("")
+    git(tmp_path, "add", ".")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        pygic, ["precommit", "python", "--repository", str(tmp_path)]
+    )
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+
+    (tmp_path / "main.pyc").write_text("")
+    git(tmp_path, "add", ".")
+    result = runner.invoke(
+        pygic, ["precommit", "python", "--repository", str(tmp_path)]
+    )
+    assert result.exit_code == 1
+    assert "main.pyc: ignored by '*.py[cod]' (Python)" in result.output
+    assert "1 of 2 staged files are ignored by the templates." in result.output
@@ -0,0 +1,119 @@
+import gzip
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pygic.complete import COMPLETION_NAMES_FILE_NAME
+from pygic.config import ROOT_DIR
+from pygic.gitignore import (
+    TEMPLATES_LOCAL_DIR,
+    Gitignore,
+    list_renderable_template_names,
+    read_order_file,
+)
+from pygic.index import _get_file_name_index
+from pygic.precompute import (
+    PRECOMPUTED_TEMPLATES_FILE_NAME,
+    PrecomputedTemplates,
+    get_precomputed_templates,
+    write_precomputed_templates,
+)
+
+
+@pytest.fixture(scope="module")
+def precomputed() -> PrecomputedTemplates:
+    return PrecomputedTemplates.from_bytes(
+        PrecomputedTemplates.from_directory(TEMPLATES_LOCAL_DIR).to_bytes()
+    )
+
+
+def test_precomputed_templates_match_live_rendering(precomputed: PrecomputedTemplates):
+    live_templates = Gitignore(directory=TEMPLATES_LOCAL_DIR)
+    assert precomputed.order == dict(read_order_file(TEMPLATES_LOCAL_DIR / "order"))
+    for name in live_templates.list_template_names():
+        assert precomputed.gitignores[
+            name.lower()
+        ] == live_templates.create_one_gitignore(name)
+    # Patches without a `.gitignore` file can also be rendered
+    assert precomputed.gitignores["rider+all"] == live_templates.create_one_gitignore(
+        "rider+all"
+    )
+
+
+@pytest.mark.parametrize(
+    "file",
+    sorted((ROOT_DIR / "tests" / "targets").glob("*.gitignore")),
+)
+def test_gitignore_uses_precomputed_templates(
+    file: Path, precomputed: PrecomputedTemplates
+):
+    names = file.stem.split(".")
+    with patch("pygic.precompute.get_precomputed_templates", return_value=precomputed):
+        assert Gitignore().create(*names) == file.read_text()
+
+
+def test_gitignore_precomputed_templates_only_for_default_directory():
+    precomputed = PrecomputedTemplates({"python": "precomputed"}, {})
+    with patch("pygic.precompute.get_precomputed_templates", return_value=precomputed):
+        assert Gitignore().create_one_gitignore("Python") == "precomputed"
+        # Names that are not precomputed are rendered
+        assert Gitignore().create_one_gitignore("c").startswith("### C ###")
+        assert (
+            Gitignore(directory=TEMPLATES_LOCAL_DIR).create_one_gitignore("python")
+            != "precomputed"
+        )
+
+
+def test_precomputed_templates_invalid():
+    with pytest.raises(ValueError, match="Invalid precomputed templates"):
+        PrecomputedTemplates.from_bytes(b"not gzip")
+    with pytest.raises(ValueError, match="Unsupported precomputed templates format"):
+        PrecomputedTemplates.from_bytes(gzip.compress(b'{"format": 0}'))
+
+
+def test_get_precomputed_templates(tmp_path: Path):
+    get_precomputed_templates.cache_clear()
+    try:
+        with patch("pygic.precompute.PACKAGE_DIR", tmp_path):
+            # Running from the sources
+            assert get_precomputed_templates() is None
+
+            get_precomputed_templates.cache_clear()
+            write_precomputed_templates(
+                TEMPLATES_LOCAL_DIR, tmp_path / PRECOMPUTED_TEMPLATES_FILE_NAME
+            )
+            assert (
+                get_precomputed_templates()
+                .gitignores["python"]
+                .startswith("### Python ###")
+            )
+
+            get_precomputed_templates.cache_clear()
+            (tmp_path / PRECOMPUTED_TEMPLATES_FILE_NAME).write_bytes(b"corrupted")
+            assert get_precomputed_templates() is None
+    finally:
+        get_precomputed_templates.cache_clear()
+
+
+def test_wheel_contains_precomputed_templates(
+    tmp_path: Path, index_cache_directory: Path
+):
+    """The artifact built into the wheel matches the live rendering byte for byte."""
+    wheel_builder = pytest.importorskip("hatchling.builders.wheel")
+
+    _get_file_name_index.cache_clear()
+    builder = wheel_builder.WheelBuilder(str(ROOT_DIR))
+    wheel = next(builder.build(directory=str(tmp_path), versions=["standard"]))
+    # Nothing is written in the cache directory of the user
+    assert not any(index_cache_directory.iterdir())
+    with zipfile.ZipFile(wheel) as zf:
+        artifact = zf.read(f"pygic/{PRECOMPUTED_TEMPLATES_FILE_NAME}")
+        names = zf.read(f"pygic/{COMPLETION_NAMES_FILE_NAME}").decode()
+
+    assert (
+        artifact == PrecomputedTemplates.from_directory(TEMPLATES_LOCAL_DIR).to_bytes()
+    )
+    # The names for the shell completion are the ones accepted by `Gitignore.create`
+    assert names.split() == list_renderable_template_names(TEMPLATES_LOCAL_DIR)
@@ -0,0 +1,227 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pygic.gitignore import CLONE_STAMP_FILE, TEMPLATES_LOCAL_DIR, Gitignore
+from pygic.refresh import (
+    LOCK_TIMEOUT,
+    acquire_refresh_lock,
+    get_clone_age,
+    get_lock_path,
+    get_log_path,
+    is_clone_stale,
+    main,
+    pop_refresh_log,
+    refresh_clone,
+    release_refresh_lock,
+    start_background_refresh,
+)
+
+
+def make_clone(clone_root: Path, age: float = 0) -> Path:
+    """Create a fake clone of the toptal/gitignore repository, cloned `age` seconds ago."""
+    shutil.copytree(TEMPLATES_LOCAL_DIR, clone_root / "templates", symlinks=True)
+    stamp = clone_root / CLONE_STAMP_FILE
+    stamp.touch()
+    mtime = time.time() - age
+    os.utime(stamp, (mtime, mtime))
+    return clone_root
+
+
+def fake_clone_toptal_repository(directory: Path) -> None:
+    shutil.copytree(TEMPLATES_LOCAL_DIR, directory / "templates", symlinks=True)
+
+
+def test_get_clone_age(tmp_path: Path):
+    assert get_clone_age(tmp_path) is None
+    assert is_clone_stale(tmp_path, 3600)
+
+    (tmp_path / ".git").mkdir()
+    assert get_clone_age(tmp_path) < 60
+
+    make_clone(tmp_path, age=7200)
+    assert get_clone_age(tmp_path) == pytest.approx(7200, abs=60)
+    assert is_clone_stale(tmp_path, 3600)
+    assert not is_clone_stale(tmp_path, 86400)
+
+
+def test_refresh_lock(tmp_path: Path):
+    clone_root = tmp_path / "gitignore"
+    assert acquire_refresh_lock(clone_root)
+    assert get_lock_path(clone_root).exists()
+    assert not acquire_refresh_lock(clone_root)
+
+    release_refresh_lock(clone_root)
+    assert not get_lock_path(clone_root).exists()
+    assert acquire_refresh_lock(clone_root)
+
+    # An abandoned lock is acquired again
+    mtime = time.time() - LOCK_TIMEOUT - 1
+    os.utime(get_lock_path(clone_root), (mtime, mtime))
+    assert acquire_refresh_lock(clone_root)
+    assert not acquire_refresh_lock(clone_root)
+
+
+def test_start_background_refresh(tmp_path: Path):
+    clone_root = tmp_path / "gitignore"
+    with patch("pygic.refresh.subprocess.Popen") as mock_popen:
+        assert start_background_refresh(clone_root)
+        # The lock is held until the refresh process releases it
+        assert not start_background_refresh(clone_root)
+
+    mock_popen.assert_called_once()
+    assert mock_popen.call_args.args[0] == [
+        sys.executable,
+        "-m",
+        "pygic.refresh",
+        str(clone_root),
+    ]
+    # The output of the refresh process is written to the refresh log
+    assert mock_popen.call_args.kwargs["stdout"].name == str(get_log_path(clone_root))
+    assert mock_popen.call_args.kwargs["stderr"] == subprocess.STDOUT
+
+
+def test_pop_refresh_log(tmp_path: Path):
+    clone_root = tmp_path / "gitignore"
+    assert pop_refresh_log(clone_root) is None
+
+    # A successful refresh only logs its warnings and errors
+    get_log_path(clone_root).write_text("\n")
+    assert pop_refresh_log(clone_root) is None
+    assert not get_log_path(clone_root).exists()
+
+    get_log_path(clone_root).write_text("ERROR - Failed to refresh\n")
+    # The log is not read while the refresh is in progress
+    assert acquire_refresh_lock(clone_root)
+    assert pop_refresh_log(clone_root) is None
+    release_refresh_lock(clone_root)
+    assert pop_refresh_log(clone_root) == "ERROR - Failed to refresh"
+    assert pop_refresh_log(clone_root) is None
+
+
+def test_start_background_refresh_popen_error(tmp_path: Path):
+    clone_root = tmp_path / "gitignore"
+    with patch("pygic.refresh.subprocess.Popen", side_effect=OSError("no python")):
+        assert not start_background_refresh(clone_root)
+    assert not get_lock_path(clone_root).exists()
+
+
+@patch("pygic.gitignore.TEMPLATE_STORE_DIR", None)
+def test_refresh_clone(tmp_path: Path, completion_names_file: Path):
+    clone_root = make_clone(tmp_path / "gitignore", age=7200)
+    (clone_root / "templates" / "Python.gitignore").write_text("outdated\n")
+    assert acquire_refresh_lock(clone_root)
+
+    with patch(
+        "pygic.refresh.clone_toptal_repository",
+        side_effect=fake_clone_toptal_repository,
+    ):
+        refresh_clone(clone_root)
+
+    assert not is_clone_stale(clone_root, 3600)
+    assert (clone_root / "templates" / "Python.gitignore").read_bytes() == (
+        TEMPLATES_LOCAL_DIR / "Python.gitignore"
+    ).read_bytes()
+    assert not get_lock_path(clone_root).exists()
+    # Only the refreshed clone is left
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["gitignore"]
+    # The shell completion uses the names of the refreshed templates
+    assert "python" in completion_names_file.read_text().split()
+
+
+@patch("pygic.gitignore.TEMPLATE_STORE_DIR", None)
+def test_refresh_clone_failure(tmp_path: Path):
+    clone_root = make_clone(tmp_path / "gitignore", age=7200)
+    assert acquire_refresh_lock(clone_root)
+
+    with patch(
+        "pygic.refresh.clone_toptal_repository",
+        side_effect=ModuleNotFoundError("no git"),
+    ):
+        with pytest.raises(ModuleNotFoundError):
+            refresh_clone(clone_root)
+        # `main` reports the failure with its exit code
+        assert main([str(clone_root)]) == 1
+
+    # The old clone is left untouched
+    assert is_clone_stale(clone_root, 3600)
+    assert (clone_root / "templates" / "Python.gitignore").exists()
+    assert not get_lock_path(clone_root).exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["gitignore"]
+
+
+@patch("pygic.gitignore.TEMPLATE_STORE_DIR", None)
+def test_refresh_clone_swap_failure(tmp_path: Path):
+    clone_root = make_clone(tmp_path / "gitignore", age=7200)
+    assert acquire_refresh_lock(clone_root)
+    rename = Path.rename
+
+    def failing_rename(path: Path, target: Path) -> Path:
+        if path.name.startswith(".gitignore.new-"):
+            raise OSError("rename failed")
+        return rename(path, target)
+
+    with (
+        patch(
+            "pygic.refresh.clone_toptal_repository",
+            side_effect=fake_clone_toptal_repository,
+        ),
+        patch.object(Path, "rename", failing_rename),
+    ):
+        with pytest.raises(OSError, match="rename failed"):
+            refresh_clone(clone_root)
+
+    # The current clone is moved back in place
+    assert is_clone_stale(clone_root, 3600)
+    assert (clone_root / "templates" / "Python.gitignore").exists()
+    assert not get_lock_path(clone_root).exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["gitignore"]
+
+
+def test_main_usage():
+    assert main([]) == 2
+
+
+@pytest.mark.parametrize("age, expected_refresh", [(7200, True), (60, False)])
+def test_gitignore_clone_ttl(tmp_path: Path, age: float, expected_refresh: bool):
+    clone_root = make_clone(tmp_path / "gitignore", age=age)
+
+    with patch("pygic.refresh.start_background_refresh") as mock_refresh:
+        templates = Gitignore(clone_directory=clone_root, clone_ttl=3600)
+
+    # The current clone is used while it is refreshed
+    assert templates.directory == clone_root / "templates"
+    if expected_refresh:
+        mock_refresh.assert_called_once_with(clone_root)
+    else:
+        mock_refresh.assert_not_called()
+
+
+def test_gitignore_reports_refresh_failure(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+):
+    clone_root = make_clone(tmp_path / "gitignore", age=60)
+    get_log_path(clone_root).write_text("ERROR - Failed to refresh\n")
+
+    with caplog.at_level(logging.WARNING):
+        Gitignore(clone_directory=clone_root, clone_ttl=3600)
+
+    assert "The last background refresh" in caplog.text
+    assert "ERROR - Failed to refresh" in caplog.text
+    assert not get_log_path(clone_root).exists()
+
+
+def test_gitignore_without_clone_ttl(tmp_path: Path):
+    clone_root = make_clone(tmp_path / "gitignore", age=7200)
+
+    with patch("pygic.refresh.start_background_refresh") as mock_refresh:
+        Gitignore(clone_directory=clone_root)
+
+    mock_refresh.assert_not_called()
@@ -0,0 +1,157 @@
+import os
+import pickle
+import subprocess
+import sys
+import zipapp
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pygic.config import ROOT_DIR
+from pygic.file import File, FileType
+from pygic.gitignore import TEMPLATES_LOCAL_DIR, Gitignore
+from pygic.resources import (
+    ZipTraversable,
+    get_zip_index,
+    open_template_directory,
+    open_zip_directory,
+)
+
+NAMES = ["python", "c", "reactnative", "dotnetcore", "lsspice"]
+
+
+def write_templates_archive(archive: Path, prefix: str = "pygic/templates/") -> Path:
+    """Write the local templates to a zip archive, like in a wheel."""
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for file_path in sorted(TEMPLATES_LOCAL_DIR.iterdir()):
+            zf.write(file_path, prefix + file_path.name)
+    return archive
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    return write_templates_archive(tmp_path / "pygic-1.0.0-py3-none-any.whl")
+
+
+@pytest.mark.parametrize("subpath", ["", "pygic/templates"])
+def test_gitignore_from_archive(archive: Path, subpath: str):
+    templates = Gitignore(directory=archive / subpath)
+    assert isinstance(templates.directory, ZipTraversable)
+    assert templates.directory.at == "pygic/templates"
+
+    local_templates = Gitignore()
+    assert templates.list_template_names() == local_templates.list_template_names()
+    for name in NAMES:
+        assert templates.create_one_gitignore(
+            name
+        ) == local_templates.create_one_gitignore(name)
+    assert templates.create(*NAMES) == local_templates.create(*NAMES)
+
+
+def test_gitignore_from_archive_does_not_open_files(archive: Path):
+    templates = Gitignore(directory=archive)
+    expected = Gitignore().create(*NAMES)
+    # Only the already opened archive is read
+    with patch("builtins.open", side_effect=AssertionError("a file was opened")):
+        assert templates.create(*NAMES) == expected
+
+
+def test_gitignore_from_archive_not_found(archive: Path):
+    templates = Gitignore(directory=archive)
+    with pytest.raises(FileNotFoundError, match="Did you mean 'python'"):
+        templates.create("pyhton")
+
+
+def test_gitignore_from_archive_invalid_directory(archive: Path):
+    with pytest.raises(FileNotFoundError):
+        Gitignore(directory=archive / "nonexistent")
+    with pytest.raises(NotADirectoryError):
+        Gitignore(directory=archive / "pygic/templates/order")
+
+
+def test_zip_index_cache(archive: Path):
+    index = get_zip_index(archive)
+    assert get_zip_index(archive) is index
+
+    # The archive is indexed again once modified
+    with zipfile.ZipFile(archive, "a") as zf:
+        zf.writestr("pygic/templates/Extra.gitignore", "extra\n")
+    new_index = get_zip_index(archive)
+    assert new_index is not index
+    assert "pygic/templates/Extra.gitignore" in new_index.files
+
+
+def test_zip_traversable(archive: Path):
+    root = open_zip_directory(archive)
+    assert root.is_dir() and not root.is_file()
+    assert [entry.name for entry in root.iterdir()] == ["pygic"]
+
+    file = root / "pygic" / "templates" / "./Python.gitignore"
+    assert file == root.joinpath("pygic/templates/Python.gitignore")
+    assert file.is_file() and file.name == "Python.gitignore"
+    assert file.read_bytes() == (TEMPLATES_LOCAL_DIR / "Python.gitignore").read_bytes()
+    with pytest.raises(NotADirectoryError):
+        list(file.iterdir())
+    with pytest.raises(ValueError):
+        file.open("w")
+    with pytest.raises(FileNotFoundError):
+        (root / "missing").read_bytes()
+
+    template_file = File(file)
+    assert template_file.type == FileType.GITIGNORE
+    assert template_file.name == "Python"
+
+    assert pickle.loads(pickle.dumps(file)) == file
+
+
+def test_open_template_directory(archive: Path, tmp_path: Path):
+    # Regular and nonexistent directories are kept as paths
+    assert open_template_directory(tmp_path) == tmp_path
+    assert open_template_directory(tmp_path / "missing") == tmp_path / "missing"
+    assert open_template_directory(str(tmp_path)) == tmp_path
+
+    # As returned by `importlib.resources.files` for a package imported from a zip archive
+    directory = open_template_directory(zipfile.Path(archive, "pygic/templates/"))
+    assert directory == open_zip_directory(archive, "pygic/templates")
+
+    # Templates at the root of the archive
+    root_archive = write_templates_archive(tmp_path / "templates.zip", prefix="")
+    assert open_template_directory(root_archive).at == ""
+
+
+def test_zipapp(tmp_path: Path):
+    """`pygic` run as a zipapp reads its templates from the zipapp."""
+    with zipfile.ZipFile(tmp_path / "pygic.zip", "w") as zf:
+        for file_path in sorted((ROOT_DIR / "pygic").rglob("*")):
+            if file_path.is_file() and "__pycache__" not in file_path.parts:
+                zf.write(file_path, file_path.relative_to(ROOT_DIR).as_posix())
+        zf.writestr("__main__.py", "from pygic.cli import pygic\n\npygic()\n")
+    zipapp.create_archive(tmp_path / "pygic.zip", tmp_path / "pygic.pyz")
+
+    result = subprocess.run(
+        [sys.executable, str(tmp_path / "pygic.pyz"), "gen", "python", "c"],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == (ROOT_DIR / "tests/targets/python.c.gitignore").read_text()
+
+    # The templates are read from the zipapp, not from an installed copy of `pygic`
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from pygic.gitignore import TEMPLATES_LOCAL_DIR; print(repr(TEMPLATES_LOCAL_DIR))",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(tmp_path / "pygic.pyz")},
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith("ZipTraversable(")
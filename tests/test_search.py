@@ -0,0 +1,88 @@
+import io
+from unittest.mock import patch
+
+import pytest
+
+from pygic.gitignore import Gitignore
+
+search = pytest.importorskip("pygic.search")
+
+ENTER = "\r"
+ESC = "\x1b"
+TAB = "\t"
+CTRL_T = "\x14"
+BACKSPACE = "\x7f"
+
+
+def run_search(keys: list[str]) -> tuple[search.SearchSession, list[str], str]:
+    """Run a search session with the given key presses, and get the selected names and the output."""
+    session = search.SearchSession(Gitignore())
+    output = io.StringIO()
+    with patch("pzp.keys.get_char", side_effect=keys):
+        selected_names = session.run(output_stream=output)
+    return session, selected_names, output.getvalue()
+
+
+def test_search_select_several_templates():
+    keys = [*"^python", TAB, *[BACKSPACE] * 7, *"umbraco", TAB, CTRL_T, ESC]
+    session, selected_names, output = run_search(keys)
+    assert selected_names == ["Python", "Umbraco"]
+    # Only the highlighted templates were rendered for the preview
+    assert {"Python", "Umbraco"} <= set(session.previews.gitignores)
+    assert len(session.previews.gitignores) < 20
+    assert "* Umbraco" in output
+    assert "--- Merged gitignore" in output
+    assert list(session.previews.merged_gitignores) == [("Python", "Umbraco")]
+
+
+def test_search_enter_selects_the_highlighted_template():
+    _, selected_names, output = run_search([*"umbr", ENTER])
+    assert selected_names == ["Umbraco"]
+    assert "--- Umbraco (" in output
+
+
+def test_search_unselect():
+    _, selected_names, _ = run_search([*"umbraco", TAB, TAB, ESC])
+    assert selected_names == []
+
+
+def test_search_and_create():
+    with patch("pzp.keys.get_char", side_effect=[*"umbraco", ENTER]):
+        assert Gitignore().search_and_create() == Gitignore().create("umbraco")
+    with patch("pzp.keys.get_char", side_effect=[ESC]):
+        assert Gitignore().search_and_create() is None
+
+
+def test_incremental_matcher():
+    matcher = search.IncrementalMatcher()
+    names = ["Python", "PyCharm", "Node", "Umbraco"]
+    assert matcher.filter("py", names) == ["Python", "PyCharm"]
+    with patch.object(
+        matcher.matcher, "filter", wraps=matcher.matcher.filter
+    ) as inner_filter:
+        # Narrowing the pattern only filters the previous matches
+        assert matcher.filter("pyt", names) == ["Python"]
+        inner_filter.assert_called_once_with("pyt", ["Python", "PyCharm"])
+        # The same pattern is not filtered again
+        assert matcher.filter("pyt", names) == ["Python"]
+        assert inner_filter.call_count == 1
+    # A negation can match more names with a longer pattern
+    assert matcher.filter("!p", names) == ["Node", "Umbraco"]
+    assert matcher.filter("!py", names) == ["Node", "Umbraco"]
+    assert matcher.filter("!pyc", names) == ["Python", "Node", "Umbraco"]
+    assert matcher.filter("o", names) == ["Python", "Node", "Umbraco"]
+
+
+def test_get_header_has_a_fixed_height():
+    session = search.SearchSession(Gitignore(), preview_height=5)
+    headers = [
+        session.get_header("Python", 40),
+        session.get_header("Umbraco", 40),
+        session.get_header(None, 40),
+    ]
+    session.preview_merged = True
+    headers.append(session.get_header("Python", 40))
+    for header in headers:
+        lines = header.split("\n")
+        assert len(lines) == 9
+        assert max(len(line) for line in lines) <= 40
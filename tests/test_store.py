@@ -0,0 +1,185 @@
+import shutil
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pygic.config import ROOT_DIR
+from pygic.gitignore import (
+    TEMPLATES_LOCAL_DIR,
+    Gitignore,
+    list_renderable_template_names,
+)
+from pygic.store import TemplateStore, get_head_commit, hash_content
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> TemplateStore:
+    return TemplateStore(tmp_path / "store")
+
+
+def count_blobs(store: TemplateStore) -> int:
+    return len(list(store.objects_directory.glob("*/*")))
+
+
+class TestTemplateStore:
+    """Test suite for the TemplateStore class."""
+
+    def test_add_blob(self, store: TemplateStore):
+        blob_hash = store.add_blob(b"*.pyc\n")
+        assert blob_hash == hash_content(b"*.pyc\n")
+        assert store.blob_path(blob_hash).read_bytes() == b"*.pyc\n"
+        assert store.add_blob(b"*.pyc\n") == blob_hash
+        assert count_blobs(store) == 1
+
+    def test_import_directory_deduplicates(self, store: TemplateStore):
+        files = store.import_directory(TEMPLATES_LOCAL_DIR, "v1")
+        num_files = len(list(TEMPLATES_LOCAL_DIR.iterdir()))
+        assert len(files) == num_files
+        # The symlinked templates share the blob of their target
+        num_symlinks = sum(path.is_symlink() for path in TEMPLATES_LOCAL_DIR.iterdir())
+        assert num_symlinks > 0
+        assert count_blobs(store) <= num_files - num_symlinks
+
+    def test_snapshot_directory(self, store: TemplateStore):
+        store.import_directory(TEMPLATES_LOCAL_DIR, "v1")
+        view = store.snapshot_directory("v1")
+        assert store.snapshot_directory("v1") == view
+
+        templates = Gitignore(directory=view)
+        for file in (ROOT_DIR / "tests" / "targets").glob("*.gitignore"):
+            assert templates.create(*file.stem.split(".")) == file.read_text()
+
+    def test_snapshots_share_unchanged_blobs(
+        self, store: TemplateStore, tmp_path: Path
+    ):
+        store.import_directory(TEMPLATES_LOCAL_DIR, "v1")
+        num_blobs = count_blobs(store)
+
+        directory = tmp_path / "templates"
+        shutil.copytree(TEMPLATES_LOCAL_DIR, directory)
+        (directory / "Python.gitignore").write_text("*.pyc\n")
+        store.import_directory(directory, "v2")
+        assert count_blobs(store) == num_blobs + 1
+
+        assert (
+            store.snapshot_directory("v2") / "Python.gitignore"
+        ).read_text() == "*.pyc\n"
+        assert (
+            store.snapshot_directory("v1") / "Python.gitignore"
+        ).read_text() != "*.pyc\n"
+
+    def test_import_directory_errors(self, store: TemplateStore, tmp_path: Path):
+        with pytest.raises(ValueError, match="Invalid snapshot name"):
+            store.import_directory(TEMPLATES_LOCAL_DIR, "../v1")
+        with pytest.raises(NotADirectoryError):
+            store.import_directory(tmp_path / "missing", "v1")
+        store.import_directory(TEMPLATES_LOCAL_DIR, "v1")
+        with pytest.raises(FileExistsError, match="Snapshot 'v1' already exists."):
+            store.import_directory(TEMPLATES_LOCAL_DIR, "v1")
+
+    def test_resolve_snapshot_name(self, store: TemplateStore, tmp_path: Path):
+        directory = tmp_path / "templates"
+        directory.mkdir()
+        (directory / "order").touch()
+        for name in ["abc123", "abd456", "b789"]:
+            store.import_directory(directory, name)
+            time.sleep(0.01)
+
+        assert store.list_snapshots() == ["abc123", "abd456", "b789"]
+        assert store.resolve_snapshot_name("abc123") == "abc123"
+        assert store.resolve_snapshot_name("abc") == "abc123"
+        assert store.resolve_snapshot_name("latest") == "b789"
+        with pytest.raises(ValueError, match="Several snapshots match 'ab'"):
+            store.resolve_snapshot_name("ab")
+        with pytest.raises(FileNotFoundError, match="No snapshot found for 'c'."):
+            store.resolve_snapshot_name("c")
+
+    def test_remove_snapshot_and_garbage_collect(
+        self, store: TemplateStore, tmp_path: Path
+    ):
+        directory = tmp_path / "templates"
+        directory.mkdir()
+        (directory / "order").write_text("python\n")
+        store.import_directory(directory, "v1")
+        (directory / "order").write_text("java\n")
+        store.import_directory(directory, "v2")
+        store.snapshot_directory("v1")
+
+        store.remove_snapshot("v1")
+        assert store.list_snapshots() == ["v2"]
+        assert not (store.views_directory / "v1").exists()
+        assert store.garbage_collect() == 1
+        assert count_blobs(store) == 1
+
+        with pytest.raises(FileNotFoundError):
+            store.remove_snapshot("v1")
+
+
+def test_get_head_commit(tmp_path: Path):
+    assert get_head_commit(tmp_path) is None
+
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/master\n")
+    assert get_head_commit(tmp_path) is None
+
+    (git_dir / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted\n"
+        "1111111111111111111111111111111111111111 refs/heads/master\n"
+    )
+    assert get_head_commit(tmp_path) == "1" * 40
+
+    (git_dir / "refs" / "heads" / "master").write_text("2" * 40 + "\n")
+    assert get_head_commit(tmp_path) == "2" * 40
+
+    (git_dir / "HEAD").write_text("3" * 40 + "\n")
+    assert get_head_commit(tmp_path) == "3" * 40
+
+
+def test_gitignore_from_snapshot(tmp_path: Path):
+    store = TemplateStore(tmp_path / "store")
+    store.import_directory(TEMPLATES_LOCAL_DIR, "0123456789abcdef")
+
+    templates = Gitignore.from_snapshot("0123", store_directory=store.root)
+    assert templates.directory == store.views_directory / "0123456789abcdef"
+    assert templates.create("python") == Gitignore().create("python")
+
+    with patch("pygic.gitignore.TEMPLATE_STORE_DIR", store.root):
+        templates = Gitignore.from_snapshot("latest")
+        assert templates.create("python") == Gitignore().create("python")
+
+    with (
+        patch("pygic.gitignore.TEMPLATE_STORE_DIR", None),
+        pytest.raises(ModuleNotFoundError, match="there is no default template store"),
+    ):
+        Gitignore.from_snapshot("latest")
+
+
+def test_gitignore_clone_saves_snapshot(tmp_path: Path, completion_names_file: Path):
+    """Test that a snapshot named after the cloned commit, and the names for the shell completion,
+    are saved after cloning."""
+    clone_directory = tmp_path / "clone"
+
+    def fake_clone(url: str, directory: Path) -> None:
+        shutil.copytree(TEMPLATES_LOCAL_DIR, directory / "templates")
+        (directory / ".git").mkdir()
+        (directory / ".git" / "HEAD").write_text("a" * 40 + "\n")
+
+    with (
+        patch("pygic.gitignore.CLONED_TOPTAL_DIR", clone_directory),
+        patch("pygic.gitignore.TEMPLATE_STORE_DIR", tmp_path / "store"),
+        patch("git.Repo.clone_from", side_effect=fake_clone),
+    ):
+        templates = Gitignore(clone_directory="default")
+
+    assert templates.directory == clone_directory / "templates"
+    store = TemplateStore(tmp_path / "store")
+    assert store.list_snapshots() == ["a" * 40]
+    assert store.get_snapshot("a" * 40)["Python.gitignore"] == hash_content(
+        (TEMPLATES_LOCAL_DIR / "Python.gitignore").read_bytes()
+    )
+    assert completion_names_file.read_text().split() == (
+        list_renderable_template_names(TEMPLATES_LOCAL_DIR)
+    )
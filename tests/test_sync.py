@@ -0,0 +1,138 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pygic.gitignore import Gitignore
+from pygic.sync import (
+    SyncResult,
+    SyncStatus,
+    read_manifest,
+    sync_repositories,
+    sync_repository,
+)
+
+
+@pytest.fixture
+def repositories(tmp_path: Path) -> Path:
+    """A directory with repositories in various states and the manifest listing them."""
+    templates = Gitignore()
+    for name in ["fresh", "outdated", "up_to_date", "sections"]:
+        (tmp_path / name).mkdir()
+    (tmp_path / "outdated" / ".gitignore").write_text("*.pyc\n")
+    (tmp_path / "up_to_date" / ".gitignore").write_text(templates.create("python"))
+    (tmp_path / "sections" / ".gitignore").write_text(
+        "/local\n" + templates.create("c").replace("*.o\n", "")
+    )
+
+    manifest = tmp_path / "manifest"
+    manifest.write_text(
+        "# Repositories\n"
+        "fresh python c\n"
+        "outdated Python\n"
+        "\n"
+        "up_to_date python\n"
+        "sections\n"
+        "missing python\n"
+        "fresh pyton\n"
+    )
+    return manifest
+
+
+def test_read_manifest(repositories: Path):
+    root = repositories.parent
+    assert read_manifest(repositories) == [
+        (root / "fresh", ["python", "c"]),
+        (root / "outdated", ["Python"]),
+        (root / "up_to_date", ["python"]),
+        (root / "sections", []),
+        (root / "missing", ["python"]),
+        (root / "fresh", ["pyton"]),
+    ]
+
+
+def test_read_manifest_not_found(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        read_manifest(tmp_path / "manifest")
+
+
+def test_sync_repository_check(tmp_path: Path):
+    templates = Gitignore()
+    result = sync_repository(tmp_path, ["python"], templates, check=True)
+    assert result.status == SyncStatus.CHANGED
+    assert result.path == tmp_path / ".gitignore"
+    assert not result.path.exists()
+
+    result = sync_repository(tmp_path, ["python"], templates)
+    assert result.status == SyncStatus.CHANGED
+    assert result.path.read_text() == templates.create("python")
+
+    result = sync_repository(tmp_path, ["python"], templates)
+    assert result.status == SyncStatus.UNCHANGED
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_sync_repositories(repositories: Path, jobs: int):
+    templates = Gitignore()
+    root = repositories.parent
+    progress_calls: list[tuple[int, int, SyncResult]] = []
+
+    results = sync_repositories(
+        read_manifest(repositories),
+        templates,
+        jobs=jobs,
+        progress=lambda *args: progress_calls.append(args),
+    )
+
+    assert [(result.path.parent.name, result.status) for result in results] == [
+        ("fresh", SyncStatus.CHANGED),
+        ("outdated", SyncStatus.CHANGED),
+        ("up_to_date", SyncStatus.UNCHANGED),
+        ("sections", SyncStatus.CHANGED),
+        ("missing", SyncStatus.ERROR),
+        ("fresh", SyncStatus.ERROR),
+    ]
+    assert results[3].message == "C"
+    assert results[4].message.startswith("NotADirectoryError")
+    assert "Did you mean 'python'?" in results[5].message
+
+    assert sorted(num_done for num_done, _, _ in progress_calls) == list(range(1, 7))
+    assert all(total == 6 for _, total, _ in progress_calls)
+
+    assert (root / "fresh" / ".gitignore").read_text() == templates.create(
+        "python", "c"
+    )
+    # The lines written by hand are kept before the sections
+    assert (root / "outdated" / ".gitignore").read_text() == (
+        "*.pyc\n\n" + templates.create("python")
+    )
+    assert (root / "sections" / ".gitignore").read_text() == (
+        "/local\n" + templates.create("c")
+    )
+
+
+def _exit_worker(repository: Path, names: list[str], check: bool) -> SyncResult:
+    if repository.name == "crash":
+        os._exit(1)
+    return SyncResult(repository / ".gitignore", SyncStatus.UNCHANGED)
+
+
+def test_sync_repositories_broken_worker(tmp_path: Path):
+    entries = [(tmp_path / "crash", ["python"]), (tmp_path / "other", ["python"])]
+    progress_calls: list[tuple[int, int, SyncResult]] = []
+    with patch("pygic.sync._sync_repository_in_worker", _exit_worker):
+        results = sync_repositories(
+            entries,
+            Gitignore(),
+            jobs=2,
+            progress=lambda *args: progress_calls.append(args),
+        )
+
+    assert [result.path for result in results] == [
+        tmp_path / "crash" / ".gitignore",
+        tmp_path / "other" / ".gitignore",
+    ]
+    assert results[0].status == SyncStatus.ERROR
+    assert results[0].message.startswith("BrokenProcessPool")
+    assert len(progress_calls) == 2
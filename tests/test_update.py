@@ -0,0 +1,234 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pygic.config import ROOT_DIR
+from pygic.gitignore import Gitignore
+from pygic.update import (
+    END_MARKER,
+    get_section_names,
+    get_section_titles,
+    split_sections,
+    update_gitignore,
+    update_gitignore_file,
+)
+
+
+@pytest.fixture
+def small_templates(tmp_path: Path) -> Gitignore:
+    """A small template directory that can be modified by the tests."""
+    directory = tmp_path / "templates"
+    directory.mkdir()
+    (directory / "order").write_text("python\n")
+    (directory / "Python.gitignore").write_text("__pycache__/\n*.py[cod]\n")
+    (directory / "Python.patch").write_text("# Patch\n.venv/\n")
+    (directory / "Node.gitignore").write_text("node_modules/\n*.log\n")
+    (directory / "ReactNative.gitignore").write_text("*.jsbundle\n")
+    (directory / "ReactNative.Linux.stack").write_text("*~\n*.log\n")
+    return Gitignore(directory=directory, ignore_num_files_check=True)
+
+
+def test_get_section_titles(small_templates: Gitignore):
+    titles = get_section_titles(small_templates)
+    assert titles == {
+        "Python": "Python",
+        "Python Patch": "Python",
+        "Node": "Node",
+        "ReactNative": "ReactNative",
+        "ReactNative.Linux Stack": "ReactNative",
+    }
+
+
+def test_split_sections(small_templates: Gitignore):
+    titles = get_section_titles(small_templates)
+    lines = [
+        "# mine",
+        "### Python ###",
+        "a",
+        "### Python Patch ###",
+        "b",
+        "### Foo ###",
+    ]
+    preamble, sections = split_sections(lines, titles)
+    assert preamble == ["# mine"]
+    assert sections == [
+        ("Python", ["### Python ###", "a"]),
+        ("Python Patch", ["### Python Patch ###", "b", "### Foo ###"]),
+    ]
+
+
+@pytest.mark.parametrize(
+    "file",
+    sorted((ROOT_DIR / "tests" / "targets").glob("*.gitignore")),
+)
+def test_update_gitignore_up_to_date(file: Path):
+    templates = Gitignore()
+    content = file.read_text()
+    updated_content, changed_titles = update_gitignore(content, templates)
+    assert changed_titles == []
+    assert updated_content is content
+
+
+def test_get_section_names_header_inside_template():
+    """`LSspice.gitignore` contains `### LTspice ###` which must not be taken as a section."""
+    templates = Gitignore()
+    titles = get_section_titles(templates)
+
+    content = templates.create("lsspice")
+    _, sections = split_sections(content.split("\n"), titles)
+    assert get_section_names(templates, sections, titles) == ["LSspice"]
+
+    content = templates.create("lsspice", "ltspice")
+    _, sections = split_sections(content.split("\n"), titles)
+    assert get_section_names(templates, sections, titles) == ["LSspice", "LTspice"]
+
+
+def test_get_section_names_renders_each_template_once():
+    templates = Gitignore()
+    titles = get_section_titles(templates)
+    names = ["python", "java", "node", "lsspice", "ltspice", "reactnative"]
+    _, sections = split_sections(templates.create(*names).split("\n"), titles)
+
+    with patch.object(
+        templates, "create_one_gitignore", wraps=templates.create_one_gitignore
+    ) as mock_create:
+        section_names = get_section_names(templates, sections, titles)
+    assert sorted(name.lower() for name in section_names) == sorted(names)
+    assert mock_create.call_count == len(names)
+
+
+def test_update_gitignore_preserves_user_lines(small_templates: Gitignore):
+    generated = small_templates.create("python", "reactnative")
+    content = f"# My rules\n/secrets\n\n{generated}{END_MARKER}\n/local\n"
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert changed_titles == []
+    assert updated_content == content
+
+    (small_templates.directory / "Python.gitignore").write_text("__pycache__/\n")
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert changed_titles == ["Python"]
+    assert updated_content == (
+        f"# My rules\n/secrets\n\n"
+        f"{small_templates.create('python', 'reactnative')}{END_MARKER}\n/local\n"
+    )
+
+
+def test_update_gitignore_appended_user_lines(small_templates: Gitignore):
+    generated = small_templates.create("node", "python")
+    content = f"{generated}/local\n"
+
+    # Unchanged sections: the appended lines are kept, and nothing is rewritten
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert changed_titles == []
+    assert updated_content == content
+
+    # Changed last section: the appended lines are kept after an end marker
+    (small_templates.directory / "Python.patch").write_text("# Patch\n.venv/\n.env\n")
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert changed_titles == ["Python Patch"]
+    assert updated_content == (
+        f"{small_templates.create('node', 'python')}{END_MARKER}\n/local\n"
+    )
+
+
+def test_update_gitignore_user_lines_after_changed_section(
+    small_templates: Gitignore,
+):
+    content = f"{small_templates.create('python')}my_secret_dir/\n*.local\n"
+
+    # Only the changed section is reported, and the user lines are kept
+    (small_templates.directory / "Python.gitignore").write_text("__pycache__/\n")
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert changed_titles == ["Python"]
+    assert updated_content == (
+        f"{small_templates.create('python')}{END_MARKER}\nmy_secret_dir/\n*.local\n"
+    )
+
+    # The last section changed too
+    (small_templates.directory / "Python.patch").write_text("# Patch\n.env\n.venv/\n")
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert changed_titles == ["Python", "Python Patch"]
+    assert updated_content == (
+        f"{small_templates.create('python')}{END_MARKER}\nmy_secret_dir/\n*.local\n"
+    )
+
+    # A line removed from the end of the last section cannot be told apart from a user line, so it is kept
+    (small_templates.directory / "Python.patch").write_text("# Patch\n")
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert updated_content.endswith(
+        f"# Patch\n{END_MARKER}\n.venv/\nmy_secret_dir/\n*.local\n"
+    )
+
+
+def test_update_gitignore_stacks(small_templates: Gitignore):
+    content = f"{small_templates.create('reactnative')}{END_MARKER}\n"
+    (small_templates.directory / "ReactNative.Linux.stack").unlink()
+    (small_templates.directory / "ReactNative.Android.stack").write_text("*.apk\n")
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert changed_titles == ["ReactNative.Android Stack", "ReactNative.Linux Stack"]
+    assert updated_content == f"{small_templates.create('reactnative')}{END_MARKER}\n"
+
+
+def test_update_gitignore_removed_last_section(small_templates: Gitignore):
+    content = f"{small_templates.create('reactnative')}/local\n"
+    (small_templates.directory / "ReactNative.Linux.stack").unlink()
+    updated_content, changed_titles = update_gitignore(content, small_templates)
+    assert "ReactNative.Linux Stack" in changed_titles
+    # The lines of the removed section cannot be told apart from the user lines, so they are all kept
+    assert updated_content == (
+        f"{small_templates.create('reactnative')}{END_MARKER}\n*~\n*.log\n/local\n"
+    )
+
+
+def test_update_gitignore_names(small_templates: Gitignore):
+    # The lines of a gitignore without any section are kept before the new sections
+    updated_content, changed_titles = update_gitignore(
+        "/secrets\n", small_templates, ["python"]
+    )
+    assert changed_titles == ["Python", "Python Patch"]
+    assert updated_content == f"/secrets\n\n{small_templates.create('python')}"
+
+    # The sections are replaced by the ones of the names, the user lines are kept
+    content = f"/secrets\n\n{small_templates.create('python')}/local\n"
+    updated_content, changed_titles = update_gitignore(
+        content, small_templates, ["python", "node"]
+    )
+    assert changed_titles == ["Node"]
+    assert updated_content == (
+        f"/secrets\n\n{small_templates.create('python', 'node')}{END_MARKER}\n/local\n"
+    )
+    assert update_gitignore(updated_content, small_templates, ["node", "python"]) == (
+        updated_content,
+        [],
+    )
+
+
+def test_update_gitignore_no_section(small_templates: Gitignore):
+    with pytest.raises(ValueError, match="No pygic section found"):
+        update_gitignore("/build\n# ### Python ###\n", small_templates)
+
+
+def test_update_gitignore_file(small_templates: Gitignore, tmp_path: Path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    gitignore_path = repo / ".gitignore"
+    gitignore_path.write_text(small_templates.create("python"))
+    mtime = gitignore_path.stat().st_mtime_ns
+
+    assert update_gitignore_file(repo, small_templates) == []
+    assert gitignore_path.stat().st_mtime_ns == mtime
+
+    (small_templates.directory / "Python.gitignore").write_text("*.so\n")
+    assert update_gitignore_file(gitignore_path, small_templates, check=True) == [
+        "Python"
+    ]
+    assert gitignore_path.read_text() != small_templates.create("python")
+
+    assert update_gitignore_file(gitignore_path, small_templates) == ["Python"]
+    assert gitignore_path.read_text() == small_templates.create("python")
+
+
+def test_update_gitignore_file_not_found(small_templates: Gitignore, tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        update_gitignore_file(tmp_path, small_templates)
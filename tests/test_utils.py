@@ -0,0 +1,82 @@
+import io
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pygic.cli import pygic
+from pygic.gitignore import Gitignore
+from pygic.utils import ColorFormatter, JsonFormatter, setup_logging
+
+
+def test_setup_logging_is_idempotent(pygic_logger: logging.Logger):
+    root_handlers = logging.getLogger().handlers[:]
+    stream = io.StringIO()
+    for _ in range(3):
+        setup_logging(logging.INFO, stream=stream)
+    setup_logging(logging.DEBUG, log_format="json", stream=stream)
+
+    # The root logger is left to the application
+    assert logging.getLogger().handlers == root_handlers
+    assert len(pygic_logger.handlers) == 1
+    assert pygic_logger.level == logging.DEBUG
+    assert isinstance(pygic_logger.handlers[0].formatter, JsonFormatter)
+
+    logging.getLogger("pygic.gitignore").info("Once")
+    assert stream.getvalue().count("Once") == 1
+
+    with pytest.raises(ValueError, match="Unknown log format"):
+        setup_logging(log_format="xml")
+
+
+def test_color_formatter_is_created_once():
+    formatter = ColorFormatter()
+    records = [
+        logging.makeLogRecord({"msg": "Message", "levelno": level})
+        for level in (logging.DEBUG, logging.WARNING, logging.CRITICAL, 15)
+    ]
+    with patch.object(logging.Formatter, "__init__", side_effect=AssertionError):
+        messages = [formatter.format(record) for record in records]
+    assert messages[:3] == [
+        logging.Formatter(ColorFormatter.FORMATS[record.levelno]).format(record)
+        for record in records[:3]
+    ]
+    assert messages[3] == logging.Formatter(ColorFormatter.BASE_FORMAT).format(
+        records[3]
+    )
+
+
+def test_json_logs_of_create():
+    stream = io.StringIO()
+    setup_logging(logging.DEBUG, log_format="json", stream=stream)
+    Gitignore().create("python", "c")
+
+    log = json.loads(stream.getvalue().splitlines()[-1])
+    assert log["level"] == "DEBUG"
+    assert log["logger"] == "pygic.gitignore"
+    assert log["message"].startswith("Created a gitignore from 2 templates in ")
+    assert log["templates"] == ["c", "python"]
+    assert log["duration_ms"] > 0
+
+    try:
+        raise ValueError("Invalid")
+    except ValueError:
+        logging.getLogger("pygic.gitignore").exception("Failed")
+    log = json.loads(stream.getvalue().splitlines()[-1])
+    assert log["level"] == "ERROR"
+    assert "ValueError: Invalid" in log["exception"]
+
+
+def test_cli_pygic_log_format():
+    runner = CliRunner()
+    result = runner.invoke(pygic, ["-vv", "--log-format", "json", "gen", "python"])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    logs = [json.loads(line) for line in result.output.splitlines() if line[:1] == "{"]
+    assert [log["templates"] for log in logs if "duration_ms" in log] == [["python"]]
+
+    # The logs are not written twice by the next commands
+    result = runner.invoke(pygic, ["-vv", "gen", "python"])
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert result.output.count("Created a gitignore") == 1
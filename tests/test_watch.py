@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pygic.cli import pygic
+from pygic.gitignore import Gitignore
+from pygic.watch import GitignoreWatcher, read_names_file
+
+
+@pytest.fixture
+def templates_directory(tmp_path: Path) -> Path:
+    templates_directory = tmp_path / "templates"
+    templates_directory.mkdir()
+    (templates_directory / "order").write_text("python\n")
+    (templates_directory / "Python.gitignore").write_text("__pycache__/\n")
+    (templates_directory / "Python.patch").write_text("*.pyc\n")
+    (templates_directory / "C.gitignore").write_text("*.o\n")
+    (templates_directory / "Go.gitignore").write_text("vendor/\n")
+    return templates_directory
+
+
+def make_watcher(
+    templates_directory: Path, path: Path, *names: str, **kwargs
+) -> GitignoreWatcher:
+    return GitignoreWatcher(
+        path,
+        lambda: Gitignore(directory=templates_directory, ignore_num_files_check=True),
+        names,
+        **kwargs,
+    )
+
+
+def test_read_names_file(tmp_path: Path):
+    names_file = tmp_path / "templates.txt"
+    names_file.write_text("# The templates\npython\nnode react  # Frontend\n\n")
+    assert read_names_file(names_file) == ["python", "node", "react"]
+
+
+def test_watcher_only_writes_on_changes(templates_directory: Path, tmp_path: Path):
+    watcher = make_watcher(templates_directory, tmp_path, "python")
+    gitignore = tmp_path / ".gitignore"
+    assert watcher.path == gitignore
+    assert watcher.poll()
+    assert gitignore.read_text() == watcher.templates.create("python")
+    assert not watcher.poll()
+
+    # Other templates are not inputs of the gitignore
+    with patch.object(Gitignore, "create", autospec=True) as create:
+        (templates_directory / "C.gitignore").write_text("*.o\n*.a\n")
+        assert not watcher.poll()
+    create.assert_not_called()
+
+    (templates_directory / "Python.patch").write_text("*.pyc\n*.pyo\n")
+    assert watcher.poll()
+    assert gitignore.read_text().endswith("### Python Patch ###\n*.pyc\n*.pyo\n")
+
+    # The gitignore is not written if its content did not change
+    os.utime(gitignore, ns=(0, 0))
+    os.utime(templates_directory / "Python.gitignore")
+    assert not watcher.poll()
+    assert gitignore.stat().st_mtime_ns == 0
+
+
+def test_watcher_names_file_and_new_templates(
+    templates_directory: Path, tmp_path: Path
+):
+    names_file = tmp_path / "templates.txt"
+    names_file.write_text("python\n")
+    watcher = make_watcher(templates_directory, tmp_path / "out", names_file=names_file)
+    assert watcher.poll()
+
+    names_file.write_text("python\nrust\n")
+    with patch.object(logging.getLogger("pygic.watch"), "error") as error:
+        assert not watcher.poll()
+    assert "No template found for 'rust'" in error.call_args.args[0]
+
+    # The templates are loaded again when a template is added
+    (templates_directory / "Rust.gitignore").write_text("target/\n")
+    assert watcher.poll()
+    assert "### Rust ###\ntarget/\n" in (tmp_path / "out").read_text()
+
+    names_file.write_text("# No template\n")
+    assert not watcher.poll()
+    names_file.unlink()
+    assert not watcher.poll()
+
+
+def test_watcher_overlay(templates_directory: Path, tmp_path: Path):
+    overlay = tmp_path / "overlay"
+    overlay.mkdir()
+
+    def load_templates() -> Gitignore:
+        return Gitignore(
+            directory=templates_directory, ignore_num_files_check=True
+        ).with_overlays(overlay)
+
+    watcher = GitignoreWatcher(tmp_path / "out", load_templates, ["python"])
+    assert watcher.poll()
+    (overlay / "python.patch").write_text("*.egg-info/\n")
+    assert watcher.poll()
+    assert (
+        (tmp_path / "out").read_text().endswith("### Python Patch ###\n*.egg-info/\n")
+    )
+
+
+def test_watcher_debounce(templates_directory: Path, tmp_path: Path):
+    watcher = make_watcher(templates_directory, tmp_path, "python")
+    assert watcher.poll()
+    with patch("pygic.watch.time.monotonic", side_effect=[100, 105, 106, 115, 117]):
+        (templates_directory / "Python.gitignore").write_text("build/\n")
+        assert not watcher.poll(debounce=10)
+        assert not watcher.poll(debounce=10)
+        # The templates are still changing
+        (templates_directory / "Python.gitignore").write_text("build/\ndist/\n")
+        assert not watcher.poll(debounce=10)
+        assert not watcher.poll(debounce=10)
+        assert watcher.poll(debounce=10)
+    assert "build/\ndist/\n" in (tmp_path / ".gitignore").read_text()
+
+
+def test_watcher_run(templates_directory: Path, tmp_path: Path):
+    watcher = make_watcher(templates_directory, tmp_path, "go")
+    gitignore = tmp_path / ".gitignore"
+    written: list[Path] = []
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watcher.run,
+        args=(0.01, 0),
+        kwargs={"stop": stop, "on_write": written.append},
+    )
+    thread.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not written and time.monotonic() < deadline:
+            time.sleep(0.01)
+        (templates_directory / "Go.gitignore").write_text("vendor/\nbin/\n")
+        while len(written) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+    assert written == [gitignore, gitignore]
+    assert gitignore.read_text() == "### Go ###\nvendor/\nbin/\n"
+
+
+def test_cli_pygic_watch_command(templates_directory: Path, tmp_path: Path):
+    def run_once(watcher: GitignoreWatcher, interval, debounce, *, on_write):
+        assert (interval, debounce) == (0.2, 0)
+        if watcher.poll():
+            on_write(watcher.path)
+        raise KeyboardInterrupt
+
+    runner = CliRunner()
+    args = ["--directory", str(templates_directory), "--ignore-num-files-check"]
+    with patch.object(GitignoreWatcher, "run", autospec=True, side_effect=run_once):
+        result = runner.invoke(
+            pygic,
+            [
+                "watch",
+                str(tmp_path),
+                "python",
+                "--interval",
+                "0.2",
+                "--debounce",
+                "0",
+                *args,
+            ],
+        )
+    assert result.exit_code == 0, f"CLI Command failed with output: {result.output}"
+    assert f"Updated {tmp_path / '.gitignore'}" in result.output
+    assert (tmp_path / ".gitignore").read_text().startswith("### Python ###\n")
+
+    result = runner.invoke(pygic, ["watch", str(tmp_path), *args])
+    assert result.exit_code == 2
+    assert "Provide template NAMES or a --names-file." in result.output